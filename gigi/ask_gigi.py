@@ -12,7 +12,6 @@ without duplication. All 19 tools available across all channels.
 
 import json
 import logging
-from datetime import datetime
 
 logger = logging.getLogger("gigi.ask_gigi")
 
@@ -31,63 +30,48 @@ def _get_bot():
     return _bot_instance
 
 
-def _build_system_prompt(channel: str, conversation_store=None, user_message=None):
-    """Build system prompt with dynamic context, adapted for the given channel."""
-    from gigi.telegram_bot import (
-        _TELEGRAM_SYSTEM_PROMPT_BASE,
-        MEMORY_AVAILABLE,
-        MODE_AVAILABLE,
-        _memory_system,
-        _mode_detector,
+def _render_system_prompt(channel: str, ctx) -> str:
+    from gigi.prompt_context import (
+        PromptContext,
+        format_date,
+        format_memories,
+        format_mode,
     )
+    from gigi.telegram_bot import _TELEGRAM_SYSTEM_PROMPT_BASE
 
-    parts = [_TELEGRAM_SYSTEM_PROMPT_BASE]
+    # Stable sections first so the prompt prefix caches across turns
+    stable = [
+        f"\n# Channel\nThis conversation is via the '{channel}' channel.",
+        format_memories(ctx.memories),
+        ctx.long_term,
+    ]
+    volatile = [format_date(), format_mode(ctx.mode), ctx.cross_channel]
+    return PromptContext.render(_TELEGRAM_SYSTEM_PROMPT_BASE, stable, volatile)
 
-    # Current date/time
-    parts.append(
-        f"\n# Current Date\nToday is {datetime.now().strftime('%A, %B %d, %Y')}"
-    )
-    parts.append(f"\n# Channel\nThis conversation is via the '{channel}' channel.")
 
-    # Inject mode context
-    if MODE_AVAILABLE and _mode_detector:
-        try:
-            mode_info = _mode_detector.get_current_mode()
-            parts.append(
-                f"\n# Current Operating Mode\nMode: {mode_info.mode.value.upper()} (source: {mode_info.source.value})"
-            )
-        except Exception as e:
-            logger.warning(f"Mode detection failed: {e}")
+def _context_kwargs(channel: str, conversation_store=None) -> dict:
+    return {
+        "user_id": "jason" if conversation_store else None,
+        "channel": channel,
+        "long_term_days": 30,
+        "conversation_store": conversation_store,
+    }
 
-    # Inject relevant memories
-    if MEMORY_AVAILABLE and _memory_system:
-        try:
-            memories = _memory_system.query_memories(min_confidence=0.5, limit=25)
-            if memories:
-                memory_lines = [
-                    f"- {m.content} (confidence: {m.confidence:.0%}, category: {m.category})"
-                    for m in memories
-                ]
-                parts.append("\n# Your Saved Memories\n" + "\n".join(memory_lines))
-        except Exception as e:
-            logger.warning(f"Memory injection failed: {e}")
 
-    # Inject cross-channel context
-    if conversation_store:
-        try:
-            xc = conversation_store.get_cross_channel_summary(
-                "jason", channel, limit=5, hours=24
-            )
-            if xc:
-                parts.append(xc)
-            # Long-term conversation history (summaries from past 30 days)
-            ltc = conversation_store.get_long_term_context("jason", days=30)
-            if ltc:
-                parts.append(ltc)
-        except Exception as e:
-            logger.warning(f"Cross-channel context failed: {e}")
+def _build_system_prompt(channel: str, conversation_store=None, user_message=None):
+    """Build system prompt with dynamic context, adapted for the given channel."""
+    from gigi.telegram_bot import _prompt_context
+
+    ctx = _prompt_context.fetch(**_context_kwargs(channel, conversation_store))
+    return _render_system_prompt(channel, ctx)
+
+
+async def _abuild_system_prompt(channel: str, conversation_store=None, user_message=None):
+    """Async variant of _build_system_prompt (context fetched off the event loop)."""
+    from gigi.telegram_bot import _prompt_context
 
-    return "\n".join(parts)
+    ctx = await _prompt_context.fetch_async(**_context_kwargs(channel, conversation_store))
+    return _render_system_prompt(channel, ctx)
 
 
 _BRIEFING_KEYWORDS = (
@@ -132,7 +116,7 @@ async def ask_gigi(text: str, user_id: str = "jason", channel: str = "api") -> s
     store.append(user_id, channel, "user", text)
 
     # Build system prompt with cross-channel context
-    sys_prompt = _build_system_prompt(channel, store, user_message=text)
+    sys_prompt = await _abuild_system_prompt(channel, store, user_message=text)
 
     # Get conversation history for this channel
     history = store.get_recent(user_id, channel, limit=20)
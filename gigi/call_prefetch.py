@@ -0,0 +1,366 @@
+"""
+Per-call caller context prefetch for Retell voice calls.
+
+When Retell asks for inbound dynamic variables (before the caller hears a
+word), we already know the caller's phone number. The first LLM turn then
+typically needs who they are, their shifts, open call-outs and what they
+talked about last time - previously fetched one tool call at a time while the
+caller waited.
+
+CallContextPrefetcher loads all of that in parallel into a short-lived
+per-call cache:
+
+- Keyed by the caller's last-10 phone digits (the inbound-variables webhook
+  arrives before Retell assigns a call_id); call_ids are attached later from
+  call_started / the LLM WebSocket and released at hang-up
+- Concurrent prefetches for the same phone share one in-flight load
+- Entries expire after PREFETCH_TTL_SECONDS; tools fall back to their normal
+  lookups on a miss
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_TTL_SECONDS = 300
+PREFETCH_SHIFT_DAYS = 7
+PREFETCH_CALL_OUT_HOURS = 48
+
+# Lookup order matches the inbound-variables webhook: staff, caregivers, clients, family
+_IDENTITY_TABLES = [
+    ("cached_staff", "staff", "NULL", ""),
+    ("cached_practitioners", "caregiver", "id", "is_active = true AND "),
+    ("cached_patients", "client", "id", "is_active = true AND "),
+    ("cached_related_persons", "family", "NULL", ""),
+]
+
+_PHONE_MATCH = "RIGHT(REGEXP_REPLACE({col}, '[^0-9]', '', 'g'), 10) = %s"
+
+
+def clean_phone(phone: str) -> str:
+    return "".join(filter(str.isdigit, phone or ""))[-10:]
+
+
+def _db_url() -> str:
+    return os.getenv("DATABASE_URL", "postgresql://careassist@localhost:5432/careassist")
+
+
+def _shift_row(row) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "scheduled_start": row[1].isoformat() if row[1] else None,
+        "scheduled_end": row[2].isoformat() if row[2] else None,
+        "status": row[3],
+        "client_id": row[4],
+        "caregiver_id": row[5],
+        "client_name": row[6] or "Unknown",
+        "caregiver_name": row[7] or "Unassigned",
+        "client_address": row[8] or "",
+    }
+
+
+_SHIFT_SELECT = """
+    SELECT a.id, a.scheduled_start, a.scheduled_end, a.status,
+           a.patient_id, a.practitioner_id,
+           p.full_name, pr.full_name, p.address
+    FROM cached_appointments a
+    LEFT JOIN cached_patients p ON a.patient_id = p.id
+    LEFT JOIN cached_practitioners pr ON a.practitioner_id = pr.id
+"""
+
+
+# ----------------------------------------------------------------------
+# Default loaders (each runs in its own thread with its own connection)
+# ----------------------------------------------------------------------
+
+def load_identity(phone: str) -> Optional[Dict[str, Any]]:
+    """Caller identity from the cached WellSky/staff tables, or None."""
+    import psycopg2
+
+    conn = psycopg2.connect(_db_url())
+    try:
+        cur = conn.cursor()
+        for table, caller_type, id_col, active in _IDENTITY_TABLES:
+            cur.execute(
+                f"SELECT {id_col}, first_name, full_name FROM {table} "
+                f"WHERE {active}phone IS NOT NULL AND {_PHONE_MATCH.format(col='phone')} LIMIT 1",
+                (phone,),
+            )
+            row = cur.fetchone()
+            if row:
+                return {
+                    "type": caller_type,
+                    "id": row[0],
+                    "first_name": row[1],
+                    "full_name": row[2],
+                }
+        return None
+    finally:
+        conn.close()
+
+
+def load_shifts(phone: str, days: int = PREFETCH_SHIFT_DAYS) -> List[Dict[str, Any]]:
+    """Today's and upcoming shifts where the caller is the caregiver or the client."""
+    import psycopg2
+
+    start = date.today()
+    conn = psycopg2.connect(_db_url())
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            _SHIFT_SELECT
+            + f"""
+            WHERE a.scheduled_start >= %s AND a.scheduled_start < %s
+              AND ({_PHONE_MATCH.format(col='pr.phone')} OR {_PHONE_MATCH.format(col='p.phone')})
+            ORDER BY a.scheduled_start LIMIT 50
+        """,
+            (start, start + timedelta(days=days), phone, phone),
+        )
+        return [_shift_row(row) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def load_open_call_outs(phone: str, hours: int = PREFETCH_CALL_OUT_HOURS) -> List[Dict[str, Any]]:
+    """Open (uncovered) shifts starting soon - what a call-out leaves behind."""
+    import psycopg2
+
+    now = datetime.now()
+    conn = psycopg2.connect(_db_url())
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            _SHIFT_SELECT
+            + """
+            WHERE a.scheduled_start >= %s AND a.scheduled_start < %s
+              AND (a.practitioner_id IS NULL OR a.status IN ('open', 'pending', 'proposed'))
+            ORDER BY a.scheduled_start LIMIT 25
+        """,
+            (now, now + timedelta(hours=hours)),
+        )
+        return [_shift_row(row) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+# ----------------------------------------------------------------------
+# Cache
+# ----------------------------------------------------------------------
+
+@dataclass
+class CallContext:
+    phone: str
+    identity: Optional[Dict[str, Any]] = None
+    shifts: List[Dict[str, Any]] = field(default_factory=list)
+    open_call_outs: List[Dict[str, Any]] = field(default_factory=list)
+    recent_conversations: List[Dict[str, Any]] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+    @property
+    def person_id(self) -> Optional[str]:
+        return (self.identity or {}).get("id")
+
+    def upcoming_shifts(self, hours: float = None, now: datetime = None) -> List[Dict[str, Any]]:
+        """Shifts that haven't started yet (optionally only within ``hours``), earliest first."""
+        now = now or datetime.now()
+        cutoff = now + timedelta(hours=hours) if hours else None
+        upcoming = []
+        for shift in self.shifts:
+            start = shift.get("scheduled_start")
+            if not start:
+                continue
+            start_dt = datetime.fromisoformat(start)
+            if start_dt >= now and (cutoff is None or start_dt <= cutoff):
+                upcoming.append(shift)
+        return upcoming
+
+    def shifts_payload(self, days: int, caregiver_id: str = None, client_id: str = None) -> Optional[Dict[str, Any]]:
+        """
+        get_wellsky_shifts-shaped result for this caller's own shifts, or None
+        when the request falls outside what was prefetched.
+        """
+        if days > PREFETCH_SHIFT_DAYS or not self.person_id:
+            return None
+        if self.person_id not in (caregiver_id, client_id):
+            return None
+        date_from = date.today()
+        date_to = date_from + timedelta(days=days)
+        shifts = []
+        total_hours = 0
+        for shift in self.shifts:
+            if caregiver_id and shift.get("caregiver_id") != caregiver_id:
+                continue
+            if client_id and shift.get("client_id") != client_id:
+                continue
+            start = datetime.fromisoformat(shift["scheduled_start"])
+            if start.date() >= date_to:
+                continue
+            hours = None
+            if shift.get("scheduled_end"):
+                hours = round((datetime.fromisoformat(shift["scheduled_end"]) - start).total_seconds() / 3600, 1)
+                total_hours += hours
+            shifts.append({**shift, "scheduled_hours": hours})
+        return {
+            "count": len(shifts),
+            "total_scheduled_hours": round(total_hours, 1),
+            "date_range": f"{date_from.isoformat()} to {date_to.isoformat()}",
+            "shifts": shifts,
+        }
+
+
+class CallContextPrefetcher:
+    """Parallel caller-context loader with a short-TTL per-call cache."""
+
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[[str], Any]] = None,
+        ttl: float = PREFETCH_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.loaders = loaders or {
+            "identity": load_identity,
+            "shifts": load_shifts,
+            "open_call_outs": load_open_call_outs,
+        }
+        self.ttl = ttl
+        self._clock = clock
+        self._by_phone: Dict[str, CallContext] = {}
+        self._call_phones: Dict[str, str] = {}  # call_id -> phone
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure_conversations(self, conversation_store, user_id_for: Callable[[str], str], limit: int = 6):
+        """Also prefetch the caller's recent voice conversations from this store."""
+
+        def _load(phone: str):
+            user_id = user_id_for(phone)
+            if not user_id or user_id == "unknown":
+                return []
+            return conversation_store.get_recent(user_id, "voice", limit=limit)
+
+        self.loaders["recent_conversations"] = _load
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    async def prefetch(self, phone: str, call_id: str = None) -> Optional[CallContext]:
+        """Load (or join the in-flight load of) the caller's context. Never raises."""
+        phone = clean_phone(phone)
+        if not phone:
+            return None
+        if call_id:
+            self.attach(call_id, phone)
+
+        cached = self._fresh(phone)
+        if cached:
+            return cached
+
+        future = self._inflight.get(phone)
+        if future is None:
+            future = asyncio.ensure_future(self._load(phone))
+            self._inflight[phone] = future
+            future.add_done_callback(lambda _f: self._inflight.pop(phone, None))
+        return await asyncio.shield(future)
+
+    async def _load(self, phone: str) -> CallContext:
+        started = time.monotonic()
+        names = list(self.loaders)
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.loaders[name], phone) for name in names),
+            return_exceptions=True,
+        )
+        ctx = CallContext(phone=phone, fetched_at=self._clock())
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Call prefetch {name} failed for ...{phone[-4:]}: {result}")
+                continue
+            if result is not None:
+                setattr(ctx, name, result)
+        with self._lock:
+            self._by_phone[phone] = ctx
+            self._evict_expired()
+        logger.info(
+            f"Prefetched call context for ...{phone[-4:]} in {(time.monotonic() - started) * 1000:.0f}ms "
+            f"(identity={'yes' if ctx.identity else 'no'}, shifts={len(ctx.shifts)})"
+        )
+        return ctx
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _fresh(self, phone: str) -> Optional[CallContext]:
+        with self._lock:
+            ctx = self._by_phone.get(phone)
+            if ctx and self._clock() - ctx.fetched_at < self.ttl:
+                return ctx
+        return None
+
+    def get(self, call_id: str = None, phone: str = None) -> Optional[CallContext]:
+        """Fresh prefetched context by call_id or caller phone, else None."""
+        if call_id and not phone:
+            phone = self._call_phones.get(call_id)
+        ctx = self._fresh(clean_phone(phone)) if phone else None
+        if ctx:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return ctx
+
+    def find_person(self, person_id: str) -> Optional[CallContext]:
+        """Fresh context whose caller is the given caregiver/client ID."""
+        if not person_id:
+            return None
+        with self._lock:
+            candidates = [c for c in self._by_phone.values() if c.person_id == person_id]
+        for ctx in candidates:
+            fresh = self._fresh(ctx.phone)
+            if fresh:
+                self.hits += 1
+                return fresh
+        self.misses += 1
+        return None
+
+    # ------------------------------------------------------------------
+    # Call lifecycle
+    # ------------------------------------------------------------------
+
+    def attach(self, call_id: str, phone: str) -> None:
+        phone = clean_phone(phone)
+        if call_id and phone:
+            with self._lock:
+                self._call_phones[call_id] = phone
+
+    def release(self, call_id: str) -> None:
+        """Drop a finished call's context (other live calls from the same phone keep it)."""
+        with self._lock:
+            phone = self._call_phones.pop(call_id, None)
+            if phone and phone not in self._call_phones.values():
+                self._by_phone.pop(phone, None)
+
+    def forget_person(self, person_id: str) -> None:
+        """Drop cached context for a caller whose schedule just changed."""
+        with self._lock:
+            for phone in [p for p, c in self._by_phone.items() if person_id and c.person_id == person_id]:
+                del self._by_phone[phone]
+
+    def _evict_expired(self) -> None:
+        now = self._clock()
+        for phone in [p for p, c in self._by_phone.items() if now - c.fetched_at >= self.ttl]:
+            del self._by_phone[phone]
+        live = set(self._by_phone)
+        for call_id in [c for c, p in self._call_phones.items() if p not in live]:
+            del self._call_phones[call_id]
+
+
+call_prefetcher = CallContextPrefetcher()
@@ -14,8 +14,10 @@ Preference types:
 import os
 import json
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 
 # Multi-LLM support — use whatever provider is configured
 try:
@@ -35,6 +37,14 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 CAREGIVER_MEMORY_ENABLED = os.getenv("CAREGIVER_MEMORY_ENABLED", "false").lower() == "true"
+PREFERENCE_CACHE_TTL = int(os.getenv("CAREGIVER_PREFERENCE_CACHE_TTL", "60"))  # seconds
+
+# caregiver_id -> (loaded_at, active preferences). Shared by every extractor in
+# the process, so a preference stored through the RC bot's extractor is seen
+# by the shift matcher's on its next lookup. A process that didn't do the
+# write keeps its copy for up to PREFERENCE_CACHE_TTL seconds.
+_pref_cache: Dict[str, Tuple[float, List[Any]]] = {}
+_pref_cache_lock = threading.Lock()
 
 EXTRACTION_PROMPT = """Analyze this message from caregiver {name} (ID: {caregiver_id}).
 Extract any scheduling preferences, client preferences, or location preferences.
@@ -64,6 +74,13 @@ Rules:
 - Do NOT invent preferences that aren't clearly stated"""
 
 
+@dataclass
+class CaregiverPreferences:
+    """A caregiver's active preferences, split the way the matcher uses them."""
+    hard: List[Any] = field(default_factory=list)
+    soft: List[Any] = field(default_factory=list)
+
+
 class CaregiverPreferenceExtractor:
     """Extracts and stores caregiver preferences from free-text messages."""
 
@@ -190,14 +207,15 @@ class CaregiverPreferenceExtractor:
         }
 
         # Include structured fields if present
-        for field in ["day_of_week", "time_preference", "client_name", "location"]:
-            if pref.get(field):
-                metadata[field] = pref[field]
+        for key in ["day_of_week", "time_preference", "client_name", "location"]:
+            if pref.get(key):
+                metadata[key] = pref[key]
 
         # Check for existing similar preference
         existing = self._find_similar_preference(caregiver_id, content, pref_type)
         if existing:
             self.memory.reinforce_memory(existing.id)
+            self.invalidate_preferences(caregiver_id)
             logger.info(f"Reinforced preference for {caregiver_name}: {content}")
             return existing.id
 
@@ -214,6 +232,7 @@ class CaregiverPreferenceExtractor:
             impact_level=impact,
             metadata=metadata
         )
+        self.invalidate_preferences(caregiver_id)
 
         logger.info(f"New preference for {caregiver_name}: {content} (hard={hard})")
         return memory_id
@@ -231,14 +250,14 @@ class CaregiverPreferenceExtractor:
             category="caregiver_preference",
             status=MemoryStatus.ACTIVE,
             min_confidence=0.0,
-            limit=100
+            limit=None,
+            metadata_key="caregiver_id",
+            metadata_values=[caregiver_id],
         )
 
         content_lower = content.lower()
         for mem in existing:
             meta = mem.metadata or {}
-            if meta.get("caregiver_id") != caregiver_id:
-                continue
             if meta.get("preference_type") != pref_type:
                 continue
             # Simple similarity check - same key words
@@ -254,35 +273,85 @@ class CaregiverPreferenceExtractor:
         preference_type: Optional[str] = None
     ) -> List[Any]:
         """Get all active preferences for a caregiver."""
-        from gigi.memory_system import MemoryStatus
-
-        all_prefs = self.memory.query_memories(
-            category="caregiver_preference",
-            status=MemoryStatus.ACTIVE,
-            min_confidence=0.3,
-            limit=200
-        )
-
-        result = []
-        for mem in all_prefs:
-            meta = mem.metadata or {}
-            if meta.get("caregiver_id") != caregiver_id:
-                continue
-            if preference_type and meta.get("preference_type") != preference_type:
-                continue
-            result.append(mem)
+        prefs = self._load_preferences([caregiver_id])[caregiver_id]
+        if preference_type:
+            return [p for p in prefs if (p.metadata or {}).get("preference_type") == preference_type]
+        return prefs
 
-        return result
+    def get_preferences_for_caregivers(
+        self,
+        caregiver_ids: Iterable[str]
+    ) -> Dict[str, CaregiverPreferences]:
+        """Hard and soft preferences for a whole candidate list, in at most one query."""
+        loaded = self._load_preferences(caregiver_ids)
+        return {
+            cg_id: CaregiverPreferences(
+                hard=self._hard(prefs),
+                soft=self._soft(prefs),
+            )
+            for cg_id, prefs in loaded.items()
+        }
 
     def get_hard_constraints(self, caregiver_id: str) -> List[Any]:
         """Get only hard constraints (high confidence, hard_constraint=true)."""
-        prefs = self.get_caregiver_preferences(caregiver_id)
+        return self._hard(self.get_caregiver_preferences(caregiver_id))
+
+    def get_soft_preferences(self, caregiver_id: str) -> List[Any]:
+        """Get soft preferences (not hard constraints)."""
+        return self._soft(self.get_caregiver_preferences(caregiver_id))
+
+    def invalidate_preferences(self, caregiver_id: Optional[str] = None):
+        """Drop cached preferences for one caregiver (or everyone) in this process."""
+        with _pref_cache_lock:
+            if caregiver_id is None:
+                _pref_cache.clear()
+            else:
+                _pref_cache.pop(caregiver_id, None)
+
+    @staticmethod
+    def _hard(prefs: List[Any]) -> List[Any]:
         return [p for p in prefs
                 if p.metadata.get("hard_constraint", False)
                 and p.confidence >= 0.5]
 
-    def get_soft_preferences(self, caregiver_id: str) -> List[Any]:
-        """Get soft preferences (not hard constraints)."""
-        prefs = self.get_caregiver_preferences(caregiver_id)
+    @staticmethod
+    def _soft(prefs: List[Any]) -> List[Any]:
         return [p for p in prefs
                 if not p.metadata.get("hard_constraint", False)]
+
+    def _load_preferences(self, caregiver_ids: Iterable[str]) -> Dict[str, List[Any]]:
+        """Active preferences per caregiver, from the cache or one indexed query for the rest."""
+        from gigi.memory_system import MemoryStatus
+
+        ids = list(dict.fromkeys(str(i) for i in caregiver_ids if i))
+        now = time.monotonic()
+        result: Dict[str, List[Any]] = {}
+        with _pref_cache_lock:
+            for cg_id in ids:
+                cached = _pref_cache.get(cg_id)
+                if cached and now - cached[0] < PREFERENCE_CACHE_TTL:
+                    result[cg_id] = cached[1]
+        missing = [cg_id for cg_id in ids if cg_id not in result]
+        if not missing:
+            return result
+
+        memories = self.memory.query_memories(
+            category="caregiver_preference",
+            status=MemoryStatus.ACTIVE,
+            min_confidence=0.3,
+            limit=None,
+            metadata_key="caregiver_id",
+            metadata_values=missing,
+        )
+
+        fetched: Dict[str, List[Any]] = {cg_id: [] for cg_id in missing}
+        for mem in memories:
+            cg_id = (mem.metadata or {}).get("caregiver_id")
+            if cg_id in fetched:
+                fetched[cg_id].append(mem)
+
+        with _pref_cache_lock:
+            for cg_id, prefs in fetched.items():
+                _pref_cache[cg_id] = (now, prefs)
+        result.update(fetched)
+        return result
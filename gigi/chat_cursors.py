@@ -0,0 +1,97 @@
+"""
+Glip Chat Cursors
+
+Per-chat polling state for the RC bot's team chat and DM checks:
+- A last-seen cursor (newest post timestamp) so each poll only asks RingCentral
+  for posts newer than what we've already handled
+- Adaptive backoff for quiet chats (interval doubles per idle poll, capped;
+  the team chat has a low cap of its own because @Gigi mentions there have no
+  lastModifiedTime wake-up)
+- Immediate wake-up when a chat's lastModifiedTime moves past its cursor, so a
+  backed-off chat still gets answered on the next cycle
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+CHAT_POLL_BASE_SECONDS = 30
+CHAT_POLL_MAX_SECONDS = 300
+TEAM_CHAT_POLL_MAX_SECONDS = 60
+
+
+def parse_rc_timestamp(value: str) -> Optional[datetime]:
+    """Parse a RingCentral ISO timestamp (with or without millis) as naive UTC."""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+@dataclass
+class ChatCursor:
+    chat_id: str
+    last_seen_at: datetime
+    idle_polls: int = 0
+    next_poll_at: Optional[datetime] = None
+
+
+class ChatCursorTracker:
+    """Tracks cursors and backoff for a set of chats."""
+
+    def __init__(
+        self,
+        start_at: datetime,
+        base_interval: int = CHAT_POLL_BASE_SECONDS,
+        max_interval: int = CHAT_POLL_MAX_SECONDS,
+    ):
+        self.start_at = start_at
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._cursors: Dict[str, ChatCursor] = {}
+        self._max_intervals: Dict[str, int] = {}
+
+    def set_max_interval(self, chat_id: str, max_interval: int) -> None:
+        """Cap one chat's backoff below the tracker-wide maximum."""
+        self._max_intervals[chat_id] = max_interval
+
+    def get(self, chat_id: str) -> ChatCursor:
+        cursor = self._cursors.get(chat_id)
+        if cursor is None:
+            cursor = ChatCursor(chat_id=chat_id, last_seen_at=self.start_at)
+            self._cursors[chat_id] = cursor
+        return cursor
+
+    def is_due(self, chat_id: str, now: datetime, last_modified: str = None) -> bool:
+        """Whether a chat should be fetched this cycle."""
+        cursor = self.get(chat_id)
+        modified_at = parse_rc_timestamp(last_modified) if last_modified else None
+        if modified_at and modified_at > cursor.last_seen_at:
+            return True
+        return cursor.next_poll_at is None or now >= cursor.next_poll_at
+
+    def advance(self, chat_id: str, posts: List[Dict[str, Any]], now: datetime) -> None:
+        """Move the cursor past ``posts`` (oldest-first) and schedule the next poll."""
+        cursor = self.get(chat_id)
+        newest = None
+        for post in posts:
+            created = parse_rc_timestamp(post.get("creationTime", ""))
+            if created and (newest is None or created > newest):
+                newest = created
+        if newest and newest > cursor.last_seen_at:
+            cursor.last_seen_at = newest
+            cursor.idle_polls = 0
+        else:
+            cursor.idle_polls += 1
+
+        max_interval = self._max_intervals.get(chat_id, self.max_interval)
+        interval = min(self.base_interval * (2 ** cursor.idle_polls), max_interval)
+        cursor.next_poll_at = now + timedelta(seconds=interval)
+
+    def forget(self, chat_id: str) -> None:
+        self._cursors.pop(chat_id, None)
+        self._max_intervals.pop(chat_id, None)
@@ -4,14 +4,20 @@ Clock In/Out Reminder Service
 Monitors today's shifts and sends SMS reminders to caregivers
 who haven't clocked in/out within 5 minutes of shift start/end.
 
-Integrates with the RC bot's check_and_act() polling loop.
+Runs as a job on the RC bot's scheduler (gigi/job_scheduler.py).
+
+Today's shifts are held in a TodayShiftIndex ordered by start and end time,
+so each check only visits shifts whose reminder window is open. The index is
+an hourly snapshot used only to pick reminder candidates; SMS clock-in/out
+always looks the caregiver's shift up live in WellSky before changing it.
 """
 
 import logging
 import os
+from bisect import bisect_left, bisect_right
 from datetime import date, datetime, timedelta
 from datetime import time as dt_time
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
 try:
     import psycopg2
@@ -30,6 +36,139 @@ REMINDER_THRESHOLD_MINUTES = (
 )
 REMINDER_COOLDOWN_MINUTES = 60  # Don't re-remind for same shift within this window
 MAX_LATE_MINUTES = 120  # Don't send reminders if shift started > 2 hours ago
+SHIFT_CACHE_REFRESH_INTERVAL = timedelta(hours=1)
+
+
+def _parse_time(time_str) -> Optional[dt_time]:
+    """Parse a time string into a time object."""
+    if not time_str:
+        return None
+    if isinstance(time_str, dt_time):
+        return time_str
+    try:
+        # Try HH:MM format
+        return datetime.strptime(str(time_str)[:5], "%H:%M").time()
+    except (ValueError, TypeError):
+        try:
+            # Try HH:MM:SS format
+            return datetime.strptime(str(time_str)[:8], "%H:%M:%S").time()
+        except (ValueError, TypeError):
+            return None
+
+
+class TodayShiftIndex:
+    """Today's shifts, ordered by start and end time."""
+
+    def __init__(self, shifts: List[Dict], day: date, built_at: datetime):
+        self.shifts = shifts
+        self.day = day
+        self.built_at = built_at
+
+        self._by_start = self._ordered("start_time")
+        self._start_keys = [dt for dt, _ in self._by_start]
+        self._by_end = self._ordered("end_time")
+        self._end_keys = [dt for dt, _ in self._by_end]
+
+    def _ordered(self, field: str) -> List[tuple]:
+        ordered = []
+        for i, shift in enumerate(self.shifts):
+            t = _parse_time(shift.get(field))
+            if t:
+                ordered.append((datetime.combine(self.day, t), i))
+        ordered.sort()
+        return ordered
+
+    def _between(self, ordered, keys, earliest: datetime, latest: datetime) -> List[Dict]:
+        lo = bisect_left(keys, earliest)
+        hi = bisect_right(keys, latest)
+        return [self.shifts[i] for _, i in ordered[lo:hi]]
+
+    def starting_between(self, earliest: datetime, latest: datetime) -> List[Dict]:
+        return self._between(self._by_start, self._start_keys, earliest, latest)
+
+    def ending_between(self, earliest: datetime, latest: datetime) -> List[Dict]:
+        return self._between(self._by_end, self._end_keys, earliest, latest)
+
+    def __len__(self) -> int:
+        return len(self.shifts)
+
+
+def _lookup_practitioners(caregiver_ids: Iterable[str]) -> Dict[str, tuple]:
+    """Batch lookup of (phone, first_name) by caregiver ID from cached_practitioners."""
+    ids = sorted({str(i) for i in caregiver_ids if i})
+    if not ids or not psycopg2:
+        return {}
+    try:
+        conn = psycopg2.connect(DATABASE_URL)
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT id, phone, first_name FROM cached_practitioners WHERE id = ANY(%s)",
+            (ids,),
+        )
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"Could not look up caregiver phones: {e}")
+        return {}
+    return {str(row[0]): (row[1] or "", row[2] or "") for row in rows}
+
+
+def build_today_shift_index(wellsky_service) -> TodayShiftIndex:
+    """Fetch today's shifts and resolve caregiver phones in one cached_practitioners query."""
+    today = date.today()
+    shifts = wellsky_service.get_shifts(date_from=today, date_to=today, limit=500)
+
+    active = []
+    for s in shifts:
+        if not s.caregiver_id:
+            continue
+        if hasattr(s, "status") and hasattr(s.status, "value"):
+            status = s.status.value
+        else:
+            status = str(s.status) if s.status else "scheduled"
+        if status in ("scheduled", "confirmed", "in_progress"):
+            active.append((s, status))
+
+    practitioners = _lookup_practitioners(
+        s.caregiver_id for s, _ in active if not getattr(s, "caregiver_phone", None)
+    )
+
+    entries = []
+    unresolved = 0
+    for s, status in active:
+        cached_phone, cached_name = practitioners.get(str(s.caregiver_id), ("", ""))
+        phone = getattr(s, "caregiver_phone", None) or cached_phone
+        if not phone:
+            unresolved += 1
+
+        caregiver_name = (
+            getattr(s, "caregiver_first_name", None)
+            or getattr(s, "caregiver_name", None)
+            or cached_name
+        )
+        client_name = getattr(s, "client_first_name", None) or getattr(s, "client_name", None) or ""
+
+        entries.append(
+            {
+                "shift_id": s.id,
+                "caregiver_id": s.caregiver_id,
+                "caregiver_phone": phone,
+                "caregiver_name": caregiver_name,
+                "client_name": client_name,
+                "shift_date": getattr(s, "date", None) or today,
+                "start_time": getattr(s, "start_time", None),
+                "end_time": getattr(s, "end_time", None),
+                "clock_in_time": getattr(s, "clock_in_time", None),
+                "clock_out_time": getattr(s, "clock_out_time", None),
+                "status": status,
+                "shift": s,
+            }
+        )
+
+    if unresolved:
+        logger.info(f"{unresolved} shifts today have no caregiver phone in cached_practitioners")
+    return TodayShiftIndex(entries, today, datetime.now())
 
 
 class ClockReminderService:
@@ -46,8 +185,9 @@ class ClockReminderService:
 
         # Local shift cache (refreshed hourly)
         self._cached_shifts: List[Dict] = []
+        self._shift_index: Optional[TodayShiftIndex] = None
         self._last_cache_refresh: Optional[datetime] = None
-        self._cache_refresh_interval = timedelta(hours=1)
+        self._cache_refresh_interval = SHIFT_CACHE_REFRESH_INTERVAL
 
         # Track sent reminders to avoid duplicates: "shift_id:type" -> sent_at
         self._sent_reminders: Dict[str, datetime] = self._load_sent_reminders()
@@ -69,7 +209,14 @@ class ClockReminderService:
         if self._should_refresh_cache(now):
             self._refresh_shift_cache()
 
-        for shift in self._cached_shifts:
+        if self._shift_index is None:
+            return actions
+
+        # Only shifts whose start/end falls inside the reminder window
+        earliest = now - timedelta(minutes=MAX_LATE_MINUTES)
+        latest = now - timedelta(minutes=REMINDER_THRESHOLD_MINUTES)
+
+        for shift in self._shift_index.starting_between(earliest, latest):
             # Skip if not today
             if shift.get("shift_date") != date.today():
                 continue
@@ -82,6 +229,10 @@ class ClockReminderService:
                         f"clock_in_reminder:{shift.get('caregiver_name', '?')}"
                     )
 
+        for shift in self._shift_index.ending_between(earliest, latest):
+            if shift.get("shift_date") != date.today():
+                continue
+
             # Check clock-out reminder
             if self._needs_clock_out_reminder(shift, now):
                 sent = self._send_clock_out_reminder(shift, now)
@@ -98,72 +249,16 @@ class ClockReminderService:
     def _should_refresh_cache(self, now: datetime) -> bool:
         if self._last_cache_refresh is None:
             return True
+        if self._last_cache_refresh.date() != now.date():
+            return True
         return (now - self._last_cache_refresh) >= self._cache_refresh_interval
 
     def _refresh_shift_cache(self):
-        """Fetch today's shifts and cache them locally."""
+        """Fetch today's shifts and index them by start and end time."""
         try:
-            today = date.today()
-            shifts = self.wellsky.get_shifts(date_from=today, date_to=today, limit=500)
-
-            self._cached_shifts = []
-            for s in shifts:
-                if not s.caregiver_id:
-                    continue
-                if hasattr(s, "status") and hasattr(s.status, "value"):
-                    status = s.status.value
-                else:
-                    status = str(s.status) if s.status else "scheduled"
-
-                if status not in ("scheduled", "confirmed", "in_progress"):
-                    continue
-
-                # Get caregiver phone from the shift or look up
-                phone = ""
-                if hasattr(s, "caregiver_phone") and s.caregiver_phone:
-                    phone = s.caregiver_phone
-                else:
-                    try:
-                        cg = self.wellsky.get_caregiver(s.caregiver_id)
-                        phone = cg.phone if cg else ""
-                    except Exception:
-                        pass
-
-                caregiver_name = ""
-                if hasattr(s, "caregiver_first_name") and s.caregiver_first_name:
-                    caregiver_name = s.caregiver_first_name
-                elif hasattr(s, "caregiver_name") and s.caregiver_name:
-                    caregiver_name = s.caregiver_name
-
-                client_name = ""
-                if hasattr(s, "client_first_name") and s.client_first_name:
-                    client_name = s.client_first_name
-                elif hasattr(s, "client_name") and s.client_name:
-                    client_name = s.client_name
-
-                self._cached_shifts.append(
-                    {
-                        "shift_id": s.id,
-                        "caregiver_id": s.caregiver_id,
-                        "caregiver_phone": phone,
-                        "caregiver_name": caregiver_name,
-                        "client_name": client_name,
-                        "shift_date": s.date if hasattr(s, "date") else today,
-                        "start_time": s.start_time
-                        if hasattr(s, "start_time")
-                        else None,
-                        "end_time": s.end_time if hasattr(s, "end_time") else None,
-                        "clock_in_time": s.clock_in_time
-                        if hasattr(s, "clock_in_time")
-                        else None,
-                        "clock_out_time": s.clock_out_time
-                        if hasattr(s, "clock_out_time")
-                        else None,
-                        "status": status,
-                    }
-                )
-
-            self._last_cache_refresh = datetime.now()
+            self._shift_index = build_today_shift_index(self.wellsky)
+            self._cached_shifts = self._shift_index.shifts
+            self._last_cache_refresh = self._shift_index.built_at
             logger.info(
                 f"Clock reminder cache refreshed: {len(self._cached_shifts)} shifts today"
             )
@@ -173,19 +268,7 @@ class ClockReminderService:
 
     def _parse_time(self, time_str) -> Optional[dt_time]:
         """Parse a time string into a time object."""
-        if not time_str:
-            return None
-        if isinstance(time_str, dt_time):
-            return time_str
-        try:
-            # Try HH:MM format
-            return datetime.strptime(str(time_str)[:5], "%H:%M").time()
-        except (ValueError, TypeError):
-            try:
-                # Try HH:MM:SS format
-                return datetime.strptime(str(time_str)[:8], "%H:%M:%S").time()
-            except (ValueError, TypeError):
-                return None
+        return _parse_time(time_str)
 
     def _needs_clock_in_reminder(self, shift: Dict, now: datetime) -> bool:
         if shift.get("clock_in_time") is not None:
@@ -15,6 +15,11 @@ try:
 except ImportError:
     psycopg2 = None
 
+try:
+    from gigi.prompt_context import SEGMENT_CROSS_CHANNEL, SEGMENT_LONG_TERM, bump_version
+except ImportError:  # run as a script from inside gigi/
+    from prompt_context import SEGMENT_CROSS_CHANNEL, SEGMENT_LONG_TERM, bump_version
+
 logger = logging.getLogger(__name__)
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://careassist@localhost:5432/careassist")
 
@@ -83,6 +88,7 @@ class ConversationStore:
                 conn.commit()
             finally:
                 conn.close()
+            bump_version(SEGMENT_CROSS_CHANNEL, user_id)
         except Exception as e:
             logger.error("Failed to append conversation message: %s", e)
 
@@ -206,6 +212,7 @@ class ConversationStore:
                 conn.commit()
             finally:
                 conn.close()
+            bump_version(SEGMENT_CROSS_CHANNEL, user_id)
         except Exception as e:
             logger.error("Failed to clear channel conversations: %s", e)
 
@@ -333,6 +340,7 @@ class ConversationStore:
                             (user_id, channel, conv_date, summary, len(messages), topics)
                         )
                     conn2.commit()
+                    bump_version(SEGMENT_LONG_TERM, user_id)
                     logger.info("Summarized %s/%s/%s: %d messages", user_id, channel, conv_date, len(messages))
                 finally:
                     conn2.close()
@@ -4,13 +4,22 @@ Daily Shift Confirmation Service
 Sends "you have shifts tomorrow" reminder texts at 2pm Mountain daily.
 One SMS per caregiver, even if they have multiple shifts.
 
-Integrates with the RC bot's check_and_act() polling loop.
+Runs as a job on the RC bot's scheduler (gigi/job_scheduler.py).
+
+Tomorrow's schedule is pulled in one pass (cached_appointments, or a
+concurrent WellSky fetch when the cache is stale) and the texts go out
+through a rate-limited async sender. Each caregiver's send is recorded in
+gigi_dedup_state, so a run that dies halfway resumes without double-texting.
 """
 
+import asyncio
 import os
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple, Callable
+from typing import Any, Dict, List, Optional, Set, Tuple, Callable
 
 try:
     import pytz
@@ -29,6 +38,62 @@ DAILY_CONFIRMATION_ENABLED = os.getenv("DAILY_CONFIRMATION_ENABLED", "false").lo
 CONFIRMATION_HOUR = 14  # 2pm Mountain
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://careassist@localhost:5432/careassist")
 
+SMS_RATE_PER_SECOND = float(os.getenv("DAILY_CONFIRMATION_SMS_RATE", "2"))
+SMS_CONCURRENCY = int(os.getenv("DAILY_CONFIRMATION_SMS_CONCURRENCY", "4"))
+FETCH_WORKERS = int(os.getenv("DAILY_CONFIRMATION_FETCH_WORKERS", "8"))
+CACHE_MAX_AGE_HOURS = 6  # Portal cache sync runs every 2h; allow a couple of missed runs
+WELLSKY_PAGE_SIZE = 200
+SENT_KEY_PREFIX = "daily_confirmation:"
+
+
+def _fetch_all_pages(fetch_page: Callable[[int], list]) -> list:
+    """Every record from a WellSky list call, paging by offset until a short page."""
+    records: Dict[str, Any] = {}
+    offset = 0
+    while True:
+        page = fetch_page(offset)
+        new = [r for r in page if r.id not in records]
+        for r in new:
+            records[r.id] = r
+        # Stop on a short page, or if the API ignored the offset
+        if len(page) < WELLSKY_PAGE_SIZE or not new:
+            return list(records.values())
+        offset += WELLSKY_PAGE_SIZE
+
+
+@dataclass
+class ConfirmationShift:
+    """A shift row from cached_appointments, shaped like WellSkyShift for messaging."""
+    client_first_name: str
+    start_time: Optional[str]
+    end_time: Optional[str]
+
+
+@dataclass
+class CaregiverSchedule:
+    """One caregiver's shifts for tomorrow."""
+    caregiver_id: str
+    first_name: str
+    phone: str
+    shifts: list = field(default_factory=list)
+
+
+class RateLimiter:
+    """Spaces out calls to at most `rate` per second across concurrent tasks."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 
 class DailyConfirmationService:
     """Sends daily shift confirmation texts at 2pm Mountain."""
@@ -45,7 +110,7 @@ class DailyConfirmationService:
 
     def check_and_send(self) -> List[str]:
         """
-        Called from RC bot's check_and_act() loop every cycle.
+        Called by the RC bot's daily_confirmations job every minute.
         Only actually sends once per day at 2pm Mountain.
 
         Returns:
@@ -65,10 +130,14 @@ class DailyConfirmationService:
         if self._last_confirmation_date == today:
             return []
 
+        logger.info("Starting daily shift confirmations...")
+        notified = self._send_all_confirmations(today + timedelta(days=1))
+
+        # Marked done only after the run finishes: if the process dies mid-run
+        # the next tick resumes, and the per-caregiver markers prevent repeats.
         self._last_confirmation_date = today
         self._save_last_date(today)
-        logger.info("Starting daily shift confirmations...")
-        return self._send_all_confirmations()
+        return notified
 
     def _get_mountain_time(self) -> datetime:
         """Get current time in Mountain timezone."""
@@ -77,65 +146,311 @@ class DailyConfirmationService:
         # Fallback: assume UTC-7
         return datetime.utcnow() - timedelta(hours=7)
 
-    def _send_all_confirmations(self) -> List[str]:
-        """Query tomorrow's shifts and send grouped confirmation texts."""
-        tomorrow = date.today() + timedelta(days=1)
+    def _send_all_confirmations(self, tomorrow: Optional[date] = None) -> List[str]:
+        """Pull tomorrow's schedule in one pass and text every caregiver on it."""
+        tomorrow = tomorrow or date.today() + timedelta(days=1)
         notified = []
 
         try:
-            # Get active caregivers from cache
-            from services.wellsky_service import CaregiverStatus
-            caregivers = self.wellsky.get_caregivers(
-                status=CaregiverStatus.ACTIVE, limit=200
+            schedules = self._load_schedule_from_cache(tomorrow)
+            if schedules is None:
+                schedules = self._load_schedule_from_wellsky(tomorrow)
+
+            already_sent = self._load_sent_caregivers(tomorrow)
+            pending = [s for s in schedules if s.caregiver_id not in already_sent]
+            if already_sent:
+                logger.info(
+                    f"Resuming daily confirmations: {len(schedules) - len(pending)} "
+                    f"caregivers already texted for {tomorrow}"
+                )
+
+            notified = asyncio.run(self._send_batch(pending, tomorrow))
+            self._cleanup_sent_markers()
+
+        except Exception as e:
+            logger.error(f"Daily confirmation error: {e}")
+
+        return notified
+
+    # ------------------------------------------------------------------
+    # Schedule loading
+    # ------------------------------------------------------------------
+
+    def _load_schedule_from_cache(self, tomorrow: date) -> Optional[List[CaregiverSchedule]]:
+        """
+        Tomorrow's shifts from cached_appointments, grouped by caregiver.
+
+        Returns None when the cache is unavailable, empty for tomorrow or older
+        than CACHE_MAX_AGE_HOURS, so the caller falls back to WellSky.
+        """
+        if not psycopg2:
+            return None
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT MAX(synced_at) FROM cached_appointments "
+                    "WHERE scheduled_start >= %s AND scheduled_start < %s",
+                    (tomorrow, tomorrow + timedelta(days=1)),
+                )
+                synced_at = cur.fetchone()[0]
+                if synced_at is None:
+                    logger.info("No cached appointments for tomorrow, falling back to WellSky")
+                    return None
+                if datetime.now() - synced_at > timedelta(hours=CACHE_MAX_AGE_HOURS):
+                    logger.info(f"Appointment cache is stale (synced {synced_at}), falling back to WellSky")
+                    return None
+
+                cur.execute(
+                    """
+                    SELECT a.practitioner_id, pr.first_name, pr.phone,
+                           p.first_name, a.scheduled_start, a.scheduled_end
+                    FROM cached_appointments a
+                    JOIN cached_practitioners pr ON a.practitioner_id = pr.id
+                    LEFT JOIN cached_patients p ON a.patient_id = p.id
+                    WHERE a.scheduled_start >= %s AND a.scheduled_start < %s
+                    AND LOWER(a.status) IN ('scheduled', 'confirmed')
+                    AND pr.is_active = true
+                    AND pr.phone IS NOT NULL AND pr.phone != ''
+                    ORDER BY a.practitioner_id, a.scheduled_start
+                """,
+                    (tomorrow, tomorrow + timedelta(days=1)),
+                )
+                rows = cur.fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Could not read tomorrow's schedule from cache: {e}")
+            return None
+
+        schedules: Dict[str, CaregiverSchedule] = {}
+        for cg_id, cg_first, phone, client_first, start, end in rows:
+            sched = schedules.get(cg_id)
+            if sched is None:
+                sched = schedules[cg_id] = CaregiverSchedule(cg_id, cg_first or "there", phone)
+            sched.shifts.append(
+                ConfirmationShift(
+                    client_first_name=client_first or "",
+                    start_time=start.strftime("%H:%M") if start else None,
+                    end_time=end.strftime("%H:%M") if end else None,
+                )
             )
 
-            caregiver_count = 0
-            shift_count = 0
+        logger.info(f"Loaded tomorrow's schedule from cache: {len(rows)} shifts, {len(schedules)} caregivers")
+        return list(schedules.values())
 
-            for cg in caregivers:
-                if not cg.phone:
-                    continue
+    def _load_schedule_from_wellsky(self, tomorrow: date) -> List[CaregiverSchedule]:
+        """
+        Tomorrow's shifts straight from WellSky, grouped by caregiver.
 
-                try:
-                    shifts = self.wellsky.get_shifts(
-                        caregiver_id=cg.id,
-                        date_from=tomorrow,
-                        date_to=tomorrow
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to get shifts for {cg.first_name}: {e}")
+        Pages through every active caregiver for phone numbers and every
+        active client, then fetches each client's appointments concurrently.
+        """
+        from services.wellsky_service import CaregiverStatus, ClientStatus
+
+        caregivers = {
+            cg.id: cg
+            for cg in _fetch_all_pages(
+                lambda offset: self.wellsky.get_caregivers(
+                    status=CaregiverStatus.ACTIVE, limit=WELLSKY_PAGE_SIZE, offset=offset
+                )
+            )
+        }
+        clients = _fetch_all_pages(
+            lambda offset: self.wellsky.get_clients(
+                status=ClientStatus.ACTIVE, limit=WELLSKY_PAGE_SIZE, offset=offset
+            )
+        )
+
+        def fetch(client) -> list:
+            try:
+                return self.wellsky.get_shifts(
+                    client_id=client.id, date_from=tomorrow, date_to=tomorrow
+                )
+            except Exception as e:
+                logger.warning(f"Failed to get shifts for client {client.id}: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            per_client = list(pool.map(fetch, clients))
+
+        schedules: Dict[str, CaregiverSchedule] = {}
+        shift_count = 0
+        for shifts in per_client:
+            for s in shifts:
+                status = s.status.value if hasattr(s.status, 'value') else str(s.status)
+                if status not in ("scheduled", "confirmed") or s.date != tomorrow:
                     continue
-
-                if not shifts:
+                cg = caregivers.get(s.caregiver_id)
+                if not cg or not cg.phone:
                     continue
+                sched = schedules.get(cg.id)
+                if sched is None:
+                    sched = schedules[cg.id] = CaregiverSchedule(cg.id, cg.first_name, cg.phone)
+                sched.shifts.append(s)
+                shift_count += 1
+
+        for sched in schedules.values():
+            sched.shifts.sort(key=lambda s: str(getattr(s, 'start_time', '') or ''))
+
+        logger.info(
+            f"Loaded tomorrow's schedule from WellSky: {len(clients)} clients, "
+            f"{shift_count} shifts, {len(schedules)} caregivers"
+        )
+        return list(schedules.values())
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+
+    async def _send_batch(self, schedules: List[CaregiverSchedule], tomorrow: date) -> List[str]:
+        """Send all confirmations concurrently, paced by the SMS rate limit."""
+        limiter = RateLimiter(SMS_RATE_PER_SECOND)
+        semaphore = asyncio.Semaphore(SMS_CONCURRENCY)
+
+        async def send_one(sched: CaregiverSchedule) -> bool:
+            async with semaphore:
+                await limiter.wait()
+                return await asyncio.to_thread(self._deliver, sched, tomorrow)
+
+        results = await asyncio.gather(
+            *(send_one(s) for s in schedules), return_exceptions=True
+        )
 
-                # Filter to only scheduled/confirmed shifts
-                active_shifts = []
-                for s in shifts:
-                    status = s.status.value if hasattr(s.status, 'value') else str(s.status)
-                    if status in ("scheduled", "confirmed"):
-                        active_shifts.append(s)
+        notified = []
+        shift_count = 0
+        for sched, result in zip(schedules, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Confirmation to {sched.first_name} failed: {result}")
+            elif result:
+                notified.append(sched.first_name)
+                shift_count += len(sched.shifts)
+
+        logger.info(
+            f"Daily confirmations complete: {len(notified)} caregivers, "
+            f"{shift_count} shifts"
+        )
+        return notified
 
-                if not active_shifts:
-                    continue
+    def _deliver(self, sched: CaregiverSchedule, tomorrow: date) -> bool:
+        """Claim, send and record one caregiver's confirmation (runs in a worker thread)."""
+        key = f"{SENT_KEY_PREFIX}{tomorrow.isoformat()}:{sched.caregiver_id}"
+        if not self._claim_sent_marker(key):
+            return False
+
+        message = self._build_confirmation_message(sched.first_name, sched.shifts)
+        try:
+            success, error = self.send_sms(sched.phone, message)
+        except Exception as e:
+            success, error = False, str(e)
 
-                message = self._build_confirmation_message(cg.first_name, active_shifts)
-                success, _ = self.send_sms(cg.phone, message)
+        if success:
+            self._set_sent_marker(key, "sent")
+        else:
+            logger.warning(f"Confirmation SMS to {sched.first_name} failed: {error}")
+            self._release_sent_marker(key)
+        return bool(success)
 
-                if success:
-                    notified.append(cg.first_name)
-                    caregiver_count += 1
-                    shift_count += len(active_shifts)
+    # ------------------------------------------------------------------
+    # Per-caregiver sent markers (gigi_dedup_state), so a restarted run
+    # skips anyone who was already texted
+    # ------------------------------------------------------------------
 
-            logger.info(
-                f"Daily confirmations complete: {caregiver_count} caregivers, "
-                f"{shift_count} shifts"
+    def _load_sent_caregivers(self, tomorrow: date) -> Set[str]:
+        """Caregiver IDs already texted (or mid-send when a run died) for tomorrow."""
+        if not psycopg2:
+            return set()
+        prefix = f"{SENT_KEY_PREFIX}{tomorrow.isoformat()}:"
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT key, value FROM gigi_dedup_state WHERE key LIKE %s",
+                (prefix + "%",),
             )
+            rows = cur.fetchall()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Could not load sent confirmations: {e}")
+            return set()
+
+        in_flight = [k for k, v in rows if v != "sent"]
+        if in_flight:
+            # Delivery unknown: the run died between claim and confirm. Skipping
+            # risks a missed reminder; resending risks a duplicate text.
+            logger.warning(
+                f"{len(in_flight)} confirmations were mid-send when the last run stopped; not resending"
+            )
+        return {k[len(prefix):] for k, _ in rows}
 
+    def _claim_sent_marker(self, key: str) -> bool:
+        """Atomically claim a caregiver's confirmation. False if another run already has it."""
+        if not psycopg2:
+            return True
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO gigi_dedup_state (key, value, created_at, expires_at)
+                VALUES (%s, 'sending', NOW(), NOW() + INTERVAL '2 days')
+                ON CONFLICT (key) DO NOTHING
+                RETURNING key
+            """,
+                (key,),
+            )
+            claimed = cur.fetchone() is not None
+            conn.commit()
+            cur.close()
+            conn.close()
+            return claimed
         except Exception as e:
-            logger.error(f"Daily confirmation error: {e}")
+            logger.warning(f"Could not claim confirmation {key}: {e}")
+            return True
 
-        return notified
+    def _set_sent_marker(self, key: str, value: str):
+        if not psycopg2:
+            return
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            cur = conn.cursor()
+            cur.execute("UPDATE gigi_dedup_state SET value = %s WHERE key = %s", (value, key))
+            conn.commit()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Could not record confirmation {key}: {e}")
+
+    def _release_sent_marker(self, key: str):
+        """Drop the claim after a failed send so a later run can retry."""
+        if not psycopg2:
+            return
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            cur = conn.cursor()
+            cur.execute("DELETE FROM gigi_dedup_state WHERE key = %s", (key,))
+            conn.commit()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Could not release confirmation {key}: {e}")
+
+    def _cleanup_sent_markers(self):
+        if not psycopg2:
+            return
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            cur = conn.cursor()
+            cur.execute(
+                "DELETE FROM gigi_dedup_state WHERE key LIKE 'daily_confirmation:%%' AND expires_at < NOW()"
+            )
+            conn.commit()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Could not clean old confirmations from DB: {e}")
 
     def _build_confirmation_message(self, caregiver_name: str, shifts: list) -> str:
         """Build the confirmation SMS for a caregiver."""
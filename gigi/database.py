@@ -13,7 +13,8 @@ from typing import Any, Dict, List, Optional
 
 from sqlalchemy import and_, create_engine, or_
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+
+from service_metrics import timed_pool_class
 
 from .models import (
     Base,
@@ -65,7 +66,7 @@ class GigiDatabase:
             else:
                 self.engine = create_engine(
                     database_url,
-                    poolclass=QueuePool,
+                    poolclass=timed_pool_class("gigi"),
                     pool_size=5,
                     max_overflow=10,
                     pool_pre_ping=True,
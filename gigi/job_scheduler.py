@@ -0,0 +1,310 @@
+"""
+Gigi Job Scheduler
+
+Small asyncio scheduler for the RC bot's periodic work (SMS fallback polling,
+team chat, DMs, campaign checks, clock reminders, daily confirmations).
+
+Each job runs in its own task with its own interval, jitter and timeout, so a
+slow WellSky call in one job can't delay the others. Blocking (sync) jobs run
+in a worker thread; a thread can't be cancelled, so when one outlives its
+timeout the job's later runs are skipped until it finishes. Last-run times
+are persisted to gigi_dedup_state so intervals survive restarts, and per-job
+latency/overrun metrics are written there too for the Gigi dashboard
+(GET /gigi/api/gigi/scheduler/jobs).
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL", "postgresql://careassist@localhost:5432/careassist"
+)
+
+STATE_KEY_PREFIX = "job_scheduler"
+LATENCY_WINDOW = 50  # samples kept per job for percentile reporting
+
+
+@dataclass
+class ScheduledJob:
+    """A periodic job.
+
+    func may be async or sync; sync functions run via asyncio.to_thread and
+    are never started again while a previous (timed out) run is still going.
+    condition (sync, cheap) is evaluated before each run — when it returns
+    False the run is skipped without counting as a run.
+    """
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    timeout: Optional[float] = None
+    jitter: float = 0.0
+    condition: Optional[Callable[[], bool]] = None
+    run_on_start: bool = True
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    overruns: int = 0  # runs that took longer than the job's interval
+    skipped: int = 0
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    durations_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = sorted(self.durations_ms)
+
+        def _pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 1)
+
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_finished_at": self.last_finished_at.isoformat() if self.last_finished_at else None,
+            "last_duration_ms": round(self.last_duration_ms, 1) if self.last_duration_ms is not None else None,
+            "last_error": self.last_error,
+            "p50_ms": _pct(0.50),
+            "p95_ms": _pct(0.95),
+            "max_ms": round(samples[-1], 1) if samples else None,
+        }
+
+
+class JobScheduler:
+    """Runs ScheduledJobs concurrently with per-job isolation."""
+
+    def __init__(self, name: str, persist: bool = True, database_url: Optional[str] = None):
+        self.name = name
+        self.persist = persist and psycopg2 is not None
+        self.database_url = database_url or DATABASE_URL
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.stats: Dict[str, JobStats] = {}
+        self._last_run: Dict[str, datetime] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._threads: Dict[str, asyncio.Future] = {}  # sync runs that outlived their timeout
+
+    def add(self, job: ScheduledJob) -> "JobScheduler":
+        self.jobs[job.name] = job
+        self.stats[job.name] = JobStats()
+        return self
+
+    # ------------------------------------------------------------------
+    # Persistence (gigi_dedup_state key/value rows)
+    # ------------------------------------------------------------------
+
+    def _state_key(self, job_name: str) -> str:
+        return f"{STATE_KEY_PREFIX}:{self.name}:{job_name}"
+
+    def _load_state(self) -> Dict[str, datetime]:
+        if not self.persist:
+            return {}
+        try:
+            conn = psycopg2.connect(self.database_url)
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT key, value FROM gigi_dedup_state WHERE key LIKE %s",
+                    (f"{STATE_KEY_PREFIX}:{self.name}:%",),
+                )
+                rows = cur.fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Scheduler {self.name}: could not load state: {e}")
+            return {}
+
+        last_run = {}
+        for key, value in rows:
+            job_name = key.rsplit(":", 1)[-1]
+            try:
+                data = json.loads(value)
+                if data.get("last_run_at"):
+                    last_run[job_name] = datetime.fromisoformat(data["last_run_at"])
+            except (ValueError, TypeError):
+                continue
+        return last_run
+
+    def _save_state(self, job_name: str):
+        if not self.persist:
+            return
+        payload = self.stats[job_name].to_dict()
+        last_run = self._last_run.get(job_name)
+        payload["last_run_at"] = last_run.isoformat() if last_run else None
+        payload["interval"] = self.jobs[job_name].interval
+        try:
+            conn = psycopg2.connect(self.database_url)
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    INSERT INTO gigi_dedup_state (key, value, created_at)
+                    VALUES (%s, %s, NOW())
+                    ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, created_at = NOW()
+                """,
+                    (self._state_key(job_name), json.dumps(payload)),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Scheduler {self.name}: could not save state for {job_name}: {e}")
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _initial_delay(self, job: ScheduledJob) -> float:
+        last = self._last_run.get(job.name)
+        if last is None:
+            return 0.0 if job.run_on_start else job.interval
+        elapsed = (datetime.utcnow() - last).total_seconds()
+        return max(0.0, job.interval - elapsed)
+
+    async def run_once(self, job_name: str) -> bool:
+        """Run a single job now. Returns True on success."""
+        job = self.jobs[job_name]
+        stats = self.stats[job_name]
+
+        if job.condition is not None:
+            try:
+                if not job.condition():
+                    stats.skipped += 1
+                    return True
+            except Exception as e:
+                logger.error(f"Job {job_name} condition failed: {e}")
+                return False
+
+        running = self._threads.get(job_name)
+        if running is not None and not running.done():
+            stats.skipped += 1
+            logger.warning(f"Job {job_name} skipped: previous run is still running in its worker thread")
+            return False
+
+        stats.last_started_at = datetime.utcnow()
+        started = asyncio.get_running_loop().time()
+        ok = True
+        thread_run = None
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await asyncio.wait_for(job.func(), timeout=job.timeout)
+            else:
+                # Shielded: timing out must not pretend the thread stopped
+                thread_run = asyncio.ensure_future(asyncio.to_thread(job.func))
+                await asyncio.wait_for(asyncio.shield(thread_run), timeout=job.timeout)
+            stats.last_error = None
+        except asyncio.TimeoutError:
+            ok = False
+            stats.timeouts += 1
+            stats.last_error = f"timed out after {job.timeout}s"
+            logger.error(f"Job {job_name} timed out after {job.timeout}s")
+            if thread_run is not None:
+                self._threads[job_name] = thread_run
+                thread_run.add_done_callback(lambda f: self._thread_finished(job_name, f))
+        except Exception as e:
+            ok = False
+            stats.failures += 1
+            stats.last_error = str(e)[:300]
+            logger.error(f"Job {job_name} error: {e}")
+
+        duration_ms = (asyncio.get_running_loop().time() - started) * 1000
+        stats.runs += 1
+        stats.last_duration_ms = duration_ms
+        stats.durations_ms.append(duration_ms)
+        stats.last_finished_at = datetime.utcnow()
+        if duration_ms > job.interval * 1000:
+            stats.overruns += 1
+            logger.warning(f"Job {job_name} overran its {job.interval}s interval ({duration_ms:.0f}ms)")
+
+        self._last_run[job_name] = stats.last_started_at
+        await asyncio.to_thread(self._save_state, job_name)
+        return ok
+
+    def _thread_finished(self, job_name: str, future: asyncio.Future):
+        if self._threads.get(job_name) is future:
+            del self._threads[job_name]
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Job {job_name} error after timing out: {future.exception()}")
+        else:
+            logger.info(f"Job {job_name} finished after timing out")
+
+    async def _job_loop(self, job: ScheduledJob):
+        await asyncio.sleep(self._initial_delay(job))
+        while True:
+            await self.run_once(job.name)
+            delay = job.interval
+            if job.jitter:
+                delay += random.uniform(-job.jitter, job.jitter)
+            await asyncio.sleep(max(1.0, delay))
+
+    async def run(self):
+        """Start every job and run until cancelled."""
+        self._last_run.update(await asyncio.to_thread(self._load_state))
+        self._tasks = [
+            asyncio.create_task(self._job_loop(job), name=f"{self.name}:{job.name}")
+            for job in self.jobs.values()
+        ]
+        logger.info(f"Scheduler {self.name} started: {', '.join(self.jobs)}")
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-job metrics for dashboards."""
+        return {
+            name: {**self.stats[name].to_dict(), "interval": job.interval}
+            for name, job in self.jobs.items()
+        }
+
+
+def load_persisted_stats(scheduler_name: Optional[str] = None, database_url: Optional[str] = None) -> Dict[str, Any]:
+    """Read persisted job metrics (written by a scheduler in another process)."""
+    if psycopg2 is None:
+        return {}
+    prefix = f"{STATE_KEY_PREFIX}:{scheduler_name}:" if scheduler_name else f"{STATE_KEY_PREFIX}:"
+    conn = psycopg2.connect(database_url or DATABASE_URL)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT key, value FROM gigi_dedup_state WHERE key LIKE %s ORDER BY key",
+            (prefix + "%",),
+        )
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    result: Dict[str, Any] = {}
+    for key, value in rows:
+        _, sched, job_name = key.split(":", 2)
+        try:
+            result.setdefault(sched, {})[job_name] = json.loads(value)
+        except (ValueError, TypeError):
+            continue
+    return result
@@ -188,6 +188,10 @@ except Exception as e:
 # Removed module-level GigiRingCentralBot() — it was unused dead code causing
 # a heavy init side effect (RC auth, WellSky init). (Feb 11, 2026)
 
+# Per-call caller context, prefetched at inbound-variables time
+from gigi.call_prefetch import call_prefetcher
+from gigi.tool_cache import tool_cache
+
 # Import Partial Availability Parser for nuanced call-out handling
 try:
     from gigi.partial_availability_parser import detect_partial_availability
@@ -302,6 +306,17 @@ except ImportError:
     )
     ENHANCED_WEBHOOK_AVAILABLE = False
 
+
+async def _cached_retell_weather(location: str) -> str:
+    """Retell weather sentence via the shared tool cache (the lookup is a blocking HTTP call)."""
+    return await tool_cache.call(
+        "get_weather",
+        {"location": location},
+        lambda: asyncio.to_thread(get_weather, location),
+        namespace="retell",
+        is_error=lambda text: text.startswith("I couldn't"),
+    )
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -584,6 +599,27 @@ async def get_learning_stats(_auth=Depends(require_gigi_token)):
         return {"success": False, "error": "Failed to retrieve learning stats"}
 
 
+@app.get("/api/gigi/tool-cache/stats")
+async def get_tool_cache_stats(_auth=Depends(require_gigi_token)):
+    """Per-tool hit rates of the shared read-tool result cache (this process)."""
+    return {"success": True, **tool_cache.stats()}
+
+
+@app.get("/api/gigi/scheduler/jobs")
+async def get_scheduler_jobs(_auth=Depends(require_gigi_token)):
+    """Per-job latency/overrun metrics persisted by the RC bot's job scheduler."""
+    import asyncio
+
+    try:
+        from gigi.job_scheduler import load_persisted_stats
+
+        schedulers = await asyncio.to_thread(load_persisted_stats)
+        return {"success": True, "schedulers": schedulers}
+    except Exception as e:
+        logger.error(f"Scheduler stats error: {e}")
+        return {"success": False, "error": "Failed to retrieve scheduler stats"}
+
+
 @app.post("/api/gigi/learning/run")
 async def run_learning_pipeline_endpoint(_auth=Depends(require_gigi_token)):
     """Manually trigger the learning pipeline."""
@@ -2047,6 +2083,25 @@ async def verify_caller(phone_number: str) -> CallerInfo:
     if len(clean_phone) == 11 and clean_phone.startswith("1"):
         clean_phone = clean_phone[1:]
 
+    # =========================================================================
+    # STEP 0: Context prefetched for this call at inbound-variables time
+    # =========================================================================
+    prefetched = call_prefetcher.get(phone=clean_phone)
+    if prefetched and prefetched.identity:
+        identity = prefetched.identity
+        caller_type = {
+            "caregiver": CallerType.CAREGIVER,
+            "client": CallerType.CLIENT,
+        }.get(identity["type"])
+        if caller_type:
+            return CallerInfo(
+                caller_type=caller_type,
+                person_id=identity.get("id"),
+                name=identity.get("full_name") or identity.get("first_name"),
+                phone=phone_number,
+                is_active=True,
+            )
+
     # =========================================================================
     # STEP 1: Check local cache FIRST (instant, no API call)
     # =========================================================================
@@ -2111,6 +2166,29 @@ async def verify_caller(phone_number: str) -> CallerInfo:
     )
 
 
+def _prefetched_shift_details(shift: Dict[str, Any]) -> ShiftDetails:
+    """ShiftDetails from a call_prefetch shift row."""
+    start_time = datetime.fromisoformat(shift["scheduled_start"])
+    end_time = (
+        datetime.fromisoformat(shift["scheduled_end"])
+        if shift.get("scheduled_end")
+        else start_time + timedelta(hours=3)
+    )
+    return ShiftDetails(
+        shift_id=shift["id"],
+        caregiver_id=shift.get("caregiver_id") or "",
+        caregiver_name=shift.get("caregiver_name", ""),
+        client_id=shift.get("client_id") or "",
+        client_name=shift.get("client_name", ""),
+        client_address=shift.get("client_address", ""),
+        start_time=start_time,
+        end_time=end_time,
+        hours=(end_time - start_time).total_seconds() / 3600,
+        status=shift.get("status") or "scheduled",
+        notes="",
+    )
+
+
 async def get_shift_details(
     person_id: str, caregiver_name: str = None
 ) -> Optional[ShiftDetails]:
@@ -2133,6 +2211,14 @@ async def get_shift_details(
         f"get_shift_details called for person_id: {person_id}, name: {caregiver_name}"
     )
 
+    prefetched = call_prefetcher.find_person(person_id)
+    if prefetched:
+        upcoming = [
+            s for s in prefetched.upcoming_shifts() if s.get("caregiver_id") == person_id
+        ]
+        if upcoming:
+            return _prefetched_shift_details(upcoming[0])
+
     # =========================================================================
     # STEP 1: Check local cache FIRST (instant, no API call)
     # =========================================================================
@@ -2247,6 +2333,29 @@ async def get_active_shifts(person_id: str) -> List[Dict[str, Any]]:
     try:
         logger.info(f"get_active_shifts called for person_id: {person_id}")
 
+        prefetched = call_prefetcher.find_person(person_id)
+        if prefetched:
+            active_shifts = [
+                {
+                    "shift_id": s["id"],
+                    "client_name": s["client_name"],
+                    "client_id": s["client_id"] or "",
+                    "start_time": datetime.fromisoformat(
+                        s["scheduled_start"]
+                    ).strftime("%I:%M %p"),
+                    "start_time_iso": s["scheduled_start"],
+                    "end_time": s["scheduled_end"] or "",
+                    "status": s["status"] or "scheduled",
+                    "client_address": s["client_address"],
+                }
+                for s in prefetched.upcoming_shifts(hours=24)
+                if s.get("caregiver_id") == person_id
+            ]
+            logger.info(
+                f"Found {len(active_shifts)} active shifts in next 24 hours (prefetched)"
+            )
+            return active_shifts
+
         shifts = await _get_caregiver_shifts(person_id)
 
         if not shifts:
@@ -2400,6 +2509,8 @@ async def _execute_caregiver_call_out_locked(
     """
     # Get shift details first to validate time window
     shift = await get_shift_details(caregiver_id)
+    # The call-out changes this caregiver's schedule; stop serving the prefetch
+    call_prefetcher.forget_person(caregiver_id)
 
     # ==========================================================================
     # TIME WINDOW VALIDATION
@@ -4937,88 +5048,13 @@ async def retell_inbound_variables(request: Request):
     caller_full_name = ""
 
     if from_number:
-        clean_phone = "".join(filter(str.isdigit, from_number))[-10:]
-
-        # Check cached database for caller ID (fast, reliable)
-        conn = None
-        try:
-            import psycopg2
-
-            db_url = os.getenv(
-                "DATABASE_URL", "postgresql://careassist@localhost:5432/careassist"
-            )
-            conn = psycopg2.connect(db_url)
-            cur = conn.cursor()
-
-            # Check staff first (Jason, Israt, Jacob, Cynthia)
-            cur.execute(
-                """
-                SELECT first_name, full_name, role FROM cached_staff
-                WHERE phone IS NOT NULL
-                AND RIGHT(REGEXP_REPLACE(phone, '[^0-9]', '', 'g'), 10) = %s
-                LIMIT 1
-            """,
-                (clean_phone,),
-            )
-            row = cur.fetchone()
-            if row:
-                caller_name = row[0]
-                caller_full_name = row[1]
-                caller_type = "staff"
-            else:
-                # Check caregivers
-                cur.execute(
-                    """
-                    SELECT first_name, full_name FROM cached_practitioners
-                    WHERE is_active = true AND phone IS NOT NULL
-                    AND RIGHT(REGEXP_REPLACE(phone, '[^0-9]', '', 'g'), 10) = %s
-                    LIMIT 1
-                """,
-                    (clean_phone,),
-                )
-                row = cur.fetchone()
-                if row:
-                    caller_name = row[0]
-                    caller_full_name = row[1]
-                    caller_type = "caregiver"
-                else:
-                    # Check clients
-                    cur.execute(
-                        """
-                        SELECT first_name, full_name FROM cached_patients
-                        WHERE is_active = true AND phone IS NOT NULL
-                        AND RIGHT(REGEXP_REPLACE(phone, '[^0-9]', '', 'g'), 10) = %s
-                        LIMIT 1
-                    """,
-                        (clean_phone,),
-                    )
-                    row = cur.fetchone()
-                    if row:
-                        caller_name = row[0]
-                        caller_full_name = row[1]
-                        caller_type = "client"
-                    else:
-                        # Check family/emergency contacts
-                        cur.execute(
-                            """
-                            SELECT first_name, full_name FROM cached_related_persons
-                            WHERE phone IS NOT NULL
-                            AND RIGHT(REGEXP_REPLACE(phone, '[^0-9]', '', 'g'), 10) = %s
-                            LIMIT 1
-                        """,
-                            (clean_phone,),
-                        )
-                        row = cur.fetchone()
-                        if row:
-                            caller_name = row[0]
-                            caller_full_name = row[1]
-                            caller_type = "family"
-
-        except Exception as e:
-            logger.error(f"Inbound variables DB lookup error: {e}")
-        finally:
-            if conn:
-                conn.close()
+        # Load identity, shifts, open call-outs and recent conversations in
+        # parallel; the voice tools read the rest from this cache on turn one
+        ctx = await call_prefetcher.prefetch(from_number, body.get("call_id"))
+        if ctx and ctx.identity:
+            caller_name = ctx.identity.get("first_name") or ""
+            caller_full_name = ctx.identity.get("full_name") or ""
+            caller_type = ctx.identity["type"]
 
     logger.info(
         f"Inbound variables: caller_name={caller_name}, caller_type={caller_type}"
@@ -5059,6 +5095,7 @@ async def retell_webhook(request: Request):
         from_number = body.get("from_number", "")
         to_number = body.get("to_number", "")
         logger.info(f"Call started from {from_number} to {to_number}")
+        call_prefetcher.attach(call_id, from_number)
 
         # Enhanced caller lookup with fallback to Apple Contacts
         if ENHANCED_WEBHOOK_AVAILABLE:
@@ -5171,6 +5208,7 @@ async def retell_webhook(request: Request):
             return JSONResponse({"status": "ok", "caller_info": caller_info})
 
     elif event == "call_ended":
+        call_prefetcher.release(call_id)
         transcript = body.get("transcript", "")
         recording_url = body.get("recording_url", "")
         duration_ms = body.get("end_timestamp", 0) - body.get("start_timestamp", 0)
@@ -5249,7 +5287,7 @@ async def retell_webhook(request: Request):
                 # NEW: Enhanced webhook tools for caller ID, weather, transfer, and messages
                 elif tool_name == "get_weather" and ENHANCED_WEBHOOK_AVAILABLE:
                     location = tool_args.get("location", "Boulder CO")
-                    weather_result = get_weather(location)
+                    weather_result = await _cached_retell_weather(location)
                     results.append(
                         {"tool_call_id": tool_call_id, "result": weather_result}
                     )
@@ -5487,6 +5525,19 @@ async def retell_function_call(function_name: str, request: Request):
             phone = args.get("phone_number", args.get("from_number", ""))
             clean_phone = "".join(filter(str.isdigit, phone))[-10:]
 
+            # Prefetched at inbound-variables time
+            prefetched = call_prefetcher.get(call_id=call_id, phone=clean_phone)
+            if prefetched and prefetched.identity:
+                name = prefetched.identity.get("first_name")
+                return JSONResponse(
+                    {
+                        "found": True,
+                        "caller_type": prefetched.identity["type"],
+                        "name": name,
+                        "greeting": f"Hi {name}" if name else "Hi there",
+                    }
+                )
+
             # Check call context first (set at call_started)
             caller_info = _get_call_context(call_id)
             if caller_info:
@@ -6469,7 +6520,7 @@ async def retell_function_call(function_name: str, request: Request):
         elif function_name == "get_weather":
             location = args.get("location", "Boulder")
             logger.info(f"Getting weather for: {location}")
-            weather_result = get_weather(location)
+            weather_result = await _cached_retell_weather(location)
             return JSONResponse(
                 {
                     "response_type": "response",
@@ -6510,7 +6561,12 @@ async def retell_function_call(function_name: str, request: Request):
                         "message": "I need a stock ticker symbol to look up. What stock are you interested in?",
                     }
                 )
-            result = await get_stock_price(symbol)
+            result = await tool_cache.call(
+                "get_stock_price",
+                {"symbol": symbol},
+                lambda: get_stock_price(symbol),
+                namespace="retell",
+            )
             return JSONResponse(
                 {
                     "success": result.success,
@@ -6534,7 +6590,12 @@ async def retell_function_call(function_name: str, request: Request):
                         "message": "I need a cryptocurrency symbol to look up. What crypto are you interested in?",
                     }
                 )
-            result = await get_crypto_price(symbol, market)
+            result = await tool_cache.call(
+                "get_crypto_price",
+                {"symbol": symbol, "market": market},
+                lambda: get_crypto_price(symbol, market),
+                namespace="retell",
+            )
             return JSONResponse(
                 {
                     "success": result.success,
@@ -6555,7 +6616,19 @@ async def retell_function_call(function_name: str, request: Request):
             end_date = args.get("end_date")
             limit = args.get("limit", 5)
 
-            result = await get_events(query, city, state, start_date, end_date, limit)
+            result = await tool_cache.call(
+                "get_events",
+                {
+                    "query": query,
+                    "city": city,
+                    "state": state,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "limit": limit,
+                },
+                lambda: get_events(query, city, state, start_date, end_date, limit),
+                namespace="retell",
+            )
             return JSONResponse(
                 {
                     "success": result.success,
@@ -6579,7 +6652,12 @@ async def retell_function_call(function_name: str, request: Request):
                     }
                 )
 
-            result = await get_setlist(artist_name, limit)
+            result = await tool_cache.call(
+                "get_setlist",
+                {"artist_name": artist_name, "limit": limit},
+                lambda: get_setlist(artist_name, limit),
+                namespace="retell",
+            )
             return JSONResponse(
                 {
                     "success": result.success,
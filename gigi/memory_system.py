@@ -24,6 +24,11 @@ from typing import Any, Dict, List, Optional
 import psycopg2
 from psycopg2.extras import Json, RealDictCursor
 
+try:
+    from gigi.prompt_context import SEGMENT_MEMORIES, bump_version
+except ImportError:  # run as a script from inside gigi/
+    from prompt_context import SEGMENT_MEMORIES, bump_version
+
 logger = logging.getLogger(__name__)
 
 
@@ -126,6 +131,9 @@ class MemorySystem:
         CREATE INDEX IF NOT EXISTS idx_memories_status ON gigi_memories(status);
         CREATE INDEX IF NOT EXISTS idx_memories_confidence ON gigi_memories(confidence);
         CREATE INDEX IF NOT EXISTS idx_memories_category ON gigi_memories(category);
+        CREATE INDEX IF NOT EXISTS idx_memories_caregiver_id
+            ON gigi_memories ((metadata->>'caregiver_id'))
+            WHERE category = 'caregiver_preference';
 
         CREATE TABLE IF NOT EXISTS gigi_memory_audit_log (
             id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -216,6 +224,7 @@ class MemorySystem:
 
             conn.commit()
 
+        bump_version(SEGMENT_MEMORIES)
         logger.info(f"Created memory {memory_id}: {content[:50]}... (confidence: {confidence})")
         return str(memory_id)
 
@@ -255,9 +264,17 @@ class MemorySystem:
         status: Optional[MemoryStatus] = None,
         min_confidence: float = 0.0,
         memory_type: Optional[MemoryType] = None,
-        limit: int = 100
+        limit: Optional[int] = 100,
+        metadata_key: Optional[str] = None,
+        metadata_values: Optional[List[str]] = None
     ) -> List[Memory]:
-        """Query memories with filters."""
+        """
+        Query memories with filters.
+
+        metadata_key/metadata_values restrict to memories whose metadata->>key
+        is one of the values (e.g. caregiver_id, served by idx_memories_caregiver_id).
+        limit=None returns every match.
+        """
         conditions = ["1=1"]
         params = []
 
@@ -277,13 +294,18 @@ class MemorySystem:
             conditions.append("type = %s")
             params.append(memory_type.value)
 
+        if metadata_key:
+            conditions.append("metadata->>%s = ANY(%s)")
+            params.extend([metadata_key, list(metadata_values or [])])
+
         query = f"""
             SELECT * FROM gigi_memories
             WHERE {' AND '.join(conditions)}
             ORDER BY confidence DESC, created_at DESC
-            LIMIT %s
         """
-        params.append(limit)
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
 
         with self._get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -383,6 +405,7 @@ class MemorySystem:
 
             conn.commit()
 
+        bump_version(SEGMENT_MEMORIES)
         logger.info(f"Reinforced memory {memory_id}: {old_confidence:.2f} → {new_confidence:.2f}")
         return True
 
@@ -456,6 +479,7 @@ class MemorySystem:
 
             conn.commit()
 
+        bump_version(SEGMENT_MEMORIES)
         logger.info("Memory decay completed")
 
     def detect_conflicts(self, new_content: str, category: str) -> List[Memory]:
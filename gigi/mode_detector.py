@@ -33,6 +33,11 @@ import psycopg2
 from psycopg2.extras import RealDictCursor, Json
 import logging
 
+try:
+    from gigi.prompt_context import SEGMENT_MODE, bump_version
+except ImportError:  # run as a script from inside gigi/
+    from prompt_context import SEGMENT_MODE, bump_version
+
 logger = logging.getLogger(__name__)
 
 
@@ -226,6 +231,7 @@ class ModeDetector:
 
             conn.commit()
 
+        bump_version(SEGMENT_MODE)
         logger.info(f"Mode set to {mode.value} (source: {source.value}, confidence: {confidence:.2f})")
         return True
 
@@ -0,0 +1,272 @@
+"""
+Prompt Context Assembler
+
+Shared source of the dynamic system-prompt context every Gigi channel
+(voice, Telegram, RingCentral SMS/DM, Ask-Gigi) injects on each turn:
+operating mode, saved memories, cross-channel activity and long-term
+conversation summaries.
+
+- Segments are fetched concurrently (each is its own DB round trip)
+- Each segment is cached with its own TTL and keyed by its query arguments
+- Writers bump a per-segment version (bump_version) so a new memory, mode
+  change, message or daily summary in this process invalidates the cached
+  segment immediately; the TTL bounds staleness for writes made by other
+  processes
+- PromptContext.render() orders sections from most to least stable so the
+  prompt prefix stays byte-identical between turns and provider-side prompt
+  caching can hit
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_MODE = "mode"
+SEGMENT_MEMORIES = "memories"
+SEGMENT_CROSS_CHANNEL = "cross_channel"
+SEGMENT_LONG_TERM = "long_term"
+
+# Seconds each segment may be served from cache
+SEGMENT_TTLS = {
+    SEGMENT_MODE: 60,
+    SEGMENT_MEMORIES: 300,
+    SEGMENT_CROSS_CHANNEL: 30,
+    SEGMENT_LONG_TERM: 1800,
+}
+
+# Version counters per (segment, scope). scope is None for global segments
+# (mode, memories) and the user_id for per-user ones.
+_versions: Dict[Tuple[str, Optional[str]], int] = {}
+_versions_lock = threading.Lock()
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="prompt-context")
+
+
+def bump_version(segment: str, scope: Optional[str] = None) -> None:
+    """Invalidate cached copies of a segment (call after writing its source data)."""
+    with _versions_lock:
+        _versions[(segment, scope)] = _versions.get((segment, scope), 0) + 1
+
+
+def get_version(segment: str, scope: Optional[str] = None) -> int:
+    return _versions.get((segment, scope), 0)
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    version: int
+    expires_at: float
+
+
+@dataclass
+class PromptContext:
+    """Raw segment data for one prompt build (formatting stays per channel)."""
+    mode: Any = None  # ModeInfo
+    memories: List[Any] = field(default_factory=list)  # Memory
+    cross_channel: Optional[str] = None
+    long_term: Optional[str] = None
+
+    @staticmethod
+    def render(base: str, stable: List[Optional[str]], volatile: List[Optional[str]]) -> str:
+        """Join sections: base, then stable ones, then those that change turn to turn."""
+        return "\n".join([base] + [s for s in stable if s] + [s for s in volatile if s])
+
+    @staticmethod
+    def anthropic_system(prompt: str, stable_prefix: str) -> Any:
+        """
+        Anthropic system blocks with a cache breakpoint after the stable prefix.
+
+        Falls back to the plain string when the prompt doesn't start with it.
+        """
+        if not stable_prefix or not prompt.startswith(stable_prefix):
+            return prompt
+        blocks = [{"type": "text", "text": stable_prefix, "cache_control": {"type": "ephemeral"}}]
+        rest = prompt[len(stable_prefix):]
+        if rest.strip():
+            blocks.append({"type": "text", "text": rest})
+        return blocks
+
+
+class PromptContextAssembler:
+    """Fetches and caches prompt context segments for one channel's dependencies."""
+
+    def __init__(
+        self,
+        mode_detector=None,
+        memory_system=None,
+        conversation_store=None,
+        ttls: Dict[str, float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.mode_detector = mode_detector
+        self.memory_system = memory_system
+        self.conversation_store = conversation_store
+        self.ttls = {**SEGMENT_TTLS, **(ttls or {})}
+        self._clock = clock
+        self._cache: Dict[Tuple[str, Hashable], _CacheEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cached(self, segment: str, key: Hashable, scope: Optional[str], loader: Callable[[], Any]) -> Any:
+        version = get_version(segment, scope)
+        now = self._clock()
+        with self._lock:
+            entry = self._cache.get((segment, key))
+            if entry and entry.version == version and entry.expires_at > now:
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning(f"Prompt context segment {segment} failed: {e}")
+            # Serve the stale copy rather than dropping the section
+            return entry.value if entry else None
+
+        with self._lock:
+            self._cache[(segment, key)] = _CacheEntry(value, version, now + self.ttls[segment])
+        return value
+
+    def invalidate(self, segment: str = None) -> None:
+        with self._lock:
+            if segment is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == segment]:
+                    del self._cache[key]
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def get_mode(self):
+        if not self.mode_detector:
+            return None
+        return self._cached(SEGMENT_MODE, None, None, self.mode_detector.get_current_mode)
+
+    def get_memories(self, min_confidence: float = 0.5, limit: int = 25, status=None) -> List[Any]:
+        if not self.memory_system:
+            return []
+        kwargs = {"min_confidence": min_confidence, "limit": limit}
+        if status is not None:
+            kwargs["status"] = status
+        key = (min_confidence, limit, getattr(status, "value", status))
+        return self._cached(
+            SEGMENT_MEMORIES, key, None, lambda: self.memory_system.query_memories(**kwargs)
+        ) or []
+
+    def get_cross_channel(
+        self, user_id: str, channel: str, limit: int = 5, hours: int = 24, conversation_store=None
+    ) -> Optional[str]:
+        store = conversation_store or self.conversation_store
+        if not store or not user_id:
+            return None
+        return self._cached(
+            SEGMENT_CROSS_CHANNEL, (user_id, channel, limit, hours), user_id,
+            lambda: store.get_cross_channel_summary(user_id, channel, limit=limit, hours=hours),
+        )
+
+    def get_long_term(self, user_id: str, days: int = 30, conversation_store=None) -> Optional[str]:
+        store = conversation_store or self.conversation_store
+        if not store or not user_id:
+            return None
+        return self._cached(
+            SEGMENT_LONG_TERM, (user_id, days), user_id,
+            lambda: store.get_long_term_context(user_id, days=days),
+        )
+
+    # ------------------------------------------------------------------
+    # Assembly
+    # ------------------------------------------------------------------
+
+    def fetch(
+        self,
+        user_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        memory_limit: int = 25,
+        memory_status=None,
+        cross_channel_hours: int = 24,
+        long_term_days: Optional[int] = 30,
+        conversation_store=None,
+    ) -> PromptContext:
+        """
+        Fetch every segment concurrently (cache hits return immediately).
+
+        Pass user_id=None to skip the per-user segments, long_term_days=None
+        to skip long-term summaries. conversation_store overrides the
+        assembler's store for this call.
+        """
+        started = time.monotonic()
+        jobs = {
+            "mode": _executor.submit(self.get_mode),
+            "memories": _executor.submit(
+                self.get_memories, 0.5, memory_limit, memory_status
+            ),
+        }
+        if user_id and channel:
+            jobs["cross_channel"] = _executor.submit(
+                self.get_cross_channel, user_id, channel, 5, cross_channel_hours, conversation_store
+            )
+        if user_id and long_term_days:
+            jobs["long_term"] = _executor.submit(
+                self.get_long_term, user_id, long_term_days, conversation_store
+            )
+
+        values = {}
+        for name, future in jobs.items():
+            try:
+                values[name] = future.result()
+            except Exception as e:
+                logger.warning(f"Prompt context {name} failed: {e}")
+        logger.debug(f"Prompt context assembled in {(time.monotonic() - started) * 1000:.0f}ms")
+        return PromptContext(
+            mode=values.get("mode"),
+            memories=values.get("memories") or [],
+            cross_channel=values.get("cross_channel"),
+            long_term=values.get("long_term"),
+        )
+
+    async def fetch_async(self, **kwargs) -> PromptContext:
+        """fetch() without blocking the event loop."""
+        return await asyncio.to_thread(self.fetch, **kwargs)
+
+
+# ----------------------------------------------------------------------
+# Shared section formatting
+# ----------------------------------------------------------------------
+
+def format_mode(mode_info, heading: str = "\n# Current Operating Mode\n") -> Optional[str]:
+    if not mode_info:
+        return None
+    return f"{heading}Mode: {mode_info.mode.value.upper()} (source: {mode_info.source.value})"
+
+
+def format_memories(memories: List[Any], heading: str = "\n# Your Saved Memories\n", compact: bool = False) -> Optional[str]:
+    if not memories:
+        return None
+    if compact:
+        lines = [f"- {m.content} ({m.category})" for m in memories]
+    else:
+        lines = [
+            f"- {m.content} (confidence: {m.confidence:.0%}, category: {m.category})"
+            for m in memories
+        ]
+    return heading + "\n".join(lines)
+
+
+def format_date(heading: str = "\n# Current Date\n", now: datetime = None) -> str:
+    return f"{heading}Today is {(now or datetime.now()).strftime('%A, %B %d, %Y')}"
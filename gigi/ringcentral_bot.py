@@ -56,6 +56,7 @@ from ringcentral.websocket.events import WebSocketEvents
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from gigi.chat_cursors import TEAM_CHAT_POLL_MAX_SECONDS, ChatCursorTracker, parse_rc_timestamp
 from services.ringcentral_messaging_service import (
     RINGCENTRAL_SERVER,
     ringcentral_messaging_service,
@@ -83,6 +84,19 @@ except Exception:
     _rc_mode_detector = None
     RC_MODE_AVAILABLE = False
 
+from gigi.prompt_context import (
+    PromptContext,
+    PromptContextAssembler,
+    format_memories,
+    format_mode,
+)
+from service_metrics import instrument_llm_client
+
+_rc_prompt_context = PromptContextAssembler(
+    mode_detector=_rc_mode_detector if RC_MODE_AVAILABLE else None,
+    memory_system=_rc_memory_system if RC_MEMORY_AVAILABLE else None,
+)
+
 try:
     from gigi.failure_handler import FailureHandler
 
@@ -117,7 +131,9 @@ logging.basicConfig(
 logger = logging.getLogger("gigi_rc_bot")
 
 # Configuration
-CHECK_INTERVAL = 30  # seconds
+CHECK_INTERVAL = 30  # seconds (team chat / DM polling)
+SMS_FALLBACK_POLL_INTERVAL = 120  # seconds (WebSocket is primary)
+DM_FETCH_CONCURRENCY = 5  # concurrent Glip DM fetches per cycle
 TARGET_CHAT = "New Scheduling"
 TIMEZONE = pytz.timezone("America/Denver")
 
@@ -150,7 +166,6 @@ GIGI_SHIFT_MONITOR_ENABLED = (
 )
 CAMPAIGN_CHECK_INTERVAL_SECONDS = 300  # Check campaigns every 5 minutes
 CAMPAIGN_ESCALATION_MINUTES = 30  # Escalate unfilled campaigns after 30 min
-VOICE_OUTREACH_ENABLED = os.getenv("VOICE_OUTREACH_ENABLED", "false").lower() == "true"
 
 # LLM Provider Configuration — switch via env var (default: gemini to avoid API fees)
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
@@ -1172,8 +1187,6 @@ TONE:
 - OUTBOUND MESSAGES: NEVER send SMS/texts to external contacts without explicit confirmation from Jason. Show the draft first, wait for approval.
 - NO sycophantic language: never say "locked in", "inner circle", "absolutely", "on it boss". Be direct and real.
 - NEVER start with "Great question!" or "I'd be happy to help!" — just answer.
-
-Today is {current_date}.
 """
 
 SMS_SYSTEM_PROMPT = """You are Gigi, a real team member at Colorado Care Assist, a home care agency in Colorado Springs. You are responding via SMS text message.
@@ -1249,7 +1262,6 @@ On the FIRST message in a conversation, ALWAYS use identify_caller with the call
 - NEVER start with "Thanks for your message!" — just respond to what they said.
 - NEVER include your internal reasoning or thought process in your response. Do NOT narrate what you're observing ("The caller is...", "This is a prospect inquiry...", "I should..."). Think silently, then respond naturally.
 
-Today is {current_date}.
 The caller's phone number is {caller_phone}.
 """
 
@@ -1294,6 +1306,7 @@ class GigiRingCentralBot:
                 )
             else:
                 logger.warning("No LLM provider available - using static replies")
+        self.llm = instrument_llm_client(self.llm, channel="sms", provider=self.llm_provider)
         from gigi.conversation_store import ConversationStore
 
         self.conversation_store = ConversationStore()
@@ -1303,9 +1316,13 @@ class GigiRingCentralBot:
         )  # Prevent concurrent cooldown check + reply races
         # Track active team chat conversations (creator_id -> last_interaction_time)
         self._team_chat_active_conversations = {}
+        # Per-chat cursors + idle backoff for team chat / DM polling
+        self.chat_cursors = ChatCursorTracker(
+            start_at=self.startup_time, base_interval=CHECK_INTERVAL
+        )
+        self._team_chat_id = None
         # Autonomous shift coordination
         self._active_campaigns = {}  # campaign_id -> {shift_id, started_at, client_name}
-        self._last_campaign_check = datetime.utcnow()
         if GIGI_SHIFT_MONITOR_ENABLED:
             logger.info("Autonomous shift monitor ENABLED")
         else:
@@ -1336,7 +1353,6 @@ class GigiRingCentralBot:
 
         # --- Clock in/out reminders (GAP 4) ---
         self.clock_reminder = None
-        self._last_clock_check = datetime.utcnow()
         try:
             from gigi.clock_reminder_service import (
                 CLOCK_REMINDER_ENABLED,
@@ -1376,6 +1392,9 @@ class GigiRingCentralBot:
         # Task completion tracking (last notified task ID)
         self._last_notified_task_id = self._load_last_notified_task_id()
 
+        # Periodic job scheduler (built in polling_loop / check_and_act)
+        self.scheduler = None
+
         # RingCentral SDK for WebSocket subscriptions
         self.rc_sdk = None
         self.rc_platform = None
@@ -2205,88 +2224,83 @@ class GigiRingCentralBot:
         is_working_hours = BUSINESS_START <= now.time() <= BUSINESS_END
         return is_weekday and is_working_hours
 
-    async def check_and_act(self):
-        """Main loop: Team chat, DMs, SMS fallback polling, scheduled services."""
-        try:
-            status = (
-                "BUSINESS HOURS (Silent)"
-                if self.is_business_hours()
-                else "AFTER HOURS (Active)"
-            )
-            logger.info(f"--- Gigi Bot Cycle: {status} ---")
-
-            # 1. SMS fallback poll (catches anything WebSocket missed, every 4th cycle = ~2 min)
-            if not hasattr(self, "_sms_poll_counter"):
-                self._sms_poll_counter = 0
-            self._sms_poll_counter += 1
-            if self._sms_poll_counter >= 4:
-                self._sms_poll_counter = 0
-                await self.check_direct_sms()
-
-            # 2. Check Team Chats (Glip)
-            await self.check_team_chats()
+    def build_scheduler(self):
+        """Register the bot's periodic work as independent scheduled jobs.
 
-            # 3. Check Direct Glip Messages (1:1 DMs)
-            await self.check_direct_glip_messages()
-
-            # 4. Check active shift-filling campaigns (every 5 min)
-            if GIGI_SHIFT_MONITOR_ENABLED and self._active_campaigns:
-                now = datetime.utcnow()
-                if (
-                    now - self._last_campaign_check
-                ).total_seconds() >= CAMPAIGN_CHECK_INTERVAL_SECONDS:
-                    self._last_campaign_check = now
-                    await self._check_campaign_status()
-
-            # 4. Clock in/out reminders (every 5 min during business hours)
-            # Respects REPLIES_ENABLED as global SMS kill switch
-            if self.clock_reminder and REPLIES_ENABLED and self.is_business_hours():
-                now = datetime.utcnow()
-                if (now - self._last_clock_check).total_seconds() >= 300:
-                    self._last_clock_check = now
-                    try:
-                        actions = self.clock_reminder.check_and_remind()
-                        if actions:
-                            logger.info(f"Clock reminders sent: {actions}")
-                    except Exception as e:
-                        logger.error(f"Clock reminder error: {e}")
-
-            # 5. Daily shift confirmations (service handles its own 2pm timing)
-            # Respects REPLIES_ENABLED as global SMS kill switch
-            if self.daily_confirmation and REPLIES_ENABLED:
-                try:
-                    notified = self.daily_confirmation.check_and_send()
-                    if notified:
-                        logger.info(f"Daily confirmations sent to: {notified}")
-                except Exception as e:
-                    logger.error(f"Daily confirmation error: {e}")
-
-            # Morning briefing permanently deleted
-
-            # 7. Claude Code task completion notifications — DISABLED (user request: no unsolicited messages)
-            # try:
-            #     await self._check_task_completions()
-            # except Exception as e:
-            #     logger.error(f"Task completion check error: {e}")
-
-            # 8. Ticket watch monitor — DISABLED (user request: no unsolicited messages)
-            # if not hasattr(self, '_ticket_check_counter'):
-            #     self._ticket_check_counter = 0
-            #     self._ticket_monitor = None
-            # self._ticket_check_counter += 1
-            # if self._ticket_check_counter >= 30:
-            #     self._ticket_check_counter = 0
-            #     try:
-            #         if self._ticket_monitor is None:
-            #             from gigi.ticket_monitor import TicketMonitorService
-            #             self._ticket_monitor = TicketMonitorService()
-            #         await asyncio.to_thread(self._ticket_monitor.check_watches)
-            #         logger.debug("Ticket watch check completed")
-            #     except Exception as e:
-            #         logger.error(f"Ticket monitor error: {e}")
+        Each job has its own interval/timeout and runs in its own task, so a
+        slow WellSky call in clock reminders can't hold up SMS polling. Sync
+        services run in a worker thread. Last-run state and latency metrics
+        persist in gigi_dedup_state (see gigi/job_scheduler.py).
+        """
+        from gigi.job_scheduler import JobScheduler, ScheduledJob
+
+        scheduler = JobScheduler("gigi_rc_bot")
+
+        # SMS fallback poll (catches anything WebSocket missed)
+        scheduler.add(ScheduledJob(
+            "sms_fallback_poll", self.check_direct_sms,
+            interval=SMS_FALLBACK_POLL_INTERVAL, timeout=90, jitter=10,
+        ))
+        # Team Chats (Glip)
+        scheduler.add(ScheduledJob(
+            "team_chats", self.check_team_chats,
+            interval=CHECK_INTERVAL, timeout=120, jitter=3,
+        ))
+        # Direct Glip Messages (1:1 DMs)
+        scheduler.add(ScheduledJob(
+            "direct_dms", self.check_direct_glip_messages,
+            interval=CHECK_INTERVAL, timeout=120, jitter=3,
+        ))
+        # Active shift-filling campaigns
+        scheduler.add(ScheduledJob(
+            "campaign_status", self._check_campaign_status,
+            interval=CAMPAIGN_CHECK_INTERVAL_SECONDS, timeout=120,
+            condition=lambda: GIGI_SHIFT_MONITOR_ENABLED and bool(self._active_campaigns),
+            run_on_start=False,
+        ))
+        # Clock in/out reminders during business hours
+        # Respects REPLIES_ENABLED as global SMS kill switch
+        if self.clock_reminder:
+            scheduler.add(ScheduledJob(
+                "clock_reminders", self._run_clock_reminders,
+                interval=300, timeout=240, jitter=15,
+                condition=lambda: REPLIES_ENABLED and self.is_business_hours(),
+            ))
+        # Daily shift confirmations (service handles its own 2pm timing)
+        if self.daily_confirmation:
+            scheduler.add(ScheduledJob(
+                "daily_confirmations", self._run_daily_confirmations,
+                interval=60, timeout=900,
+                condition=lambda: REPLIES_ENABLED,
+            ))
+
+        # Morning briefing permanently deleted
+        # Claude Code task completions and ticket watch monitor — DISABLED
+        # (user request: no unsolicited messages)
+        return scheduler
+
+    def _run_clock_reminders(self):
+        actions = self.clock_reminder.check_and_remind()
+        if actions:
+            logger.info(f"Clock reminders sent: {actions}")
+
+    def _run_daily_confirmations(self):
+        notified = self.daily_confirmation.check_and_send()
+        if notified:
+            logger.info(f"Daily confirmations sent to: {notified}")
 
-        except Exception as e:
-            logger.error(f"Error in check_and_act: {e}")
+    async def check_and_act(self):
+        """Run every scheduled job once (manual/diagnostic single cycle)."""
+        status = (
+            "BUSINESS HOURS (Silent)"
+            if self.is_business_hours()
+            else "AFTER HOURS (Active)"
+        )
+        logger.info(f"--- Gigi Bot Cycle: {status} ---")
+        if self.scheduler is None:
+            self.scheduler = self.build_scheduler()
+        for job_name in self.scheduler.jobs:
+            await self.scheduler.run_once(job_name)
 
     def _load_last_notified_task_id(self) -> int:
         """Load last notified task ID from DB."""
@@ -2393,23 +2407,43 @@ class GigiRingCentralBot:
         except Exception as e:
             logger.warning(f"Task completion check failed: {e}")
 
+    async def _fetch_new_chat_posts(self, chat_id: str, page_size: int):
+        """Fetch posts newer than the chat's cursor (off the event loop)."""
+        cursor = self.chat_cursors.get(chat_id)
+        return await asyncio.to_thread(
+            self.rc_service.get_chat_posts_since,
+            chat_id,
+            cursor.last_seen_at,
+            page_size,
+        )
+
     async def check_team_chats(self):
         """Monitor Glip channels for activity documentation and replies"""
-        chat = self.rc_service.find_chat_by_name(TARGET_CHAT)
-        if not chat:
-            logger.warning(f"Target chat {TARGET_CHAT} not found in check_team_chats")
+        # Resolve the target chat once; re-resolve only if fetching fails
+        if not self._team_chat_id:
+            chat = await asyncio.to_thread(self.rc_service.find_chat_by_name, TARGET_CHAT)
+            if not chat:
+                logger.warning(f"Target chat {TARGET_CHAT} not found in check_team_chats")
+                return
+            self._team_chat_id = chat["id"]
+            # Mentions here must be answered quickly, so back off only a little
+            self.chat_cursors.set_max_interval(self._team_chat_id, TEAM_CHAT_POLL_MAX_SECONDS)
+        team_chat_id = self._team_chat_id
+
+        now = datetime.utcnow()
+        if not self.chat_cursors.is_due(team_chat_id, now):
             return
 
-        # Reduced lookback for team chats to save quota
-        messages = self.rc_service.get_chat_messages(
-            chat["id"], since=datetime.utcnow() - timedelta(minutes=10), limit=20
-        )
+        messages = await self._fetch_new_chat_posts(team_chat_id, page_size=20)
+        if messages is None:
+            self._team_chat_id = None
+            return
+        self.chat_cursors.advance(team_chat_id, messages, now)
 
         if not messages:
             return
 
-        logger.info(f"Glip: Found {len(messages)} recent messages in {TARGET_CHAT}")
-        messages.sort(key=lambda x: x.get("creationTime", ""))
+        logger.info(f"Glip: Found {len(messages)} new messages in {TARGET_CHAT}")
 
         new_msg_count = 0
         for msg in messages:
@@ -2418,23 +2452,10 @@ class GigiRingCentralBot:
                 continue
 
             # Skip historical messages (older than startup) to prevent bursts on restart
-            creation_time_str = msg.get("creationTime", "")
-            if creation_time_str:
-                try:
-                    creation_time = datetime.strptime(
-                        creation_time_str, "%Y-%m-%dT%H:%M:%S.%fZ"
-                    )
-                except ValueError:
-                    try:
-                        creation_time = datetime.strptime(
-                            creation_time_str, "%Y-%m-%dT%H:%M:%SZ"
-                        )
-                    except ValueError:
-                        creation_time = None
-
-                if creation_time and creation_time < self.startup_time:
-                    self.processed_message_ids[msg_id] = True
-                    continue
+            creation_time = parse_rc_timestamp(msg.get("creationTime", ""))
+            if creation_time and creation_time < self.startup_time:
+                self.processed_message_ids[msg_id] = True
+                continue
 
             # CRITICAL: Skip messages sent by the bot itself to prevent infinite loops
             creator_id = str(msg.get("creatorId", ""))
@@ -2477,10 +2498,8 @@ class GigiRingCentralBot:
                 )
                 reason = "mentioned" if gigi_mentioned else "active conversation"
                 logger.info(f"Gigi replying in team chat ({reason}) to {sender_name}")
-                chat = self.rc_service.find_chat_by_name(TARGET_CHAT)
-                chat_id = chat.get("id") if chat else "team"
                 reply = await self._get_llm_dm_reply(
-                    text, sender_name, f"team_{chat_id}"
+                    text, sender_name, f"team_{team_chat_id}"
                 )
                 if reply:
                     try:
@@ -2502,25 +2521,44 @@ class GigiRingCentralBot:
             )
 
     async def check_direct_glip_messages(self):
-        """Monitor Glip 1:1 direct message conversations and reply via Claude."""
+        """Monitor Glip 1:1 direct message conversations and reply via Claude.
+
+        One list call per cycle; a DM is only fetched when its lastModifiedTime
+        moved past its cursor or its (idle-backed-off) poll is due. Due chats
+        are fetched concurrently and only posts newer than the cursor come back.
+        """
         try:
-            direct_chats = self.rc_service.list_direct_chats()
+            direct_chats = await asyncio.to_thread(self.rc_service.list_direct_chats)
             if not direct_chats:
                 return
 
-            for chat in direct_chats:
-                chat_id = chat.get("id")
-                if not chat_id:
-                    continue
-
-                # Get recent messages from this DM
-                messages = self.rc_service.get_chat_messages(
-                    chat_id, since=datetime.utcnow() - timedelta(minutes=10), limit=10
+            now = datetime.utcnow()
+            due_ids = [
+                chat["id"]
+                for chat in direct_chats
+                if chat.get("id")
+                and self.chat_cursors.is_due(
+                    chat["id"], now, chat.get("lastModifiedTime")
                 )
-                if not messages:
-                    continue
+            ]
+            if not due_ids:
+                return
 
-                messages.sort(key=lambda x: x.get("creationTime", ""))
+            sem = asyncio.Semaphore(DM_FETCH_CONCURRENCY)
+
+            async def _fetch(chat_id):
+                async with sem:
+                    return await self._fetch_new_chat_posts(chat_id, page_size=10)
+
+            results = await asyncio.gather(
+                *(_fetch(cid) for cid in due_ids), return_exceptions=True
+            )
+
+            for chat_id, messages in zip(due_ids, results):
+                if isinstance(messages, Exception) or messages is None:
+                    logger.warning(f"Glip DM fetch failed for chat {chat_id}: {messages}")
+                    continue
+                self.chat_cursors.advance(chat_id, messages, now)
 
                 for msg in messages:
                     msg_id = msg.get("id")
@@ -2528,23 +2566,10 @@ class GigiRingCentralBot:
                         continue
 
                     # Skip historical messages (older than startup)
-                    creation_time_str = msg.get("creationTime", "")
-                    if creation_time_str:
-                        try:
-                            creation_time = datetime.strptime(
-                                creation_time_str, "%Y-%m-%dT%H:%M:%S.%fZ"
-                            )
-                        except ValueError:
-                            try:
-                                creation_time = datetime.strptime(
-                                    creation_time_str, "%Y-%m-%dT%H:%M:%SZ"
-                                )
-                            except ValueError:
-                                creation_time = None
-
-                        if creation_time and creation_time < self.startup_time:
-                            self.processed_message_ids[msg_id] = True
-                            continue
+                    creation_time = parse_rc_timestamp(msg.get("creationTime", ""))
+                    if creation_time and creation_time < self.startup_time:
+                        self.processed_message_ids[msg_id] = True
+                        continue
 
                     # Skip messages from bot itself
                     creator_id = str(msg.get("creatorId", ""))
@@ -3381,21 +3406,8 @@ class GigiRingCentralBot:
         for cid in completed:
             self._active_campaigns.pop(cid, None)
 
-        # Trigger voice follow-up calls for non-responding caregivers
-        if VOICE_OUTREACH_ENABLED:
-            try:
-                resp = http_requests.post(
-                    "http://localhost:8765/api/internal/shift-filling/voice-followups",
-                    timeout=15,
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if data.get("calls_made", 0) > 0:
-                        logger.info(
-                            f"Voice follow-ups initiated: {data['calls_made']} calls"
-                        )
-            except Exception as e:
-                logger.error(f"Voice followup check error: {e}")
+        # Voice follow-ups and SMS timeouts fire from the portal's shift filling
+        # deadline runner at their due time; nothing to trigger from here.
 
     # =========================================================================
     # Claude SMS Conversation History
@@ -3568,33 +3580,29 @@ class GigiRingCentralBot:
         if not self.llm:
             return None
 
+        clean_phone = self._clean_phone(phone)
+        is_jason = clean_phone in ("3074598220",)
+
+        # Mode, memories and (for Jason) cross-channel context, fetched concurrently + cached
+        ctx = await _rc_prompt_context.fetch_async(
+            user_id="jason" if is_jason else None,
+            channel="sms",
+            memory_limit=15,
+            long_term_days=None,
+            conversation_store=self.conversation_store,
+        )
         now = datetime.now(TIMEZONE)
-        system = SMS_SYSTEM_PROMPT.format(
-            current_date=now.strftime("%A, %B %d, %Y at %I:%M %p MT"),
-            caller_phone=phone,
+        system = PromptContext.render(
+            SMS_SYSTEM_PROMPT.format(caller_phone=phone),
+            [format_memories(ctx.memories, "\n\nYour Saved Memories:\n", compact=True)],
+            [
+                f"\nToday is {now.strftime('%A, %B %d, %Y at %I:%M %p MT')}.",
+                format_mode(ctx.mode, "\n\nCurrent Operating Mode: "),
+                ctx.cross_channel,
+            ],
         )
 
-        # Inject mode context and memories
-        if RC_MODE_AVAILABLE and _rc_mode_detector:
-            try:
-                mode_info = _rc_mode_detector.get_current_mode()
-                system += f"\n\nCurrent Operating Mode: {mode_info.mode.value.upper()} (source: {mode_info.source.value})"
-            except Exception:
-                pass
-
-        if RC_MEMORY_AVAILABLE and _rc_memory_system:
-            try:
-                memories = _rc_memory_system.query_memories(
-                    min_confidence=0.5, limit=15
-                )
-                if memories:
-                    memory_lines = [f"- {m.content} ({m.category})" for m in memories]
-                    system += "\n\nYour Saved Memories:\n" + "\n".join(memory_lines)
-            except Exception:
-                pass
-
         # Retrieve conversation history from PostgreSQL (user message stored after LLM success)
-        clean_phone = self._clean_phone(phone)
         conv_history = self.conversation_store.get_recent(
             clean_phone,
             "sms",
@@ -3604,14 +3612,6 @@ class GigiRingCentralBot:
         # Append user message to history for LLM context (not yet persisted)
         conv_history.append({"role": "user", "content": text})
 
-        # Inject cross-channel context if this is Jason
-        if clean_phone in ("3074598220",):
-            xc = self.conversation_store.get_cross_channel_summary(
-                "jason", "sms", limit=5, hours=24
-            )
-            if xc:
-                system += xc
-
         try:
             # Fallback chain: primary provider → gemini on rate limit
             final_text = None
@@ -3700,48 +3700,25 @@ class GigiRingCentralBot:
         if not self.llm:
             return None
 
+        # Mode, memories, cross-channel and long-term context, fetched concurrently + cached
+        ctx = await _rc_prompt_context.fetch_async(
+            user_id="jason",
+            channel="dm",
+            long_term_days=30,
+            conversation_store=self.conversation_store,
+        )
         now = datetime.now(TIMEZONE)
-        system = GLIP_DM_SYSTEM_PROMPT.format(
-            sender_name=sender_name,
-            current_date=now.strftime("%A, %B %d, %Y at %I:%M %p MT"),
+        system = PromptContext.render(
+            GLIP_DM_SYSTEM_PROMPT.format(sender_name=sender_name),
+            [format_memories(ctx.memories, "\n\nYour Saved Memories:\n"), ctx.long_term],
+            [
+                f"\nToday is {now.strftime('%A, %B %d, %Y at %I:%M %p MT')}.",
+                format_mode(ctx.mode, "\n\nCurrent Operating Mode: "),
+                # What Jason discussed on other channels recently
+                ctx.cross_channel,
+            ],
         )
 
-        # Inject mode context and memories
-        if RC_MODE_AVAILABLE and _rc_mode_detector:
-            try:
-                mode_info = _rc_mode_detector.get_current_mode()
-                system += f"\n\nCurrent Operating Mode: {mode_info.mode.value.upper()} (source: {mode_info.source.value})"
-            except Exception:
-                pass
-
-        if RC_MEMORY_AVAILABLE and _rc_memory_system:
-            try:
-                memories = _rc_memory_system.query_memories(
-                    min_confidence=0.5, limit=25
-                )
-                if memories:
-                    memory_lines = [
-                        f"- {m.content} (confidence: {m.confidence:.0%}, category: {m.category})"
-                        for m in memories
-                    ]
-                    system += "\n\nYour Saved Memories:\n" + "\n".join(memory_lines)
-            except Exception:
-                pass
-
-        # Inject cross-channel context (what Jason discussed on other channels recently)
-        try:
-            xc = self.conversation_store.get_cross_channel_summary(
-                "jason", "dm", limit=5, hours=24
-            )
-            if xc:
-                system += xc
-            # Long-term conversation history (summaries from past 30 days)
-            ltc = self.conversation_store.get_long_term_context("jason", days=30)
-            if ltc:
-                system += ltc
-        except Exception:
-            pass
-
         # Retrieve DM conversation history from PostgreSQL (user message stored after LLM success)
         dm_user_id = f"dm_{chat_id}"
         conv_history = self.conversation_store.get_recent(
@@ -4595,13 +4572,9 @@ class GigiRingCentralBot:
 
 
 async def polling_loop(bot):
-    """Run the periodic polling loop for team chat, DMs, and scheduled services."""
-    while True:
-        try:
-            await bot.check_and_act()
-        except Exception as e:
-            logger.error(f"Error in polling loop: {e}")
-        await asyncio.sleep(CHECK_INTERVAL)
+    """Run team chat, DMs, and scheduled services on the bot's job scheduler."""
+    bot.scheduler = bot.build_scheduler()
+    await bot.scheduler.run()
 
 
 async def main():
@@ -10,8 +10,6 @@ import json
 import time
 import uuid
 
-import websockets
-
 PORTAL_PORT = 8765
 
 SCENARIOS = [
@@ -160,6 +158,8 @@ SCENARIOS = [
 
 async def run_scenario(scenario):
     """Run a single scenario, return results dict."""
+    import websockets
+
     call_id = f"sim_{uuid.uuid4().hex[:16]}"
     ws_url = f"ws://127.0.0.1:{PORTAL_PORT}/llm-websocket/{call_id}"
     result = {
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""Concurrent voice-simulation benchmark.
+
+Runs the SCENARIOS from run_all_simulations.py N at a time against the voice
+brain and reports latency percentiles per turn:
+
+- ttft:     response_required sent -> first spoken content (a thinking phrase
+            or the final answer)
+- turn:     response_required sent -> content_complete response
+- tool:     tool_call_invocation -> tool_call_result, per tool
+- greeting: call_details sent -> greeting
+
+By default the voice brain runs in-process behind an in-memory websocket, with
+a scripted stub LLM and stub tool/WellSky results that sleep for a seeded
+latency. Nothing leaves the process, and the report measures our own
+overhead in generate_response (prompt assembly, tool fan-out, sends) on top of
+a fixed latency budget. Pass --url to run the same scenarios against a live
+server instead.
+
+The JSON report uses sorted keys and rounded milliseconds so two runs can be
+diffed; --baseline compares p95s against an earlier report.
+
+Usage:
+    python3 -m gigi.simulation_bench --concurrency 8 --repeat 3
+    python3 -m gigi.simulation_bench --baseline bench/simulation_bench.json --fail-over 20
+    python3 -m gigi.simulation_bench --url ws://127.0.0.1:8765/llm-websocket
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 95, 99)
+DEFAULT_CONCURRENCY = 8
+TURN_TIMEOUT = 35.0  # seconds, same as run_all_simulations
+FROM_NUMBER = "+17195551234"
+TO_NUMBER = "+17208176600"
+
+# Canned tool results for the stub run. Unknown tools get {"success": true}.
+STUB_TOOL_RESULTS: Dict[str, Any] = {
+    "lookup_caller": {"found": False},
+    "verify_caller": {"found": True, "type": "client", "name": "Test Caller", "id": "sim-1"},
+    "get_client_schedule": {"shifts": [{"date": "today", "time": "9:00 AM - 1:00 PM"}]},
+    "get_caregiver_schedule": {"shifts": [{"date": "today", "time": "9:00 AM - 1:00 PM"}]},
+    "get_active_shifts": {"shifts": []},
+    "get_wellsky_shifts": {"shifts": []},
+    "transfer_call": {"success": True, "transfer_number": None},
+}
+
+
+# ═══════════════════════════════════════════════════════════
+# STATS
+# ═══════════════════════════════════════════════════════════
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile (same as numpy's default), None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values_ms: Sequence[float]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"count": len(values_ms)}
+    for pct in PERCENTILES:
+        value = percentile(values_ms, pct)
+        summary[f"p{pct}"] = round(value, 1) if value is not None else None
+    summary["max"] = round(max(values_ms), 1) if values_ms else None
+    summary["mean"] = round(sum(values_ms) / len(values_ms), 1) if values_ms else None
+    return summary
+
+
+# ═══════════════════════════════════════════════════════════
+# STUBS
+# ═══════════════════════════════════════════════════════════
+@dataclass
+class LatencyModel:
+    """Uniform latency in [low_ms, high_ms]; seeded so a run draws the same samples."""
+
+    low_ms: float
+    high_ms: float
+    seed: int = 0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def sample(self) -> float:
+        return self._rng.uniform(self.low_ms, self.high_ms) / 1000
+
+
+def plan_tools(scenario: Dict[str, Any]) -> List[List[str]]:
+    """Which expected tools the stub LLM calls on each user turn: one per turn, the rest on the last."""
+    turns = len(scenario["messages"])
+    tools = list(scenario.get("expected_tools", []))
+    plan = [tools[i : i + 1] for i in range(turns)]
+    if turns and len(tools) > turns:
+        plan[-1] = tools[turns - 1 :]
+    return plan
+
+
+class StubLLM:
+    """
+    Stands in for AsyncAnthropic: client.messages.create(...) sleeps for the
+    model latency, then asks for the turn's planned tools (all in one
+    response) or answers with text once their results are in.
+
+    Scenarios are recognised by their first user message, which is the only
+    stable thing in the request across turns.
+    """
+
+    def __init__(self, plans: Dict[str, List[List[str]]], latency: LatencyModel):
+        self.plans = plans
+        self.latency = latency
+        self.messages = self
+        self.calls = 0
+
+    async def create(self, messages: List[Dict[str, Any]], **kwargs) -> SimpleNamespace:
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample())
+
+        user_texts = [i for i, m in enumerate(messages) if m["role"] == "user" and isinstance(m["content"], str)]
+        turn = len(user_texts) - 1
+        tool_rounds = sum(1 for m in messages[user_texts[-1] + 1 :] if m["role"] == "assistant")
+        plan = self.plans.get(messages[user_texts[0]]["content"], []) if user_texts else []
+        tools = plan[turn] if 0 <= turn < len(plan) and tool_rounds == 0 else []
+
+        if tools:
+            blocks = [
+                SimpleNamespace(type="tool_use", name=name, input={}, id=f"toolu_{turn}_{i}")
+                for i, name in enumerate(tools)
+            ]
+            return SimpleNamespace(stop_reason="tool_use", content=blocks)
+        return SimpleNamespace(
+            stop_reason="end_turn",
+            content=[SimpleNamespace(type="text", text=f"Stub reply for turn {turn + 1}.")],
+        )
+
+
+class StubTools:
+    """Replaces voice_brain.execute_tool: canned JSON after the tool latency."""
+
+    def __init__(self, latency: LatencyModel, results: Dict[str, Any] = None):
+        self.latency = latency
+        self.results = STUB_TOOL_RESULTS if results is None else results
+        self.calls: Dict[str, int] = {}
+
+    async def __call__(self, tool_name: str, tool_input: dict) -> str:
+        self.calls[tool_name] = self.calls.get(tool_name, 0) + 1
+        await asyncio.sleep(self.latency.sample())
+        return json.dumps(self.results.get(tool_name, {"success": True}))
+
+
+def _stub_loaders(latency: LatencyModel) -> Dict[str, Any]:
+    """Caller-context loaders that take WellSky-like time and find nothing."""
+
+    def _load(empty):
+        def loader(phone):
+            time.sleep(latency.sample())
+            return empty
+
+        return loader
+
+    return {"identity": _load(None), "shifts": _load([]), "open_call_outs": _load([])}
+
+
+@contextmanager
+def stubbed_voice_brain(llm: StubLLM, tools: StubTools, wellsky_latency: LatencyModel):
+    """Point the voice brain's module globals at the stubs for the duration of a run."""
+    from gigi import voice_brain
+    from gigi.call_prefetch import CallContextPrefetcher
+    from gigi.prompt_context import PromptContextAssembler
+
+    patches = {
+        "llm_client": llm,
+        "LLM_PROVIDER": "anthropic",
+        "_get_runtime_override": lambda: (None, None),
+        "execute_tool": tools,
+        "VOICE_STORE_AVAILABLE": False,
+        "call_prefetcher": CallContextPrefetcher(loaders=_stub_loaders(wellsky_latency)),
+        "_prompt_context": PromptContextAssembler(),
+    }
+    saved = {name: getattr(voice_brain, name) for name in patches}
+    try:
+        for name, value in patches.items():
+            setattr(voice_brain, name, value)
+        yield voice_brain
+    finally:
+        for name, value in saved.items():
+            setattr(voice_brain, name, value)
+
+
+class MemoryWebSocket:
+    """
+    An in-memory websocket pair. The handler side has the FastAPI methods
+    VoiceBrainHandler uses (accept/receive_text/send_text); the client side has
+    the websockets-library send/recv used by the runners.
+    """
+
+    def __init__(self):
+        self._to_server: asyncio.Queue = asyncio.Queue()
+        self._to_client: asyncio.Queue = asyncio.Queue()
+
+    # Handler side
+    async def accept(self):
+        pass
+
+    async def receive_text(self) -> str:
+        text = await self._to_server.get()
+        if text is None:
+            from fastapi import WebSocketDisconnect
+
+            raise WebSocketDisconnect()
+        return text
+
+    async def send_text(self, text: str):
+        await self._to_client.put(text)
+
+    # Client side
+    async def send(self, text: str):
+        await self._to_server.put(text)
+
+    async def recv(self) -> str:
+        return await self._to_client.get()
+
+    async def close(self):
+        await self._to_server.put(None)
+
+
+# ═══════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════
+async def _recv(ws, timeout: float) -> Dict[str, Any]:
+    while True:
+        data = json.loads(await asyncio.wait_for(ws.recv(), timeout=timeout))
+        if data.get("response_type") != "ping_pong":
+            return data
+        await ws.send(json.dumps({"response_type": "ping_pong", "timestamp": data.get("timestamp")}))
+
+
+async def drive_call(ws, scenario: Dict[str, Any], call_id: str, timeout: float = TURN_TIMEOUT) -> Dict[str, Any]:
+    """Play one scenario over an open voice-brain websocket, timing every turn."""
+    result: Dict[str, Any] = {
+        "id": scenario["id"],
+        "call_id": call_id,
+        "greeting_ms": None,
+        "turns": [],
+        "error": None,
+    }
+    clock = time.perf_counter
+
+    await asyncio.wait_for(ws.recv(), timeout=5)  # config
+    started = clock()
+    await ws.send(json.dumps({
+        "interaction_type": "call_details",
+        "call": {
+            "call_id": call_id,
+            "call_type": "phone_call",
+            "from_number": FROM_NUMBER,
+            "to_number": TO_NUMBER,
+            "metadata": {"test": True, "scenario": scenario["id"], "benchmark": True},
+        },
+    }))
+    while True:
+        data = await _recv(ws, timeout)
+        if data.get("response_type") == "response":
+            result["greeting_ms"] = (clock() - started) * 1000
+            transcript = [{"role": "agent", "content": data.get("content", "")}]
+            break
+
+    for response_id, user_msg in enumerate(scenario["messages"], 1):
+        transcript.append({"role": "user", "content": user_msg})
+        turn = {"ttft_ms": None, "turn_ms": None, "tools": []}
+        tool_started: Dict[str, Tuple[str, float]] = {}
+        started = clock()
+        await ws.send(json.dumps({
+            "interaction_type": "response_required",
+            "response_id": response_id,
+            "transcript": transcript,
+        }))
+        while True:
+            data = await _recv(ws, timeout)
+            rt = data.get("response_type")
+            elapsed_ms = (clock() - started) * 1000
+            if rt == "tool_call_invocation":
+                tool_started[data.get("tool_call_id", "")] = (data.get("name", "unknown"), clock())
+            elif rt == "tool_call_result":
+                name, t0 = tool_started.pop(data.get("tool_call_id", ""), ("unknown", started))
+                turn["tools"].append({"name": name, "ms": (clock() - t0) * 1000})
+            elif rt == "response" and data.get("response_id") == response_id:
+                if turn["ttft_ms"] is None:
+                    turn["ttft_ms"] = elapsed_ms
+                if data.get("content_complete"):
+                    turn["turn_ms"] = elapsed_ms
+                    transcript.append({"role": "agent", "content": data.get("content", "")})
+                    break
+        result["turns"].append(turn)
+    return result
+
+
+async def _run_in_process(scenario: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    from gigi import voice_brain
+
+    call_id = f"sim_bench_{uuid.uuid4().hex[:12]}"
+    ws = MemoryWebSocket()
+    handler = asyncio.create_task(voice_brain.VoiceBrainHandler(ws, call_id).handle())
+    try:
+        return await drive_call(ws, scenario, call_id, timeout)
+    finally:
+        await ws.close()
+        await asyncio.wait_for(handler, timeout=5)
+
+
+async def _run_remote(scenario: Dict[str, Any], url: str, timeout: float) -> Dict[str, Any]:
+    import websockets
+
+    call_id = f"sim_bench_{uuid.uuid4().hex[:12]}"
+    async with websockets.connect(f"{url.rstrip('/')}/{call_id}", open_timeout=10) as ws:
+        return await drive_call(ws, scenario, call_id, timeout)
+
+
+async def run_benchmark(
+    scenarios: List[Dict[str, Any]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    repeat: int = 1,
+    url: Optional[str] = None,
+    timeout: float = TURN_TIMEOUT,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """Run every scenario `repeat` times, at most `concurrency` calls at once. Returns (calls, wall seconds)."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def _one(scenario):
+        async with slots:
+            try:
+                if url:
+                    return await _run_remote(scenario, url, timeout)
+                return await _run_in_process(scenario, timeout)
+            except Exception as e:
+                logger.warning(f"Scenario {scenario['id']} failed: {e!r}")
+                return {"id": scenario["id"], "greeting_ms": None, "turns": [], "error": repr(e)}
+
+    started = time.perf_counter()
+    calls = await asyncio.gather(*(_one(s) for _ in range(repeat) for s in scenarios))
+    return list(calls), time.perf_counter() - started
+
+
+# ═══════════════════════════════════════════════════════════
+# REPORT
+# ═══════════════════════════════════════════════════════════
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_report(calls: List[Dict[str, Any]], wall_seconds: float, meta: Dict[str, Any]) -> Dict[str, Any]:
+    turns = [t for c in calls for t in c["turns"]]
+    tool_ms: Dict[str, List[float]] = {}
+    for t in turns:
+        for tool in t["tools"]:
+            tool_ms.setdefault(tool["name"], []).append(tool["ms"])
+
+    scenarios: Dict[str, Dict[str, Any]] = {}
+    for c in calls:
+        s = scenarios.setdefault(c["id"], {"runs": 0, "errors": 0, "turn_ms": [], "tools": set()})
+        s["runs"] += 1
+        s["errors"] += 1 if c["error"] else 0
+        s["turn_ms"].extend(t["turn_ms"] for t in c["turns"])
+        s["tools"].update(tool["name"] for t in c["turns"] for tool in t["tools"])
+
+    return {
+        "meta": {**meta, "commit": _git_commit(), "generated_at": datetime.now().isoformat(timespec="seconds")},
+        "summary": {
+            "calls": len(calls),
+            "errors": sum(1 for c in calls if c["error"]),
+            "turns": len(turns),
+            "wall_seconds": round(wall_seconds, 2),
+            "turns_per_second": round(len(turns) / wall_seconds, 2) if wall_seconds else None,
+        },
+        "latency_ms": {
+            "greeting": summarize([c["greeting_ms"] for c in calls if c["greeting_ms"] is not None]),
+            "ttft": summarize([t["ttft_ms"] for t in turns]),
+            "turn": summarize([t["turn_ms"] for t in turns]),
+            "tool": summarize([ms for values in tool_ms.values() for ms in values]),
+        },
+        "tools": {name: summarize(values) for name, values in tool_ms.items()},
+        "scenarios": {
+            sid: {
+                "runs": s["runs"],
+                "errors": s["errors"],
+                "turn_p50_ms": summarize(s["turn_ms"])["p50"],
+                "turn_p95_ms": summarize(s["turn_ms"])["p95"],
+                "tools": sorted(s["tools"]),
+            }
+            for sid, s in scenarios.items()
+        },
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], stat: str = "p95") -> List[Dict[str, Any]]:
+    """Per-metric change in `stat` between two reports (latency metrics, then per tool)."""
+    rows = []
+    for section in ("latency_ms", "tools"):
+        for name in sorted(set(baseline.get(section, {})) & set(current.get(section, {}))):
+            before = baseline[section][name].get(stat)
+            after = current[section][name].get(stat)
+            if before is None or after is None:
+                continue
+            rows.append({
+                "metric": name if section == "latency_ms" else f"tool:{name}",
+                "baseline": before,
+                "current": after,
+                "change_pct": round((after - before) / before * 100, 1) if before else None,
+            })
+    return rows
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    stats = ["count", *[f"p{p}" for p in PERCENTILES], "max", "mean"]
+
+    def _table(title, rows):
+        head = "".join(f"<th>{h}</th>" for h in ["", *stats])
+        body = "".join(
+            "<tr><td>{}</td>{}</tr>".format(
+                html.escape(name), "".join(f"<td>{'' if s.get(k) is None else s.get(k)}</td>" for k in stats)
+            )
+            for name, s in rows.items()
+        )
+        return f"<h2>{title}</h2><table><tr>{head}</tr>{body}</table>"
+
+    meta = " &middot; ".join(f"{html.escape(str(k))}: {html.escape(str(v))}" for k, v in sorted(report["meta"].items()))
+    summary = " &middot; ".join(f"{k}: {v}" for k, v in report["summary"].items())
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'><title>Gigi simulation benchmark</title>"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 10px;text-align:right}td:first-child{text-align:left}</style>"
+        f"</head><body><h1>Gigi simulation benchmark</h1><p>{meta}</p><p>{summary}</p>"
+        f"{_table('Latency (ms)', report['latency_ms'])}{_table('Tools (ms)', report['tools'])}"
+        "</body></html>"
+    )
+
+
+def write_report(report: Dict[str, Any], out_dir: str) -> Tuple[str, str]:
+    os.makedirs(out_dir, exist_ok=True)
+    json_path = os.path.join(out_dir, "simulation_bench.json")
+    html_path = os.path.join(out_dir, "simulation_bench.html")
+    with open(json_path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    with open(html_path, "w") as f:
+        f.write(render_html(report))
+    return json_path, html_path
+
+
+async def benchmark(
+    scenarios: List[Dict[str, Any]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    repeat: int = 1,
+    url: Optional[str] = None,
+    llm_ms: Tuple[float, float] = (300, 900),
+    tool_ms: Tuple[float, float] = (50, 400),
+    seed: int = 0,
+    timeout: float = TURN_TIMEOUT,
+) -> Dict[str, Any]:
+    """Run the benchmark (stubbed in-process unless url is given) and build its report."""
+    meta = {
+        "mode": url or "in-process",
+        "concurrency": concurrency,
+        "repeat": repeat,
+        "scenarios": len(scenarios),
+    }
+    if url:
+        calls, wall = await run_benchmark(scenarios, concurrency, repeat, url, timeout)
+        return build_report(calls, wall, meta)
+
+    plans = {s["messages"][0]: plan_tools(s) for s in scenarios if s["messages"]}
+    llm = StubLLM(plans, LatencyModel(*llm_ms, seed=seed))
+    tools = StubTools(LatencyModel(*tool_ms, seed=seed + 1))
+    with stubbed_voice_brain(llm, tools, LatencyModel(*tool_ms, seed=seed + 2)):
+        calls, wall = await run_benchmark(scenarios, concurrency, repeat, None, timeout)
+    meta.update({"llm_latency_ms": list(llm_ms), "tool_latency_ms": list(tool_ms), "seed": seed})
+    return build_report(calls, wall, meta)
+
+
+def main(argv: List[str] = None) -> int:
+    from gigi.run_all_simulations import SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Concurrent Gigi voice simulation benchmark")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario")
+    parser.add_argument("--scenario", action="append", help="only run these scenario ids")
+    parser.add_argument("--url", help="live llm-websocket base URL instead of the in-process stub run")
+    parser.add_argument("--llm-ms", type=float, nargs=2, default=(300, 900), metavar=("LOW", "HIGH"))
+    parser.add_argument("--tool-ms", type=float, nargs=2, default=(50, 400), metavar=("LOW", "HIGH"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench", help="directory for the JSON/HTML report")
+    parser.add_argument("--baseline", help="earlier simulation_bench.json to compare p95s against")
+    parser.add_argument("--fail-over", type=float, help="exit 1 if a latency p95 regressed by more than this %%")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    scenarios = [s for s in SCENARIOS if not args.scenario or s["id"] in args.scenario]
+    report = asyncio.run(benchmark(
+        scenarios,
+        concurrency=args.concurrency,
+        repeat=args.repeat,
+        url=args.url,
+        llm_ms=tuple(args.llm_ms),
+        tool_ms=tuple(args.tool_ms),
+        seed=args.seed,
+    ))
+    json_path, html_path = write_report(report, args.out)
+
+    summary = report["summary"]
+    print(f"{summary['calls']} calls, {summary['turns']} turns, {summary['errors']} errors, "
+          f"{summary['turns_per_second']} turns/s")
+    for name, s in report["latency_ms"].items():
+        print(f"  {name:9s} p50={s['p50']}ms p95={s['p95']}ms p99={s['p99']}ms max={s['max']}ms")
+    print(f"Report: {json_path} / {html_path}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        rows = compare_reports(json.load(f), report)
+    regressed = False
+    for row in rows:
+        change = row["change_pct"]
+        flag = ""
+        # Per-tool p95s rest on a handful of samples; only the aggregates gate
+        gated = not row["metric"].startswith("tool:")
+        if gated and args.fail_over is not None and change is not None and change > args.fail_over:
+            flag, regressed = "  REGRESSION", True
+        change_str = "n/a" if change is None else f"{change:+}%"
+        print(f"  {row['metric']:28s} p95 {row['baseline']} -> {row['current']}ms ({change_str}){flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,8 +10,8 @@ import json
 import logging
 import os
 import sys
-from datetime import datetime
 from pathlib import Path
+from typing import Tuple
 
 # Load environment variables from .env file
 try:
@@ -127,6 +127,15 @@ except Exception as e:
     MODE_AVAILABLE = False
     print(f"⚠️  Mode detector not available: {e}")
 
+from gigi.prompt_context import (
+    PromptContext,
+    PromptContextAssembler,
+    format_date,
+    format_memories,
+    format_mode,
+)
+from service_metrics import instrument_llm_client
+
 try:
     from gigi.failure_handler import FailureHandler
 
@@ -1889,56 +1898,40 @@ _TELEGRAM_SYSTEM_PROMPT_BASE = """You are Gigi, Jason Shulman's Elite Chief of S
 """
 
 
-def _build_telegram_system_prompt(conversation_store=None, user_message=None):
-    """Build the system prompt with dynamic context: date, memories, mode, cross-channel."""
-    parts = [_TELEGRAM_SYSTEM_PROMPT_BASE]
+_prompt_context = PromptContextAssembler(
+    mode_detector=_mode_detector if MODE_AVAILABLE else None,
+    memory_system=_memory_system if MEMORY_AVAILABLE else None,
+)
 
-    # Current date/time
-    parts.append(
-        f"\n# Current Date\nToday is {datetime.now().strftime('%A, %B %d, %Y')}"
-    )
 
-    # Inject mode context
-    if MODE_AVAILABLE and _mode_detector:
-        try:
-            mode_info = _mode_detector.get_current_mode()
-            parts.append(
-                f"\n# Current Operating Mode\nMode: {mode_info.mode.value.upper()} (source: {mode_info.source.value})"
-            )
-        except Exception as e:
-            logger.warning(f"Mode detection failed: {e}")
+def _render_telegram_system_prompt(ctx: PromptContext) -> Tuple[str, str]:
+    """Render (prompt, stable_prefix). Stable sections first so the prefix caches."""
+    stable = [format_memories(ctx.memories), ctx.long_term]
+    volatile = [format_date(), format_mode(ctx.mode), ctx.cross_channel]
+    prefix = PromptContext.render(_TELEGRAM_SYSTEM_PROMPT_BASE, stable, [])
+    return PromptContext.render(_TELEGRAM_SYSTEM_PROMPT_BASE, stable, volatile), prefix
 
-    # Inject relevant memories
-    if MEMORY_AVAILABLE and _memory_system:
-        try:
-            memories = _memory_system.query_memories(
-                min_confidence=0.5, limit=25, status=MemoryStatus.ACTIVE
-            )
-            if memories:
-                memory_lines = [
-                    f"- {m.content} (confidence: {m.confidence:.0%}, category: {m.category})"
-                    for m in memories
-                ]
-                parts.append("\n# Your Saved Memories\n" + "\n".join(memory_lines))
-        except Exception as e:
-            logger.warning(f"Memory injection failed: {e}")
 
-    # Inject cross-channel context
-    if conversation_store:
-        try:
-            xc = conversation_store.get_cross_channel_summary(
-                "jason", "telegram", limit=5, hours=24
-            )
-            if xc:
-                parts.append(xc)
-            # Long-term conversation history (summaries from past 30 days)
-            ltc = conversation_store.get_long_term_context("jason", days=30)
-            if ltc:
-                parts.append(ltc)
-        except Exception as e:
-            logger.warning(f"Cross-channel context failed: {e}")
+def _telegram_context_kwargs(conversation_store=None) -> dict:
+    return {
+        "user_id": "jason" if conversation_store else None,
+        "channel": "telegram",
+        "memory_status": MemoryStatus.ACTIVE if MemoryStatus else None,
+        "long_term_days": 30,
+        "conversation_store": conversation_store,
+    }
+
+
+def _build_telegram_system_prompt(conversation_store=None, user_message=None):
+    """Build the system prompt with dynamic context: date, memories, mode, cross-channel."""
+    ctx = _prompt_context.fetch(**_telegram_context_kwargs(conversation_store))
+    return _render_telegram_system_prompt(ctx)[0]
 
-    return "\n".join(parts)
+
+async def _abuild_telegram_system_prompt(conversation_store=None, user_message=None) -> Tuple[str, str]:
+    """Async variant for the per-turn path; returns (prompt, stable_prefix)."""
+    ctx = await _prompt_context.fetch_async(**_telegram_context_kwargs(conversation_store))
+    return _render_telegram_system_prompt(ctx)
 
 
 class GigiTelegramBot:
@@ -1967,6 +1960,7 @@ class GigiTelegramBot:
                 logger.warning(
                     f"Provider '{LLM_PROVIDER}' not available, falling back to anthropic"
                 )
+        self.llm = instrument_llm_client(self.llm, channel="telegram")
 
         self.wellsky = WellSkyService() if WellSkyService else None
         self.google = GoogleService() if GoogleService else None
@@ -2127,9 +2121,10 @@ class GigiTelegramBot:
         messages = [{"role": m["role"], "content": m["content"]} for m in history]
 
         user_msg = update.message.text if update.message else None
-        sys_prompt = _build_telegram_system_prompt(
+        sys_prompt, stable_prefix = await _abuild_telegram_system_prompt(
             self.conversation_store, user_message=user_msg
         )
+        sys_prompt = PromptContext.anthropic_system(sys_prompt, stable_prefix)
         response = await self.llm.messages.create(
             model=LLM_MODEL,
             max_tokens=4096,
@@ -2216,10 +2211,11 @@ class GigiTelegramBot:
             )
 
         user_msg = update.message.text if update.message else None
+        sys_prompt, _ = await _abuild_telegram_system_prompt(
+            self.conversation_store, user_message=user_msg
+        )
         config = genai_types.GenerateContentConfig(
-            system_instruction=_build_telegram_system_prompt(
-                self.conversation_store, user_message=user_msg
-            ),
+            system_instruction=sys_prompt,
             tools=GEMINI_TOOLS,
         )
 
@@ -2319,14 +2315,10 @@ class GigiTelegramBot:
         # Build OpenAI-format messages from shared conversation store
         history = self.conversation_store.get_recent("jason", "telegram", limit=20)
         user_msg = update.message.text if update.message else None
-        messages = [
-            {
-                "role": "system",
-                "content": _build_telegram_system_prompt(
-                    self.conversation_store, user_message=user_msg
-                ),
-            }
-        ]
+        sys_prompt, _ = await _abuild_telegram_system_prompt(
+            self.conversation_store, user_message=user_msg
+        )
+        messages = [{"role": "system", "content": sys_prompt}]
         for m in history:
             messages.append({"role": m["role"], "content": m["content"]})
 
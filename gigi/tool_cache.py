@@ -0,0 +1,229 @@
+"""
+Tool Result Cache
+
+TTL cache + request coalescing for idempotent Gigi read tools (quotes,
+weather, events, setlists, maps lookups, ...). The same question tends to
+arrive on voice, SMS and Telegram within minutes; all of those go through
+tool_executor.execute(), so one upstream call can answer all of them.
+
+- Caching is opt-in: a tool is cached only if it has a CachePolicy in
+  TOOL_CACHE_POLICIES. Tools in tool_registry.SIDE_EFFECT_TOOLS are never
+  cached, even if a policy is registered for them by mistake
+- The key is the tool name plus its normalized input: only the policy's
+  key fields, strings trimmed and case-folded, empty values dropped
+- Concurrent identical calls share one in-flight upstream request
+- Error results ({"error": ...}, success=False) are returned but not stored
+- stats() reports per-tool hits, misses, coalesced calls and hit rate
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from gigi.tool_registry import SIDE_EFFECT_TOOLS
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 2000
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float  # seconds
+    key_fields: Optional[Tuple[str, ...]] = None  # None = every input field
+
+
+TOOL_CACHE_POLICIES: Dict[str, CachePolicy] = {
+    # Market data
+    "get_stock_price": CachePolicy(60, ("symbol",)),
+    "get_crypto_price": CachePolicy(60, ("symbol", "market")),
+    # Weather
+    "get_weather": CachePolicy(600, ("location",)),
+    # Events / entertainment (get_events and get_setlist are the Retell names)
+    "search_events": CachePolicy(1800),
+    "search_concerts": CachePolicy(1800),
+    "get_events": CachePolicy(1800),
+    "get_setlist": CachePolicy(6 * 3600),
+    "search_phish": CachePolicy(3600),
+    "search_books": CachePolicy(6 * 3600),
+    "search_nytimes": CachePolicy(900),
+    "search_f1": CachePolicy(900),
+    "explore_national_parks": CachePolicy(6 * 3600),
+    # Maps
+    "get_directions": CachePolicy(900, ("origin", "destination", "mode")),
+    "geocode_address": CachePolicy(24 * 3600, ("address",)),
+    "search_nearby_places": CachePolicy(3600, ("location", "place_type", "radius_miles")),
+    # Travel reference data
+    "get_airport_info": CachePolicy(24 * 3600),
+    "get_airline_info": CachePolicy(24 * 3600),
+}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _is_error(result: Any) -> bool:
+    """Results that shouldn't be reused: error JSON, success=False objects."""
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except (ValueError, TypeError):
+            return False
+    if isinstance(result, dict):
+        return bool(result.get("error")) or result.get("success") is False
+    if getattr(result, "error", None):
+        return True
+    return getattr(result, "success", True) is False
+
+
+class ToolResultCache:
+    """Per-process cache of read-tool results, shared by every channel."""
+
+    def __init__(
+        self,
+        policies: Dict[str, CachePolicy] = None,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.policies = dict(TOOL_CACHE_POLICIES if policies is None else policies)
+        for name in SIDE_EFFECT_TOOLS & set(self.policies):
+            logger.warning(f"Ignoring cache policy for side-effect tool {name}")
+            del self.policies[name]
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def policy(self, tool_name: str) -> Optional[CachePolicy]:
+        if tool_name in SIDE_EFFECT_TOOLS:
+            return None
+        return self.policies.get(tool_name)
+
+    def key(self, tool_name: str, tool_input: Optional[dict], namespace: str = "") -> Optional[str]:
+        """Cache key for a call, or None when the tool isn't cacheable."""
+        policy = self.policy(tool_name)
+        if policy is None:
+            return None
+        tool_input = tool_input or {}
+        if policy.key_fields is not None:
+            tool_input = {f: tool_input.get(f) for f in policy.key_fields}
+        normalized = json.dumps(_normalize(tool_input), sort_keys=True, default=str)
+        return f"{namespace}:{tool_name}:{normalized}"
+
+    def _count(self, tool_name: str, field: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                tool_name, {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+            )
+            stats[field] += 1
+
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def _put(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def call(
+        self,
+        tool_name: str,
+        tool_input: Optional[dict],
+        fetch: Callable[[], Awaitable[Any]],
+        namespace: str = "",
+        is_error: Callable[[Any], bool] = _is_error,
+    ) -> Any:
+        """
+        Return a cached result for (tool_name, tool_input) or run fetch().
+
+        namespace separates callers that format the same tool's result
+        differently (e.g. the Retell function-call path vs tool_executor);
+        is_error decides which results must not be stored.
+        """
+        key = self.key(tool_name, tool_input, namespace)
+        if key is None:
+            return await fetch()
+
+        found, value = self._get(key)
+        if found:
+            self._count(tool_name, "hits")
+            return value
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            self._count(tool_name, "coalesced")
+            return await asyncio.shield(inflight)
+
+        self._count(tool_name, "misses")
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._count(tool_name, "errors")
+            future.set_exception(e)
+            future.exception()  # retrieved; waiters re-raise it themselves
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if is_error(value):
+            self._count(tool_name, "errors")
+        else:
+            self._put(key, value, self.policies[tool_name].ttl)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k.split(":", 2)[1] == tool_name]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {}
+            for name, s in sorted(self._stats.items()):
+                lookups = s["hits"] + s["coalesced"] + s["misses"]
+                tools[name] = {
+                    **s,
+                    "ttl": self.policies[name].ttl if name in self.policies else None,
+                    "hit_rate": round((s["hits"] + s["coalesced"]) / lookups, 3) if lookups else None,
+                }
+            return {"entries": len(self._entries), "tools": tools}
+
+
+# Singleton instance
+tool_cache = ToolResultCache()
@@ -11,8 +11,9 @@ Usage:
 
 Adding a new tool:
   1. Add the schema to gigi/tool_registry.py  CANONICAL_TOOLS
-  2. Add an elif branch here in execute()
-  3. Done — all channels pick it up automatically.
+  2. Add an elif branch here in _execute()
+  3. If it is a pure read, give it a CachePolicy in gigi/tool_cache.py
+  4. Done — all channels pick it up automatically.
 """
 
 from __future__ import annotations
@@ -25,6 +26,10 @@ from datetime import date
 
 import psycopg2.pool
 
+from gigi.prompt_context import SEGMENT_MEMORIES, bump_version
+from gigi.tool_cache import tool_cache
+from service_metrics import DB_POOL_WAIT_SECONDS, TOOL_SECONDS
+
 logger = logging.getLogger(__name__)
 
 # ============================================================
@@ -46,6 +51,7 @@ def _get_db_pool():
     return _db_pool
 
 
+@DB_POOL_WAIT_SECONDS.time(pool="gigi_tools")
 def _get_conn():
     """Get a pooled database connection."""
     return _get_db_pool().getconn()
@@ -110,7 +116,18 @@ def set_google_service(svc) -> None:
 
 
 async def execute(tool_name: str, tool_input: dict) -> str:
-    """Execute a named tool and return the result as a JSON string."""
+    """Execute a named tool and return the result as a JSON string.
+
+    Idempotent read tools are served from the shared tool_cache (see
+    gigi/tool_cache.py TOOL_CACHE_POLICIES); everything else runs every time.
+    """
+    with TOOL_SECONDS.time(tool=tool_name):
+        return await tool_cache.call(
+            tool_name, tool_input, lambda: _execute(tool_name, tool_input)
+        )
+
+
+async def _execute(tool_name: str, tool_input: dict) -> str:
     try:
         # === CHIEF-OF-STAFF / ENTERTAINMENT ===
 
@@ -1332,6 +1349,7 @@ async def execute(tool_name: str, tool_input: dict) -> str:
                         "User requested forget",
                     )
                 conn.commit()
+            bump_version(SEGMENT_MEMORIES)
             return json.dumps(
                 {"archived": True, "memory_id": memory_id, "content": memory.content}
             )
@@ -163,6 +163,18 @@ VOICE_EXCLUDE = {
     "get_polybot_status",
 }
 
+# Tools that act on the outside world (messages, calls, faxes, call-outs).
+# Blocked during simulated calls and never served from the tool result cache.
+SIDE_EFFECT_TOOLS = {
+    "send_sms",
+    "send_team_message",
+    "send_email",
+    "transfer_call",
+    "report_call_out",
+    "send_fax",
+    "file_fax_referral",
+}
+
 
 def get_tools(channel: str) -> list:
     """Return the filtered tool list for a given channel.
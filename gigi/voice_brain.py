@@ -21,8 +21,8 @@ import logging
 import os
 import sys
 import time
-from datetime import date, datetime
-from typing import Dict, List, Optional
+from datetime import date
+from typing import Dict, List, Optional, Tuple
 
 # Add parent to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -118,6 +118,12 @@ def _phone_to_user_id(from_number: str) -> str:
     return PHONE_TO_USER.get(digits, PHONE_TO_USER.get(from_number, digits))
 
 
+from gigi.call_prefetch import call_prefetcher
+
+if VOICE_STORE_AVAILABLE:
+    call_prefetcher.configure_conversations(_voice_store, _phone_to_user_id)
+
+
 try:
     from gigi.mode_detector import ModeDetector
 
@@ -129,6 +135,15 @@ except Exception as e:
     MODE_AVAILABLE = False
     logger.warning(f"Mode detector not available: {e}")
 
+from gigi.prompt_context import (
+    PromptContext,
+    PromptContextAssembler,
+    format_date,
+    format_memories,
+    format_mode,
+)
+from service_metrics import instrument_llm_client
+
 try:
     from gigi.failure_handler import FailureHandler
 
@@ -232,6 +247,8 @@ else:
     elif ANTHROPIC_AVAILABLE and ANTHROPIC_API_KEY:
         llm_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
 
+llm_client = instrument_llm_client(llm_client, channel="voice")
+
 logger.info(
     f"Voice Brain LLM: {LLM_PROVIDER} / {LLM_MODEL} ({'ready' if llm_client else 'NOT CONFIGURED'})"
 )
@@ -284,6 +301,7 @@ def _sync_db_execute(sql, params=None):
 
 
 # Anthropic-format tools — sourced from canonical registry + voice-exclusive additions
+from gigi.tool_registry import SIDE_EFFECT_TOOLS
 from gigi.tool_registry import get_tools as _get_voice_tools
 
 _VOICE_ONLY_TOOLS = [
@@ -612,60 +630,64 @@ CRITICAL RULE: When transferring, you MUST invoke the transfer_call tool functio
 """
 
 
-def _build_voice_system_prompt(caller_id: str = None):
-    """Build the system prompt with dynamic context: date, memories, mode, cross-channel."""
-    parts = [_VOICE_SYSTEM_PROMPT_BASE]
+_prompt_context = PromptContextAssembler(
+    mode_detector=mode_detector if MODE_AVAILABLE else None,
+    memory_system=memory_system if MEMORY_AVAILABLE else None,
+    conversation_store=_voice_store if VOICE_STORE_AVAILABLE else None,
+)
 
-    # Current date/time
-    parts.append(
-        f"\n# Current Date/Time\nToday is {datetime.now().strftime('%A, %B %d, %Y')}"
-    )
 
-    # Inject mode context
-    if MODE_AVAILABLE and mode_detector:
-        try:
-            mode_info = mode_detector.get_current_mode()
-            parts.append(
-                f"\n# Current Operating Mode\nMode: {mode_info.mode.value.upper()} (source: {mode_info.source.value})"
-            )
-        except Exception as e:
-            logger.warning(f"Mode detection failed: {e}")
+def _render_voice_system_prompt(ctx: PromptContext) -> Tuple[str, str]:
+    """Render (prompt, stable_prefix). Stable sections first so the prefix caches."""
+    stable = [
+        format_memories(ctx.memories),
+        ctx.long_term,
+    ]
+    volatile = [
+        format_date("\n# Current Date/Time\n"),
+        format_mode(ctx.mode),
+        # What this caller discussed on other channels recently
+        ctx.cross_channel,
+    ]
+    prefix = PromptContext.render(_VOICE_SYSTEM_PROMPT_BASE, stable, [])
+    return PromptContext.render(_VOICE_SYSTEM_PROMPT_BASE, stable, volatile), prefix
 
-    # Inject relevant memories
-    if MEMORY_AVAILABLE and memory_system:
-        try:
-            memories = memory_system.query_memories(min_confidence=0.5, limit=25)
-            if memories:
-                memory_lines = [
-                    f"- {m.content} (confidence: {m.confidence:.0%}, category: {m.category})"
-                    for m in memories
-                ]
-                parts.append("\n# Your Saved Memories\n" + "\n".join(memory_lines))
-        except Exception as e:
-            logger.warning(f"Memory injection failed: {e}")
 
-    # Inject cross-channel context (what this user discussed on other channels recently)
-    if VOICE_STORE_AVAILABLE and _voice_store and caller_id:
-        try:
-            xc = _voice_store.get_cross_channel_summary(
-                caller_id, "voice", limit=5, hours=24
-            )
-            if xc:
-                parts.append(xc)
-            # Long-term conversation history (summaries from past 14 days — shorter for voice to save tokens)
-            ltc = _voice_store.get_long_term_context(caller_id, days=14)
-            if ltc:
-                parts.append(ltc)
-        except Exception as e:
-            logger.warning(f"Cross-channel context failed: {e}")
+def _voice_context_kwargs(caller_id: str = None) -> dict:
+    # Long-term summaries from past 14 days — shorter for voice to save tokens
+    return {"user_id": caller_id, "channel": "voice", "long_term_days": 14}
 
-    return "\n".join(parts)
+
+def _build_voice_system_prompt(caller_id: str = None):
+    """Build the system prompt with dynamic context: date, memories, mode, cross-channel."""
+    ctx = _prompt_context.fetch(**_voice_context_kwargs(caller_id))
+    return _render_voice_system_prompt(ctx)[0]
+
+
+async def _abuild_voice_system_prompt(caller_id: str = None) -> Tuple[str, str]:
+    """Async variant for the per-turn path; returns (prompt, stable_prefix)."""
+    ctx = await _prompt_context.fetch_async(**_voice_context_kwargs(caller_id))
+    return _render_voice_system_prompt(ctx)
 
 
 # Legacy reference for places that use SYSTEM_PROMPT directly
 SYSTEM_PROMPT = _build_voice_system_prompt()
 
 
+def _prefetched_shifts(tool_input: dict) -> Optional[dict]:
+    """Serve a caller's own upcoming shifts from the per-call prefetch, if loaded."""
+    if tool_input.get("past_days") or tool_input.get("open_only"):
+        return None
+    caregiver_id = tool_input.get("caregiver_id")
+    client_id = tool_input.get("client_id")
+    prefetched = call_prefetcher.find_person(caregiver_id or client_id)
+    if not prefetched:
+        return None
+    return prefetched.shifts_payload(
+        min(tool_input.get("days", 7), 30), caregiver_id=caregiver_id, client_id=client_id
+    )
+
+
 async def execute_tool(tool_name: str, tool_input: dict) -> str:
     """Execute a tool. Voice-specific tools handled locally; all others delegate to tool_executor."""
     try:
@@ -756,6 +778,17 @@ async def execute_tool(tool_name: str, tool_input: dict) -> str:
                 return json.dumps({"found": False})
             clean_phone = "".join(filter(str.isdigit, phone))[-10:]
 
+            prefetched = call_prefetcher.get(phone=clean_phone)
+            if prefetched and prefetched.identity:
+                return json.dumps(
+                    {
+                        "found": True,
+                        "name": prefetched.identity.get("first_name"),
+                        "full_name": prefetched.identity.get("full_name"),
+                        "type": prefetched.identity["type"],
+                    }
+                )
+
             def _lookup_phone():
                 import psycopg2
 
@@ -815,6 +848,11 @@ async def execute_tool(tool_name: str, tool_input: dict) -> str:
 
         # --- All other tools: delegate to shared executor ---
         else:
+            if tool_name == "get_wellsky_shifts":
+                prefetched = _prefetched_shifts(tool_input)
+                if prefetched:
+                    return json.dumps(prefetched)
+
             import gigi.tool_executor as _tex
 
             return await _tex.execute(tool_name, tool_input)
@@ -894,16 +932,6 @@ async def _maybe_acknowledge(call_info, on_token):
         call_info["acknowledged_thinking"] = True
 
 
-SIDE_EFFECT_TOOLS = {
-    "send_sms",
-    "send_team_message",
-    "send_email",
-    "transfer_call",
-    "report_call_out",
-    "send_fax",
-    "file_fax_referral",
-}
-
 # Dedup: track recent team messages to prevent duplicates
 _recent_team_messages: Dict[str, float] = {}  # message_hash -> timestamp
 MAX_DEDUP_ENTRIES = 100
@@ -1051,7 +1079,11 @@ async def generate_response(
     # Prepend recent voice conversation history from previous calls
     if VOICE_STORE_AVAILABLE and _voice_store and caller_id != "unknown":
         try:
-            prev_voice = _voice_store.get_recent(caller_id, "voice", limit=6)
+            prefetched = call_prefetcher.get(call_id=call_id, phone=from_number)
+            if prefetched:
+                prev_voice = prefetched.recent_conversations
+            else:
+                prev_voice = _voice_store.get_recent(caller_id, "voice", limit=6)
             if prev_voice:
                 # Only prepend if there's actual user speech in this call
                 # (to avoid bloating the greeting-only turn)
@@ -1094,7 +1126,9 @@ async def generate_response(
         active_client = llm_client
 
         if override_provider:
-            active_client = _create_llm_client(override_provider)
+            active_client = instrument_llm_client(
+                _create_llm_client(override_provider), channel="voice", provider=override_provider
+            )
             if not active_client:
                 logger.warning(
                     f"Failed to create client for override provider {override_provider}, falling back to {LLM_PROVIDER}"
@@ -1191,7 +1225,8 @@ async def _generate_anthropic(
     transfer_number = None
     client = _client or llm_client
     model = _model or LLM_MODEL
-    system_prompt = _build_voice_system_prompt(caller_id=caller_id)
+    system_prompt, stable_prefix = await _abuild_voice_system_prompt(caller_id=caller_id)
+    system_prompt = PromptContext.anthropic_system(system_prompt, stable_prefix)
     response = await client.messages.create(
         model=model,
         max_tokens=300,
@@ -1269,8 +1304,9 @@ async def _generate_gemini(
             genai_types.Content(role=role, parts=[genai_types.Part(text=m["content"])])
         )
 
+    system_prompt, _ = await _abuild_voice_system_prompt(caller_id=caller_id)
     config = genai_types.GenerateContentConfig(
-        system_instruction=_build_voice_system_prompt(caller_id=caller_id),
+        system_instruction=system_prompt,
         tools=GEMINI_TOOLS,
     )
 
@@ -1421,9 +1457,8 @@ async def _generate_openai(
     client = _client or llm_client
     model = _model or LLM_MODEL
 
-    oai_messages = [
-        {"role": "system", "content": _build_voice_system_prompt(caller_id=caller_id)}
-    ]
+    system_prompt, _ = await _abuild_voice_system_prompt(caller_id=caller_id)
+    oai_messages = [{"role": "system", "content": system_prompt}]
     for m in messages:
         oai_messages.append({"role": m["role"], "content": m["content"]})
 
@@ -1562,6 +1597,7 @@ class VoiceBrainHandler:
         finally:
             if self._response_task and not self._response_task.done():
                 self._response_task.cancel()
+            call_prefetcher.release(self.call_id)
 
     async def send(self, data: dict):
         """Send JSON message to Retell (serialized to prevent concurrent sends)"""
@@ -1582,6 +1618,12 @@ class VoiceBrainHandler:
                 f"Call details: from={self.call_info.get('from_number')}, call_id={self.call_id}"
             )
 
+            # Normally already loaded by the inbound-variables webhook
+            if self.call_info.get("from_number"):
+                await call_prefetcher.prefetch(
+                    self.call_info["from_number"], self.call_id
+                )
+
             # Generate and send initial greeting (only once)
             if not self._greeting_sent:
                 self._greeting_sent = True
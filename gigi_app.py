@@ -5,6 +5,7 @@ Runs independently from the portal on its own port.
 Routes:
 - /gigi/*              → All Gigi routes (webhooks, API, shadow, health)
 - /llm-websocket/{id}  → Retell voice brain WebSocket
+- /metrics             → Prometheus metrics
 """
 import os
 import sys
@@ -98,6 +99,11 @@ async def redirect_shadow():
 async def health():
     return {"status": "ok", "service": "gigi"}
 
+# Prometheus scrape target (WellSky, tool, LLM and DB pool latency histograms)
+from service_metrics import add_metrics_route
+
+add_metrics_route(app)
+
 # ==================== RC DIAGNOSTIC ====================
 @app.get("/api/diag/rc-status")
 async def diag_rc_status(authorization: str = Header(None)):
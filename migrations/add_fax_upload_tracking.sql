@@ -0,0 +1,11 @@
+-- WellSky upload tracking for inbound faxes
+-- Written by services/document_upload_pipeline via fax_service.retry_wellsky_uploads
+
+ALTER TABLE fax_log ADD COLUMN IF NOT EXISTS wellsky_upload_attempts INTEGER DEFAULT 0;
+ALTER TABLE fax_log ADD COLUMN IF NOT EXISTS wellsky_upload_error TEXT;
+ALTER TABLE fax_log ADD COLUMN IF NOT EXISTS wellsky_upload_last_attempt_at TIMESTAMP;
+
+-- Inbound poll dedupe (rc_message_id = ANY(...)) and retry queue lookups
+CREATE INDEX IF NOT EXISTS idx_fax_log_rc_message_id ON fax_log(rc_message_id);
+CREATE INDEX IF NOT EXISTS idx_fax_log_pending_wellsky ON fax_log(id)
+    WHERE filed_to IS NOT NULL AND wellsky_doc_id IS NULL;
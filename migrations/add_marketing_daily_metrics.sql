@@ -0,0 +1,16 @@
+-- Daily-grain marketing metrics
+-- Filled incrementally by services/marketing/metrics_warehouse (portal startup
+-- loop / `python -m services.marketing.metrics_warehouse`); date-range totals
+-- and previous-period comparisons aggregate over these rows
+
+CREATE TABLE IF NOT EXISTS marketing_daily_metrics (
+    source VARCHAR(32) NOT NULL,           -- ga4, gsc, gbp, facebook, google_ads, ...
+    metric VARCHAR(64) NOT NULL,
+    day DATE NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    fetched_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (source, metric, day)
+);
+
+-- Range scans per source (stored-day lookups, daily series)
+CREATE INDEX IF NOT EXISTS idx_marketing_daily_metrics_source_day ON marketing_daily_metrics(source, day);
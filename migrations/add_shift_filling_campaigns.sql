@@ -0,0 +1,17 @@
+-- Shift filling campaign state
+-- Written by sales/shift_filling/campaign_timers.CampaignStore so open campaigns
+-- (and their timeout / voice follow-up deadlines) survive a portal restart
+
+CREATE TABLE IF NOT EXISTS shift_filling_campaigns (
+    id VARCHAR(64) PRIMARY KEY,
+    shift_id VARCHAR(255) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    state JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Startup restore loads open campaigns only
+CREATE INDEX IF NOT EXISTS idx_shift_filling_campaigns_open ON shift_filling_campaigns(updated_at)
+    WHERE status IN ('pending', 'in_progress');
+CREATE INDEX IF NOT EXISTS idx_shift_filling_campaigns_shift ON shift_filling_campaigns(shift_id);
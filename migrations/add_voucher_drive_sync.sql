@@ -0,0 +1,28 @@
+-- Drive changes-feed voucher sync
+-- Written by voucher_sync_service.sync_new_vouchers; new deployments get these
+-- from Base.metadata.create_all (portal_models.Voucher / DriveSyncState /
+-- DriveSyncRetry)
+
+ALTER TABLE vouchers ADD COLUMN IF NOT EXISTS drive_file_id VARCHAR(255);
+ALTER TABLE vouchers ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- Idempotency key: one voucher per Drive file revision
+CREATE UNIQUE INDEX IF NOT EXISTS uq_voucher_drive_file_content ON vouchers(drive_file_id, content_hash);
+CREATE INDEX IF NOT EXISTS ix_vouchers_drive_file_id ON vouchers(drive_file_id);
+
+CREATE TABLE IF NOT EXISTS drive_sync_state (
+    sync_key VARCHAR(255) PRIMARY KEY,     -- e.g. vouchers:<folder id>
+    page_token VARCHAR(255) NOT NULL,      -- next changes().list pageToken
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Files that failed download/OCR; retried each run until dead_at is set
+CREATE TABLE IF NOT EXISTS drive_sync_retries (
+    sync_key VARCHAR(255) NOT NULL,
+    file_id VARCHAR(255) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    last_error TEXT,
+    dead_at TIMESTAMP,                     -- set after VOUCHER_SYNC_MAX_ATTEMPTS failures
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (sync_key, file_id)
+);
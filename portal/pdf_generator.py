@@ -8,6 +8,7 @@ Produces clean, branded PDFs for:
 import base64
 import io
 from datetime import date as _date
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
 from reportlab.lib import colors
@@ -93,18 +94,48 @@ STYLE_FOOTER = ParagraphStyle(
     alignment=TA_CENTER,
 )
 
+# Table styles are immutable command lists; built once and shared by every render
+TABLE_SECTION = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), BRAND_BLUE),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+    ("LEFTPADDING", (0, 0), (-1, -1), 8),
+])
+TABLE_KV = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), colors.white),
+    ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, SECTION_BG]),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#dddddd")),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 6),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+])
+TABLE_TEXT = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), SECTION_BG),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#dddddd")),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("LEFTPADDING", (0, 0), (-1, -1), 8),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+])
+TABLE_SIG = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, -1), SIG_BOX_BG),
+    ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#cccccc")),
+    ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+])
+
 
 # ── Builder utilities ─────────────────────────────────────────────────────────
 
 def _section_header(title: str):
     """Returns a Table that renders as a coloured section banner."""
     t = Table([[Paragraph(title, STYLE_SECTION)]], colWidths=[7.0 * inch])
-    t.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), BRAND_BLUE),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-    ]))
+    t.setStyle(TABLE_SECTION)
     return t
 
 
@@ -140,16 +171,7 @@ def _kv_table(rows: List[Tuple[str, Any]], cols: int = 2):
             ])
 
     t = Table(data, colWidths=col_widths, repeatRows=0)
-    t.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.white),
-        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, SECTION_BG]),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#dddddd")),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 6),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-    ]))
+    t.setStyle(TABLE_KV)
     return t
 
 
@@ -159,28 +181,29 @@ def _text_block(text: str):
         [[Paragraph(str(text or "—"), STYLE_VALUE)]],
         colWidths=[7.0 * inch],
     )
-    t.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), SECTION_BG),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#dddddd")),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-    ]))
+    t.setStyle(TABLE_TEXT)
     return t
 
 
+@lru_cache(maxsize=128)
+def _decode_image(b64_str: str) -> bytes:
+    """
+    Decoded bytes of a base64 data-URI; cached because the same signatures
+    (agency rep, repeat clients, re-synced forms) show up render after render.
+    """
+    if "," in b64_str:
+        _, data = b64_str.split(",", 1)
+    else:
+        data = b64_str
+    return base64.b64decode(data)
+
+
 def _sig_image(b64_str: str, width: float = 2.0 * inch, height: float = 0.55 * inch):
     """Decode a base64 data-URI PNG and return a reportlab Image, or None."""
     if not b64_str or not isinstance(b64_str, str):
         return None
     try:
-        if "," in b64_str:
-            _, data = b64_str.split(",", 1)
-        else:
-            data = b64_str
-        img_bytes = base64.b64decode(data)
-        buf = io.BytesIO(img_bytes)
+        buf = io.BytesIO(_decode_image(b64_str))
         return Image(buf, width=width, height=height)
     except Exception:
         return None
@@ -235,15 +258,7 @@ def _sig_block(
 
     col_widths = [col_w] * ncols
     t = Table(rows_out, colWidths=col_widths)
-    t.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), SIG_BOX_BG),
-        ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#cccccc")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#eeeeee")),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("TOPPADDING", (0, 0), (-1, -1), 4),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-    ]))
+    t.setStyle(TABLE_SIG)
     return t
 
 
@@ -0,0 +1,270 @@
+"""
+Off-loop PDF rendering for the offline-form sync endpoints.
+
+ReportLab rendering is CPU-bound and was running inside the async handlers,
+stalling every other request while a large assessment was built. Renders now
+run in a small process pool (the GIL would serialize threads anyway) behind
+a bounded queue:
+
+- at most ``max_workers + max_queue`` renders are admitted at once; further
+  callers wait up to ``queue_timeout`` and then get PdfRenderBusy
+- output is cached by a hash of (form, data, meta, date), so a re-sync of an
+  unchanged form returns the earlier bytes; identical concurrent requests
+  share one render
+- per-form timings (count, cache hits, avg/max/last ms, errors) are kept for
+  the stats endpoint
+
+Each worker process imports pdf_generator once, so paragraph/table styles and
+decoded signature images are reused across the renders it handles.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FORMS = {
+    "client_assessment": "generate_client_assessment_pdf",
+    "monitoring_visit": "generate_monitoring_visit_pdf",
+    "incident_report": "generate_incident_report_pdf",
+}
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_QUEUE = int(os.getenv("PDF_RENDER_QUEUE", "8"))
+QUEUE_TIMEOUT = 30.0  # seconds a caller waits for a render slot
+CACHE_MAX_ENTRIES = 64
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class PdfRenderBusy(RuntimeError):
+    """The render queue stayed full for longer than the queue timeout."""
+
+
+def _warm_worker() -> None:
+    # Build module-level styles once per worker process
+    import portal.pdf_generator  # noqa: F401
+
+
+def _render(form: str, data: Dict[str, Any], meta: Dict[str, Any]) -> bytes:
+    """Runs in the worker process."""
+    from portal import pdf_generator
+
+    return getattr(pdf_generator, FORMS[form])(data, meta)
+
+
+def payload_key(form: str, data: Dict[str, Any], meta: Dict[str, Any]) -> str:
+    """
+    Cache key for a render. The PDF footer carries the generation date, so
+    the date is part of the key.
+    """
+    payload = json.dumps(
+        {"form": form, "data": data, "meta": meta, "day": date.today().isoformat()},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _process_pool(max_workers: int) -> Executor:
+    # spawn, not fork: the portal process has live threads and DB pools
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    )
+
+
+class PdfRenderService:
+    """Renders form PDFs in worker processes, with a bounded queue and an output cache."""
+
+    def __init__(
+        self,
+        max_workers: int = PDF_RENDER_WORKERS,
+        max_queue: int = PDF_RENDER_QUEUE,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        cache_max_bytes: int = CACHE_MAX_BYTES,
+        executor_factory: Callable[[int], Executor] = _process_pool,
+        render_fn: Callable[[str, Dict[str, Any], Dict[str, Any]], bytes] = _render,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.cache_max_entries = cache_max_entries
+        self.cache_max_bytes = cache_max_bytes
+        self._executor_factory = executor_factory
+        self._render_fn = render_fn
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: str) -> Optional[bytes]:
+        pdf = self._cache.get(key)
+        if pdf is not None:
+            self._cache.move_to_end(key)
+        return pdf
+
+    def _cache_put(self, key: str, pdf: bytes) -> None:
+        if len(pdf) > self.cache_max_bytes:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= len(old)
+        self._cache[key] = pdf
+        self._cache_bytes += len(pdf)
+        while len(self._cache) > self.cache_max_entries or self._cache_bytes > self.cache_max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def _form_stats(self, form: str) -> Dict[str, float]:
+        if form not in self._stats:
+            self._stats[form] = {
+                "renders": 0,
+                "cache_hits": 0,
+                "errors": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_ms": 0.0,
+            }
+        return self._stats[form]
+
+    def stats(self) -> Dict[str, Any]:
+        forms = {}
+        for form, s in self._stats.items():
+            forms[form] = {
+                **s,
+                "avg_ms": round(s["total_ms"] / s["renders"], 1) if s["renders"] else None,
+            }
+        in_flight = 0
+        if self._slots is not None:
+            in_flight = self.max_workers + self.max_queue - self._slots._value
+        return {
+            "forms": forms,
+            "in_flight": in_flight,
+            "waiting": self._waiting,
+            "capacity": self.max_workers + self.max_queue,
+            "cache_entries": len(self._cache),
+            "cache_bytes": self._cache_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self.max_workers)
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def _acquire_slot(self) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise PdfRenderBusy(
+                f"PDF render queue full ({self.max_workers + self.max_queue} in flight)"
+            )
+        finally:
+            self._waiting -= 1
+
+    async def _run(self, form: str, data: Dict[str, Any], meta: Dict[str, Any]) -> bytes:
+        stats = self._form_stats(form)
+        await self._acquire_slot()
+        started = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                pdf = await loop.run_in_executor(
+                    self._get_executor(), self._render_fn, form, data, meta
+                )
+            except BrokenProcessPool:
+                # A worker died (OOM, segfault in an image lib); start a fresh pool
+                logger.warning("PDF render pool broken, restarting it")
+                self._reset_executor()
+                pdf = await loop.run_in_executor(
+                    self._get_executor(), self._render_fn, form, data, meta
+                )
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            self._slots.release()
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        stats["renders"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = round(elapsed_ms, 1)
+        stats["max_ms"] = max(stats["max_ms"], round(elapsed_ms, 1))
+        logger.info(f"Rendered {form} PDF in {elapsed_ms:.0f}ms ({len(pdf)} bytes)")
+        return pdf
+
+    async def render(self, form: str, data: Dict[str, Any], meta: Dict[str, Any]) -> bytes:
+        """Render a form PDF off the event loop, returning cached bytes for a repeat payload."""
+        if form not in FORMS:
+            raise ValueError(f"Unknown PDF form: {form}")
+
+        key = payload_key(form, data, meta)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._form_stats(form)["cache_hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._form_stats(form)["cache_hits"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            pdf = await self._run(form, data, meta)
+            self._cache_put(key, pdf)
+            future.set_result(pdf)
+            return pdf
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a render nobody else waited on doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def shutdown(self) -> None:
+        self._reset_executor()
+
+
+# Singleton instance
+pdf_render_service = PdfRenderService()
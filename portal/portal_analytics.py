@@ -0,0 +1,472 @@
+"""
+Buffered portal usage analytics.
+
+The track endpoints used to insert/commit one row per login, logout and tile
+click. They now queue the event here and return immediately; a background
+loop writes each batch in a single transaction and keeps hourly and daily
+UsageRollup counters (per user, per tool) up to date in the same commit.
+
+Summary and trend views read the rollups, so the user_sessions / tool_clicks
+event tables can keep growing without making every dashboard load scan them.
+Events queued but not yet flushed (at most one flush interval) are lost if
+the process dies. A batch that fails for any reason other than the database
+being unreachable is retried event by event, and events that still fail are
+logged and dropped rather than blocking every later flush.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from portal_models import ToolClick, UsageRollup, UserSession
+from sqlalchemy import distinct, func
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5.0  # seconds between background flushes
+MAX_BATCH = 500  # events written per transaction
+MAX_PENDING = 20000  # oldest events are dropped past this (DB down for a long time)
+
+GRANULARITIES = ("hour", "day")
+SESSION_TOOL_ID = 0  # rollup rows holding session counters
+
+RollupKey = Tuple[str, datetime, str, int]
+
+
+def _utc_naive(at: Optional[datetime]) -> datetime:
+    """Event tables store naive UTC timestamps."""
+    if at is None:
+        return datetime.utcnow()
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+def period_start(at: datetime, granularity: str) -> datetime:
+    at = _utc_naive(at)
+    if granularity == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class _Deltas:
+    """Counter increments for one batch, keyed by rollup row."""
+
+    def __init__(self):
+        self.counts: Dict[RollupKey, Dict[str, int]] = defaultdict(
+            lambda: {"clicks": 0, "sessions": 0, "session_seconds": 0}
+        )
+        self.tool_names: Dict[int, str] = {}
+
+    def add(self, at: datetime, user_email: str, tool_id: int, **increments) -> None:
+        for granularity in GRANULARITIES:
+            key = (granularity, period_start(at, granularity), user_email, tool_id)
+            for column, amount in increments.items():
+                self.counts[key][column] += amount
+
+    def __bool__(self):
+        return bool(self.counts)
+
+
+def _apply_deltas(db, deltas: _Deltas) -> None:
+    """Increment existing rollup rows in place; insert the ones that don't exist yet."""
+    for (granularity, start, user_email, tool_id), counts in deltas.counts.items():
+        values = {
+            getattr(UsageRollup, column): getattr(UsageRollup, column) + amount
+            for column, amount in counts.items()
+            if amount
+        }
+        tool_name = deltas.tool_names.get(tool_id)
+        if tool_name:
+            values[UsageRollup.tool_name] = tool_name
+        if not values:
+            values = {UsageRollup.clicks: UsageRollup.clicks}
+        updated = (
+            db.query(UsageRollup)
+            .filter(
+                UsageRollup.granularity == granularity,
+                UsageRollup.period_start == start,
+                UsageRollup.user_email == user_email,
+                UsageRollup.tool_id == tool_id,
+            )
+            .update(values, synchronize_session=False)
+        )
+        if not updated:
+            db.add(
+                UsageRollup(
+                    granularity=granularity,
+                    period_start=start,
+                    user_email=user_email,
+                    tool_id=tool_id,
+                    tool_name=tool_name,
+                    **counts,
+                )
+            )
+
+
+class AnalyticsBuffer:
+    """In-memory event queue flushed to the portal database in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        flush_interval: float = FLUSH_INTERVAL,
+        max_batch: int = MAX_BATCH,
+        max_pending: int = MAX_PENDING,
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._events: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Recording (called from request handlers; never touches the DB)
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, kind: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append((kind, data))
+            overflow = len(self._events) - self.max_pending
+            for _ in range(max(overflow, 0)):
+                self._events.popleft()
+        if overflow > 0:
+            logger.warning(f"Analytics buffer full, dropped {overflow} oldest event(s)")
+
+    def record_login(
+        self,
+        user_email: str,
+        user_name: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        at: Optional[datetime] = None,
+    ) -> None:
+        self._enqueue(
+            "login",
+            {
+                "user_email": user_email,
+                "user_name": user_name,
+                "login_time": _utc_naive(at),
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            },
+        )
+
+    def record_logout(
+        self,
+        user_email: str,
+        duration_seconds: Optional[int] = None,
+        at: Optional[datetime] = None,
+    ) -> None:
+        self._enqueue(
+            "logout",
+            {
+                "user_email": user_email,
+                "duration_seconds": duration_seconds,
+                "logout_time": _utc_naive(at),
+            },
+        )
+
+    def record_click(
+        self,
+        user_email: str,
+        tool_id: int,
+        tool_name: str,
+        tool_url: str,
+        user_name: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        at: Optional[datetime] = None,
+    ) -> None:
+        self._enqueue(
+            "click",
+            {
+                "user_email": user_email,
+                "user_name": user_name,
+                "tool_id": tool_id,
+                "tool_name": tool_name,
+                "tool_url": tool_url,
+                "clicked_at": _utc_naive(at),
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            },
+        )
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _take(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            count = min(self.max_batch, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def _requeue(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        with self._lock:
+            self._events.extendleft(reversed(batch))
+
+    def _write_batch(self, db, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        deltas = _Deltas()
+        for kind, data in batch:
+            if kind == "login":
+                db.add(UserSession(**data))
+                deltas.add(data["login_time"], data["user_email"], SESSION_TOOL_ID, sessions=1)
+            elif kind == "click":
+                db.add(ToolClick(**data))
+                deltas.add(data["clicked_at"], data["user_email"], data["tool_id"], clicks=1)
+                deltas.tool_names[data["tool_id"]] = data["tool_name"]
+            elif kind == "logout":
+                # Logins from earlier in this batch must be visible to the lookup
+                db.flush()
+                session = (
+                    db.query(UserSession)
+                    .filter(
+                        UserSession.user_email == data["user_email"],
+                        UserSession.logout_time.is_(None),
+                    )
+                    .order_by(UserSession.login_time.desc())
+                    .first()
+                )
+                if not session:
+                    continue
+                session.logout_time = data["logout_time"]
+                duration = data["duration_seconds"]
+                if not duration:
+                    duration = (session.logout_time - session.login_time).total_seconds()
+                session.duration_seconds = int(duration)
+                # Time is credited to the period the session started in
+                deltas.add(
+                    session.login_time,
+                    session.user_email,
+                    SESSION_TOOL_ID,
+                    session_seconds=session.duration_seconds,
+                )
+        db.flush()
+        _apply_deltas(db, deltas)
+
+    def _commit(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        db = self._session_factory()
+        try:
+            self._write_batch(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_one_by_one(self, batch: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Retry a failed batch event by event so one bad event can't block the
+        rest. Events that still fail are dropped; if the database goes away
+        midway, the remaining events are requeued.
+        """
+        written = 0
+        for n, event in enumerate(batch):
+            for attempt in (1, 2):
+                try:
+                    self._commit([event])
+                    written += 1
+                    break
+                except (OperationalError, InterfaceError):
+                    self._requeue(batch[n:])
+                    raise
+                except IntegrityError as e:
+                    # A concurrent insert of the same rollup row becomes an
+                    # update on the retry; anything else is a bad event
+                    if attempt == 2:
+                        logger.error(f"Dropping analytics {event[0]} event {event[1]}: {e}")
+                except Exception as e:
+                    logger.error(f"Dropping analytics {event[0]} event {event[1]}: {e}")
+                    break
+        return written
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of events written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return written
+                try:
+                    self._commit(batch)
+                    written += len(batch)
+                    continue
+                except (OperationalError, InterfaceError) as e:
+                    # Database unreachable: nothing was committed, keep the
+                    # batch for the next flush
+                    self._requeue(batch)
+                    logger.error(f"Error flushing analytics events: {e}")
+                    return written
+                except Exception as e:
+                    logger.warning(f"Analytics batch failed ({e}), retrying events one by one")
+                try:
+                    written += self._write_one_by_one(batch)
+                except Exception as e:
+                    logger.error(f"Error flushing analytics events: {e}")
+                    return written
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Error in analytics flush loop: {e}")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+def backfill_rollups(db, batch_size: int = 5000) -> int:
+    """
+    Build rollups from the event tables when none exist yet (first deploy).
+
+    Returns the number of rollup rows created.
+    """
+    if db.query(UsageRollup.id).first() is not None:
+        return 0
+
+    deltas = _Deltas()
+    clicks = db.query(
+        ToolClick.user_email, ToolClick.tool_id, ToolClick.tool_name, ToolClick.clicked_at
+    ).yield_per(batch_size)
+    for user_email, tool_id, tool_name, clicked_at in clicks:
+        deltas.add(clicked_at, user_email, tool_id, clicks=1)
+        deltas.tool_names[tool_id] = tool_name
+
+    sessions = db.query(
+        UserSession.user_email, UserSession.login_time, UserSession.duration_seconds
+    ).yield_per(batch_size)
+    for user_email, login_time, duration_seconds in sessions:
+        deltas.add(
+            login_time,
+            user_email,
+            SESSION_TOOL_ID,
+            sessions=1,
+            session_seconds=duration_seconds or 0,
+        )
+
+    _apply_deltas(db, deltas)
+    db.commit()
+    return len(deltas.counts)
+
+
+# ----------------------------------------------------------------------
+# Reads
+# ----------------------------------------------------------------------
+
+
+def usage_totals(db) -> Dict[str, int]:
+    """All-time totals from the daily rollups."""
+    clicks, sessions = (
+        db.query(
+            func.coalesce(func.sum(UsageRollup.clicks), 0),
+            func.coalesce(func.sum(UsageRollup.sessions), 0),
+        )
+        .filter(UsageRollup.granularity == "day")
+        .one()
+    )
+    active_users = (
+        db.query(func.count(distinct(UsageRollup.user_email)))
+        .filter(
+            UsageRollup.granularity == "day",
+            UsageRollup.tool_id == SESSION_TOOL_ID,
+            UsageRollup.sessions > 0,
+        )
+        .scalar()
+        or 0
+    )
+    return {
+        "total_sessions": int(sessions),
+        "total_clicks": int(clicks),
+        "active_users": int(active_users),
+    }
+
+
+def usage_trends(
+    db,
+    granularity: str = "day",
+    since: Optional[datetime] = None,
+    tool_id: Optional[int] = None,
+    user_email: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Per-period series plus the top tools over the same window."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    if since is None:
+        since = datetime.utcnow() - timedelta(days=30)
+
+    filters = [UsageRollup.granularity == granularity, UsageRollup.period_start >= _utc_naive(since)]
+    if tool_id is not None:
+        filters.append(UsageRollup.tool_id == tool_id)
+    if user_email:
+        filters.append(UsageRollup.user_email == user_email)
+
+    rows = (
+        db.query(
+            UsageRollup.period_start,
+            func.sum(UsageRollup.clicks),
+            func.sum(UsageRollup.sessions),
+            func.sum(UsageRollup.session_seconds),
+            func.count(distinct(UsageRollup.user_email)),
+        )
+        .filter(*filters)
+        .group_by(UsageRollup.period_start)
+        .order_by(UsageRollup.period_start)
+        .all()
+    )
+    series = [
+        {
+            "period_start": start.isoformat(),
+            "clicks": int(clicks or 0),
+            "sessions": int(sessions or 0),
+            "session_seconds": int(seconds or 0),
+            "users": int(users or 0),
+        }
+        for start, clicks, sessions, seconds, users in rows
+    ]
+
+    top_tools = (
+        db.query(
+            UsageRollup.tool_id,
+            func.max(UsageRollup.tool_name),
+            func.sum(UsageRollup.clicks).label("clicks"),
+        )
+        .filter(*filters, UsageRollup.tool_id != SESSION_TOOL_ID)
+        .group_by(UsageRollup.tool_id)
+        .order_by(func.sum(UsageRollup.clicks).desc())
+        .limit(10)
+        .all()
+    )
+    return {
+        "granularity": granularity,
+        "since": _utc_naive(since).isoformat(),
+        "series": series,
+        "top_tools": [
+            {"tool_id": tid, "tool_name": name, "clicks": int(clicks or 0)}
+            for tid, name, clicks in top_tools
+        ],
+    }
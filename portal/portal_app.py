@@ -32,6 +32,12 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
 
+from portal_analytics import (
+    AnalyticsBuffer,
+    backfill_rollups,
+    usage_totals,
+    usage_trends,
+)
 from portal_auth import get_current_user, get_current_user_optional, oauth_manager
 from portal_database import db_manager, get_db
 from portal_models import (
@@ -49,6 +55,7 @@ from services.marketing.metrics_service import (
     get_social_metrics,
 )
 from services.search_service import search_service
+from service_metrics import add_metrics_route
 
 # Import client satisfaction service at module load time (before sales path takes precedence)
 try:
@@ -245,17 +252,61 @@ async def autonomous_documentation_sync():
         await asyncio.sleep(1800)
 
 
+async def marketing_metrics_refresh_loop():
+    """Background loop filling the daily marketing metrics warehouse"""
+    from services.marketing.metrics_warehouse import metrics_warehouse
+
+    while True:
+        try:
+            await asyncio.to_thread(metrics_warehouse.refresh_all)
+        except Exception as e:
+            logger.error(f"Error in marketing metrics refresh loop: {e}")
+
+        # Every 6 hours; the last few days are re-fetched each time
+        await asyncio.sleep(6 * 3600)
+
+
+analytics_buffer = AnalyticsBuffer(db_manager.get_session)
+
+
+def _backfill_usage_rollups():
+    db = db_manager.get_session()
+    try:
+        created = backfill_rollups(db)
+        if created:
+            logger.info(f"Backfilled {created} usage rollup rows from event tables")
+    finally:
+        db.close()
+
+
 @app.on_event("startup")
 async def startup_event():
+    # Portal analytics: build rollups on first deploy, then flush queued events
+    try:
+        await asyncio.to_thread(_backfill_usage_rollups)
+    except Exception as e:
+        logger.error(f"Error backfilling usage rollups: {e}")
+    analytics_buffer.start()
+
     # Only run autonomous sync in production (staging has STAGING=true env var)
     if os.getenv("STAGING", "").lower() != "true":
         asyncio.create_task(autonomous_documentation_sync())
         logger.info("Gigi Autonomous Documentation Engine started.")
+        if os.getenv("DATABASE_URL"):
+            asyncio.create_task(marketing_metrics_refresh_loop())
     else:
         logger.info(
             "Staging environment detected — skipping autonomous documentation sync."
         )
 
+    # Shift filling: reload open campaigns and fire their deadlines on time
+    if SHIFT_FILLING_AVAILABLE:
+        try:
+            await asyncio.to_thread(shift_filling_engine.restore_campaigns)
+            shift_filling_engine.start_deadline_runner()
+        except Exception as e:
+            logger.error(f"Error starting shift filling deadline runner: {e}")
+
     # Ensure Gigi Brain tile exists
     try:
         with db_manager.get_session() as db:
@@ -288,6 +339,19 @@ async def startup_event():
         logger.error(f"Error ensuring Gigi Brain tile: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Don't lose analytics events still waiting in the buffer
+    try:
+        await analytics_buffer.stop()
+    except Exception as e:
+        logger.error(f"Error flushing analytics events on shutdown: {e}")
+
+    from portal.pdf_renderer import pdf_render_service
+
+    pdf_render_service.shutdown()
+
+
 # Add session middleware for OAuth state management
 import secrets
 
@@ -2903,6 +2967,9 @@ async def status():
     return {"status": "ok", "service": "Colorado CareAssist Portal"}
 
 
+add_metrics_route(app)
+
+
 # === Client Assessment (Offline Form) ===
 
 
@@ -2982,9 +3049,10 @@ async def sync_client_assessment(request: Request):
                 from gigi.google_service import google_service
 
                 if google_service._creds:
-                    from portal.pdf_generator import generate_client_assessment_pdf
+                    from portal.pdf_renderer import pdf_render_service
 
-                    file_bytes = generate_client_assessment_pdf(
+                    file_bytes = await pdf_render_service.render(
+                        "client_assessment",
                         data,
                         {
                             "client_name": client_name,
@@ -3136,20 +3204,25 @@ async def sync_client_assessment(request: Request):
 
                         if file_bytes:
                             try:
-                                import base64 as _b64
+                                from services.document_upload_pipeline import (
+                                    DocumentUpload,
+                                    upload_document,
+                                )
 
-                                pdf_b64 = _b64.b64encode(file_bytes).decode("utf-8")
                                 safe_date = (
                                     str(assessment_date)
                                     if assessment_date
                                     else "unknown"
                                 )
-                                ws.create_document_reference(
-                                    patient_id=str(wellsky_id),
-                                    document_type="Client Assessment",
-                                    content_type="application/pdf",
-                                    data_base64=pdf_b64,
-                                    filename=f"Assessment_{client_name.replace(' ', '_')}_{safe_date.replace('-', '_')}.pdf",
+                                await asyncio.to_thread(
+                                    upload_document,
+                                    DocumentUpload(
+                                        patient_id=str(wellsky_id),
+                                        document_type="Client Assessment",
+                                        filename=f"Assessment_{client_name.replace(' ', '_')}_{safe_date.replace('-', '_')}.pdf",
+                                        data=file_bytes,
+                                    ),
+                                    service=ws,
                                 )
                             except Exception as dr_err:
                                 logger.warning(
@@ -3319,9 +3392,10 @@ async def sync_monitoring_visit(request: Request):
             from gigi.google_service import google_service
 
             if google_service._creds:
-                from portal.pdf_generator import generate_monitoring_visit_pdf
+                from portal.pdf_renderer import pdf_render_service
 
-                file_bytes = generate_monitoring_visit_pdf(
+                file_bytes = await pdf_render_service.render(
+                    "monitoring_visit",
                     data,
                     {
                         "client_name": client_name,
@@ -3632,9 +3706,10 @@ async def sync_incident_report(request: Request):
             from gigi.google_service import google_service
 
             if google_service._creds:
-                from portal.pdf_generator import generate_incident_report_pdf
+                from portal.pdf_renderer import pdf_render_service
 
-                file_bytes = generate_incident_report_pdf(
+                file_bytes = await pdf_render_service.render(
+                    "incident_report",
                     data,
                     {
                         "client_name": client_name,
@@ -3822,136 +3897,113 @@ async def get_incident_reports(
         return JSONResponse({"reports": []})
 
 
+@app.get("/api/forms/pdf-render-stats")
+async def get_pdf_render_stats(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Per-form PDF render timings, cache hits and queue depth"""
+    from portal.pdf_renderer import pdf_render_service
+
+    return JSONResponse({"success": True, **pdf_render_service.stats()})
+
+
 # Analytics endpoints
+# Events are queued on analytics_buffer and written in batches by its flush
+# loop; summary/trend reads come from the usage_rollups table.
+def _client_ip(request: Request) -> str:
+    ip_address = request.client.host
+    if request.headers.get("X-Forwarded-For"):
+        ip_address = request.headers.get("X-Forwarded-For").split(",")[0].strip()
+    return ip_address
+
+
 @app.post("/api/analytics/track-session")
 async def track_session(
     request: Request,
-    db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
     """Track user session (login/logout)"""
     try:
         data = await request.json()
         action = data.get("action")
-        duration_seconds = data.get("duration_seconds")
-
-        # Get IP address
-        ip_address = request.client.host
-        if request.headers.get("X-Forwarded-For"):
-            ip_address = request.headers.get("X-Forwarded-For").split(",")[0].strip()
-
-        user_agent = request.headers.get("User-Agent", "")
 
         if action == "login":
-            # Create new session
-            session = UserSession(
+            analytics_buffer.record_login(
                 user_email=current_user.get("email"),
                 user_name=current_user.get("name"),
-                login_time=datetime.now(timezone.utc),
-                ip_address=ip_address,
-                user_agent=user_agent,
+                ip_address=_client_ip(request),
+                user_agent=request.headers.get("User-Agent", ""),
+                at=datetime.now(timezone.utc),
             )
-            db.add(session)
-            db.commit()
-            db.refresh(session)
-
-            return JSONResponse({"success": True, "session_id": session.id})
         elif action == "logout":
-            # Find active session (most recent without logout_time)
-            session = (
-                db.query(UserSession)
-                .filter(
-                    UserSession.user_email == current_user.get("email"),
-                    UserSession.logout_time.is_(None),
-                )
-                .order_by(UserSession.login_time.desc())
-                .first()
+            duration_seconds = data.get("duration_seconds")
+            if duration_seconds is not None:
+                try:
+                    duration_seconds = int(duration_seconds)
+                except (TypeError, ValueError):
+                    raise HTTPException(status_code=400, detail="duration_seconds must be an integer")
+            # Closes the most recent open session when the batch is flushed
+            analytics_buffer.record_logout(
+                user_email=current_user.get("email"),
+                duration_seconds=duration_seconds,
+                at=datetime.now(timezone.utc),
             )
-
-            if session:
-                session.logout_time = datetime.now(timezone.utc)
-                if duration_seconds:
-                    session.duration_seconds = duration_seconds
-                else:
-                    # Calculate duration
-                    duration = (
-                        session.logout_time - session.login_time
-                    ).total_seconds()
-                    session.duration_seconds = int(duration)
-                db.commit()
-
-            return JSONResponse({"success": True})
         else:
             raise HTTPException(status_code=400, detail="Invalid action")
 
+        return JSONResponse({"success": True, "queued": True})
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error tracking session: {str(e)}")
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error tracking session: {str(e)}")
 
 
 @app.post("/api/analytics/heartbeat")
 async def analytics_heartbeat(
     request: Request,
-    db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
     """Heartbeat to keep user session active."""
-    try:
-        session = (
-            db.query(UserSession)
-            .filter(
-                UserSession.user_email == current_user.get("email"),
-                UserSession.logout_time.is_(None),
-            )
-            .order_by(UserSession.login_time.desc())
-            .first()
-        )
-
-        # Do not overwrite login_time — it records when the session started.
-        # A heartbeat only confirms the session is still active.
-
-        return JSONResponse({"success": True})
-    except Exception:
-        return JSONResponse({"success": False})
+    # Nothing to record: login_time marks the session start and logout closes
+    # it, so a heartbeat only confirms the user is still authenticated.
+    return JSONResponse({"success": True})
 
 
 @app.post("/api/analytics/track-click")
 async def track_click(
     request: Request,
-    db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
     """Track tool click"""
     try:
         data = await request.json()
 
-        # Get IP address
-        ip_address = request.client.host
-        if request.headers.get("X-Forwarded-For"):
-            ip_address = request.headers.get("X-Forwarded-For").split(",")[0].strip()
-
-        user_agent = request.headers.get("User-Agent", "")
+        # Validated here: events are written later, so a bad one can't fail the request
+        missing = [f for f in ("tool_id", "tool_name", "tool_url") if data.get(f) in (None, "")]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing required field(s): {', '.join(missing)}")
+        try:
+            tool_id = int(data["tool_id"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="tool_id must be an integer")
 
-        click = ToolClick(
+        analytics_buffer.record_click(
             user_email=current_user.get("email"),
             user_name=current_user.get("name"),
-            tool_id=data.get("tool_id"),
-            tool_name=data.get("tool_name"),
-            tool_url=data.get("tool_url"),
-            clicked_at=datetime.now(timezone.utc),
-            ip_address=ip_address,
-            user_agent=user_agent,
+            tool_id=tool_id,
+            tool_name=str(data["tool_name"]),
+            tool_url=str(data["tool_url"]),
+            ip_address=_client_ip(request),
+            user_agent=request.headers.get("User-Agent", ""),
+            at=datetime.now(timezone.utc),
         )
 
-        db.add(click)
-        db.commit()
-
-        return JSONResponse({"success": True})
+        return JSONResponse({"success": True, "queued": True})
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error tracking click: {str(e)}")
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error tracking click: {str(e)}")
 
 
@@ -4032,14 +4084,8 @@ async def get_analytics_summary(
 ):
     """Get analytics summary"""
     try:
-        from sqlalchemy import distinct, func
-
-        # Get summary stats
-        total_sessions = db.query(func.count(UserSession.id)).scalar() or 0
-        total_clicks = db.query(func.count(ToolClick.id)).scalar() or 0
-        active_users = (
-            db.query(func.count(distinct(UserSession.user_email))).scalar() or 0
-        )
+        # Totals come from the daily rollups instead of counting the event tables
+        summary = usage_totals(db)
 
         # Get recent sessions (last 50)
         sessions = (
@@ -4057,11 +4103,7 @@ async def get_analytics_summary(
         return JSONResponse(
             {
                 "success": True,
-                "summary": {
-                    "total_sessions": total_sessions,
-                    "total_clicks": total_clicks,
-                    "active_users": active_users,
-                },
+                "summary": summary,
                 "sessions": [session.to_dict() for session in sessions],
                 "clicks": [click.to_dict() for click in clicks],
             }
@@ -4074,6 +4116,35 @@ async def get_analytics_summary(
         )
 
 
+@app.get("/api/analytics/trends")
+async def get_analytics_trends(
+    granularity: str = "day",
+    days: int = 30,
+    tool_id: Optional[int] = None,
+    user_email: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """Usage over time (hourly or daily) from the rollup table"""
+    if granularity not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    days = max(1, min(days, 7 if granularity == "hour" else 400))
+    try:
+        trends = usage_trends(
+            db,
+            granularity=granularity,
+            since=datetime.now(timezone.utc) - timedelta(days=days),
+            tool_id=tool_id,
+            user_email=user_email,
+        )
+        return JSONResponse({"success": True, **trends})
+    except Exception as e:
+        logger.error(f"Error getting analytics trends: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error getting analytics trends: {str(e)}"
+        )
+
+
 # Voucher Management Routes
 @app.get("/vouchers", response_class=HTMLResponse)
 async def voucher_list_page(
@@ -4595,7 +4666,7 @@ async def api_fax_retry_wellsky(
     try:
         from services.fax_service import retry_wellsky_uploads
 
-        result = retry_wellsky_uploads()
+        result = await asyncio.to_thread(retry_wellsky_uploads)
         return JSONResponse(result)
     except Exception as e:
         logger.error(f"WellSky retry error: {e}")
@@ -7261,6 +7332,72 @@ async def api_marketing_social(
     )
 
 
+@app.get("/api/marketing/history")
+async def api_marketing_history(
+    source: str = Query(...),
+    metrics: Optional[str] = Query(None),
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    compare: Optional[str] = Query(None),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Totals and daily series for one marketing source from the daily metrics
+    warehouse (no third-party API calls). Supports long ranges, e.g. 12 months.
+    """
+    from services.marketing.metrics_warehouse import SOURCES, metrics_warehouse
+
+    if source not in SOURCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown source. Expected one of: {', '.join(SOURCES)}",
+        )
+    if not metrics_warehouse.enabled:
+        raise HTTPException(status_code=503, detail="Metrics warehouse not configured")
+
+    end_default = datetime.now(timezone.utc).date()
+    start_default = end_default - timedelta(days=364)
+
+    start = _parse_date_param(from_date, start_default)
+    end = _parse_date_param(to_date, end_default)
+
+    if start > end:
+        raise HTTPException(
+            status_code=400, detail="'from' date must be before 'to' date."
+        )
+
+    metric_list = [m.strip() for m in metrics.split(",") if m.strip()] if metrics else None
+
+    def _query():
+        result = metrics_warehouse.compare(source, start, end, metric_list)
+        return {
+            "totals": result["current"],
+            "comparison": (
+                {"previous": result["previous"], "change_pct": result["change_pct"]}
+                if compare == "previous_period"
+                else None
+            ),
+            "daily": metrics_warehouse.daily(source, start, end, metric_list),
+            "coverage": round(metrics_warehouse.coverage(source, start, end), 3),
+        }
+
+    data = await asyncio.to_thread(_query)
+
+    return JSONResponse(
+        {
+            "success": True,
+            "source": source,
+            "range": {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "days": (end - start).days + 1,
+            },
+            "compare": compare,
+            "data": data,
+        }
+    )
+
+
 @app.post("/api/marketing/google-ads/webhook")
 @limiter.limit("30/minute")  # Rate limit webhooks
 async def google_ads_webhook(request: Request):
@@ -7796,6 +7933,7 @@ async def api_marketing_engagement(
     """
     import logging
 
+    from services.marketing.aggregation import fetch_sources
     from services.marketing.ga4_service import ga4_service
     from services.marketing.gbp_service import gbp_service
     from services.marketing.linkedin_service import linkedin_service
@@ -7816,30 +7954,30 @@ async def api_marketing_engagement(
 
     days = (end - start).days + 1
 
-    # Fetch data from all sources
-    try:
-        # GA4 data for traffic sources
-        ga4_data = ga4_service.get_website_metrics(start, end)
-
-        # Get social metrics
-        social_data = get_social_metrics(start, end, None)
-
-        # Get ads metrics
-        ads_data = get_ads_metrics(start, end, None)
-
-        # GBP for calls/directions
-        gbp_data = gbp_service.get_gbp_metrics(start, end)
-
-        # Pinterest metrics
-        pinterest_data = pinterest_service.get_user_metrics(start, end)
-
-        # LinkedIn metrics
-        linkedin_data = linkedin_service.get_metrics(start, end)
-
-    except Exception as e:
-        logger.error(f"Error fetching engagement data: {e}")
+    # Fetch every source concurrently; a slow or failing source degrades to
+    # its last good data (or nothing) instead of failing the whole response
+    source_data, source_status = await fetch_sources(
+        {
+            "ga4": lambda: ga4_service.get_website_metrics(start, end),
+            "social": lambda: get_social_metrics(start, end, None),
+            "ads": lambda: get_ads_metrics(start, end, None),
+            "gbp": lambda: gbp_service.get_gbp_metrics(start, end),
+            "pinterest": lambda: pinterest_service.get_user_metrics(start, end),
+            "linkedin": lambda: linkedin_service.get_metrics(start, end),
+        },
+        key=(start, end),
+    )
+    if not any(source_data.values()):
+        logger.error(f"Error fetching engagement data: {source_status}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    ga4_data = source_data["ga4"]
+    social_data = source_data["social"]
+    ads_data = source_data["ads"]
+    gbp_data = source_data["gbp"]
+    pinterest_data = source_data["pinterest"]
+    linkedin_data = source_data["linkedin"]
+
     # Build attribution breakdown - where are engagements coming from?
     attribution = {"by_source": [], "by_type": []}
 
@@ -8079,6 +8217,15 @@ async def api_marketing_engagement(
                 if "Google Ads" in placeholder_sources
                 else None,
             },
+            "source_status": source_status,
+            "stale_sources": [
+                name for name, info in source_status.items() if info["status"] == "stale"
+            ],
+            "failed_sources": [
+                name
+                for name, info in source_status.items()
+                if info["status"] in ("failed", "timeout")
+            ],
         }
     )
 
@@ -9746,30 +9893,13 @@ async def internal_process_sms_response(request: Request):
             f"[GIGI] Processing SMS response from {phone_number}: {message_text[:50]}"
         )
 
-        # Clean phone number for matching
-        import re
-
-        clean_phone = re.sub(r"[^\d]", "", phone_number)[-10:]
-
-        # Find the campaign this phone belongs to
+        # Find the open campaign this phone belongs to (phone -> outreach index)
         found_campaign = None
         found_outreach = None
 
-        for campaign_id, campaign in shift_filling_engine.active_campaigns.items():
-            # Check if campaign is still active
-            if campaign.status.value not in ["in_progress", "pending"]:
-                continue
-
-            # Check each caregiver contacted
-            for outreach in campaign.caregivers_contacted:
-                outreach_phone = re.sub(r"[^\d]", "", outreach.phone)[-10:]
-                if outreach_phone == clean_phone:
-                    found_campaign = campaign
-                    found_outreach = outreach
-                    break
-
-            if found_campaign:
-                break
+        match = shift_filling_engine.find_outreach_by_phone(phone_number)
+        if match:
+            found_campaign, found_outreach = match
 
         if not found_campaign:
             logger.info(f"No active shift offer found for {phone_number}")
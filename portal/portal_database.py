@@ -2,6 +2,7 @@ import logging
 import os
 
 from portal_models import Base
+from service_metrics import timed_pool_class
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -47,6 +48,7 @@ class DatabaseManager:
             else:
                 self.engine = create_engine(
                     database_url,
+                    poolclass=timed_pool_class("portal"),
                     pool_size=10,
                     max_overflow=20,
                     pool_recycle=3600,
@@ -12,6 +12,7 @@ from sqlalchemy import (
     Numeric,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -113,9 +114,61 @@ class ToolClick(Base):
             "ip_address": self.ip_address
         }
 
+class DriveSyncState(Base):
+    """Persisted Drive changes-feed page token per sync job"""
+    __tablename__ = "drive_sync_state"
+
+    sync_key = Column(String(255), primary_key=True)
+    page_token = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DriveSyncRetry(Base):
+    """Drive files a sync job failed to process, retried on its next run"""
+    __tablename__ = "drive_sync_retries"
+
+    sync_key = Column(String(255), primary_key=True)
+    file_id = Column(String(255), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=1)
+    last_error = Column(Text, nullable=True)
+    dead_at = Column(DateTime, nullable=True)  # Gave up after too many attempts
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UsageRollup(Base):
+    """Hourly/daily usage counters per user and tool (sessions use tool_id 0)"""
+    __tablename__ = "usage_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "period_start", "user_email", "tool_id", name="uq_usage_rollup_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10), nullable=False)  # hour, day
+    period_start = Column(DateTime, nullable=False, index=True)
+    user_email = Column(String(255), nullable=False, index=True)
+    tool_id = Column(Integer, nullable=False, default=0, index=True)
+    tool_name = Column(String(255), nullable=True)
+    clicks = Column(Integer, nullable=False, default=0)
+    sessions = Column(Integer, nullable=False, default=0)
+    session_seconds = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "granularity": self.granularity,
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "user_email": self.user_email,
+            "tool_id": self.tool_id,
+            "tool_name": self.tool_name,
+            "clicks": self.clicks,
+            "sessions": self.sessions,
+            "session_seconds": self.session_seconds,
+        }
+
 class Voucher(Base):
     """AAA Voucher tracking and reconciliation"""
     __tablename__ = "vouchers"
+    __table_args__ = (
+        # Idempotency key for the Drive sync: one voucher per file revision
+        UniqueConstraint("drive_file_id", "content_hash", name="uq_voucher_drive_file_content"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_name = Column(String(255), nullable=False, index=True)
@@ -131,6 +184,8 @@ class Voucher(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(String(255), nullable=True)
     updated_by = Column(String(255), nullable=True)
+    drive_file_id = Column(String(255), nullable=True, index=True)  # Set by the Drive sync
+    content_hash = Column(String(64), nullable=True)  # MD5 of the imported file
 
     def to_dict(self):
         return {
@@ -1,5 +1,3 @@
-import csv
-import io
 import os
 import secrets
 import threading
@@ -20,7 +18,31 @@ from flask import Flask, jsonify, redirect, request, session
 from flask_cors import CORS
 from flask_login import LoginManager, UserMixin
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, joinedload, load_only, object_session
+
+from facebook_lead_sync import (
+    GraphClient,
+    discover_page_ids,
+    fetch_new_leads,
+    list_lead_forms,
+    normalize_email,
+    normalize_phone,
+    parse_lead,
+    plan_ingest,
+)
+from lead_csv_import import import_leads_files
+from lead_listing import (
+    APPLICANT_FIELDS,
+    LEAD_FIELDS,
+    columns_for,
+    keyset_page,
+    page_size,
+    parse_cursor,
+    parse_fields,
+    serialize_lead,
+)
+from lead_metrics import MetricsCache, summarize, wants_work, wants_work_sql
 
 load_dotenv()
 
@@ -83,6 +105,8 @@ FACEBOOK_APP_ID = os.getenv('FACEBOOK_APP_ID', '1826010391596353')
 FACEBOOK_APP_SECRET = os.getenv('FACEBOOK_APP_SECRET')
 FACEBOOK_ACCESS_TOKEN = os.getenv('FACEBOOK_ACCESS_TOKEN')
 FACEBOOK_AD_ACCOUNT_ID = os.getenv('FACEBOOK_AD_ACCOUNT_ID', '2228418524061660')
+# Pages whose lead forms we ingest (comma-separated); discovered from the ad account if unset
+FACEBOOK_PAGE_IDS = [p.strip() for p in os.getenv('FACEBOOK_PAGE_IDS', '').split(',') if p.strip()]
 
 # Initialize Facebook API
 FacebookAdsApi.init(FACEBOOK_APP_ID, FACEBOOK_APP_SECRET, FACEBOOK_ACCESS_TOKEN)
@@ -95,6 +119,11 @@ if os.getenv('DATABASE_URL'):
     elif db_url.startswith("postgresql://"):
         db_url = db_url.replace("postgresql://", "postgresql+psycopg2://", 1)
     app.config['SQLALCHEMY_DATABASE_URI'] = db_url
+    try:
+        from service_metrics import timed_pool_class
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': timed_pool_class('recruiting')}
+    except ImportError:  # recruiting/ run on its own, without the repo root on sys.path
+        pass
 else:
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///leads.db'
 
@@ -170,6 +199,34 @@ class Lead(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     source = db.Column(db.String(50), default='manual')
     facebook_lead_id = db.Column(db.String(64), unique=True, index=True)
+    # Derived from notes on write (lead_metrics.wants_work), counted by /api/stats
+    wants_work = db.Column(db.Boolean, default=False, index=True)
+
+@event.listens_for(Lead, 'before_insert')
+@event.listens_for(Lead, 'before_update')
+def _derive_lead_flags(mapper, connection, lead):
+    lead.wants_work = wants_work(lead.notes)
+
+@event.listens_for(Lead, 'after_insert')
+@event.listens_for(Lead, 'after_update')
+@event.listens_for(Lead, 'after_delete')
+def _lead_changed(mapper, connection, lead):
+    _mark_leads_changed(object_session(lead))
+
+def _mark_leads_changed(session=None):
+    """Drop cached dashboard metrics once the session commits."""
+    (session or db.session).info['leads_changed'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_lead_metrics(session):
+    if session.info.pop('leads_changed', False):
+        lead_metrics_cache.invalidate()
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_lead_changes(session):
+    session.info.pop('leads_changed', None)
+
+lead_metrics_cache = MetricsCache()
 
 class Activity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -195,6 +252,15 @@ class FacebookCampaign(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class FacebookLeadForm(db.Model):
+    """Per-form ingestion cursor: only leads newer than `since` are requested."""
+    form_id = db.Column(db.String(64), primary_key=True)
+    page_id = db.Column(db.String(64))
+    name = db.Column(db.String(200))
+    status = db.Column(db.String(20))
+    since = db.Column(db.Integer, default=0)  # Unix seconds of the newest ingested lead
+    last_synced_at = db.Column(db.DateTime)
+
 class AdMetrics(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     campaign_id = db.Column(db.String(50), nullable=False)
@@ -240,6 +306,35 @@ def create_tables():
     except Exception as e:
         print(f"Column facebook_lead_id migration note: {e}")
 
+    # Normalized email/phone/name indexes for set-based lead dedupe
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS lead_email_normalized_idx ON lead (LOWER(TRIM(email)))"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS lead_phone_normalized_idx "
+                "ON lead (RIGHT(REGEXP_REPLACE(phone, '[^0-9]', '', 'g'), 10))"
+            ))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS lead_name_lower_idx ON lead (LOWER(name))"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS lead_name_normalized_idx ON lead (LOWER(TRIM(name)))"))
+            conn.commit()
+        print("Ensured normalized lead indexes exist")
+    except Exception as e:
+        print(f"Normalized lead index migration note: {e}")
+
+    # Add wants_work flag and classify existing notes once
+    try:
+        with db.engine.connect() as conn:
+            # Added without a default so existing (and raw-SQL inserted) rows stay NULL until classified
+            conn.execute(text("ALTER TABLE lead ADD COLUMN IF NOT EXISTS wants_work BOOLEAN"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_lead_wants_work ON lead (wants_work)"))
+            conn.execute(text(
+                f"UPDATE lead SET wants_work = COALESCE({wants_work_sql()}, FALSE) WHERE wants_work IS NULL"
+            ))
+            conn.commit()
+        print("Ensured wants_work column exists on lead table")
+    except Exception as e:
+        print(f"Column wants_work migration note: {e}")
+
     # Add default users if they don't exist
     if User.query.count() == 0:
         default_users = [
@@ -2355,96 +2450,82 @@ def logout():
     # No auth required - just redirect to home
     return redirect('/')
 
+def compute_lead_metrics(today_start):
+    """All dashboard counts in one pass: leads grouped by status with conditional sums."""
+    rows = db.session.query(
+        Lead.status,
+        db.func.count(Lead.id),
+        db.func.sum(db.case((Lead.created_at >= today_start, 1), else_=0)),
+        db.func.sum(db.case((Lead.wants_work.is_(True), 1), else_=0)),
+    ).group_by(Lead.status).all()
+    return summarize(rows)
+
+def get_lead_metrics():
+    # New leads = leads added since today (baseline reset)
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return lead_metrics_cache.get(today_start, lambda: compute_lead_metrics(today_start))
+
 @app.route('/api/stats')
 @require_auth
 def get_stats():
-    total_leads = Lead.query.count()
+    return jsonify(get_lead_metrics()['stats'])
 
-    # New leads = leads added since today (baseline reset)
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    new_leads = Lead.query.filter(Lead.created_at >= today_start).count()
-
-    contacted_leads = Lead.query.filter_by(status='contacted').count()
-
-    # Calculate "Wants Work" - leads with positive indicators in notes
-    wants_work_query = Lead.query.filter(
-        db.or_(
-            Lead.notes.contains('sent application'),
-            Lead.notes.contains('FT'),
-            Lead.notes.contains('PT'),
-            Lead.notes.contains('CNA'),
-            Lead.notes.contains('QMAP'),
-            Lead.notes.contains('full time'),
-            Lead.notes.contains('part time')
-        )
-    )
-    wants_work_leads = wants_work_query.count()
+def list_leads(query, allowed_fields, key):
+    """
+    Serialize a page of leads for the list endpoints.
 
-    # Current Caregivers - leads marked as hired (still employed)
-    current_caregivers = Lead.query.filter_by(status='hired').count()
+    Assignees are joined into the same query, only the requested columns are
+    loaded, and cursor= switches from offset paging (with totals) to keyset
+    paging on id (no COUNT). See lead_listing for the parameters.
+    """
+    fields = parse_fields(request.args.get('fields'), allowed_fields)
+    options = [load_only(*[getattr(Lead, c) for c in columns_for(fields)])]
+    if 'assigned_to' in fields:
+        options.append(joinedload(Lead.assigned_user).load_only(User.name))
+    query = query.options(*options).order_by(Lead.id.desc())
 
+    if 'cursor' in request.args:
+        try:
+            cursor = parse_cursor(request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        limit = page_size(request.args.get('per_page', type=int))
+        if cursor:
+            query = query.filter(Lead.id < cursor)
+        leads, next_cursor = keyset_page(query.limit(limit + 1).all(), limit)
+        return jsonify({
+            key: [serialize_lead(lead, fields) for lead in leads],
+            'next_cursor': next_cursor,
+        })
+
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    leads = query.paginate(page=page, per_page=per_page, error_out=False)
     return jsonify({
-        'total_leads': total_leads,
-        'new_leads': new_leads,
-        'contacted_leads': contacted_leads,
-        'wants_work_leads': wants_work_leads,
-        'current_caregivers': current_caregivers
+        key: [serialize_lead(lead, fields) for lead in leads.items],
+        'total': leads.total,
+        'pages': leads.pages,
+        'current_page': leads.page
     })
 
 @app.route('/api/applicants')
 @require_auth
 def get_applicants():
     """Alias for /api/leads — returns paginated applicant/lead list."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
     status_filter = request.args.get('status')
 
     query = Lead.query
     if status_filter:
         query = query.filter(Lead.status == status_filter)
 
-    leads = query.order_by(Lead.id.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-
-    return jsonify({
-        'applicants': [{
-            'id': lead.id,
-            'name': lead.name,
-            'email': lead.email,
-            'phone': lead.phone,
-            'notes': lead.notes,
-            'status': lead.status,
-            'priority': lead.priority,
-            'assigned_to': lead.assigned_user.name if lead.assigned_user else None,
-            'created_at': lead.created_at.isoformat(),
-            'updated_at': lead.updated_at.isoformat()
-        } for lead in leads.items],
-        'total': leads.total,
-        'pages': leads.pages,
-        'current_page': leads.page
-    })
+    return list_leads(query, APPLICANT_FIELDS, 'applicants')
 
 
 @app.route('/api/pipeline')
 @require_auth
 def get_pipeline():
     """Pipeline breakdown — count of leads by status stage."""
-    stages = [
-        ('new', 'New'),
-        ('contacted', 'Contacted'),
-        ('interested', 'Interested'),
-        ('sent_to_ep', 'Sent to EP'),
-        ('hired', 'Hired'),
-        ('not_interested', 'Not Interested'),
-    ]
-    pipeline = []
-    for value, label in stages:
-        count = Lead.query.filter_by(status=value).count()
-        pipeline.append({'stage': value, 'label': label, 'count': count})
-
-    total = Lead.query.count()
-    return jsonify({'pipeline': pipeline, 'total': total})
+    return jsonify(get_lead_metrics()['pipeline'])
 
 
 @app.route('/health')
@@ -2680,151 +2761,141 @@ def fetch_facebook_leads():
         return 0
 
 def fetch_facebook_leads_enhanced():
-    """Enhanced Facebook lead fetching with better error handling and filtering"""
-    try:
-        account = AdAccount(f'act_{FACEBOOK_AD_ACCOUNT_ID}')
-        leads_added = 0
-
-        # Get campaigns with lead generation objectives
-        campaigns = account.get_campaigns(fields=['id', 'name', 'status', 'objective'])
-        print(f"Found {len(campaigns)} total campaigns")
-
-        for campaign in campaigns:
-            print(f"Campaign: {campaign['name']} ({campaign['id']}) - Status: {campaign['status']} - Objective: {campaign.get('objective', 'Unknown')}")
-
-            # Process all campaigns with lead generation objectives (including PAUSED/ARCHIVED)
-            # so historical leads from inactive campaigns are also imported
-            if campaign.get('objective') in ['LEAD_GENERATION', 'MESSAGES']:
-                print(f"Processing lead generation campaign: {campaign['name']} (status: {campaign['status']})")
-
-                # Get ad sets for this campaign
-                ad_sets = Campaign(campaign['id']).get_ad_sets(fields=['id', 'name'])
-                print(f"Found {len(ad_sets)} ad sets in campaign {campaign['name']}")
-
-                for ad_set in ad_sets:
-                    print(f"Processing ad set: {ad_set['name']} ({ad_set['id']})")
-                    # Get ads for this ad set
-                    ads = AdSet(ad_set['id']).get_ads(fields=['id', 'name'])
-                    print(f"Found {len(ads)} ads in ad set {ad_set['name']}")
-
-                    for ad in ads:
-                        print(f"Processing ad: {ad['name']} ({ad['id']})")
-                        try:
-                            # Get leads for this ad with enhanced fields
-                            leads = Ad(ad['id']).get_leads(fields=[
-                                'id',
-                                'created_time',
-                                'field_data',
-                                'ad_id',
-                                'adset_id',
-                                'campaign_id'
-                            ])
-                            print(f"Found {len(leads)} leads in ad {ad['name']}")
+    """
+    Pull new Facebook leads form-by-form since each form's cursor.
 
-                            for lead in leads:
-                                # Process each lead with enhanced data
-                                if process_facebook_lead_enhanced(lead, campaign['name'], ad['name']):
-                                    leads_added += 1
-                        except Exception as ad_error:
-                            print(f"Error getting leads from ad {ad['id']}: {ad_error}")
+    Lists every lead form on our Pages and asks each only for leads created
+    after its cursor, in Graph API batch requests, then dedupes and inserts
+    them in bulk (see ingest_facebook_leads).
+    """
+    try:
+        client = GraphClient(FACEBOOK_ACCESS_TOKEN)
+        page_ids = FACEBOOK_PAGE_IDS or discover_page_ids(client, FACEBOOK_AD_ACCOUNT_ID)
+        forms = list_lead_forms(client, page_ids)
+        print(f"Found {len(forms)} lead forms on {len(page_ids)} pages")
+
+        known = {f.form_id: f for f in FacebookLeadForm.query.all()}
+        cursors = {form_id: f.since or 0 for form_id, f in known.items()}
+        raw_leads, new_cursors = fetch_new_leads(client, forms, cursors)
+        print(f"Fetched {len(raw_leads)} leads newer than their form cursors")
+
+        leads_added = ingest_facebook_leads(raw_leads)
+
+        # Advance cursors only after the leads are committed
+        now = datetime.utcnow()
+        for form in forms:
+            row = known.get(form['id'])
+            if row is None:
+                row = FacebookLeadForm(form_id=form['id'])
+                db.session.add(row)
+            row.page_id = form.get('page_id')
+            row.name = (form.get('name') or '')[:200]
+            row.status = form.get('status')
+            row.since = new_cursors.get(form['id'], row.since or 0)
+            row.last_synced_at = now
+        db.session.commit()
 
         print(f"Successfully added {leads_added} new leads from Facebook")
         return leads_added
 
     except Exception as e:
+        db.session.rollback()
         print(f"Error fetching Facebook leads: {e}")
         return 0
 
-def process_facebook_lead_enhanced(lead_data, campaign_name, ad_name):
-    """Enhanced processing of a single Facebook lead with better data extraction"""
-    try:
-        facebook_lead_id = lead_data.get('id')
-
-        if facebook_lead_id:
-            existing_by_fb = Lead.query.filter_by(facebook_lead_id=facebook_lead_id).first()
-            if existing_by_fb:
-                print(f"Lead {facebook_lead_id} already ingested — skipping")
-                return False
-
-        # Extract lead information from field_data
-        field_data = lead_data.get('field_data', [])
-        lead_info = {}
-
-        for field in field_data:
-            field_name = field.get('name', '').lower()
-            field_value = field.get('values', [''])[0] if field.get('values') else ''
-
-            if 'full_name' in field_name or 'name' in field_name:
-                lead_info['name'] = field_value
-            elif 'email' in field_name:
-                lead_info['email'] = field_value
-            elif 'phone' in field_name or 'phone_number' in field_name:
-                lead_info['phone'] = field_value
-            elif 'message' in field_name or 'notes' in field_name or 'comments' in field_name:
-                lead_info['notes'] = field_value
-            elif 'job_title' in field_name or 'position' in field_name:
-                lead_info['job_title'] = field_value
-            elif 'company' in field_name:
-                lead_info['company'] = field_value
-
-        # Get lead creation time
-        created_time = lead_data.get('created_time', '')
-        if created_time:
-            try:
-                # Parse Facebook timestamp
-                from datetime import datetime
-                lead_date = datetime.strptime(created_time, '%Y-%m-%dT%H:%M:%S%z')
-                lead_info['created_time'] = lead_date
-            except:
-                lead_info['created_time'] = datetime.utcnow()
-        else:
-            lead_info['created_time'] = datetime.utcnow()
-
-        # Check if lead already exists (by email, phone, or name)
-        existing_lead = None
-        if lead_info.get('email'):
-            existing_lead = Lead.query.filter_by(email=lead_info['email']).first()
-        elif lead_info.get('phone'):
-            existing_lead = Lead.query.filter_by(phone=lead_info['phone']).first()
-        elif lead_info.get('name'):
-            existing_lead = Lead.query.filter(
-                db.func.lower(Lead.name) == lead_info['name'].lower()
-            ).first()
+def _lead_phone_key():
+    """SQL expression matching normalize_phone (and lead_phone_normalized_idx)."""
+    if db.engine.dialect.name == 'postgresql':
+        return db.func.right(db.func.regexp_replace(Lead.phone, '[^0-9]', '', 'g'), 10)
+    return Lead.phone  # SQLite dev database: exact match only
 
-        if existing_lead:
-            # Backfill facebook id/source if we just matched on email/phone/name
-            if facebook_lead_id and not existing_lead.facebook_lead_id:
-                existing_lead.facebook_lead_id = facebook_lead_id
-                if existing_lead.source == 'manual':
-                    existing_lead.source = 'facebook'
-                db.session.commit()
-            print(f"Lead already exists: {lead_info.get('name', 'Unknown')}")
-            return False
-
-        # Don't add campaign info to notes - notes should be blank for new leads
-        # Only include actual message/notes from the lead if they provided one
-        notes = lead_info.get('notes', '') if lead_info.get('notes') else ''
+def _lead_name_key():
+    """SQL expression matching the name.strip().lower() dedupe key (lead_name_normalized_idx)."""
+    return db.func.lower(db.func.trim(Lead.name))
 
-        # Create new lead
-        new_lead = Lead(
-            name=lead_info.get('name', 'Facebook Lead'),
-            email=lead_info.get('email', ''),
-            phone=lead_info.get('phone', ''),
-            notes=notes,
-            status='new',
-            priority='medium',
-            created_at=lead_info['created_time'],
-            source='facebook',
-            facebook_lead_id=facebook_lead_id
-        )
+def ingest_facebook_leads(raw_leads):
+    """
+    Dedupe and insert a batch of Graph API leads. Returns the number added.
 
-        db.session.add(new_lead)
-        db.session.commit()
+    Existing leads are found in one query over facebook_lead_id and the
+    normalized email/phone/name indexes; new leads are written in one bulk
+    insert, and matched manual leads get their facebook id backfilled.
+    """
+    if not raw_leads:
+        return 0
 
-        print(f"Added new Facebook lead: {new_lead.name} from {campaign_name}")
-        return True
+    parsed = [parse_lead(lead) for lead in raw_leads]
+    fb_ids = {p['facebook_lead_id'] for p in parsed if p.get('facebook_lead_id')}
+    emails = {normalize_email(p.get('email')) for p in parsed} - {''}
+    phones = {normalize_phone(p.get('phone')) for p in parsed} - {''}
+    names = {(p.get('name') or '').strip().lower() for p in parsed
+             if not p.get('email') and not p.get('phone')} - {''}
+
+    conditions = []
+    if fb_ids:
+        conditions.append(Lead.facebook_lead_id.in_(fb_ids))
+    if emails:
+        conditions.append(db.func.lower(db.func.trim(Lead.email)).in_(emails))
+    if phones:
+        conditions.append(_lead_phone_key().in_(phones))
+    if names:
+        conditions.append(_lead_name_key().in_(names))
+
+    existing = []
+    if conditions:
+        rows = db.session.query(
+            Lead.id, Lead.facebook_lead_id, Lead.email, Lead.phone, Lead.name
+        ).filter(db.or_(*conditions)).all()
+        existing = [
+            {'id': r.id, 'facebook_lead_id': r.facebook_lead_id, 'email': r.email, 'phone': r.phone, 'name': r.name}
+            for r in rows
+        ]
+
+    new_leads, backfills = plan_ingest(parsed, existing)
+
+    if new_leads:
+        now = datetime.utcnow()
+        db.session.bulk_insert_mappings(Lead, [
+            {
+                'name': lead.get('name') or 'Facebook Lead',
+                'email': lead.get('email', ''),
+                'phone': lead.get('phone', ''),
+                # Notes stay blank unless the lead wrote a message
+                'notes': lead.get('notes') or '',
+                'status': 'new',
+                'priority': 'medium',
+                'created_at': lead.get('created_time') or now,
+                'updated_at': now,
+                'source': 'facebook',
+                'facebook_lead_id': lead.get('facebook_lead_id'),
+                'wants_work': wants_work(lead.get('notes')),
+            }
+            for lead in new_leads
+        ])
+        _mark_leads_changed()
+
+    if backfills:
+        fb_by_id = dict(backfills)
+        for lead in Lead.query.filter(Lead.id.in_(fb_by_id)).all():
+            if not lead.facebook_lead_id:
+                lead.facebook_lead_id = fb_by_id[lead.id]
+                if lead.source == 'manual':
+                    lead.source = 'facebook'
+
+    db.session.commit()
+    for lead in new_leads:
+        print(f"Added new Facebook lead: {lead.get('name') or 'Facebook Lead'} from {lead.get('campaign_name') or 'unknown campaign'}")
+    return len(new_leads)
 
+def process_facebook_lead_enhanced(lead_data, campaign_name, ad_name):
+    """Ingest a single Facebook lead (kept for the date-range backfill script)."""
+    try:
+        lead_data = dict(lead_data)
+        lead_data.setdefault('campaign_name', campaign_name)
+        lead_data.setdefault('ad_name', ad_name)
+        return ingest_facebook_leads([lead_data]) > 0
     except Exception as e:
+        db.session.rollback()
         print(f"Error processing Facebook lead: {e}")
         return False
 
@@ -3260,8 +3331,6 @@ def create_lead():
 @app.route('/api/leads')
 @require_auth
 def get_leads():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
     status_filter = request.args.get('status')
     assigned_filter = request.args.get('assigned_to')
 
@@ -3272,28 +3341,7 @@ def get_leads():
     if assigned_filter:
         query = query.filter(Lead.assigned_to == assigned_filter)
 
-    leads = query.order_by(Lead.id.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-
-    return jsonify({
-        'leads': [{
-            'id': lead.id,
-            'name': lead.name,
-            'email': lead.email,
-            'phone': lead.phone,
-            'notes': lead.notes,
-            'status': lead.status,
-            'priority': lead.priority,
-            'assigned_to': lead.assigned_user.name if lead.assigned_user else None,
-            'assigned_to_id': lead.assigned_to,
-            'created_at': lead.created_at.isoformat(),
-            'updated_at': lead.updated_at.isoformat()
-        } for lead in leads.items],
-        'total': leads.total,
-        'pages': leads.pages,
-        'current_page': leads.page
-    })
+    return list_leads(query, LEAD_FIELDS, 'leads')
 
 @app.route('/api/leads/<int:lead_id>', methods=['PUT'])
 @require_auth
@@ -3617,32 +3665,22 @@ def upload_leads():
     try:
         print(f"Upload received: {file.filename}, content type: {file.content_type}")
 
-        results = None
-
         if file.filename.endswith('.zip'):
-            with zipfile.ZipFile(file, 'r') as zip_file:
-                for filename in zip_file.namelist():
-                    if filename.endswith('.csv'):
-                        csv_bytes = zip_file.read(filename)
-                        csv_content = decode_csv_content(csv_bytes)
-                        results = process_csv_content(csv_content)
-        else:
-            csv_bytes = file.read()
-            csv_content = decode_csv_content(csv_bytes)
-            results = process_csv_content(csv_content)
-
-        # Handle both old format (int) and new format (dict)
-        if isinstance(results, dict):
-            leads_added = results['leads_added']
-            duplicates_skipped = results['duplicates_skipped']
-            empty_rows_skipped = results['empty_rows_skipped']
-            rows_processed = results['rows_processed']
+            with zipfile.ZipFile(file.stream, 'r') as zip_file:
+                csv_names = [n for n in zip_file.namelist() if n.endswith('.csv')]
+                result = import_leads_files(
+                    (zip_file.open(n) for n in csv_names), _find_existing_lead_keys, _bulk_insert_leads
+                )
         else:
-            # Legacy format
-            leads_added = results if results else 0
-            duplicates_skipped = 0
-            empty_rows_skipped = 0
-            rows_processed = 0
+            result = import_leads_files([file.stream], _find_existing_lead_keys, _bulk_insert_leads)
+
+        print(
+            f"CSV Processing Summary: {result.rows_processed} rows processed, {result.leads_added} leads added, "
+            f"{result.duplicates_skipped} duplicates skipped, {result.empty_rows_skipped} empty rows skipped, "
+            f"{result.error_count} errors"
+        )
+        leads_added = result.leads_added
+        duplicates_skipped = result.duplicates_skipped
 
         # Build response message
         if leads_added > 0:
@@ -3654,14 +3692,10 @@ def upload_leads():
         else:
             message = "No leads were added. The file may be empty or in an unrecognized format."
 
-        return jsonify({
-            'success': True,
-            'leads_added': leads_added,
-            'duplicates_skipped': duplicates_skipped,
-            'empty_rows_skipped': empty_rows_skipped,
-            'rows_processed': rows_processed,
-            'message': message
-        })
+        if result.error_count:
+            message += f" {result.error_count} row{'s' if result.error_count != 1 else ''} could not be imported."
+
+        return jsonify({'success': True, 'message': message, **result.to_dict()})
 
     except Exception as e:
         import traceback
@@ -3671,175 +3705,53 @@ def upload_leads():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-def decode_csv_content(csv_bytes):
-    """Try to decode CSV content with different encodings"""
-    encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252', 'iso-8859-1']
-
-    for encoding in encodings:
-        try:
-            # Try to decode with this encoding
-            content = csv_bytes.decode(encoding)
-            # If successful, return the content
-            return content
-        except UnicodeDecodeError:
-            continue
+def _find_existing_lead_keys(emails, phones, names):
+    """Which of these normalized keys already belong to a lead (one indexed query)."""
+    email_key = db.func.lower(db.func.trim(Lead.email))
+    phone_key = _lead_phone_key()
+    name_key = _lead_name_key()
+
+    conditions = []
+    if emails:
+        conditions.append(email_key.in_(emails))
+    if phones:
+        conditions.append(phone_key.in_(phones))
+    if names:
+        conditions.append(name_key.in_(names))
+    if not conditions:
+        return set(), set(), set()
+
+    rows = db.session.query(email_key, phone_key, name_key).filter(db.or_(*conditions)).all()
+    return (
+        {r[0] for r in rows} & emails,
+        {normalize_phone(r[1]) for r in rows} & phones,
+        {r[2] for r in rows} & names,
+    )
 
-    # If all encodings fail, try with error handling
+def _bulk_insert_leads(rows):
+    """Insert one chunk of imported leads (new, unowned, never contacted)."""
+    now = datetime.utcnow()
     try:
-        return csv_bytes.decode('utf-8', errors='replace')
-    except:
-        return csv_bytes.decode('latin-1', errors='replace')
-
-def process_csv_content(csv_content):
-    leads_added = 0
-    rows_processed = 0
-    duplicates_skipped = 0
-    empty_rows_skipped = 0
-
-    # Try to detect delimiter
-    sample = csv_content[:1024]
-    delimiter = '\t' if '\t' in sample else ','
-
-    print(f"CSV Processing: Using delimiter '{delimiter}'")
-
-    reader = csv.DictReader(io.StringIO(csv_content), delimiter=delimiter)
-
-    # Debug: Print column names (only once)
-    fieldnames_lower = {}
-    if reader.fieldnames:
-        print(f"CSV Columns found: {list(reader.fieldnames)}")
-        # Create lowercase mapping for case-insensitive lookup
-        fieldnames_lower = {k.lower().strip('"').strip("'"): k for k in reader.fieldnames}
-
-    for row in reader:
-        rows_processed += 1
-
-        # Handle different CSV formats
-        name = None
-        email = None
-        phone = None
-        created_date_str = None
-        notes_parts = []
-
-        # Format 1: Facebook Lead Ads export (tab-delimited with "full name", "created_time", etc.)
-        # Check for the presence of key columns that indicate this format
-        has_full_name = 'full name' in fieldnames_lower or any('full name' in k.lower() for k in (reader.fieldnames or []))
-        has_created_time = 'created_time' in fieldnames_lower or any('created_time' in k.lower() for k in (reader.fieldnames or []))
-
-        if has_full_name or has_created_time:
-            # Get the actual column key (handles quoted headers)
-            full_name_key = fieldnames_lower.get('full name') or next((k for k in row.keys() if 'full name' in k.lower()), None)
-            created_time_key = fieldnames_lower.get('created_time') or next((k for k in row.keys() if 'created_time' in k.lower()), None)
-            email_key = fieldnames_lower.get('email') or 'email'
-            phone_key = fieldnames_lower.get('phone') or 'phone'
-
-            name = row.get(full_name_key, '') if full_name_key else ''
-            email = row.get(email_key, '')
-            phone = row.get(phone_key, '')
-            created_date_str = row.get(created_time_key, '') if created_time_key else ''
-            # Strip quotes and whitespace
-            if name:
-                name = str(name).strip().strip('"').strip("'")
-            if email:
-                email = str(email).strip().strip('"').strip("'")
-            if phone:
-                phone = str(phone).strip().strip('"').strip("'")
-            if created_date_str:
-                created_date_str = str(created_date_str).strip().strip('"').strip("'")
-
-            # Don't add campaign info to notes - notes should be blank for new leads
-
-        # Format 2: Facebook export format (with Created, Name, Email, etc.)
-        elif 'Created' in row and 'Name' in row:
-            name = row.get('Name', '').strip()
-            email = row.get('Email', '').strip()
-            phone = row.get('Phone', '').strip()
-            created_date_str = row.get('Created', '').strip()
-            # Don't add source/channel/form info to notes - notes should be blank for new leads
-
-        # Format 3: Fallback - try generic name/email/phone columns
-        else:
-            name = row.get('Name', row.get('name', row.get('full name', ''))).strip()
-            email = row.get('Email', row.get('email', '')).strip()
-            phone = row.get('Phone', row.get('phone', '')).strip()
-            created_date_str = row.get('Created', row.get('created_time', row.get('created', ''))).strip()
-            # Don't add notes - notes should be blank for new leads
-
-        # Skip empty rows
-        if not name and not email and not phone:
-            empty_rows_skipped += 1
-            continue
-
-        # Clean phone number (remove p: prefix if present)
-        if phone and phone.startswith('p:'):
-            phone = phone[2:].strip()
-
-        # Parse the date
-        date_received = None
-        if created_date_str:
-            try:
-                from datetime import datetime
-                # Try ISO format first (2025-10-02T04:26:32-07:00)
-                if 'T' in created_date_str:
-                    # Remove timezone for parsing
-                    date_str_clean = created_date_str.split('T')[0]
-                    date_received = datetime.strptime(date_str_clean, '%Y-%m-%d')
-                else:
-                    # Try Facebook date format: "10/23/2025 10:34pm"
-                    date_str_clean = created_date_str.replace('pm', '').replace('am', '').strip()
-                    date_received = datetime.strptime(date_str_clean, '%m/%d/%Y %H:%M')
-            except Exception:
-                date_received = None
-
-        # Don't add date or any info to notes - notes should be blank for new leads
-        notes = ""
-
-        # Check if lead already exists (by email, phone, or name)
-        existing_lead = None
-
-        # First check by email (most reliable)
-        if email:
-            existing_lead = Lead.query.filter_by(email=email).first()
-
-        # If no email match, check by phone
-        if not existing_lead and phone:
-            existing_lead = Lead.query.filter_by(phone=phone).first()
-
-        # If still no match, check by name (case-insensitive)
-        if not existing_lead and name:
-            existing_lead = Lead.query.filter(
-                db.func.lower(Lead.name) == name.lower()
-            ).first()
-
-        if existing_lead:
-            duplicates_skipped += 1
-            continue  # Skip duplicate leads
-
-        # Create lead (new leads are never contacted and unowned)
-        lead = Lead(
-            name=name or 'Unknown',
-            email=email or '',
-            phone=phone or '',
-            notes=notes or '',
-            status='new',  # Never contacted
-            priority='medium',
-            # date_received=date_received,  # Will add back after fixing database
-            assigned_to=None  # Unowned/unassigned
-        )
-
-        db.session.add(lead)
-        leads_added += 1
-
-    db.session.commit()
-    print(f"CSV Processing Summary: {rows_processed} rows processed, {leads_added} leads added, {duplicates_skipped} duplicates skipped, {empty_rows_skipped} empty rows skipped")
-
-    # Return detailed results for better user feedback
-    return {
-        'leads_added': leads_added,
-        'duplicates_skipped': duplicates_skipped,
-        'empty_rows_skipped': empty_rows_skipped,
-        'rows_processed': rows_processed
-    }
+        db.session.bulk_insert_mappings(Lead, [
+            {
+                'name': row['name'],
+                'email': row['email'],
+                'phone': row['phone'],
+                'notes': '',
+                'status': 'new',
+                'priority': 'medium',
+                'assigned_to': None,
+                'created_at': now,
+                'updated_at': now,
+                'wants_work': False,
+            }
+            for row in rows
+        ])
+        _mark_leads_changed()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
 @app.route('/api/users')
 @require_auth
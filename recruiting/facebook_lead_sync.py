@@ -0,0 +1,257 @@
+"""
+Facebook Lead Ads ingestion at the lead-form level.
+
+Instead of walking campaigns -> ad sets -> ads -> leads on every run, this
+lists each Page's lead forms and asks every form only for leads created after
+that form's cursor, using Graph API batch requests (up to 50 calls per HTTP
+round trip) and following paging links for large backlogs.
+
+The recruiting app persists the per-form cursors and does the database side
+(dedupe + bulk insert); this module only talks to the Graph API and shapes
+leads, so it has no Flask or SDK dependency.
+"""
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+GRAPH_API_VERSION = "v19.0"
+GRAPH_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+BATCH_LIMIT = 50  # Graph API maximum requests per batch
+LEAD_FIELDS = "id,created_time,field_data,ad_id,ad_name,adset_id,campaign_id,campaign_name,form_id"
+LEADS_PAGE_SIZE = 500
+
+
+class GraphAPIError(Exception):
+    pass
+
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Last 10 digits, so +1 (303) 555-0100 and 3035550100 match."""
+    return re.sub(r"\D", "", phone or "")[-10:]
+
+
+def parse_created_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return None
+
+
+def parse_lead(lead_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pull name/email/phone/notes out of a lead's field_data."""
+    lead_info: Dict[str, Any] = {}
+    for field in lead_data.get("field_data", []) or []:
+        field_name = (field.get("name") or "").lower()
+        values = field.get("values") or [""]
+        field_value = values[0] if values else ""
+
+        if "full_name" in field_name or "name" in field_name:
+            lead_info["name"] = field_value
+        elif "email" in field_name:
+            lead_info["email"] = field_value
+        elif "phone" in field_name:
+            lead_info["phone"] = field_value
+        elif "message" in field_name or "notes" in field_name or "comments" in field_name:
+            lead_info["notes"] = field_value
+        elif "job_title" in field_name or "position" in field_name:
+            lead_info["job_title"] = field_value
+        elif "company" in field_name:
+            lead_info["company"] = field_value
+
+    lead_info["facebook_lead_id"] = lead_data.get("id")
+    lead_info["created_time"] = parse_created_time(lead_data.get("created_time"))
+    lead_info["campaign_name"] = lead_data.get("campaign_name")
+    lead_info["ad_name"] = lead_data.get("ad_name")
+    return lead_info
+
+
+class GraphClient:
+    """Minimal Graph API client: single GETs, batched GETs and paging."""
+
+    def __init__(self, access_token: str, session: Optional[requests.Session] = None, timeout: float = 60.0):
+        self.access_token = access_token
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def get(self, path_or_url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        url = path_or_url if path_or_url.startswith("http") else f"{GRAPH_URL}/{path_or_url.lstrip('/')}"
+        params = dict(params or {})
+        if "access_token=" not in url:
+            params.setdefault("access_token", self.access_token)
+        resp = self.session.get(url, params=params, timeout=self.timeout)
+        body = resp.json()
+        if resp.status_code != 200 or "error" in body:
+            raise GraphAPIError(body.get("error", {}).get("message", f"HTTP {resp.status_code}"))
+        return body
+
+    def batch(self, relative_urls: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        GET many relative URLs in batches of 50. Failed items come back as None
+        (and are logged) so one bad form doesn't sink the run.
+        """
+        results: List[Optional[Dict[str, Any]]] = []
+        for start in range(0, len(relative_urls), BATCH_LIMIT):
+            chunk = relative_urls[start:start + BATCH_LIMIT]
+            resp = self.session.post(
+                GRAPH_URL,
+                data={
+                    "access_token": self.access_token,
+                    "batch": json.dumps([{"method": "GET", "relative_url": u} for u in chunk]),
+                    "include_headers": "false",
+                },
+                timeout=self.timeout,
+            )
+            items = resp.json()
+            if resp.status_code != 200 or not isinstance(items, list):
+                raise GraphAPIError(f"Batch request failed: {items}")
+            for url, item in zip(chunk, items):
+                if not item or item.get("code") != 200:
+                    logger.warning(f"Graph batch item failed ({url}): {item and item.get('body')}")
+                    results.append(None)
+                    continue
+                results.append(json.loads(item["body"]))
+        return results
+
+    def follow_paging(self, page: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """All items from a list response, following paging.next links."""
+        items: List[Dict[str, Any]] = []
+        while page:
+            items.extend(page.get("data", []))
+            next_url = (page.get("paging") or {}).get("next")
+            page = self.get(next_url) if next_url else None
+        return items
+
+
+def discover_page_ids(client: GraphClient, ad_account_id: str) -> List[str]:
+    """Pages the ad account promotes (where its lead forms live)."""
+    body = client.get(f"act_{ad_account_id}/promote_pages", {"fields": "id", "limit": 100})
+    return [p["id"] for p in client.follow_paging(body)]
+
+
+def list_lead_forms(client: GraphClient, page_ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Every lead form on the given Pages, one batch call for all Pages."""
+    page_ids = list(page_ids)
+    responses = client.batch(
+        [f"{page_id}/leadgen_forms?fields=id,name,status&limit=100" for page_id in page_ids]
+    )
+    forms = []
+    for page_id, body in zip(page_ids, responses):
+        for form in client.follow_paging(body):
+            form["page_id"] = page_id
+            forms.append(form)
+    return forms
+
+
+def fetch_new_leads(
+    client: GraphClient,
+    forms: List[Dict[str, Any]],
+    cursors: Dict[str, int],
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Leads created after each form's cursor (unix seconds), newest cursors returned.
+
+    Forms without a cursor are read from the beginning (first sync / backfill).
+    Cursors only advance for forms whose request succeeded.
+    """
+    urls = []
+    for form in forms:
+        url = f"{form['id']}/leads?fields={LEAD_FIELDS}&limit={LEADS_PAGE_SIZE}"
+        since = cursors.get(form["id"])
+        if since:
+            filtering = [{"field": "time_created", "operator": "GREATER_THAN", "value": int(since)}]
+            url += "&filtering=" + requests.utils.quote(json.dumps(filtering, separators=(",", ":")))
+        urls.append(url)
+
+    leads: List[Dict[str, Any]] = []
+    new_cursors = dict(cursors)
+    for form, body in zip(forms, client.batch(urls)):
+        if body is None:
+            continue
+        try:
+            form_leads = client.follow_paging(body)
+        except GraphAPIError as e:
+            logger.warning(f"Stopped paging leads for form {form['id']}: {e}")
+            continue
+        for lead in form_leads:
+            lead.setdefault("form_id", form["id"])
+            created = parse_created_time(lead.get("created_time"))
+            if created:
+                ts = int(created.timestamp())
+                if ts > new_cursors.get(form["id"], 0):
+                    new_cursors[form["id"]] = ts
+        leads.extend(form_leads)
+
+    return leads, new_cursors
+
+
+def plan_ingest(
+    parsed_leads: List[Dict[str, Any]],
+    existing: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+    """
+    Decide which parsed leads are new, using the existing rows that matched any
+    incoming facebook id, email, phone or name.
+
+    Matching follows the original per-lead rules: facebook id first, then email
+    if the lead has one, else phone, else (case-insensitive) name. Leads later
+    in the same run are matched against earlier new ones too.
+
+    Returns (new leads, [(existing lead id, facebook id to backfill)]).
+    """
+    by_fb, by_email, by_phone, by_name = {}, {}, {}, {}
+
+    def remember(row, index_fb=True):
+        if index_fb and row.get("facebook_lead_id"):
+            by_fb.setdefault(row["facebook_lead_id"], row)
+        if normalize_email(row.get("email")):
+            by_email.setdefault(normalize_email(row.get("email")), row)
+        if normalize_phone(row.get("phone")):
+            by_phone.setdefault(normalize_phone(row.get("phone")), row)
+        if (row.get("name") or "").strip():
+            by_name.setdefault(row["name"].strip().lower(), row)
+
+    for row in existing:
+        remember(row)
+
+    new_leads: List[Dict[str, Any]] = []
+    backfills: List[Tuple[int, str]] = []
+    for lead in parsed_leads:
+        fb_id = lead.get("facebook_lead_id")
+        if fb_id and fb_id in by_fb:
+            continue
+
+        email, phone = normalize_email(lead.get("email")), normalize_phone(lead.get("phone"))
+        name = (lead.get("name") or "").strip().lower()
+        if email:
+            match = by_email.get(email)
+        elif phone:
+            match = by_phone.get(phone)
+        elif name:
+            match = by_name.get(name)
+        else:
+            match = None
+
+        if match is not None:
+            if fb_id and not match.get("facebook_lead_id") and match.get("id") is not None:
+                match["facebook_lead_id"] = fb_id
+                backfills.append((match["id"], fb_id))
+            if fb_id:
+                by_fb[fb_id] = match
+            continue
+
+        new_leads.append(lead)
+        remember(lead)
+
+    return new_leads, backfills
@@ -0,0 +1,253 @@
+"""
+Streaming CSV lead import.
+
+Reads an uploaded export row by row (never the whole file as one string),
+normalizes email/phone/name keys, and dedupes against existing leads and
+earlier rows of the same file with in-memory hash sets. Existing leads are
+looked up once per chunk through the normalized indexes, and new leads are
+bulk-inserted a chunk at a time, so memory stays bounded by the chunk size
+plus the keys seen so far.
+
+The recruiting app supplies the two database callbacks; this module has no
+Flask dependency.
+"""
+import codecs
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from recruiting.facebook_lead_sync import normalize_email, normalize_phone
+except ImportError:  # recruiting/ on sys.path (recruiting_app.py mounts it that way)
+    from facebook_lead_sync import normalize_email, normalize_phone
+
+CHUNK_SIZE = 1000
+SNIFF_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 200
+
+# Lead column limits (recruiting/app.py Lead model)
+MAX_LENGTHS = {'name': 100, 'email': 120, 'phone': 20}
+
+KeySets = Tuple[Set[str], Set[str], Set[str]]  # (emails, phones, names)
+
+
+@dataclass
+class CsvImportResult:
+    leads_added: int = 0
+    duplicates_skipped: int = 0
+    empty_rows_skipped: int = 0
+    rows_processed: int = 0
+    error_count: int = 0
+    errors: List[Dict] = field(default_factory=list)  # First MAX_REPORTED_ERRORS {'row', 'error'}
+
+    def add_error(self, row_number: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def merge(self, other: 'CsvImportResult'):
+        self.leads_added += other.leads_added
+        self.duplicates_skipped += other.duplicates_skipped
+        self.empty_rows_skipped += other.empty_rows_skipped
+        self.rows_processed += other.rows_processed
+        for err in other.errors:
+            self.add_error(err['row'], err['error'])
+        self.error_count += other.error_count - len(other.errors)
+
+    def to_dict(self) -> Dict:
+        return {
+            'leads_added': self.leads_added,
+            'duplicates_skipped': self.duplicates_skipped,
+            'empty_rows_skipped': self.empty_rows_skipped,
+            'rows_processed': self.rows_processed,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def open_csv_text(binary: IO[bytes]) -> Tuple[IO[str], str]:
+    """
+    Wrap a binary upload in a text stream and pick its delimiter.
+
+    The encoding comes from a sample, in the same preference order as the old
+    whole-file decode: UTF-8 (with or without BOM), UTF-16 when a BOM says so,
+    otherwise cp1252. Facebook's exports are tab-delimited.
+    """
+    buffered = binary if isinstance(binary, io.BufferedReader) else io.BufferedReader(_Readable(binary), SNIFF_BYTES)
+    sample = buffered.peek(SNIFF_BYTES)[:SNIFF_BYTES]
+
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = 'utf-16'
+    elif sample.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    else:
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            encoding = 'utf-8'
+        except UnicodeDecodeError:
+            encoding = 'cp1252'
+    delimiter = '\t' if b'\t' in sample[:2048] else ','
+    return io.TextIOWrapper(buffered, encoding=encoding, errors='replace', newline=''), delimiter
+
+
+class _Readable(io.RawIOBase):
+    """Adapts any object with read() (e.g. a zip member or SpooledTemporaryFile) for BufferedReader."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self.raw.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def _clean(value) -> str:
+    return str(value or '').strip().strip('"').strip("'")
+
+
+class RowParser:
+    """Maps the supported export layouts onto name/email/phone."""
+
+    def __init__(self, fieldnames: Optional[List[str]]):
+        fieldnames = [f for f in (fieldnames or []) if f is not None]
+        lower = {f.lower().strip('"').strip("'"): f for f in fieldnames}
+
+        def find(label):
+            return lower.get(label) or next((f for f in fieldnames if label in f.lower()), None)
+
+        # Format 1: Facebook Lead Ads export ("full name", "created_time", ...)
+        if find('full name') or find('created_time'):
+            self.keys = (find('full name'), lower.get('email') or 'email', lower.get('phone') or 'phone')
+        # Format 2: Facebook export with Created, Name, Email, ...
+        elif 'Created' in fieldnames and 'Name' in fieldnames:
+            self.keys = ('Name', 'Email', 'Phone')
+        # Format 3: generic name/email/phone columns
+        else:
+            pick = lambda *names: next((n for n in names if n in fieldnames), names[0])  # noqa: E731
+            self.keys = (pick('Name', 'name', 'full name'), pick('Email', 'email'), pick('Phone', 'phone'))
+
+    def parse(self, row: Dict) -> Tuple[str, str, str]:
+        name_key, email_key, phone_key = self.keys
+        name = _clean(row.get(name_key)) if name_key else ''
+        email = _clean(row.get(email_key))
+        phone = _clean(row.get(phone_key))
+        # Facebook prefixes phone numbers with "p:"
+        if phone.startswith('p:'):
+            phone = phone[2:].strip()
+        return name, email, phone
+
+
+def _keys(name: str, email: str, phone: str) -> Tuple[str, str, str]:
+    return normalize_email(email), normalize_phone(phone), name.strip().lower()
+
+
+def _iter_rows(text: IO[str], delimiter: str, result: CsvImportResult) -> Iterator[Tuple[int, Dict, RowParser]]:
+    reader = csv.DictReader(text, delimiter=delimiter)
+    try:
+        parser = RowParser(reader.fieldnames)
+    except csv.Error as e:
+        result.add_error(1, f"Unreadable header: {e}")
+        return
+
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            result.rows_processed += 1
+            result.add_error(reader.line_num, f"Malformed CSV: {e}")
+            continue
+        yield reader.line_num, row, parser
+
+
+def import_leads_csv(
+    binary: IO[bytes],
+    find_existing: Callable[[Set[str], Set[str], Set[str]], KeySets],
+    insert_leads: Callable[[List[Dict]], None],
+    chunk_size: int = CHUNK_SIZE,
+) -> CsvImportResult:
+    """
+    Import one CSV stream.
+
+    find_existing(emails, phones, names) returns the subset of those normalized
+    keys already on a lead; insert_leads(rows) bulk-inserts and commits one chunk
+    (and raises to reject it). A row is a duplicate if its email, phone or name
+    matches an existing lead or an earlier row in the file.
+    """
+    result = CsvImportResult()
+    seen: KeySets = (set(), set(), set())
+    pending: List[Tuple[int, Tuple[str, str, str], Dict]] = []
+
+    def flush():
+        if not pending:
+            return
+        chunk_keys = [set(k[i] for _, k, _ in pending) - {''} for i in range(3)]
+        existing = find_existing(*chunk_keys)
+
+        rows, row_numbers = [], []
+        for row_number, keys, lead in pending:
+            if any(key and (key in existing[i] or key in seen[i]) for i, key in enumerate(keys)):
+                result.duplicates_skipped += 1
+                continue
+            for i, key in enumerate(keys):
+                if key:
+                    seen[i].add(key)
+            rows.append(lead)
+            row_numbers.append(row_number)
+        pending.clear()
+
+        if not rows:
+            return
+        try:
+            insert_leads(rows)
+            result.leads_added += len(rows)
+        except Exception as e:
+            for row_number in row_numbers:
+                result.add_error(row_number, f"Insert failed: {e}")
+
+    text, delimiter = open_csv_text(binary)
+    for row_number, row, parser in _iter_rows(text, delimiter, result):
+        result.rows_processed += 1
+        name, email, phone = parser.parse(row)
+
+        if not name and not email and not phone:
+            result.empty_rows_skipped += 1
+            continue
+
+        too_long = [f"{col} longer than {limit} characters"
+                    for col, value, limit in (('name', name, MAX_LENGTHS['name']),
+                                              ('email', email, MAX_LENGTHS['email']),
+                                              ('phone', phone, MAX_LENGTHS['phone']))
+                    if len(value) > limit]
+        if too_long:
+            result.add_error(row_number, "; ".join(too_long))
+            continue
+
+        pending.append((row_number, _keys(name, email, phone), {
+            'name': name or 'Unknown',
+            'email': email,
+            'phone': phone,
+        }))
+        if len(pending) >= chunk_size:
+            flush()
+
+    flush()
+    return result
+
+
+def import_leads_files(
+    streams: Iterable[IO[bytes]],
+    find_existing: Callable[[Set[str], Set[str], Set[str]], KeySets],
+    insert_leads: Callable[[List[Dict]], None],
+) -> CsvImportResult:
+    """Import several CSV streams (e.g. the members of a zip) into one result."""
+    total = CsvImportResult()
+    for stream in streams:
+        total.merge(import_leads_csv(stream, find_existing, insert_leads))
+    return total
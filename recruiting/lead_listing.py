@@ -0,0 +1,78 @@
+"""
+Lead list serialization for /api/leads and /api/applicants.
+
+Both endpoints accept:
+- fields=name,phone,status   sparse field selection (id is always included),
+  so list views can skip the large notes column
+- cursor=<id>                keyset pagination on id (newest first): returns
+  leads with a smaller id plus next_cursor, with no COUNT query. An empty
+  cursor= asks for the first page. Without cursor the endpoints keep their
+  page/per_page offset paging and totals.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LEAD_FIELDS = (
+    'id', 'name', 'email', 'phone', 'notes', 'status', 'priority',
+    'assigned_to', 'assigned_to_id', 'created_at', 'updated_at',
+)
+APPLICANT_FIELDS = tuple(f for f in LEAD_FIELDS if f != 'assigned_to_id')
+
+# Lead model column backing each field
+FIELD_COLUMNS = {'assigned_to': 'assigned_to', 'assigned_to_id': 'assigned_to'}
+
+MAX_PAGE_SIZE = 500
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str] = LEAD_FIELDS) -> Tuple[str, ...]:
+    """Requested fields in canonical order; all of them when none are given."""
+    if not value:
+        return tuple(allowed)
+    requested = {f.strip() for f in value.split(',')}
+    return tuple(f for f in allowed if f in requested or f == 'id')
+
+
+def parse_cursor(value: Optional[str]) -> Optional[int]:
+    """Keyset cursor (an id), None for the first page. Raises ValueError if malformed."""
+    if value is None or value == '':
+        return None
+    cursor = int(value)
+    if cursor <= 0:
+        raise ValueError(f"invalid cursor: {value}")
+    return cursor
+
+
+def page_size(value: Optional[int], default: int = 50) -> int:
+    return max(1, min(value or default, MAX_PAGE_SIZE))
+
+
+def columns_for(fields: Iterable[str]) -> List[str]:
+    """Lead columns to load for the given fields."""
+    columns = []
+    for field in fields:
+        column = FIELD_COLUMNS.get(field, field)
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def serialize_lead(lead: Any, fields: Sequence[str]) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for field in fields:
+        if field == 'assigned_to':
+            data[field] = lead.assigned_user.name if lead.assigned_user else None
+        elif field == 'assigned_to_id':
+            data[field] = lead.assigned_to
+        elif field in ('created_at', 'updated_at'):
+            value = getattr(lead, field)
+            data[field] = value.isoformat() if value else None
+        else:
+            data[field] = getattr(lead, field)
+    return data
+
+
+def keyset_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[int]]:
+    """Split limit + 1 fetched rows into the page and the cursor for the next one."""
+    if len(rows) > limit:
+        page = rows[:limit]
+        return page, page[-1].id
+    return rows, None
@@ -0,0 +1,97 @@
+"""
+Recruiting dashboard metrics.
+
+/api/stats and /api/pipeline are both served from one grouped query over
+lead.status (see recruiting/app.py compute_lead_metrics). The "wants work"
+classification is derived when notes are written and stored on the lead, so
+reads never pattern-match notes. Results are cached briefly and invalidated
+whenever leads change.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Phrases in recruiter notes that mean the lead is looking for work
+# (case-sensitive, as the dashboard has always counted them)
+WANTS_WORK_MARKERS = ('sent application', 'FT', 'PT', 'CNA', 'QMAP', 'full time', 'part time')
+
+PIPELINE_STAGES = [
+    ('new', 'New'),
+    ('contacted', 'Contacted'),
+    ('interested', 'Interested'),
+    ('sent_to_ep', 'Sent to EP'),
+    ('hired', 'Hired'),
+    ('not_interested', 'Not Interested'),
+]
+
+METRICS_CACHE_TTL = 60  # seconds
+
+
+def wants_work(notes: Optional[str]) -> bool:
+    return bool(notes) and any(marker in notes for marker in WANTS_WORK_MARKERS)
+
+
+def wants_work_sql(column: str = 'notes') -> str:
+    """SQL predicate equivalent to wants_work(), for backfilling existing rows."""
+    return '(' + ' OR '.join(f"{column} LIKE '%{marker}%'" for marker in WANTS_WORK_MARKERS) + ')'
+
+
+def summarize(rows: Iterable[Tuple[Optional[str], int, int, int]]) -> Dict:
+    """
+    Build the stats and pipeline payloads from grouped rows of
+    (status, total, created_today, wants_work).
+    """
+    by_status: Dict[Optional[str], int] = {}
+    total = new_today = wants = 0
+    for status, count, created_today, wants_count in rows:
+        by_status[status] = by_status.get(status, 0) + int(count or 0)
+        total += int(count or 0)
+        new_today += int(created_today or 0)
+        wants += int(wants_count or 0)
+
+    return {
+        'stats': {
+            'total_leads': total,
+            'new_leads': new_today,
+            'contacted_leads': by_status.get('contacted', 0),
+            'wants_work_leads': wants,
+            'current_caregivers': by_status.get('hired', 0),
+        },
+        'pipeline': {
+            'pipeline': [
+                {'stage': value, 'label': label, 'count': by_status.get(value, 0)}
+                for value, label in PIPELINE_STAGES
+            ],
+            'total': total,
+        },
+    }
+
+
+class MetricsCache:
+    """One cached metrics snapshot per day, dropped on invalidate() or after the TTL."""
+
+    def __init__(self, ttl: float = METRICS_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[float, datetime, Dict]] = None
+        self._generation = 0
+
+    def get(self, day: datetime, compute: Callable[[], Dict]) -> Dict:
+        with self._lock:
+            entry, generation = self._entry, self._generation
+        if entry and entry[1] == day and self.clock() - entry[0] < self.ttl:
+            return entry[2]
+
+        value = compute()
+        with self._lock:
+            # Don't cache a result computed while leads were changing
+            if generation == self._generation:
+                self._entry = (self.clock(), day, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+            self._generation += 1
@@ -5,6 +5,7 @@ Runs independently from the portal on its own port.
 Routes:
 - /recruiting/*  → All Recruiting routes (Flask via WSGI middleware)
 - /health        → Service health check
+- /metrics       → Prometheus metrics
 """
 import os
 import sys
@@ -84,6 +85,11 @@ except Exception as e:
 async def health():
     return {"status": "ok", "service": "recruiting-dashboard"}
 
+# Prometheus scrape target (WellSky, tool, LLM and DB pool latency histograms)
+from service_metrics import add_metrics_route
+
+add_metrics_route(app)
+
 logger.info("Recruiting Dashboard standalone service ready")
 
 if __name__ == "__main__":
@@ -26,6 +26,8 @@ class ActivityLogger:
         metadata: Optional[Dict[str, Any]] = None,
         url: Optional[str] = None,
         *,
+        external_id: Optional[str] = None,
+        occurred_at: Optional[datetime] = None,
         commit: bool = True,
     ) -> Optional[ActivityLog]:
         """
@@ -41,6 +43,8 @@ class ActivityLogger:
             company_id: ID of related company
             metadata: Additional data (JSON-encodable dict)
             url: Related URL (email link, document, etc.)
+            external_id: ID in the source system (Gmail message ID, ...), indexed for dedupe
+            occurred_at: When the activity happened, if not now
         
         Returns:
             Created ActivityLog object
@@ -54,6 +58,8 @@ class ActivityLogger:
             company_id=company_id,
             extra_data=json.dumps(metadata) if metadata else None,
             url=url,
+            external_id=external_id,
+            occurred_at=occurred_at,
             created_at=datetime.utcnow(),
         )
 
@@ -145,6 +151,8 @@ class ActivityLogger:
         email_url: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
         *,
+        external_id: Optional[str] = None,
+        occurred_at: Optional[datetime] = None,
         commit: bool = True,
     ):
         """Log an email activity"""
@@ -162,6 +170,8 @@ class ActivityLogger:
                 "recipient": recipient,
                 **(metadata or {})
             },
+            external_id=external_id,
+            occurred_at=occurred_at,
             commit=commit,
         )
     
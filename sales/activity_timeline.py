@@ -0,0 +1,93 @@
+"""
+Paging helpers for the unified activity timeline (/api/timeline).
+
+Timeline rows are ordered newest first by (display time, id), where display
+time is occurred_at falling back to created_at. Pages are addressed by an
+opaque keyset cursor holding the last row's (display time, id), so page N
+costs the same as page 1. The total shown next to the timeline comes from a
+short-lived cache instead of a COUNT on every page.
+
+No database dependency; services.activity_service builds the queries.
+"""
+import base64
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+TOTAL_CACHE_TTL = 60.0
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(display_time: datetime, activity_id: int) -> str:
+    raw = f"{display_time.isoformat()}|{activity_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(display time, id) from a cursor. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        display_time, activity_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(display_time), int(activity_id)
+    except Exception as e:
+        raise ValueError(f"invalid timeline cursor: {cursor}") from e
+
+
+def page_size(limit: Optional[int], default: int = 50) -> int:
+    return max(1, min(limit or default, MAX_PAGE_SIZE))
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Split limit + 1 fetched activities into the page and the cursor for the next one."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.display_time, last.id)
+
+
+def group_by_day(items: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Serialized activities keyed by the date of their display_time, in order."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        date_key = item["display_time"][:10] if item.get("display_time") else "Unknown"
+        grouped.setdefault(date_key, []).append(item)
+    return grouped
+
+
+class TotalCache:
+    """
+    Timeline totals per filter set, kept for `ttl` seconds.
+
+    Keys are tuples whose first element is the frozenset of ("contact", id)
+    style entity filters, so invalidate() can drop just the totals a new
+    activity affects (plus the unfiltered ones).
+    """
+
+    def __init__(self, ttl: float = TOTAL_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+
+    def get(self, key: Hashable, compute: Callable[[], int]) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and self.clock() - entry[0] < self.ttl:
+            return entry[1]
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+        return value
+
+    def invalidate(self, entities: Iterable[Tuple[str, Optional[int]]] = ()):
+        """Drop totals for the given (entity, id) pairs, or everything when none are given."""
+        entities = {e for e in entities if e[1]}
+        with self._lock:
+            if not entities:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if not k[0] or entities & k[0]]:
+                del self._entries[key]
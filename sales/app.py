@@ -7286,10 +7286,11 @@ async def sync_brevo_contacts_endpoint(
 ):
     """
     Sync contacts FROM Brevo TO dashboard.
-    Imports all contacts from Brevo with their attributes.
+    Imports contacts changed in Brevo since the last sync (all of them the first time).
     """
     try:
         from brevo_service import BrevoService
+        from brevo_sync import BrevoContactSync, DatabaseSyncStore
 
         brevo_service = BrevoService()
 
@@ -7301,86 +7302,77 @@ async def sync_brevo_contacts_endpoint(
 
         logger.info("Starting Brevo contacts sync...")
 
-        # Get all contacts from Brevo
-        result = brevo_service.get_all_contacts(limit=5000)
-
-        if not result.get("success"):
-            return JSONResponse({
-                "success": False,
-                "error": result.get("error", "Failed to fetch from Brevo")
-            })
-
-        brevo_contacts = result.get("contacts", [])
-
-        if not brevo_contacts:
-            return JSONResponse({
-                "success": True,
-                "message": "No contacts found in Brevo",
-                "added": 0,
-                "updated": 0,
-                "total": db.query(Contact).count()
-            })
-
-        # Check existing contacts by email
-        existing_contacts = {c.email.lower(): c for c in db.query(Contact).filter(Contact.email.isnot(None)).all() if c.email}
-
         added_count = 0
         updated_count = 0
+        pulled_count = 0
+
+        def apply_contacts(brevo_contacts):
+            nonlocal added_count, updated_count, pulled_count
+            pulled_count += len(brevo_contacts)
+
+            # Existing contacts for this page only, via ix_contacts_email_lower
+            emails = {(bc.get('email') or '').lower().strip() for bc in brevo_contacts} - {''}
+            existing_contacts = {
+                c.email.lower().strip(): c
+                for c in db.query(Contact).filter(func.lower(Contact.email).in_(emails)).all()
+            } if emails else {}
+
+            for bc in brevo_contacts:
+                email = (bc.get('email') or '').lower().strip()
+                if not email:
+                    continue
 
-        for bc in brevo_contacts:
-            email = (bc.get('email') or '').lower().strip()
-            if not email:
-                continue
-
-            attrs = bc.get('attributes', {})
-            first_name = attrs.get('FIRSTNAME', '').strip()
-            last_name = attrs.get('LASTNAME', '').strip()
-            name = f"{first_name} {last_name}".strip() or email.split('@')[0]
-
-            if email in existing_contacts:
-                # Update existing contact
-                existing = existing_contacts[email]
-                updated = False
+                attrs = bc.get('attributes', {})
+                first_name = attrs.get('FIRSTNAME', '').strip()
+                last_name = attrs.get('LASTNAME', '').strip()
+                name = f"{first_name} {last_name}".strip() or email.split('@')[0]
+
+                if email in existing_contacts:
+                    # Update existing contact
+                    existing = existing_contacts[email]
+                    updated = False
+
+                    if attrs.get('COMPANY') and not existing.company:
+                        existing.company = attrs['COMPANY']
+                        updated = True
+                    if attrs.get('CONTACT_TYPE') and not existing.contact_type:
+                        existing.contact_type = attrs['CONTACT_TYPE'].lower()
+                        updated = True
+                    if attrs.get('STATUS') and not existing.status:
+                        existing.status = attrs['STATUS'].lower()
+                        updated = True
+                    if attrs.get('SMS') and not existing.phone:
+                        existing.phone = attrs['SMS']
+                        updated = True
+
+                    if updated:
+                        db.add(existing)
+                        updated_count += 1
+                else:
+                    # Create new contact
+                    contact = Contact(
+                        name=name,
+                        first_name=first_name or None,
+                        last_name=last_name or None,
+                        company=attrs.get('COMPANY') or None,
+                        email=email,
+                        phone=attrs.get('SMS') or None,
+                        address=attrs.get('ADDRESS') or None,
+                        title=attrs.get('TITLE') or None,
+                        contact_type=attrs.get('CONTACT_TYPE', '').lower() or None,
+                        status=attrs.get('STATUS', '').lower() or None,
+                        source='brevo',
+                        scanned_date=datetime.utcnow(),
+                        created_at=datetime.utcnow()
+                    )
 
-                if attrs.get('COMPANY') and not existing.company:
-                    existing.company = attrs['COMPANY']
-                    updated = True
-                if attrs.get('CONTACT_TYPE') and not existing.contact_type:
-                    existing.contact_type = attrs['CONTACT_TYPE'].lower()
-                    updated = True
-                if attrs.get('STATUS') and not existing.status:
-                    existing.status = attrs['STATUS'].lower()
-                    updated = True
-                if attrs.get('SMS') and not existing.phone:
-                    existing.phone = attrs['SMS']
-                    updated = True
+                    db.add(contact)
+                    existing_contacts[email] = contact
+                    added_count += 1
 
-                if updated:
-                    db.add(existing)
-                    updated_count += 1
-            else:
-                # Create new contact
-                contact = Contact(
-                    name=name,
-                    first_name=first_name or None,
-                    last_name=last_name or None,
-                    company=attrs.get('COMPANY') or None,
-                    email=email,
-                    phone=attrs.get('SMS') or None,
-                    address=attrs.get('ADDRESS') or None,
-                    title=attrs.get('TITLE') or None,
-                    contact_type=attrs.get('CONTACT_TYPE', '').lower() or None,
-                    status=attrs.get('STATUS', '').lower() or None,
-                    source='brevo',
-                    scanned_date=datetime.utcnow(),
-                    created_at=datetime.utcnow()
-                )
-
-                db.add(contact)
-                existing_contacts[email] = contact
-                added_count += 1
+            db.commit()
 
-        db.commit()
+        BrevoContactSync(brevo_service, DatabaseSyncStore(db)).pull(apply_contacts, cursor_name='dashboard_contacts')
 
         total_count = db.query(Contact).count()
 
@@ -7388,7 +7380,7 @@ async def sync_brevo_contacts_endpoint(
 
         return JSONResponse({
             "success": True,
-            "message": f"Synced {len(brevo_contacts)} contacts from Brevo",
+            "message": f"Synced {pulled_count} changed contacts from Brevo",
             "added": added_count,
             "updated": updated_count,
             "total": total_count
@@ -10550,7 +10542,6 @@ async def get_lead_activities(lead_id: int, db: Session = Depends(get_db), curre
 
 from shift_filling import (
     CaregiverMatcher,
-    OutreachStatus,
     shift_filling_engine,
     sms_service,
     wellsky_mock,
@@ -10788,30 +10779,21 @@ async def ringcentral_sms_webhook(request: Request):
 
                 logger.info(f"Received SMS from {from_number}: {message_text[:50]}")
 
-                # Try to match to an active campaign
-                import re
-                clean_from = re.sub(r'[^\d]', '', from_number)[-10:]
-
-                for campaign_id, campaign in shift_filling_engine.active_campaigns.items():
-                    if campaign.status != OutreachStatus.IN_PROGRESS:
-                        continue
-
-                    # Check if this phone matches any outreach
-                    for outreach in campaign.caregivers_contacted:
-                        clean_outreach = re.sub(r'[^\d]', '', outreach.phone)[-10:]
-                        if clean_from == clean_outreach:
-                            # Found a match! Process the response
-                            result = shift_filling_engine.process_response(
-                                campaign_id=campaign_id,
-                                phone=from_number,
-                                message_text=message_text
-                            )
-                            logger.info(f"Processed response for campaign {campaign_id}: {result}")
-                            return JSONResponse({
-                                "status": "processed",
-                                "campaign_id": campaign_id,
-                                "result": result
-                            })
+                # Try to match to an active campaign (phone -> outreach index)
+                match = shift_filling_engine.find_outreach_by_phone(from_number)
+                if match:
+                    campaign, _ = match
+                    result = shift_filling_engine.process_response(
+                        campaign_id=campaign.id,
+                        phone=from_number,
+                        message_text=message_text
+                    )
+                    logger.info(f"Processed response for campaign {campaign.id}: {result}")
+                    return JSONResponse({
+                        "status": "processed",
+                        "campaign_id": campaign.id,
+                        "result": result
+                    })
 
                 logger.info(f"No matching campaign found for SMS from {from_number}")
 
@@ -10885,6 +10867,7 @@ async def get_unified_timeline(
     activity_type: str = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str = None,
     db: Session = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -10894,19 +10877,24 @@ async def get_unified_timeline(
     Query params:
     - contact_id, company_id, deal_id: Filter by entity (can combine)
     - activity_type: Comma-separated list of types to filter
-    - limit, offset: Pagination
+    - limit, cursor: Pagination; pass the previous page's next_cursor
+    - offset: Legacy pagination, used when no cursor is given
     """
     activity_types = activity_type.split(",") if activity_type else None
 
-    result = get_timeline(
-        db=db,
-        contact_id=contact_id,
-        company_id=company_id,
-        deal_id=deal_id,
-        activity_types=activity_types,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        result = get_timeline(
+            db=db,
+            contact_id=contact_id,
+            company_id=company_id,
+            deal_id=deal_id,
+            activity_types=activity_types,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return JSONResponse(result)
 
@@ -84,20 +84,24 @@ class BrevoService:
             logger.error(f"Brevo connection test failed: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def get_all_contacts(self, limit: int = 1000) -> Dict[str, Any]:
-        """Get all contacts from Brevo."""
+    def get_all_contacts(self, limit: int = 1000, modified_since: Optional[str] = None) -> Dict[str, Any]:
+        """Get all contacts from Brevo (only those modified since an ISO timestamp, if given)."""
         if not self.enabled:
             return {"success": False, "error": "Brevo not configured"}
         
         try:
             all_contacts = []
             offset = 0
+            page_size = min(limit, 1000)  # Brevo's maximum page size for /contacts
             
             while True:
+                params = {"limit": min(page_size, limit - offset), "offset": offset}
+                if modified_since:
+                    params["modifiedSince"] = modified_since
                 response = requests.get(
                     f"{self.base_url}/contacts",
                     headers=self._get_headers(),
-                    params={"limit": min(limit, 50), "offset": offset}
+                    params=params
                 )
                 
                 if response.status_code != 200:
@@ -107,10 +111,10 @@ class BrevoService:
                 contacts = data.get('contacts', [])
                 all_contacts.extend(contacts)
                 
-                if len(contacts) < 50:
+                if len(contacts) < params["limit"]:
                     break
                     
-                offset += 50
+                offset += len(contacts)
                 
                 if offset >= limit:
                     break
@@ -199,7 +203,13 @@ class BrevoService:
             return {"success": False, "error": str(e)}
     
     def bulk_import_contacts(self, contacts: List[Dict[str, Any]], list_id: int = None) -> Dict[str, Any]:
-        """Bulk import contacts to Brevo."""
+        """
+        Bulk import contacts to Brevo.
+
+        Chunks go through Brevo's asynchronous import a few at a time and
+        return once accepted (not processed). For change-tracked, resumable
+        syncs use brevo_sync.BrevoContactSync.push.
+        """
         if not self.enabled:
             return {"success": False, "error": "Brevo not configured"}
         
@@ -207,81 +217,14 @@ class BrevoService:
             return {"success": False, "error": "No contacts provided"}
         
         try:
-            # Format contacts for Brevo bulk import
-            formatted_contacts = []
-            for c in contacts:
-                email = c.get('email', '').strip().lower()
-                if not email:
-                    continue
-                
-                # Normalize first/last names - split if first_name contains full name
-                first_name = (c.get('first_name') or '').strip()
-                last_name = (c.get('last_name') or '').strip()
-                
-                # If first_name contains a space and last_name is empty, split it
-                if first_name and ' ' in first_name and not last_name:
-                    parts = first_name.split(' ', 1)
-                    first_name = parts[0]
-                    last_name = parts[1] if len(parts) > 1 else ''
-                
-                contact_data = {
-                    "email": email,
-                    "attributes": {}
-                }
-                
-                if first_name:
-                    contact_data['attributes']['FIRSTNAME'] = first_name
-                if last_name:
-                    contact_data['attributes']['LASTNAME'] = last_name
-                if c.get('company'):
-                    contact_data['attributes']['COMPANY'] = c['company']
-                if c.get('phone'):
-                    contact_data['attributes']['SMS'] = c['phone']
-                if c.get('title'):
-                    contact_data['attributes']['TITLE'] = c['title']
-                if c.get('contact_type'):
-                    contact_data['attributes']['CONTACT_TYPE'] = c['contact_type']
-                if c.get('status'):
-                    contact_data['attributes']['STATUS'] = c['status']
-                if c.get('source'):
-                    contact_data['attributes']['SOURCE'] = c['source']
-                
-                formatted_contacts.append(contact_data)
-            
-            # Brevo accepts up to 150 contacts per batch for inline import
-            batch_size = 100
-            total_added = 0
-            total_updated = 0
-            errors = []
-            
-            for i in range(0, len(formatted_contacts), batch_size):
-                batch = formatted_contacts[i:i+batch_size]
-                
-                data = {
-                    "jsonBody": batch,
-                    "updateExistingContacts": True
-                }
-                
-                if list_id:
-                    data['listIds'] = [list_id]
-                
-                response = requests.post(
-                    f"{self.base_url}/contacts/import",
-                    headers=self._get_headers(),
-                    json=data
-                )
-                
-                if response.status_code in (200, 201, 202):
-                    result = response.json() if response.text else {}
-                    total_added += len(batch)
-                    logger.info(f"Imported batch of {len(batch)} contacts to Brevo")
-                else:
-                    errors.append(f"Batch {i//batch_size + 1}: {response.status_code} - {response.text}")
-            
+            from brevo_sync import BrevoContactSync, format_contact
+
+            rows = [row for row in (format_contact(c) for c in contacts) if row]
+            result = BrevoContactSync(self).import_rows(rows, list_id, wait=False)
             return {
-                "success": len(errors) == 0,
-                "added": total_added,
-                "errors": errors if errors else None
+                "success": result.success,
+                "added": result.imported,
+                "errors": result.errors or None
             }
             
         except Exception as e:
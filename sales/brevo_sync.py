@@ -0,0 +1,291 @@
+"""
+Brevo contact sync engine.
+
+Push: CRM contacts are shaped into Brevo import rows and hashed; only rows
+whose hash differs from the last successful sync to the same list
+(BrevoContactSyncState) are sent. They go through Brevo's asynchronous /contacts/import endpoint in
+chunks, a few imports in flight at a time, and each chunk's hashes are saved
+as soon as Brevo reports its import process completed - so a run that dies
+halfway resumes with only the contacts that never made it.
+
+Pull: contacts are read with modifiedSince from a per-feed cursor
+(BrevoSyncCursor), which only advances after the caller has applied every
+page.
+"""
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_CONCURRENCY = 3
+PROCESS_POLL_SECONDS = 2.0
+PROCESS_TIMEOUT_SECONDS = 600
+PULL_PAGE_SIZE = 500  # /contacts/lists/{id}/contacts caps limit at 500
+
+
+def format_contact(contact: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """CRM contact dict -> Brevo import row ({email, attributes}), or None without an email."""
+    email = (contact.get('email') or '').strip().lower()
+    if not email:
+        return None
+
+    # Normalize first/last names - split if first_name contains full name
+    first_name = (contact.get('first_name') or '').strip()
+    last_name = (contact.get('last_name') or '').strip()
+    if first_name and ' ' in first_name and not last_name:
+        parts = first_name.split(' ', 1)
+        first_name = parts[0]
+        last_name = parts[1] if len(parts) > 1 else ''
+
+    attributes = {}
+    if first_name:
+        attributes['FIRSTNAME'] = first_name
+    if last_name:
+        attributes['LASTNAME'] = last_name
+    for key, attribute in (
+        ('company', 'COMPANY'),
+        ('phone', 'SMS'),
+        ('title', 'TITLE'),
+        ('contact_type', 'CONTACT_TYPE'),
+        ('status', 'STATUS'),
+        ('source', 'SOURCE'),
+    ):
+        if contact.get(key):
+            attributes[attribute] = contact[key]
+
+    return {"email": email, "attributes": attributes}
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Stable hash of the import row sent for a contact."""
+    payload = json.dumps(row, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class PushResult:
+    changed: int = 0
+    unchanged: int = 0
+    imported: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+
+class BrevoContactSync:
+    """Diffed, chunked, concurrent contact import and incremental pulls."""
+
+    def __init__(
+        self,
+        brevo,
+        store=None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        concurrency: int = IMPORT_CONCURRENCY,
+        poll_seconds: float = PROCESS_POLL_SECONDS,
+        timeout_seconds: float = PROCESS_TIMEOUT_SECONDS,
+        session: Optional[requests.Session] = None,
+    ):
+        self.brevo = brevo
+        self.store = store
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds
+        self.http = session or requests.Session()
+
+    # -- push ---------------------------------------------------------------
+
+    def plan(self, contacts: Iterable[Dict[str, Any]], list_id: Optional[int] = None) -> Tuple[List[Dict], Dict[str, str], int]:
+        """(changed rows, their hashes by email, unchanged count) against the stored hashes."""
+        synced = self.store.load_hashes(list_id) if self.store else {}
+        rows: Dict[str, Dict[str, Any]] = {}
+        for contact in contacts:
+            row = format_contact(contact)
+            if row:
+                rows[row['email']] = row  # Last one wins, as Brevo would apply them
+
+        changed, hashes, unchanged = [], {}, 0
+        for email, row in rows.items():
+            digest = content_hash(row)
+            if synced.get(email) == digest:
+                unchanged += 1
+                continue
+            changed.append(row)
+            hashes[email] = digest
+        return changed, hashes, unchanged
+
+    def push(self, contacts: Iterable[Dict[str, Any]], list_id: Optional[int] = None) -> PushResult:
+        """Send only the contacts that changed since they were last synced."""
+        changed, hashes, unchanged = self.plan(contacts, list_id)
+        result = self.import_rows(changed, list_id, on_chunk_done=lambda chunk: self._checkpoint(chunk, hashes, list_id))
+        result.changed = len(changed)
+        result.unchanged = unchanged
+        return result
+
+    def _checkpoint(self, chunk: List[Dict[str, Any]], hashes: Dict[str, str], list_id: Optional[int]):
+        if self.store:
+            self.store.save_hashes({row['email']: hashes[row['email']] for row in chunk}, list_id)
+
+    def import_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        list_id: Optional[int] = None,
+        on_chunk_done: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        wait: bool = True,
+    ) -> PushResult:
+        """
+        Import formatted rows in chunks, `concurrency` imports at a time.
+
+        With wait, a chunk only counts once Brevo's import process completed;
+        otherwise once Brevo accepted it. on_chunk_done runs on the calling
+        thread after each successful chunk.
+        """
+        result = PushResult()
+        chunks = [rows[i:i + self.chunk_size] for i in range(0, len(rows), self.chunk_size)]
+        if not chunks:
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self._import_chunk, chunk, list_id, wait): n for n, chunk in enumerate(chunks, 1)}
+            for future in as_completed(futures):
+                n = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result.errors.append(f"Chunk {n}: {e}")
+                    logger.error(f"Brevo import chunk {n}/{len(chunks)} failed: {e}")
+                    continue
+                result.imported += len(chunks[n - 1])
+                if on_chunk_done:
+                    on_chunk_done(chunks[n - 1])
+                logger.info(f"Imported chunk {n}/{len(chunks)} ({len(chunks[n - 1])} contacts) to Brevo")
+        return result
+
+    def _import_chunk(self, chunk: List[Dict[str, Any]], list_id: Optional[int], wait: bool = True):
+        data: Dict[str, Any] = {"jsonBody": chunk, "updateExistingContacts": True}
+        if list_id:
+            data["listIds"] = [list_id]
+        response = self.http.post(
+            f"{self.brevo.base_url}/contacts/import",
+            headers=self.brevo._get_headers(),
+            json=data,
+        )
+        if response.status_code not in (200, 201, 202):
+            raise RuntimeError(f"{response.status_code} - {response.text}")
+        process_id = (response.json() if response.text else {}).get('processId')
+        if wait and process_id:
+            self._wait_for_process(process_id)
+
+    def _wait_for_process(self, process_id: int):
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            response = self.http.get(f"{self.brevo.base_url}/processes/{process_id}", headers=self.brevo._get_headers())
+            if response.status_code == 200:
+                status = response.json().get('status')
+                if status == 'completed':
+                    return
+                if status not in ('queued', 'in_process'):
+                    raise RuntimeError(f"import process {process_id} ended as {status}")
+            elif response.status_code != 429:
+                raise RuntimeError(f"import process {process_id}: {response.status_code} - {response.text}")
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"import process {process_id} still running after {self.timeout_seconds}s")
+            time.sleep(self.poll_seconds)
+
+    # -- pull ---------------------------------------------------------------
+
+    def pull(
+        self,
+        apply: Callable[[List[Dict[str, Any]]], None],
+        cursor_name: str = 'contacts',
+        list_id: Optional[int] = None,
+    ) -> int:
+        """
+        Feed contacts modified since the cursor to apply(page), page by page.
+
+        The cursor moves to the start of this pull only once every page was
+        applied, so a failure re-reads the same changes next time. Returns the
+        number of contacts pulled.
+        """
+        started = datetime.now(timezone.utc)
+        since = self.store.get_cursor(cursor_name) if self.store else None
+        path = f"/contacts/lists/{list_id}/contacts" if list_id else "/contacts"
+
+        pulled, offset = 0, 0
+        while True:
+            params: Dict[str, Any] = {"limit": PULL_PAGE_SIZE, "offset": offset, "sort": "asc"}
+            if since:
+                params["modifiedSince"] = since
+            response = self.http.get(f"{self.brevo.base_url}{path}", headers=self.brevo._get_headers(), params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"Brevo pull failed: {response.status_code} - {response.text}")
+            page = response.json().get('contacts', [])
+            if page:
+                apply(page)
+                pulled += len(page)
+            if len(page) < PULL_PAGE_SIZE:
+                break
+            offset += PULL_PAGE_SIZE
+
+        if self.store:
+            self.store.set_cursor(cursor_name, started.strftime('%Y-%m-%dT%H:%M:%S.') + f"{started.microsecond // 1000:03d}Z")
+        return pulled
+
+
+class DatabaseSyncStore:
+    """Sync hashes (per Brevo list) and pull cursors kept in the sales database."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def load_hashes(self, list_id: Optional[int] = None) -> Dict[str, str]:
+        from models import BrevoContactSyncState
+        return dict(
+            self.db.query(BrevoContactSyncState.email, BrevoContactSyncState.content_hash)
+            .filter(BrevoContactSyncState.list_id == (list_id or 0))
+            .all()
+        )
+
+    def save_hashes(self, hashes: Dict[str, str], list_id: Optional[int] = None):
+        from models import BrevoContactSyncState
+        now = datetime.utcnow()
+        existing = {
+            s.email: s for s in
+            self.db.query(BrevoContactSyncState).filter(
+                BrevoContactSyncState.list_id == (list_id or 0),
+                BrevoContactSyncState.email.in_(list(hashes))
+            ).all()
+        }
+        for email, digest in hashes.items():
+            state = existing.get(email)
+            if state is None:
+                self.db.add(BrevoContactSyncState(list_id=list_id or 0, email=email, content_hash=digest, synced_at=now))
+            else:
+                state.content_hash = digest
+                state.synced_at = now
+        self.db.commit()
+
+    def get_cursor(self, name: str) -> Optional[str]:
+        from models import BrevoSyncCursor
+        cursor = self.db.get(BrevoSyncCursor, name)
+        return cursor.value if cursor else None
+
+    def set_cursor(self, name: str, value: str):
+        from models import BrevoSyncCursor
+        cursor = self.db.get(BrevoSyncCursor, name)
+        if cursor is None:
+            self.db.add(BrevoSyncCursor(name=name, value=value))
+        else:
+            cursor.value = value
+        self.db.commit()
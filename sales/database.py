@@ -3,7 +3,12 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import os
 import logging
-from models import Base
+from models import POST_CREATE_INDEXES, Base
+
+try:
+    from service_metrics import timed_pool_class
+except ImportError:  # sales/ run on its own, without the repo root on sys.path
+    timed_pool_class = None
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +48,8 @@ class DatabaseManager:
                     connect_args={"check_same_thread": False},
                     poolclass=StaticPool,
                 )
+            elif timed_pool_class:
+                self.engine = create_engine(database_url, poolclass=timed_pool_class("sales"))
             else:
                 self.engine = create_engine(database_url)
             
@@ -60,6 +67,12 @@ class DatabaseManager:
             except Exception as e:
                 logger.warning(f"Tables may already exist: {str(e)}")
                 # Try to continue anyway
+
+            for index in POST_CREATE_INDEXES:
+                try:
+                    index.create(bind=self.engine, checkfirst=True)
+                except Exception as e:
+                    logger.warning(f"Could not create index {index.name}: {str(e)}")
             
             logger.info("Database initialized successfully")
             
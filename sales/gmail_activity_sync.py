@@ -1,212 +1,263 @@
 """
 Gmail Activity Sync - Automatically log emails as activities in CRM
+
+Each mailbox keeps a Gmail historyId (GmailSyncState), so a run only reads
+mail added since the last one; see gmail_history for the API side. Every
+batch of messages is deduped against ActivityLog.external_id and resolved to
+contacts and deals with one query each, so the sync is cheap enough to run
+every minute.
 """
 import logging
-import os
 import re
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Set
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from gmail_service import GmailService
+from gmail_history import (
+    HistoryExpired,
+    MetadataFetchFailed,
+    current_history_id,
+    fetch_metadata,
+    list_history,
+    list_message_ids,
+)
 from activity_logger import ActivityLogger
-from models import Contact, Lead
+from models import ActivityLog, Contact, GmailSyncState, Lead
 from database import get_db
 
 logger = logging.getLogger(__name__)
 
+ACTIVE_DEAL_STAGES = ["incoming", "ongoing", "pending"]
+
 
 class GmailActivitySync:
     """Sync Gmail emails and log them as CRM activities"""
-    
+
     def __init__(self):
         self.gmail_service = GmailService()
-        
+
     def find_contact_by_email(self, db: Session, email: str) -> Optional[Contact]:
         """Find a contact by email address"""
-        try:
-            return db.query(Contact).filter(Contact.email == email).first()
-        except Exception as e:
-            logger.error(f"Error finding contact by email: {e}")
-            return None
-    
+        return self.contacts_by_email(db, [email]).get((email or "").lower().strip())
+
     def find_deal_by_contact(self, db: Session, contact_id: int) -> Optional[Lead]:
         """Find active deal for a contact"""
-        try:
-            return db.query(Lead).filter(
-                Lead.contact_name == db.query(Contact).filter(Contact.id == contact_id).first().name,
-                Lead.stage.in_(["incoming", "ongoing", "pending"])
-            ).first()
-        except Exception as e:
-            logger.error(f"Error finding deal by contact: {e}")
+        contact = db.query(Contact).filter(Contact.id == contact_id).first()
+        if not contact:
             return None
-    
+        return self.deals_by_contact_name(db, [contact.name]).get(contact.name)
+
     def extract_email_address(self, email_string: str) -> str:
         """Extract email address from 'Name <email@domain.com>' format"""
         match = re.search(r'<(.+?)>', email_string)
         if match:
             return match.group(1).lower().strip()
         return email_string.lower().strip()
-    
-    def sync_recent_emails(self, db: Session, max_results: int = 50, since_minutes: int = 60):
+
+    def contacts_by_email(self, db: Session, emails: Iterable[str]) -> Dict[str, Contact]:
+        """Contacts for many addresses in one query (uses ix_contacts_email_lower)."""
+        emails = {e.lower().strip() for e in emails if e}
+        if not emails:
+            return {}
+        try:
+            contacts = db.query(Contact).filter(func.lower(Contact.email).in_(emails)).order_by(Contact.id).all()
+        except Exception as e:
+            logger.error(f"Error finding contacts by email: {e}")
+            return {}
+        by_email: Dict[str, Contact] = {}
+        for contact in contacts:
+            by_email.setdefault(contact.email.lower().strip(), contact)
+        return by_email
+
+    def deals_by_contact_name(self, db: Session, names: Iterable[str]) -> Dict[str, Lead]:
+        """Active deal per contact name, in one query."""
+        names = {n for n in names if n}
+        if not names:
+            return {}
+        try:
+            deals = db.query(Lead).filter(
+                Lead.contact_name.in_(names),
+                Lead.stage.in_(ACTIVE_DEAL_STAGES)
+            ).order_by(Lead.id).all()
+        except Exception as e:
+            logger.error(f"Error finding deals by contact: {e}")
+            return {}
+        by_name: Dict[str, Lead] = {}
+        for deal in deals:
+            by_name.setdefault(deal.contact_name, deal)
+        return by_name
+
+    def logged_message_ids(self, db: Session, message_ids: List[str]) -> Set[str]:
+        """Which of these Gmail message IDs already have an activity (indexed external_id)."""
+        if not message_ids:
+            return set()
+        rows = db.query(ActivityLog.external_id).filter(
+            ActivityLog.activity_type == "email",
+            ActivityLog.external_id.in_(message_ids)
+        ).all()
+        return {r[0] for r in rows}
+
+    def log_messages(self, db: Session, messages: List[Dict[str, Any]], contact: Optional[Contact] = None) -> int:
+        """
+        Log parsed Gmail messages that aren't logged yet, committing once.
+
+        Without a fixed contact, each message goes to the first known contact
+        among its sender and recipients.
         """
-        Sync recent emails and log them as activities
-        
+        logged = self.logged_message_ids(db, [m["message_id"] for m in messages])
+        messages = [m for m in messages if m["message_id"] not in logged]
+        if not messages:
+            return 0
+
+        if contact is None:
+            contacts = self.contacts_by_email(db, (a for m in messages for a in [m["from"], *m["to"]]))
+        else:
+            contacts = {}
+        deals = self.deals_by_contact_name(
+            db, [c.name for c in ([contact] if contact else contacts.values())]
+        )
+
+        synced_count = 0
+        for email_data in messages:
+            message_id = email_data["message_id"]
+            match = contact or next(
+                (contacts[a] for a in [email_data["from"], *email_data["to"]] if a in contacts), None
+            )
+            deal = deals.get(match.name) if match else None
+            date = email_data.get("date")
+
+            activity = ActivityLogger.log_email(
+                db=db,
+                subject=email_data["subject"],
+                sender=email_data["from"],
+                recipient=", ".join(email_data["to"]),
+                contact_id=match.id if match else None,
+                deal_id=deal.id if deal else None,
+                email_url=f"https://mail.google.com/mail/u/0/#inbox/{message_id}",
+                metadata={
+                    "message_id": message_id,
+                    "date": date.isoformat() if date else None,
+                    "snippet": email_data.get("snippet", "")[:200]
+                },
+                external_id=message_id,
+                occurred_at=date,
+                commit=False,
+            )
+            if activity:
+                synced_count += 1
+                logger.debug(f"Synced email: {email_data['subject']}")
+
+        db.commit()
+        return synced_count
+
+    def _sync_mailbox(self, db: Session, user_email: str, max_results: int, since_minutes: int) -> int:
+        service = self.gmail_service._get_service_for_user(user_email)
+        if service is None:
+            return 0
+
+        state = db.get(GmailSyncState, user_email)
+        if state is None:
+            state = GmailSyncState(user_email=user_email)
+            db.add(state)
+
+        message_ids = None
+        if state.history_id:
+            try:
+                message_ids, history_id = list_history(service, state.history_id)
+            except HistoryExpired:
+                logger.warning(f"Gmail history for {user_email} expired, re-listing recent mail")
+
+        if message_ids is None:
+            # First run (or lost history): take the cursor first so nothing
+            # arriving during the listing is missed, then backfill recent mail.
+            history_id = current_history_id(service)
+            after = int(time.time()) - since_minutes * 60
+            message_ids = list(reversed(list_message_ids(service, f"after:{after}", max_results)))
+
+        try:
+            messages = fetch_metadata(service, message_ids)
+        except MetadataFetchFailed as e:
+            # Log what did arrive but keep the old cursor, so the next run
+            # lists the same history again (logged messages are deduped)
+            self.log_messages(db, e.messages)
+            raise
+
+        synced_count = self.log_messages(db, messages)
+
+        state.history_id = history_id
+        state.last_synced_at = datetime.utcnow()
+        db.commit()
+        return synced_count
+
+    def sync_recent_emails(self, db: Session, max_results: int = 50, since_minutes: int = 60) -> int:
+        """
+        Log mail added to each mailbox since the last sync as activities
+
         Args:
             db: Database session
-            max_results: Maximum number of emails to process
-            since_minutes: Only process emails from last N minutes
+            max_results: Maximum number of emails to backfill on a mailbox's first sync
+            since_minutes: How far back a mailbox's first sync looks
         """
         if not self.gmail_service.enabled:
             logger.warning("Gmail service not enabled, skipping email sync")
-            return
-        
-        try:
-            # Get recent emails
-            emails = self.gmail_service.list_recent_emails(
-                max_results=max_results,
-                since_minutes=since_minutes
-            )
-            
-            if not emails:
-                logger.info("No recent emails to sync")
-                return
-            
-            synced_count = 0
-            
-            for email_data in emails:
-                try:
-                    # Extract email details
-                    subject = email_data.get('subject', 'No Subject')
-                    sender = self.extract_email_address(email_data.get('from', ''))
-                    recipient = self.extract_email_address(email_data.get('to', ''))
-                    date = email_data.get('date')
-                    message_id = email_data.get('message_id')
-                    gmail_url = f"https://mail.google.com/mail/u/0/#inbox/{message_id}"
-                    
-                    # Skip if we've already logged this email
-                    from models import ActivityLog
-                    existing = db.query(ActivityLog).filter(
-                        ActivityLog.activity_type == "email",
-                        ActivityLog.extra_data.like(f'%{message_id}%')
-                    ).first()
-                    
-                    if existing:
-                        logger.debug(f"Email already synced: {subject}")
-                        continue
-                    
-                    # Find related contact (check both sender and recipient)
-                    contact = self.find_contact_by_email(db, sender)
-                    if not contact:
-                        contact = self.find_contact_by_email(db, recipient)
-                    
-                    # Find related deal if contact exists
-                    deal_id = None
-                    if contact:
-                        deal = self.find_deal_by_contact(db, contact.id)
-                        deal_id = deal.id if deal else None
-                    
-                    # Log the email activity
-                    ActivityLogger.log_email(
-                        db=db,
-                        subject=subject,
-                        sender=sender,
-                        recipient=recipient,
-                        contact_id=contact.id if contact else None,
-                        deal_id=deal_id,
-                        email_url=gmail_url,
-                        metadata={
-                            "message_id": message_id,
-                            "date": date.isoformat() if date else None,
-                            "snippet": email_data.get('snippet', '')[:200]
-                        }
-                    )
-                    
-                    synced_count += 1
-                    logger.info(f"Synced email: {subject}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing email: {e}")
-                    continue
-            
-            logger.info(f"Successfully synced {synced_count} emails")
-            
-        except Exception as e:
-            logger.error(f"Error syncing emails: {e}")
-    
-    def sync_emails_for_contact(self, db: Session, contact_id: int, max_results: int = 20):
+            return 0
+
+        synced_count = 0
+        for user_email in self.gmail_service.user_emails:
+            try:
+                synced_count += self._sync_mailbox(db, user_email, max_results, since_minutes)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error syncing emails for {user_email}: {e}")
+
+        logger.info(f"Successfully synced {synced_count} emails")
+        return synced_count
+
+    def sync_emails_for_contact(self, db: Session, contact_id: int, max_results: int = 20) -> int:
         """
         Sync all emails for a specific contact
-        
+
         Args:
             db: Database session
             contact_id: ID of contact to sync emails for
-            max_results: Maximum number of emails to fetch
+            max_results: Maximum number of emails to fetch per mailbox
         """
         try:
             contact = db.query(Contact).filter(Contact.id == contact_id).first()
             if not contact or not contact.email:
                 logger.warning(f"Contact {contact_id} not found or has no email")
-                return
-            
+                return 0
+
             # Search for emails with this contact's email
             query = f"from:{contact.email} OR to:{contact.email}"
-            emails = self.gmail_service.search_emails(query=query, max_results=max_results)
-            
-            if not emails:
-                logger.info(f"No emails found for contact: {contact.email}")
-                return
-            
             synced_count = 0
-            for email_data in emails:
-                try:
-                    subject = email_data.get('subject', 'No Subject')
-                    sender = self.extract_email_address(email_data.get('from', ''))
-                    recipient = self.extract_email_address(email_data.get('to', ''))
-                    date = email_data.get('date')
-                    message_id = email_data.get('message_id')
-                    gmail_url = f"https://mail.google.com/mail/u/0/#inbox/{message_id}"
-                    
-                    # Skip if already logged
-                    from models import ActivityLog
-                    existing = db.query(ActivityLog).filter(
-                        ActivityLog.activity_type == "email",
-                        ActivityLog.extra_data.like(f'%{message_id}%')
-                    ).first()
-                    
-                    if existing:
-                        continue
-                    
-                    # Find related deal
-                    deal = self.find_deal_by_contact(db, contact_id)
-                    
-                    # Log the email
-                    ActivityLogger.log_email(
-                        db=db,
-                        subject=subject,
-                        sender=sender,
-                        recipient=recipient,
-                        contact_id=contact_id,
-                        deal_id=deal.id if deal else None,
-                        email_url=gmail_url,
-                        metadata={
-                            "message_id": message_id,
-                            "date": date.isoformat() if date else None
-                        }
-                    )
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing email for contact: {e}")
+            for user_email in self.gmail_service.user_emails:
+                service = self.gmail_service._get_service_for_user(user_email)
+                if service is None:
                     continue
-            
+                message_ids = list_message_ids(service, query, max_results)
+                try:
+                    messages = fetch_metadata(service, message_ids)
+                except MetadataFetchFailed as e:
+                    logger.warning(f"Syncing emails for contact {contact_id}: {e}")
+                    messages = e.messages
+                synced_count += self.log_messages(db, messages, contact=contact)
+
             logger.info(f"Synced {synced_count} emails for contact {contact.name}")
-            
+            return synced_count
+
         except Exception as e:
+            db.rollback()
             logger.error(f"Error syncing emails for contact: {e}")
+            return 0
 
 
 def sync_gmail_activities_job():
     """Background job to sync Gmail activities"""
+    db = None
     try:
         db = next(get_db())
         syncer = GmailActivitySync()
@@ -214,5 +265,5 @@ def sync_gmail_activities_job():
     except Exception as e:
         logger.error(f"Error in Gmail sync job: {e}")
     finally:
-        db.close()
-
+        if db is not None:
+            db.close()
@@ -0,0 +1,172 @@
+"""
+Incremental Gmail reads for the CRM activity sync.
+
+Instead of listing the last N minutes of mail on every run, each mailbox keeps
+the historyId it last processed; users.history.list then returns only the
+messages added since. Message metadata (headers + snippet, never bodies) is
+fetched with batch HTTP requests, up to 50 messages per round trip; entries
+Gmail rejects (often 429 when a batch is too concurrent) are retried.
+
+Works on a googleapiclient Gmail service object; no database dependency.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import getaddresses
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_LIMIT = 50  # Gmail's recommended maximum requests per batch
+HISTORY_PAGE_SIZE = 500
+METADATA_HEADERS = ["From", "To", "Cc", "Subject", "Date"]
+SKIPPED_LABELS = {"DRAFT", "SPAM", "TRASH", "CHAT"}
+RETRY_DELAYS = (1.0, 2.0, 4.0)  # seconds before each retry of failed batch entries
+
+
+class HistoryExpired(Exception):
+    """The stored historyId is too old (Gmail keeps roughly a week of history)."""
+
+
+class MetadataFetchFailed(Exception):
+    """Some messages could not be fetched even after retrying."""
+
+    def __init__(self, messages: List[Dict[str, Any]], errors: Dict[str, Exception]):
+        super().__init__(f"{len(errors)} Gmail messages could not be fetched: {next(iter(errors.values()))}")
+        self.messages = messages  # The ones that were fetched, in order
+        self.errors = errors
+
+
+def _status(error: Exception) -> Optional[int]:
+    return getattr(getattr(error, "resp", None), "status", None)
+
+
+def extract_addresses(value: Optional[str]) -> List[str]:
+    """Lower-cased addresses from a header such as 'A <a@x.com>, b@y.com'."""
+    return [addr.strip().lower() for _, addr in getaddresses([value or ""]) if "@" in addr]
+
+
+def parse_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a format=metadata message into the fields the activity sync logs."""
+    headers = {h["name"].lower(): h.get("value", "") for h in message.get("payload", {}).get("headers", [])}
+    senders = extract_addresses(headers.get("from"))
+    date = None
+    if message.get("internalDate"):
+        date = datetime.fromtimestamp(int(message["internalDate"]) / 1000, tz=timezone.utc).replace(tzinfo=None)
+    return {
+        "message_id": message["id"],
+        "thread_id": message.get("threadId"),
+        "subject": headers.get("subject") or "No Subject",
+        "from": senders[0] if senders else "",
+        "to": extract_addresses(headers.get("to")) + extract_addresses(headers.get("cc")),
+        "date": date,
+        "snippet": message.get("snippet", ""),
+        "label_ids": message.get("labelIds", []),
+    }
+
+
+def current_history_id(service) -> str:
+    return str(service.users().getProfile(userId="me").execute()["historyId"])
+
+
+def list_history(service, start_history_id: str) -> Tuple[List[str], str]:
+    """
+    IDs of messages added since start_history_id, oldest first, and the
+    historyId to resume from next time. Raises HistoryExpired when Gmail no
+    longer has history that far back.
+    """
+    message_ids: List[str] = []
+    seen = set()
+    history_id = start_history_id
+    page_token = None
+    while True:
+        params = {
+            "userId": "me",
+            "startHistoryId": start_history_id,
+            "historyTypes": ["messageAdded"],
+            "maxResults": HISTORY_PAGE_SIZE,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        try:
+            result = service.users().history().list(**params).execute()
+        except Exception as e:
+            if _status(e) == 404:
+                raise HistoryExpired(str(e)) from e
+            raise
+
+        for record in result.get("history", []):
+            for added in record.get("messagesAdded", []):
+                message = added.get("message", {})
+                if SKIPPED_LABELS.intersection(message.get("labelIds", [])):
+                    continue
+                if message.get("id") and message["id"] not in seen:
+                    seen.add(message["id"])
+                    message_ids.append(message["id"])
+
+        history_id = str(result.get("historyId") or history_id)
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return message_ids, history_id
+
+
+def list_message_ids(service, query: str, max_results: int) -> List[str]:
+    """Message IDs matching a Gmail search, newest first, capped at max_results."""
+    message_ids: List[str] = []
+    page_token = None
+    while len(message_ids) < max_results:
+        params = {"userId": "me", "q": query, "maxResults": min(500, max_results - len(message_ids))}
+        if page_token:
+            params["pageToken"] = page_token
+        result = service.users().messages().list(**params).execute()
+        message_ids.extend(m["id"] for m in result.get("messages", []))
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+    return message_ids[:max_results]
+
+
+def fetch_metadata(service, message_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parsed metadata for each message, in the given order, via batch requests.
+
+    Messages that no longer exist (404, e.g. deleted since the history entry)
+    are skipped. Other failures - typically 429 "too many concurrent
+    requests" or 5xx on some batch entries - are retried with backoff; if any
+    still fail, MetadataFetchFailed carries what was fetched.
+    """
+    fetched: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, Exception] = {}
+
+    def on_response(request_id, response, exception):
+        if exception is None:
+            fetched[request_id] = parse_message(response)
+        elif _status(exception) == 404:
+            logger.info(f"Gmail message {request_id} no longer exists, skipping")
+        else:
+            failed[request_id] = exception
+
+    pending = list(message_ids)
+    for delay in (*RETRY_DELAYS, None):
+        for start in range(0, len(pending), BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=on_response)
+            for message_id in pending[start:start + BATCH_LIMIT]:
+                batch.add(
+                    service.users().messages().get(
+                        userId="me", id=message_id, format="metadata", metadataHeaders=METADATA_HEADERS
+                    ),
+                    request_id=message_id,
+                )
+            batch.execute()
+
+        pending = [m for m in pending if m in failed]
+        if not pending or delay is None:
+            break
+        logger.warning(f"Gmail metadata fetch failed for {len(pending)} messages, retrying in {delay}s")
+        failed.clear()
+        time.sleep(delay)
+
+    messages = [fetched[m] for m in message_ids if m in fetched]
+    if pending:
+        raise MetadataFetchFailed(messages, {m: failed[m] for m in pending})
+    return messages
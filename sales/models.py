@@ -7,10 +7,12 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -207,6 +209,9 @@ class Contact(Base):
             "wellsky_patient_id": self.wellsky_patient_id,
         }
 
+# Case-insensitive email lookups (Gmail sync resolves a batch of addresses in one IN query)
+contacts_email_lower_idx = Index("ix_contacts_email_lower", func.lower(Contact.email))
+
 class FinancialEntry(Base):
     """Financial tracking entries from daily summary data"""
     __tablename__ = "financial_entries"
@@ -569,6 +574,21 @@ class ActivityLog(Base):
 
         return result
 
+
+def activity_display_time():
+    """SQL for ActivityLog.display_time, the timeline's sort key."""
+    return func.coalesce(ActivityLog.occurred_at, ActivityLog.created_at)
+
+
+# Timeline indexes: one per entity so each branch of the timeline UNION is an
+# index range scan in (display time, id) order; plus one for the unfiltered feed
+activity_timeline_indexes = (
+    Index("ix_activity_logs_timeline", activity_display_time().desc(), ActivityLog.id.desc()),
+    Index("ix_activity_logs_contact_timeline", ActivityLog.contact_id, activity_display_time().desc(), ActivityLog.id.desc()),
+    Index("ix_activity_logs_company_timeline", ActivityLog.company_id, activity_display_time().desc(), ActivityLog.id.desc()),
+    Index("ix_activity_logs_deal_timeline", ActivityLog.deal_id, activity_display_time().desc(), ActivityLog.id.desc()),
+)
+
 # ============================================================================
 # Lead Pipeline Models (CRM Features)
 # ============================================================================
@@ -957,3 +977,36 @@ class ProcessedDriveFile(Base):
             "result_id": self.result_id,
             "error_message": self.error_message
         }
+
+
+class GmailSyncState(Base):
+    """Per-mailbox Gmail history cursor so each activity sync only reads new mail"""
+    __tablename__ = "gmail_sync_state"
+
+    user_email = Column(String(255), primary_key=True)
+    history_id = Column(String(32), nullable=True)  # Gmail historyId of the last processed change
+    last_synced_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BrevoContactSyncState(Base):
+    """Hash of what was last imported to Brevo per contact and list, so pushes only send changes"""
+    __tablename__ = "brevo_contact_sync_state"
+
+    list_id = Column(Integer, primary_key=True, autoincrement=False)  # 0 = pushed without a list
+    email = Column(String(255), primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    synced_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BrevoSyncCursor(Base):
+    """modifiedSince cursor per Brevo pull feed (all contacts, a list, ...)"""
+    __tablename__ = "brevo_sync_cursors"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(String(64), nullable=True)  # ISO 8601 UTC timestamp as Brevo expects
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Indexes on tables that predate them; create_all() only creates indexes with new tables
+POST_CREATE_INDEXES = (contacts_email_lower_idx, *activity_timeline_indexes)
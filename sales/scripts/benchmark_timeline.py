@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/timeline paging on a referral source with many activities.
+
+Seeds a throwaway SQLite database (or --database-url) with one referral
+source, a few of its contacts and deals, and --rows activities spread across
+them, then times get_timeline at increasing page depths, walking there with
+offset paging and with keyset cursors. Cursor latency should stay flat as the
+page number grows; offset latency grows with it.
+
+    python scripts/benchmark_timeline.py --rows 50000 --pages 1,10,100,500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import ActivityLog, Base, Contact, Deal, ReferralSource
+from services.activity_service import get_timeline, timeline_totals
+
+
+def seed(db, rows):
+    company = ReferralSource(name="Benchmark Hospital")
+    db.add(company)
+    db.flush()
+    contacts = [Contact(name=f"Contact {i}", email=f"c{i}@bench.test", company_id=company.id) for i in range(20)]
+    deals = [Deal(name=f"Deal {i}", company_id=company.id) for i in range(5)]
+    db.add_all(contacts + deals)
+    db.flush()
+
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=3 * 365)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "activity_type": rng.choice(["note", "email_sent", "call_outbound", "visit"]),
+            "title": f"Activity {i}",
+            "contact_id": rng.choice(contacts).id,
+            "company_id": company.id if rng.random() < 0.7 else None,
+            "deal_id": rng.choice(deals).id if rng.random() < 0.2 else None,
+            "occurred_at": start + timedelta(minutes=rng.randrange(3 * 365 * 24 * 60)),
+        })
+        if len(batch) == 5000:
+            db.bulk_insert_mappings(ActivityLog, batch)
+            batch = []
+    if batch:
+        db.bulk_insert_mappings(ActivityLog, batch)
+    db.commit()
+    return company.id, contacts[0].id
+
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", default="1,10,100,500")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)  # New tables get the timeline indexes too
+    db = sessionmaker(bind=engine)()
+
+    print(f"Seeding {args.rows} activities...")
+    company_id, contact_id = seed(db, args.rows)
+    filters = {"company_id": company_id, "contact_id": contact_id}
+
+    pages = sorted(int(p) for p in args.pages.split(","))
+    cursors = {1: None}
+    cursor, page = None, 1
+    while page < pages[-1]:
+        cursor = get_timeline(db, limit=args.limit, cursor=cursor, **filters)["next_cursor"]
+        if cursor is None:
+            break
+        page += 1
+        cursors[page] = cursor
+
+    print(f"{'page':>6} {'offset ms':>10} {'cursor ms':>10}")
+    for page in pages:
+        if page not in cursors:
+            print(f"{page:>6} {'(past the end)':>21}")
+            continue
+        offset_ms, by_offset = time_call(
+            lambda: get_timeline(db, limit=args.limit, offset=(page - 1) * args.limit, **filters), args.repeat
+        )
+        cursor_ms, by_cursor = time_call(
+            lambda: get_timeline(db, limit=args.limit, cursor=cursors[page], **filters), args.repeat
+        )
+        assert [a["id"] for a in by_offset["timeline"]] == [a["id"] for a in by_cursor["timeline"]]
+        print(f"{page:>6} {offset_ms:>10.1f} {cursor_ms:>10.1f}")
+
+    timeline_totals.invalidate()
+    started = time.perf_counter()
+    total = get_timeline(db, limit=args.limit, **filters)["total"]
+    print(f"\nUncached total ({total} rows) took {(time.perf_counter() - started) * 1000:.1f} ms; later pages reuse it")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
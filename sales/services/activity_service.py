@@ -11,10 +11,14 @@ Handles:
 import json
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select, tuple_, union
 
-from models import ActivityLog, Contact, Deal, ReferralSource, DealStageHistory, DealContact
+from activity_timeline import TotalCache, decode_cursor, group_by_day, page_size, split_page
+from models import ActivityLog, Contact, Deal, ReferralSource, DealStageHistory, DealContact, activity_display_time
+
+# Timeline totals by filter set; log_activity drops the ones it changes
+timeline_totals = TotalCache()
 
 
 # Activity type constants
@@ -112,6 +116,7 @@ def log_activity(
         })
 
     db.flush()  # Get the ID
+    timeline_totals.invalidate([("contact", contact_id), ("company", company_id), ("deal", deal_id)])
     return activity
 
 
@@ -171,6 +176,49 @@ def update_deal_stage(
     return history
 
 
+def _timeline_branches(
+    contact_id: int = None,
+    company_id: int = None,
+    deal_id: int = None,
+    conditions: List[Any] = (),
+    limit: int = None,
+):
+    """
+    One (id, display_time) select per entity filter, newest first.
+
+    An OR across contact_id/company_id/deal_id can't use a single index, so
+    each entity gets its own branch backed by its own timeline index and the
+    caller UNIONs them. Without an entity filter there is a single branch.
+    """
+    display_time = activity_display_time()
+    entity_filters = [
+        column == value
+        for column, value in (
+            (ActivityLog.contact_id, contact_id),
+            (ActivityLog.company_id, company_id),
+            (ActivityLog.deal_id, deal_id),
+        )
+        if value
+    ] or [None]
+
+    branches = []
+    for entity_filter in entity_filters:
+        branch = select(ActivityLog.id.label("id"), display_time.label("display_time"))
+        filters = [f for f in (entity_filter, *conditions) if f is not None]
+        if filters:
+            branch = branch.where(*filters)
+        if limit is not None:
+            # Wrapped so the per-branch ORDER BY/LIMIT is valid inside a UNION
+            branch = branch.order_by(display_time.desc(), ActivityLog.id.desc()).limit(limit).subquery()
+            branch = select(branch.c.id, branch.c.display_time)
+        branches.append(branch)
+    return branches
+
+
+def _combine(branches):
+    return (branches[0] if len(branches) == 1 else union(*branches)).subquery()
+
+
 def get_timeline(
     db: Session,
     contact_id: int = None,
@@ -181,10 +229,16 @@ def get_timeline(
     end_date: datetime = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str = None,
 ) -> Dict[str, Any]:
     """
     Get unified timeline for an entity.
 
+    Activities are ordered newest first by display time (occurred_at, else
+    created_at) and id. Pass the returned next_cursor back as cursor to get
+    the next page; that costs the same on page 500 as on page 1. offset
+    paging still works for older callers. total is cached for a minute.
+
     Args:
         db: Database session
         contact_id: Filter by contact
@@ -194,54 +248,70 @@ def get_timeline(
         start_date: Start of date range
         end_date: End of date range
         limit: Max records to return
-        offset: Pagination offset
+        offset: Pagination offset (ignored when a cursor is given)
+        cursor: Keyset cursor from a previous page's next_cursor
 
     Returns:
         Dict with timeline items and metadata
-    """
-    query = db.query(ActivityLog)
-
-    # Build filters
-    filters = []
-    if contact_id:
-        filters.append(ActivityLog.contact_id == contact_id)
-    if company_id:
-        filters.append(ActivityLog.company_id == company_id)
-    if deal_id:
-        filters.append(ActivityLog.deal_id == deal_id)
 
-    if filters:
-        query = query.filter(or_(*filters))
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    limit = page_size(limit)
+    offset = 0 if cursor else max(offset or 0, 0)
+    display_time = activity_display_time()
 
+    conditions = []
     if activity_types:
-        query = query.filter(ActivityLog.activity_type.in_(activity_types))
-
+        conditions.append(ActivityLog.activity_type.in_(activity_types))
     if start_date:
-        query = query.filter(ActivityLog.occurred_at >= start_date)
+        conditions.append(display_time >= start_date)
     if end_date:
-        query = query.filter(ActivityLog.occurred_at <= end_date)
-
-    # Get total count
-    total = query.count()
-
-    # Get paginated results
-    activities = query.order_by(desc(ActivityLog.occurred_at)).offset(offset).limit(limit).all()
-
-    # Group by date for display
-    grouped = {}
-    for activity in activities:
-        date_key = activity.display_time.date().isoformat() if activity.display_time else "Unknown"
-        if date_key not in grouped:
-            grouped[date_key] = []
-        grouped[date_key].append(activity.to_dict())
-
+        conditions.append(display_time <= end_date)
+
+    # Total for these filters, cached so paging doesn't re-count every time
+    total_key = (
+        frozenset((e, i) for e, i in (("contact", contact_id), ("company", company_id), ("deal", deal_id)) if i),
+        tuple(sorted(activity_types)) if activity_types else None,
+        start_date,
+        end_date,
+    )
+    total = timeline_totals.get(total_key, lambda: db.execute(
+        select(func.count()).select_from(_combine(_timeline_branches(contact_id, company_id, deal_id, conditions)))
+    ).scalar() or 0)
+
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor)
+        conditions.append(tuple_(display_time, ActivityLog.id) < tuple_(cursor_time, cursor_id))
+
+    # Each branch needs at most offset + limit + 1 rows; the extra row tells
+    # whether there is another page
+    page = _combine(_timeline_branches(contact_id, company_id, deal_id, conditions, offset + limit + 1))
+    ids = [row.id for row in db.execute(
+        select(page.c.id)
+        .order_by(page.c.display_time.desc(), page.c.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
+    )]
+
+    by_id = {
+        a.id: a for a in db.query(ActivityLog).options(
+            joinedload(ActivityLog.contact).load_only(Contact.name),
+            joinedload(ActivityLog.company).load_only(ReferralSource.name),
+            joinedload(ActivityLog.deal).load_only(Deal.name),
+        ).filter(ActivityLog.id.in_(ids)).all()
+    } if ids else {}
+    activities, next_cursor = split_page([by_id[i] for i in ids if i in by_id], limit)
+
+    timeline = [a.to_dict() for a in activities]
     return {
-        "timeline": [a.to_dict() for a in activities],
-        "grouped": grouped,
+        "timeline": timeline,
+        "grouped": group_by_day(timeline),
         "total": total,
         "limit": limit,
         "offset": offset,
-        "has_more": offset + limit < total,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
     }
 
 
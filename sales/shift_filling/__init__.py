@@ -10,6 +10,7 @@ This module provides automated shift filling capabilities:
 """
 
 from .engine import ShiftFillingEngine, shift_filling_engine
+from .campaign_timers import CampaignStore, DeadlineQueue, InvalidCampaignTransition
 from .matcher import CaregiverMatcher
 from .models import Shift, Caregiver, Client, ShiftOutreach, CaregiverOutreach, OutreachStatus
 from .sms_service import SMSService, sms_service
@@ -18,6 +19,9 @@ from .wellsky_mock import wellsky_mock
 __all__ = [
     'ShiftFillingEngine',
     'shift_filling_engine',
+    'CampaignStore',
+    'DeadlineQueue',
+    'InvalidCampaignTransition',
     'CaregiverMatcher',
     'Shift',
     'Caregiver',
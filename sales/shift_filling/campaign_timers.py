@@ -0,0 +1,324 @@
+"""
+Campaign lifecycle for the Shift Filling Engine
+
+- Explicit state machine for ShiftOutreach.status (allowed transitions only)
+- DeadlineQueue: a heap of per-campaign deadlines (SMS timeout/escalation,
+  voice follow-up, shift-end expiry) so each one fires at its own time
+  instead of every campaign being rescanned on a polling interval
+- Phone index helpers so inbound replies map straight to an outreach
+- CampaignStore: PostgreSQL persistence so in-flight campaigns survive restarts
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import CaregiverResponseType, OutreachStatus, ShiftOutreach
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# State machine
+# =============================================================================
+
+CAMPAIGN_TRANSITIONS: Dict[OutreachStatus, Tuple[OutreachStatus, ...]] = {
+    OutreachStatus.PENDING: (
+        OutreachStatus.IN_PROGRESS, OutreachStatus.ESCALATED, OutreachStatus.CANCELLED,
+    ),
+    OutreachStatus.IN_PROGRESS: (
+        OutreachStatus.FILLED, OutreachStatus.ESCALATED,
+        OutreachStatus.CANCELLED, OutreachStatus.EXPIRED,
+    ),
+    # A late YES after escalation can still fill the shift
+    OutreachStatus.ESCALATED: (
+        OutreachStatus.FILLED, OutreachStatus.CANCELLED, OutreachStatus.EXPIRED,
+    ),
+    OutreachStatus.FILLED: (),
+    OutreachStatus.CANCELLED: (),
+    OutreachStatus.EXPIRED: (),
+}
+
+# Campaigns still reaching out (timeout and voice follow-up deadlines armed)
+OPEN_STATUSES = (OutreachStatus.PENDING, OutreachStatus.IN_PROGRESS)
+
+# Campaigns still accepting SMS/voice replies through the phone index; an
+# escalated campaign stays here until a late YES fills it or the shift ends
+REPLYABLE_STATUSES = OPEN_STATUSES + (OutreachStatus.ESCALATED,)
+
+
+class InvalidCampaignTransition(ValueError):
+    """Raised when a campaign is moved to a status its current status can't reach."""
+    pass
+
+
+def can_transition(current: OutreachStatus, new: OutreachStatus) -> bool:
+    return new == current or new in CAMPAIGN_TRANSITIONS.get(current, ())
+
+
+def check_transition(campaign: ShiftOutreach, new: OutreachStatus) -> None:
+    if not can_transition(campaign.status, new):
+        raise InvalidCampaignTransition(
+            f"Campaign {campaign.id}: {campaign.status.value} -> {new.value} not allowed"
+        )
+
+
+def clean_phone(phone: str) -> str:
+    """Last 10 digits of a phone number (the key used everywhere in shift filling)."""
+    return re.sub(r'[^\d]', '', phone or "")[-10:]
+
+
+# =============================================================================
+# Deadlines
+# =============================================================================
+
+DEADLINE_TIMEOUT = "timeout"   # SMS window over -> escalate if nobody accepted
+DEADLINE_VOICE = "voice"       # no SMS reply -> voice follow-up call
+DEADLINE_EXPIRE = "expire"     # shift has ended -> campaign expires
+
+
+@dataclass(order=True)
+class Deadline:
+    fire_at: datetime
+    seq: int
+    kind: str = field(compare=False)
+    campaign_id: str = field(compare=False)
+    outreach_id: Optional[str] = field(default=None, compare=False)
+
+    @property
+    def key(self) -> Tuple[str, str, Optional[str]]:
+        return (self.kind, self.campaign_id, self.outreach_id)
+
+
+class DeadlineQueue:
+    """
+    Min-heap of campaign deadlines.
+
+    Rescheduling or cancelling is lazy: the live sequence number per key is
+    tracked, and stale heap entries are dropped when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap: List[Deadline] = []
+        self._live: Dict[Tuple[str, str, Optional[str]], int] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def schedule(
+        self,
+        kind: str,
+        fire_at: datetime,
+        campaign_id: str,
+        outreach_id: Optional[str] = None,
+    ) -> Deadline:
+        """Add (or move) the deadline for (kind, campaign, outreach)."""
+        deadline = Deadline(fire_at, next(self._seq), kind, campaign_id, outreach_id)
+        with self._lock:
+            self._live[deadline.key] = deadline.seq
+            heapq.heappush(self._heap, deadline)
+        return deadline
+
+    def cancel(self, kind: str, campaign_id: str, outreach_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._live.pop((kind, campaign_id, outreach_id), None)
+
+    def cancel_campaign(self, campaign_id: str) -> None:
+        """Cancel every pending deadline for a campaign."""
+        with self._lock:
+            for key in [k for k in self._live if k[1] == campaign_id]:
+                del self._live[key]
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._live.get(self._heap[0].key) != self._heap[0].seq:
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now: datetime) -> List[Deadline]:
+        """Remove and return every live deadline at or before ``now``, earliest first."""
+        due = []
+        with self._lock:
+            self._drop_stale()
+            while self._heap and self._heap[0].fire_at <= now:
+                deadline = heapq.heappop(self._heap)
+                del self._live[deadline.key]
+                due.append(deadline)
+                self._drop_stale()
+        return due
+
+    def next_fire_at(self) -> Optional[datetime]:
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0].fire_at if self._heap else None
+
+    def pending(self, campaign_id: str = None) -> List[Deadline]:
+        """Live deadlines (optionally for one campaign), earliest first."""
+        with self._lock:
+            live = [
+                d for d in self._heap
+                if self._live.get(d.key) == d.seq
+                and (campaign_id is None or d.campaign_id == campaign_id)
+            ]
+        return sorted(live)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._live)
+
+
+# =============================================================================
+# Persistence
+# =============================================================================
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _from_iso(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def campaign_state(campaign: ShiftOutreach) -> Dict[str, Any]:
+    """Serializable snapshot of a campaign (shift/caregivers stored by ID)."""
+    state = campaign.to_dict()
+    state.update({
+        "escalated_at": _iso(campaign.escalated_at),
+        "timeout_minutes": campaign.timeout_minutes,
+        "voice_delay_minutes": campaign.voice_delay_minutes,
+        "include_voice_calls": campaign.include_voice_calls,
+        "outreaches": [
+            {
+                "id": o.id,
+                "caregiver_id": o.caregiver_id,
+                "phone": o.phone,
+                "sent_at": _iso(o.sent_at),
+                "response_type": o.response_type.value,
+                "response_text": o.response_text,
+                "responded_at": _iso(o.responded_at),
+                "match_score": o.match_score,
+                "tier": o.tier,
+                "is_winner": o.is_winner,
+            }
+            for o in campaign.caregivers_contacted
+        ],
+        "pending_matches": [
+            {"caregiver_id": m.caregiver.id, "score": m.score, "tier": m.tier}
+            for m in getattr(campaign, "_pending_matches", [])
+        ],
+    })
+    return state
+
+
+def restore_campaign(state: Dict[str, Any], wellsky) -> Optional[ShiftOutreach]:
+    """Rebuild a ShiftOutreach from campaign_state() output, rehydrating from WellSky."""
+    from .matcher import MatchResult
+    from .models import CaregiverOutreach
+
+    shift = wellsky.get_shift(state["shift_id"])
+    if not shift:
+        logger.warning(f"Campaign {state['id']}: shift {state['shift_id']} no longer exists")
+        return None
+
+    campaign = ShiftOutreach(
+        id=state["id"],
+        shift_id=state["shift_id"],
+        shift=shift,
+        status=OutreachStatus(state["status"]),
+        created_at=_from_iso(state.get("created_at")) or datetime.now(),
+        started_at=_from_iso(state.get("started_at")),
+        completed_at=_from_iso(state.get("completed_at")),
+        total_responded=state.get("total_responded", 0),
+        total_accepted=state.get("total_accepted", 0),
+        total_declined=state.get("total_declined", 0),
+        winning_caregiver_id=state.get("winning_caregiver_id"),
+        escalated_at=_from_iso(state.get("escalated_at")),
+        escalation_reason=state.get("escalation_reason", ""),
+        timeout_minutes=state.get("timeout_minutes", 15),
+        voice_delay_minutes=state.get("voice_delay_minutes", 5),
+        include_voice_calls=state.get("include_voice_calls", False),
+    )
+    for item in state.get("outreaches", []):
+        caregiver = wellsky.get_caregiver(item["caregiver_id"])
+        campaign.add_caregiver_outreach(CaregiverOutreach(
+            id=item["id"],
+            caregiver_id=item["caregiver_id"],
+            caregiver=caregiver,
+            phone=item["phone"],
+            sent_at=_from_iso(item.get("sent_at")),
+            response_type=CaregiverResponseType(item.get("response_type", "no_response")),
+            response_text=item.get("response_text", ""),
+            responded_at=_from_iso(item.get("responded_at")),
+            match_score=item.get("match_score", 0.0),
+            tier=item.get("tier", 1),
+            is_winner=item.get("is_winner", False),
+        ))
+        if item.get("is_winner"):
+            campaign.winning_caregiver = caregiver
+
+    pending = []
+    for item in state.get("pending_matches", []):
+        caregiver = wellsky.get_caregiver(item["caregiver_id"])
+        if caregiver:
+            pending.append(MatchResult(caregiver, item["score"], item["tier"], []))
+    campaign._pending_matches = pending
+    return campaign
+
+
+class CampaignStore:
+    """
+    Persists campaign state to the shift_filling_campaigns table
+    (migrations/add_shift_filling_campaigns.sql).
+    """
+
+    def __init__(self, database_url: Optional[str] = None):
+        self.database_url = database_url or os.getenv("DATABASE_URL")
+        if not self.database_url:
+            raise ValueError("DATABASE_URL required for campaign persistence")
+
+    def save(self, campaign: ShiftOutreach) -> None:
+        import psycopg2
+
+        try:
+            conn = psycopg2.connect(self.database_url)
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    INSERT INTO shift_filling_campaigns (id, shift_id, status, state, updated_at)
+                    VALUES (%s, %s, %s, %s, NOW())
+                    ON CONFLICT (id) DO UPDATE SET
+                        status = EXCLUDED.status, state = EXCLUDED.state, updated_at = NOW()
+                """,
+                    (campaign.id, campaign.shift_id, campaign.status.value,
+                     json.dumps(campaign_state(campaign))),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Could not persist campaign {campaign.id}: {e}")
+
+    def load_open(self) -> List[Dict[str, Any]]:
+        """State dicts for campaigns that could still take replies when the process stopped."""
+        import psycopg2
+
+        try:
+            conn = psycopg2.connect(self.database_url)
+            try:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT state FROM shift_filling_campaigns WHERE status = ANY(%s) ORDER BY updated_at",
+                    ([s.value for s in REPLYABLE_STATUSES],),
+                )
+                rows = cur.fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Could not load persisted campaigns: {e}")
+            return []
+        return [row[0] if isinstance(row[0], dict) else json.loads(row[0]) for row in rows]
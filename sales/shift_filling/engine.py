@@ -7,12 +7,18 @@ Coordinates the entire shift filling process:
 3. Sends parallel SMS outreach
 4. Handles responses and selects winner
 5. Assigns shift and notifies all parties
+
+Campaign timeouts, voice follow-ups and expiry are deadlines in a
+DeadlineQueue (see campaign_timers.py). start_deadline_runner() fires each
+one at its due time; check_campaign_timeouts()/check_voice_followups() run
+whatever is already due for callers that still poll.
 """
 
 import os
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Tuple
 
 from .models import (
     Shift, Caregiver, Client, ShiftOutreach, CaregiverOutreach,
@@ -21,11 +27,18 @@ from .models import (
 from .matcher import CaregiverMatcher, MatchResult
 from .sms_service import sms_service, SMSService
 from .db_lock import ShiftAssignmentLock, ShiftLockConflictError, ShiftLockDatabaseError
+from .campaign_timers import (
+    DEADLINE_EXPIRE, DEADLINE_TIMEOUT, DEADLINE_VOICE, OPEN_STATUSES, REPLYABLE_STATUSES,
+    CampaignStore, DeadlineQueue, check_transition, clean_phone, restore_campaign,
+)
 
 logger = logging.getLogger(__name__)
 
 VOICE_OUTREACH_ENABLED = os.getenv("VOICE_OUTREACH_ENABLED", "false").lower() == "true"
 
+# Upper bound on how long the deadline runner sleeps between checks
+DEADLINE_RUNNER_MAX_SLEEP_SECONDS = 60
+
 
 class ShiftFillingEngine:
     """
@@ -40,7 +53,8 @@ class ShiftFillingEngine:
         wellsky_service=None,
         sms_service: SMSService = None,
         on_shift_filled: Callable = None,
-        on_escalation: Callable = None
+        on_escalation: Callable = None,
+        campaign_store: CampaignStore = None
     ):
         """
         Initialize the shift filling engine.
@@ -50,6 +64,8 @@ class ShiftFillingEngine:
             sms_service: SMS service for outreach
             on_shift_filled: Callback when shift is successfully filled
             on_escalation: Callback when shift needs manual intervention
+            campaign_store: Persistence for campaign state (defaults to
+                CampaignStore() when DATABASE_URL is set)
         """
         if wellsky_service is None:
             from .wellsky_mock import wellsky_mock
@@ -79,8 +95,23 @@ class ShiftFillingEngine:
             except ImportError:
                 logger.info("Voice outreach service not available")
 
-        # Voice follow-up queue: outreach_id -> {sent_at, caregiver, shift, campaign_id, language}
-        self.voice_followup_queue: Dict[str, Dict] = {}
+        # Timeout / voice follow-up / expiry deadlines for every open campaign
+        self.deadlines = DeadlineQueue()
+
+        # Inbound reply routing: last-10-digit phone -> {campaign_id: outreach_id}
+        self._phone_index: Dict[str, Dict[str, str]] = {}
+        self._outreach_index: Dict[str, CaregiverOutreach] = {}
+
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._runner: Optional[threading.Thread] = None
+
+        if campaign_store is None:
+            try:
+                campaign_store = CampaignStore()
+            except ValueError:
+                logger.info("Campaign persistence disabled (no DATABASE_URL)")
+        self.store = campaign_store
 
         # Database lock for preventing race conditions
         try:
@@ -155,9 +186,11 @@ class ShiftFillingEngine:
         # 4. Start parallel outreach
         self._initiate_outreach(campaign, matches)
 
-        # 5. Store campaign (with shift_id index for dedup)
+        # 5. Store campaign (with shift_id index for dedup) and arm its deadlines
         self.active_campaigns[campaign.id] = campaign
         self._shift_campaign_index[shift_id] = campaign.id
+        self._schedule_campaign_deadlines(campaign)
+        self._persist(campaign)
 
         logger.info(f"Calloff processed. Campaign {campaign.id} started with {campaign.total_contacted} caregivers")
         return campaign
@@ -195,19 +228,7 @@ class ShiftFillingEngine:
             outreach = self.sms.send_shift_offer(shift, match.caregiver)
             outreach.match_score = match.score
             outreach.tier = match.tier
-            campaign.add_caregiver_outreach(outreach)
-
-            # Queue voice follow-up if enabled
-            if (campaign.include_voice_calls
-                    and self.voice_service
-                    and self.voice_service.enabled):
-                self.voice_followup_queue[outreach.id] = {
-                    "sent_at": datetime.now(),
-                    "caregiver": match.caregiver,
-                    "shift": shift,
-                    "campaign_id": campaign.id,
-                    "language": getattr(match.caregiver, 'preferred_language', 'English'),
-                }
+            self._register_outreach(campaign, outreach)
 
         # Store remaining matches for potential second wave
         campaign._pending_matches = tier2_matches[10:] + tier3_matches
@@ -235,11 +256,14 @@ class ShiftFillingEngine:
             return {"success": False, "error": "Campaign not found"}
 
         # Find the matching outreach
-        outreach = None
-        for o in campaign.caregivers_contacted:
-            if self._phones_match(o.phone, phone):
-                outreach = o
-                break
+        outreach_id = self._phone_index.get(clean_phone(phone), {}).get(campaign_id)
+        outreach = self._outreach_index.get(outreach_id) if outreach_id else None
+        if outreach is None:
+            # Filled, cancelled and expired campaigns are dropped from the phone index
+            outreach = next(
+                (o for o in campaign.caregivers_contacted if self._phones_match(o.phone, phone)),
+                None
+            )
 
         if not outreach:
             logger.warning(f"No outreach found for phone {phone} in campaign {campaign_id}")
@@ -249,11 +273,14 @@ class ShiftFillingEngine:
         response_type = self.sms.parse_response(message_text)
 
         # Record the response
-        campaign.record_response(
-            caregiver_id=outreach.caregiver_id,
-            response_type=response_type,
-            response_text=message_text
-        )
+        with self._lock:
+            campaign.record_response(
+                caregiver_id=outreach.caregiver_id,
+                response_type=response_type,
+                response_text=message_text
+            )
+            self.deadlines.cancel(DEADLINE_VOICE, campaign.id, outreach.id)
+        self._persist(campaign)
 
         logger.info(f"Response from {outreach.caregiver.full_name}: {response_type.value}")
 
@@ -283,6 +310,14 @@ class ShiftFillingEngine:
         shift = campaign.shift
         caregiver = outreach.caregiver
 
+        if campaign.status in (OutreachStatus.CANCELLED, OutreachStatus.EXPIRED):
+            logger.info(f"Campaign {campaign.id} is {campaign.status.value}; ignoring acceptance")
+            return {
+                "success": False,
+                "action": "campaign_closed",
+                "message": f"Shift offer is no longer open ({campaign.status.value})"
+            }
+
         # Acquire database lock for this specific shift
         # This prevents race condition where two caregivers accept at the same time
         if self.shift_lock:
@@ -305,7 +340,7 @@ class ShiftFillingEngine:
                     logger.info(f"Lock acquired for shift {shift.id}, assigning to {caregiver.full_name}")
 
                     # 1. Mark winner in campaign
-                    campaign.mark_winner(caregiver.id)
+                    self._mark_filled(campaign, caregiver.id)
 
                     # 2. Assign in WellSky
                     self.wellsky.assign_shift(shift.id, caregiver.id)
@@ -365,7 +400,7 @@ class ShiftFillingEngine:
             }
 
         # First acceptance wins!
-        campaign.mark_winner(caregiver.id)
+        self._mark_filled(campaign, caregiver.id)
         self.wellsky.assign_shift(shift.id, caregiver.id)
         self.sms.send_confirmation(caregiver, shift)
 
@@ -412,8 +447,9 @@ class ShiftFillingEngine:
                     new_outreach = self.sms.send_shift_offer(campaign.shift, match.caregiver)
                     new_outreach.match_score = match.score
                     new_outreach.tier = match.tier
-                    campaign.add_caregiver_outreach(new_outreach)
+                    self._register_outreach(campaign, new_outreach)
                 campaign._pending_matches = campaign._pending_matches[5:]
+                self._persist(campaign)
 
         return {
             "success": True,
@@ -451,103 +487,278 @@ class ShiftFillingEngine:
     ) -> None:
         """Escalate a campaign that couldn't be filled automatically."""
 
-        campaign.status = OutreachStatus.ESCALATED
+        self._transition(campaign, OutreachStatus.ESCALATED)
         campaign.escalated_at = datetime.now()
         campaign.escalation_reason = reason
+        self._persist(campaign)
 
         logger.warning(f"Campaign {campaign.id} escalated: {reason}")
 
         if self.on_escalation:
             self.on_escalation(campaign)
 
-    def check_campaign_timeouts(self) -> List[ShiftOutreach]:
+    # =========================================================================
+    # Campaign lifecycle (state machine, indexes, deadlines, persistence)
+    # =========================================================================
+
+    def _transition(self, campaign: ShiftOutreach, new_status: OutreachStatus) -> None:
         """
-        Check for campaigns that have timed out.
+        Move a campaign to new_status (raises InvalidCampaignTransition).
 
-        Called periodically to escalate stale campaigns.
+        Leaving the open states cancels the timeout and voice deadlines.
+        ESCALATED keeps the phone index entries and the expiry deadline, so a
+        late YES can still fill the shift until it is over; the other states
+        are final and drop both.
+        """
+        with self._lock:
+            check_transition(campaign, new_status)
+            campaign.status = new_status
+            if new_status in OPEN_STATUSES:
+                return
+            self.deadlines.cancel(DEADLINE_TIMEOUT, campaign.id)
+            for outreach in campaign.caregivers_contacted:
+                self.deadlines.cancel(DEADLINE_VOICE, campaign.id, outreach.id)
+            if new_status in REPLYABLE_STATUSES:
+                return
+            self._unindex_campaign(campaign)
+            self.deadlines.cancel_campaign(campaign.id)
+            campaign.completed_at = campaign.completed_at or datetime.now()
+
+    def _mark_filled(self, campaign: ShiftOutreach, caregiver_id: str) -> None:
+        self._transition(campaign, OutreachStatus.FILLED)
+        campaign.mark_winner(caregiver_id)
+        self._persist(campaign)
+
+    def cancel_campaign(self, campaign_id: str) -> bool:
+        """Stop a campaign (e.g. the shift was filled outside Gigi)."""
+        campaign = self.active_campaigns.get(campaign_id)
+        if not campaign or campaign.status in (OutreachStatus.FILLED, OutreachStatus.CANCELLED):
+            return False
+        self._transition(campaign, OutreachStatus.CANCELLED)
+        self._persist(campaign)
+        return True
+
+    def _register_outreach(self, campaign: ShiftOutreach, outreach: CaregiverOutreach) -> None:
+        """Add an outreach to a campaign, index its phone and arm its voice follow-up."""
+        with self._lock:
+            campaign.add_caregiver_outreach(outreach)
+            self._index_outreach(campaign, outreach)
+            if (campaign.include_voice_calls
+                    and self.voice_service
+                    and self.voice_service.enabled):
+                self.deadlines.schedule(
+                    DEADLINE_VOICE,
+                    (outreach.sent_at or datetime.now()) + timedelta(minutes=campaign.voice_delay_minutes),
+                    campaign.id,
+                    outreach.id,
+                )
+                self._wake.set()
+
+    def _index_outreach(self, campaign: ShiftOutreach, outreach: CaregiverOutreach) -> None:
+        self._outreach_index[outreach.id] = outreach
+        phone = clean_phone(outreach.phone)
+        if phone:
+            self._phone_index.setdefault(phone, {})[campaign.id] = outreach.id
+
+    def _unindex_campaign(self, campaign: ShiftOutreach) -> None:
+        for outreach in campaign.caregivers_contacted:
+            self._outreach_index.pop(outreach.id, None)
+            entries = self._phone_index.get(clean_phone(outreach.phone))
+            if entries is not None:
+                entries.pop(campaign.id, None)
+                if not entries:
+                    del self._phone_index[clean_phone(outreach.phone)]
+
+    def _schedule_campaign_deadlines(self, campaign: ShiftOutreach) -> None:
+        started = campaign.started_at or campaign.created_at
+        with self._lock:
+            if campaign.status in OPEN_STATUSES:
+                self.deadlines.schedule(
+                    DEADLINE_TIMEOUT,
+                    started + timedelta(minutes=campaign.timeout_minutes),
+                    campaign.id,
+                )
+            if campaign.shift is not None:
+                ends_at = campaign.shift.end_datetime
+                if ends_at <= campaign.shift.start_datetime:  # overnight shift
+                    ends_at += timedelta(days=1)
+                self.deadlines.schedule(DEADLINE_EXPIRE, ends_at, campaign.id)
+        self._wake.set()
+
+    def _persist(self, campaign: ShiftOutreach) -> None:
+        if self.store is not None and campaign.id in self.active_campaigns:
+            self.store.save(campaign)
+
+    def find_outreach_by_phone(self, phone: str) -> Optional[Tuple[ShiftOutreach, CaregiverOutreach]]:
+        """
+        Find the open or escalated campaign/outreach a caregiver's reply belongs to.
 
         Returns:
-            List of escalated campaigns
+            (campaign, outreach) for the most recently started such campaign
+            that contacted this phone, or None
         """
-        escalated = []
-        now = datetime.now()
-
-        for campaign_id, campaign in list(self.active_campaigns.items()):
-            if campaign.status != OutreachStatus.IN_PROGRESS:
+        entries = self._phone_index.get(clean_phone(phone))
+        if not entries:
+            return None
+        candidates = [
+            (self.active_campaigns[cid], self._outreach_index[oid])
+            for cid, oid in entries.items()
+            if cid in self.active_campaigns and oid in self._outreach_index
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda c: c[0].started_at or c[0].created_at)
+
+    def restore_campaigns(self) -> int:
+        """Reload open and escalated campaigns from the store and re-arm their deadlines."""
+        if self.store is None:
+            return 0
+        restored = 0
+        for state in self.store.load_open():
+            if state.get("id") in self.active_campaigns:
                 continue
+            try:
+                campaign = restore_campaign(state, self.wellsky)
+            except Exception as e:
+                logger.error(f"Could not restore campaign {state.get('id')}: {e}")
+                continue
+            if campaign is None:
+                continue
+            with self._lock:
+                self.active_campaigns[campaign.id] = campaign
+                self._shift_campaign_index[campaign.shift_id] = campaign.id
+                for outreach in campaign.caregivers_contacted:
+                    self._index_outreach(campaign, outreach)
+                    if (campaign.include_voice_calls
+                            and outreach.response_type == CaregiverResponseType.NO_RESPONSE
+                            and self.voice_service
+                            and self.voice_service.enabled):
+                        self.deadlines.schedule(
+                            DEADLINE_VOICE,
+                            (outreach.sent_at or datetime.now()) + timedelta(minutes=campaign.voice_delay_minutes),
+                            campaign.id,
+                            outreach.id,
+                        )
+            self._schedule_campaign_deadlines(campaign)
+            restored += 1
+        if restored:
+            logger.info(f"Restored {restored} open/escalated shift filling campaigns")
+        return restored
+
+    def run_due_deadlines(self, now: datetime = None) -> List[Dict[str, Any]]:
+        """
+        Fire every deadline that is due.
 
-            # Check timeout
-            elapsed_minutes = (now - campaign.started_at).total_seconds() / 60
-            if elapsed_minutes > campaign.timeout_minutes:
-                # Check if anyone accepted
-                if campaign.total_accepted == 0:
-                    self._escalate_campaign(campaign, "Timeout - no acceptances")
-                    escalated.append(campaign)
+        Returns:
+            One dict per deadline that acted: {"kind", "campaign_id", ...}
+        """
+        now = now or datetime.now()
+        fired = []
+        for deadline in self.deadlines.pop_due(now):
+            campaign = self.active_campaigns.get(deadline.campaign_id)
+            if not campaign:
+                continue
+            try:
+                if deadline.kind == DEADLINE_TIMEOUT:
+                    if campaign.status == OutreachStatus.IN_PROGRESS and campaign.total_accepted == 0:
+                        self._escalate_campaign(campaign, "Timeout - no acceptances")
+                        fired.append({"kind": deadline.kind, "campaign_id": campaign.id,
+                                      "campaign": campaign})
+                elif deadline.kind == DEADLINE_VOICE:
+                    result = self._place_voice_followup(campaign, deadline.outreach_id)
+                    if result:
+                        fired.append({"kind": deadline.kind, "campaign_id": campaign.id, **result})
+                elif deadline.kind == DEADLINE_EXPIRE:
+                    if campaign.status in REPLYABLE_STATUSES:
+                        self._transition(campaign, OutreachStatus.EXPIRED)
+                        self._persist(campaign)
+                        fired.append({"kind": deadline.kind, "campaign_id": campaign.id})
+            except Exception as e:
+                logger.error(f"Deadline {deadline.kind} for campaign {campaign.id} failed: {e}")
+        return fired
+
+    def _place_voice_followup(self, campaign: ShiftOutreach, outreach_id: str) -> Optional[Dict[str, Any]]:
+        if not self.voice_service or not self.voice_service.enabled:
+            return None
+        if campaign.status != OutreachStatus.IN_PROGRESS:
+            return None
+        outreach = self._outreach_index.get(outreach_id)
+        if not outreach or outreach.response_type != CaregiverResponseType.NO_RESPONSE:
+            return None
 
-        return escalated
+        caregiver = outreach.caregiver
+        shift = campaign.shift
+        success, call_id = self.voice_service.create_shift_offer_call(
+            caregiver_phone=outreach.phone,
+            caregiver_name=caregiver.first_name if caregiver else "",
+            client_name=shift.client.first_name if shift.client else "a client",
+            shift_date=shift.date.strftime("%A, %B %d"),
+            shift_time=shift.to_display_time(),
+            shift_duration=shift.duration_hours,
+            campaign_id=campaign.id,
+            language=getattr(caregiver, 'preferred_language', 'English'),
+        )
 
-    def _phones_match(self, phone1: str, phone2: str) -> bool:
-        """Check if two phone numbers match (ignoring formatting)."""
-        import re
-        clean1 = re.sub(r'[^\d]', '', phone1)[-10:]
-        clean2 = re.sub(r'[^\d]', '', phone2)[-10:]
-        return clean1 == clean2 and len(clean1) >= 10
+        if success:
+            logger.info(
+                f"Voice follow-up call initiated for "
+                f"{caregiver.full_name if caregiver else outreach.phone} (call_id: {call_id})"
+            )
+        return {"outreach_id": outreach_id, "success": success, "call_id": call_id}
 
-    def check_voice_followups(self, voice_delay_minutes: int = 5):
-        """
-        Check for SMS outreaches that need voice call follow-up.
-        Called periodically from the RC bot.
-        """
-        if not self.voice_service or not self.voice_service.enabled:
+    def start_deadline_runner(self) -> None:
+        """Fire deadlines at their due time from a daemon thread (idempotent)."""
+        if self._runner and self._runner.is_alive():
             return
+        self._runner = threading.Thread(
+            target=self._deadline_loop, name="shift-filling-deadlines", daemon=True
+        )
+        self._runner.start()
+        logger.info("Shift filling deadline runner started")
+
+    def _deadline_loop(self) -> None:
+        while True:
+            next_at = self.deadlines.next_fire_at()
+            wait = DEADLINE_RUNNER_MAX_SLEEP_SECONDS
+            if next_at is not None:
+                wait = min(wait, max(0.0, (next_at - datetime.now()).total_seconds()))
+            # Scheduling an earlier deadline sets _wake so we re-plan immediately
+            self._wake.wait(wait)
+            self._wake.clear()
+            try:
+                self.run_due_deadlines()
+            except Exception as e:
+                logger.error(f"Shift filling deadline runner error: {e}")
 
-        now = datetime.now()
-        to_call = []
-
-        for outreach_id, info in list(self.voice_followup_queue.items()):
-            elapsed = (now - info["sent_at"]).total_seconds() / 60
-            if elapsed < voice_delay_minutes:
-                continue
+    def check_campaign_timeouts(self) -> List[ShiftOutreach]:
+        """
+        Fire any due deadlines and return the campaigns escalated for timeout.
 
-            # Check if campaign is still active
-            campaign = self.active_campaigns.get(info["campaign_id"])
-            if not campaign or campaign.status != OutreachStatus.IN_PROGRESS:
-                del self.voice_followup_queue[outreach_id]
-                continue
+        Kept for callers that poll; start_deadline_runner() makes this a no-op
+        in practice because deadlines fire on their own.
+        """
+        return [
+            event["campaign"] for event in self.run_due_deadlines()
+            if event["kind"] == DEADLINE_TIMEOUT
+        ]
 
-            # Check if caregiver already responded
-            outreach = next(
-                (o for o in campaign.caregivers_contacted if o.id == outreach_id),
-                None
-            )
-            if outreach and outreach.response_type == CaregiverResponseType.NO_RESPONSE:
-                to_call.append((outreach_id, info))
-            else:
-                # Already responded, no need for voice call
-                del self.voice_followup_queue[outreach_id]
-
-        for outreach_id, info in to_call:
-            caregiver = info["caregiver"]
-            shift = info["shift"]
-
-            success, call_id = self.voice_service.create_shift_offer_call(
-                caregiver_phone=caregiver.phone,
-                caregiver_name=caregiver.first_name,
-                client_name=shift.client.first_name if shift.client else "a client",
-                shift_date=shift.date.strftime("%A, %B %d"),
-                shift_time=shift.to_display_time(),
-                shift_duration=shift.duration_hours,
-                campaign_id=info["campaign_id"],
-                language=info.get("language", "English"),
-            )
+    def _phones_match(self, phone1: str, phone2: str) -> bool:
+        """Check if two phone numbers match (ignoring formatting)."""
+        clean1 = clean_phone(phone1)
+        clean2 = clean_phone(phone2)
+        return clean1 == clean2 and len(clean1) >= 10
 
-            if success:
-                logger.info(
-                    f"Voice follow-up call initiated for {caregiver.full_name} "
-                    f"(call_id: {call_id})"
-                )
+    def check_voice_followups(self, voice_delay_minutes: int = None) -> List[Dict[str, Any]]:
+        """
+        Fire any due deadlines and return the voice follow-up calls placed.
 
-            del self.voice_followup_queue[outreach_id]
+        The delay comes from each campaign's voice_delay_minutes when the SMS
+        is sent; the argument is accepted for older callers and ignored.
+        """
+        return [
+            event for event in self.run_due_deadlines()
+            if event["kind"] == DEADLINE_VOICE
+        ]
 
     def get_campaign_status(self, campaign_id: str) -> Optional[Dict[str, Any]]:
         """Get status of an active campaign."""
@@ -596,7 +807,7 @@ class ShiftFillingEngine:
             outreach = self.sms.send_shift_offer(shift, match.caregiver)
             outreach.match_score = match.score
             outreach.tier = match.tier
-            campaign.add_caregiver_outreach(outreach)
+            self._register_outreach(campaign, outreach)
 
         self.active_campaigns[campaign.id] = campaign
         self._shift_campaign_index[shift.id] = campaign.id
@@ -107,6 +107,16 @@ class CaregiverMatcher:
 
         logger.info(f"Found {len(available_caregivers)} available caregivers for {shift.date}")
 
+        # Load every candidate's preferences in one query; the per-candidate
+        # constraint and scoring checks below then read from the extractor's cache
+        if _preference_extractor:
+            try:
+                _preference_extractor.get_preferences_for_caregivers(
+                    [c.id for c in available_caregivers]
+                )
+            except Exception as e:
+                logger.warning(f"Could not preload caregiver preferences: {e}")
+
         # Score each caregiver (filtering by hard constraints)
         results = []
         for caregiver in available_caregivers:
@@ -23,7 +23,7 @@ if env_file.exists():
 from database import db_manager
 from models import Contact
 from brevo_service import BrevoService
-import requests
+from brevo_sync import BrevoContactSync, DatabaseSyncStore
 
 def sync_all_to_brevo():
     """Sync all dashboard contacts to Brevo lists."""
@@ -131,30 +131,29 @@ def sync_all_to_brevo():
         # Import to Brevo
         print(f"\n=== IMPORTING TO BREVO ===")
         
-        if referral_contacts:
-            print(f"\nPushing {len(referral_contacts)} contacts to Referral Source list (ID: {referral_list_id})...")
-            result = brevo.bulk_import_contacts(referral_contacts, list_id=referral_list_id)
-            if result.get('success'):
-                print(f"  ✓ Success: {result.get('added', len(referral_contacts))} contacts imported")
-            else:
-                print(f"  ✗ Error: {result.get('error')}")
-                if result.get('errors'):
-                    for err in result['errors'][:3]:
-                        print(f"    - {err}")
-        
-        if client_contacts:
-            print(f"\nPushing {len(client_contacts)} contacts to Client list (ID: {client_list_id})...")
-            result = brevo.bulk_import_contacts(client_contacts, list_id=client_list_id)
-            if result.get('success'):
-                print(f"  ✓ Success: {result.get('added', len(client_contacts))} contacts imported")
+        # Only contacts that changed since the last successful sync are sent;
+        # a failed run resumes with whatever wasn't imported yet
+        sync = BrevoContactSync(brevo, DatabaseSyncStore(db))
+        total_pushed = 0
+        for label, contacts, list_id in (
+            ('Referral Source', referral_contacts, referral_list_id),
+            ('Client', client_contacts, client_list_id),
+        ):
+            if not contacts:
+                continue
+            print(f"\nPushing {len(contacts)} contacts to {label} list (ID: {list_id})...")
+            result = sync.push(contacts, list_id=list_id)
+            total_pushed += result.imported
+            print(f"  {result.unchanged} unchanged, {result.changed} changed")
+            if result.success:
+                print(f"  ✓ Success: {result.imported} contacts imported")
             else:
-                print(f"  ✗ Error: {result.get('error')}")
-                if result.get('errors'):
-                    for err in result['errors'][:3]:
-                        print(f"    - {err}")
+                print(f"  ✗ {len(result.errors)} chunk(s) failed, will retry next run")
+                for err in result.errors[:3]:
+                    print(f"    - {err}")
         
         print(f"\n✅ SYNC COMPLETE")
-        print(f"   Total pushed: {len(referral_contacts) + len(client_contacts)}")
+        print(f"   Total pushed: {total_pushed}")
         print(f"   Referral Source list: {len(referral_contacts)}")
         print(f"   Client list: {len(client_contacts)}")
         
@@ -9,17 +9,20 @@ import os
 import requests
 from datetime import datetime
 
+from sqlalchemy import func
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database import db_manager
 from models import Contact, ReferralSource, Deal, ContactTask, CompanyTask, DealTask
 from brevo_service import BrevoService
+from brevo_sync import BrevoContactSync, DatabaseSyncStore
 import json
 import time
 
 def sync_contacts_to_brevo(db, brevo):
-    """Sync all contacts from Dashboard to Brevo CRM."""
+    """Sync contacts that changed since the last run from Dashboard to Brevo CRM."""
     print("\n" + "="*60)
     print("SYNCING CONTACTS → BREVO")
     print("="*60)
@@ -31,54 +34,31 @@ def sync_contacts_to_brevo(db, brevo):
     
     print(f"Found {len(contacts)} contacts in dashboard")
     
-    success = 0
-    errors = 0
+    result = BrevoContactSync(brevo, DatabaseSyncStore(db)).push(
+        {
+            'email': contact.email,
+            'first_name': contact.first_name or '',
+            'last_name': contact.last_name or '',
+            'company': contact.company or '',
+            'phone': contact.phone or '',
+            'title': contact.title or '',
+            'contact_type': contact.contact_type or '',
+            'status': contact.status or '',
+            'source': contact.source or 'dashboard'
+        }
+        for contact in contacts
+    )
     
-    for contact in contacts:
-        try:
-            # Normalize names
-            first_name = contact.first_name or ''
-            last_name = contact.last_name or ''
-            if first_name and ' ' in first_name and not last_name:
-                parts = first_name.split(' ', 1)
-                first_name = parts[0]
-                last_name = parts[1] if len(parts) > 1 else ''
-            
-            contact_data = {
-                'email': contact.email,
-                'first_name': first_name,
-                'last_name': last_name,
-                'company': contact.company or '',
-                'phone': contact.phone or '',
-                'title': contact.title or '',
-                'contact_type': contact.contact_type or '',
-                'status': contact.status or '',
-                'source': contact.source or 'dashboard'
-            }
-            
-            result = brevo.sync_contact_to_crm(contact_data)
-            
-            if result.get('success'):
-                success += 1
-            else:
-                errors += 1
-                if errors <= 5:
-                    print(f"  Error: {contact.email}: {result.get('error', 'Unknown')}")
-            
-            # Rate limiting
-            if (success + errors) % 50 == 0:
-                time.sleep(1)
-                
-        except Exception as e:
-            errors += 1
-            if errors <= 5:
-                print(f"  Exception: {contact.email}: {str(e)}")
+    print(f"  {result.unchanged} unchanged since last sync, {result.changed} changed")
+    for err in result.errors[:5]:
+        print(f"  Error: {err}")
     
-    print(f"\n✓ Contacts synced: {success}")
+    print(f"\n✓ Contacts synced: {result.imported}")
+    errors = result.changed - result.imported
     if errors:
-        print(f"✗ Errors: {errors}")
+        print(f"✗ Not imported (retried next run): {errors}")
     
-    return success, errors
+    return result.imported, errors
 
 
 def sync_companies_to_brevo(db, brevo):
@@ -185,15 +165,16 @@ def sync_from_brevo_to_dashboard(db, brevo):
     print("SYNCING BREVO → DASHBOARD")
     print("="*60)
     
-    # Sync contacts from Brevo
+    # Sync contacts changed in Brevo since the last run
     print("\nSyncing contacts from Brevo...")
-    contacts_result = brevo.get_all_contacts(limit=1000)
-    if contacts_result.get('success'):
-        brevo_contacts = contacts_result.get('contacts', [])
-        print(f"Found {len(brevo_contacts)} contacts in Brevo")
-        
-        added = 0
-        updated = 0
+    counts = {'added': 0, 'updated': 0}
+    
+    def apply_contacts(brevo_contacts):
+        emails = {(bc.get('email') or '').strip().lower() for bc in brevo_contacts} - {''}
+        existing = {
+            c.email.strip().lower(): c
+            for c in db.query(Contact).filter(func.lower(Contact.email).in_(emails)).all()
+        } if emails else {}
         
         for bc in brevo_contacts:
             try:
@@ -205,8 +186,7 @@ def sync_from_brevo_to_dashboard(db, brevo):
                 first_name = attrs.get('FIRSTNAME', '').strip()
                 last_name = attrs.get('LASTNAME', '').strip()
                 
-                # Find or create contact
-                contact = db.query(Contact).filter(Contact.email == email).first()
+                contact = existing.get(email)
                 
                 if contact:
                     # Update existing
@@ -216,7 +196,7 @@ def sync_from_brevo_to_dashboard(db, brevo):
                         contact.last_name = last_name
                     if attrs.get('COMPANY') and not contact.company:
                         contact.company = attrs.get('COMPANY')
-                    updated += 1
+                    counts['updated'] += 1
                 else:
                     # Create new
                     contact = Contact(
@@ -231,14 +211,22 @@ def sync_from_brevo_to_dashboard(db, brevo):
                         status=attrs.get('STATUS', 'cold')
                     )
                     db.add(contact)
-                    added += 1
+                    existing[email] = contact
+                    counts['added'] += 1
                 
             except Exception as e:
-                if updated + added < 5:
+                if counts['updated'] + counts['added'] < 5:
                     print(f"  Error syncing contact {bc.get('email')}: {str(e)}")
         
         db.commit()
-        print(f"  ✓ Contacts: {added} added, {updated} updated")
+    
+    try:
+        pulled = BrevoContactSync(brevo, DatabaseSyncStore(db)).pull(apply_contacts, cursor_name='contacts')
+        print(f"Found {pulled} contacts changed in Brevo")
+        print(f"  ✓ Contacts: {counts['added']} added, {counts['updated']} updated")
+    except Exception as e:
+        db.rollback()
+        print(f"  Error pulling contacts from Brevo: {str(e)}")
     
     # Sync companies from Brevo
     print("\nSyncing companies from Brevo...")
@@ -6,18 +6,19 @@ This prioritizes Brevo data over dashboard data.
 
 import sys
 import os
-import requests
 from datetime import datetime
 
+from sqlalchemy import func
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database import db_manager
 from models import Contact, ReferralSource, Deal
 from brevo_service import BrevoService
+from brevo_sync import BrevoContactSync, DatabaseSyncStore
 import json
 import time
-import requests
 
 def sync_contacts_from_brevo(db, brevo):
     """Sync contacts FROM Brevo TO Dashboard, using Brevo as source of truth.
@@ -49,163 +50,133 @@ def sync_contacts_from_brevo(db, brevo):
         print(f"ERROR: Could not find both lists. Client: {client_list_id}, Referral: {referral_list_id}")
         return 0, 0
     
-    # Get contacts from Client list
-    client_contacts = []
-    offset = 0
-    while True:
-        response = requests.get(
-            f"{brevo.base_url}/contacts/lists/{client_list_id}/contacts",
-            headers=brevo._get_headers(),
-            params={"limit": 50, "offset": offset}
-        )
-        if response.status_code != 200:
-            break
-        data = response.json()
-        contacts_page = data.get('contacts', [])
-        client_contacts.extend(contacts_page)
-        if len(contacts_page) < 50:
-            break
-        offset += 50
-    
-    # Get contacts from Referral Source list
-    referral_contacts = []
-    offset = 0
-    while True:
-        response = requests.get(
-            f"{brevo.base_url}/contacts/lists/{referral_list_id}/contacts",
-            headers=brevo._get_headers(),
-            params={"limit": 50, "offset": offset}
-        )
-        if response.status_code != 200:
-            break
-        data = response.json()
-        contacts_page = data.get('contacts', [])
-        referral_contacts.extend(contacts_page)
-        if len(contacts_page) < 50:
-            break
-        offset += 50
-    
-    # Combine and deduplicate by email
-    all_brevo_contacts = {}
-    for contact in client_contacts + referral_contacts:
-        email = contact.get('email', '').strip().lower()
-        if email:
-            # Mark which list they're from
-            if contact in client_contacts:
-                contact['_list_type'] = 'client'
-            else:
-                contact['_list_type'] = 'referral'
-            all_brevo_contacts[email] = contact
-    
-    brevo_contacts = list(all_brevo_contacts.values())
-    print(f"Found {len(client_contacts)} contacts in Client list")
-    print(f"Found {len(referral_contacts)} contacts in Referral Source list")
-    print(f"Total unique contacts to sync: {len(brevo_contacts)}")
-    
+    # Only contacts modified since the last run, per list. Each list's cursor
+    # advances once its pages are applied; the Referral Source list goes
+    # second so it wins for contacts on both lists.
     added = 0
     updated = 0
     errors = 0
     
-    for bc in brevo_contacts:
-        try:
-            email = bc.get('email', '').strip().lower()
-            if not email:
-                continue
+    def apply_contacts(page, list_type):
+        nonlocal added, updated, errors
+        emails = {(bc.get('email') or '').strip().lower() for bc in page} - {''}
+        existing = {
+            c.email.strip().lower(): c
+            for c in db.query(Contact).filter(func.lower(Contact.email).in_(emails)).all()
+        } if emails else {}
+        
+        for bc in page:
+            bc['_list_type'] = list_type
+            try:
+                email = bc.get('email', '').strip().lower()
+                if not email:
+                    continue
             
-            attrs = bc.get('attributes', {})
-            first_name = attrs.get('FIRSTNAME', '').strip()
-            last_name = attrs.get('LASTNAME', '').strip()
+                attrs = bc.get('attributes', {})
+                first_name = attrs.get('FIRSTNAME', '').strip()
+                last_name = attrs.get('LASTNAME', '').strip()
             
-            # Find existing contact by email
-            contact = db.query(Contact).filter(Contact.email == email).first()
+                # Find existing contact by email
+                contact = existing.get(email)
             
-            if contact:
-                # Update existing - use Brevo data as source of truth
-                updated_fields = []
+                if contact:
+                    # Update existing - use Brevo data as source of truth
+                    updated_fields = []
                 
-                if first_name and contact.first_name != first_name:
-                    contact.first_name = first_name
-                    updated_fields.append('first_name')
+                    if first_name and contact.first_name != first_name:
+                        contact.first_name = first_name
+                        updated_fields.append('first_name')
                 
-                if last_name and contact.last_name != last_name:
-                    contact.last_name = last_name
-                    updated_fields.append('last_name')
+                    if last_name and contact.last_name != last_name:
+                        contact.last_name = last_name
+                        updated_fields.append('last_name')
                 
-                # Update name field
-                full_name = f"{first_name} {last_name}".strip() or email
-                if contact.name != full_name:
-                    contact.name = full_name
-                    updated_fields.append('name')
+                    # Update name field
+                    full_name = f"{first_name} {last_name}".strip() or email
+                    if contact.name != full_name:
+                        contact.name = full_name
+                        updated_fields.append('name')
                 
-                # Update company if provided
-                company = attrs.get('COMPANY', '').strip()
-                if company and contact.company != company:
-                    contact.company = company
-                    updated_fields.append('company')
+                    # Update company if provided
+                    company = attrs.get('COMPANY', '').strip()
+                    if company and contact.company != company:
+                        contact.company = company
+                        updated_fields.append('company')
                 
-                # Update phone if provided
-                phone = attrs.get('SMS', '').strip() or attrs.get('PHONE', '').strip()
-                if phone and contact.phone != phone:
-                    contact.phone = phone
-                    updated_fields.append('phone')
+                    # Update phone if provided
+                    phone = attrs.get('SMS', '').strip() or attrs.get('PHONE', '').strip()
+                    if phone and contact.phone != phone:
+                        contact.phone = phone
+                        updated_fields.append('phone')
                 
-                # Update title if provided
-                title = attrs.get('TITLE', '').strip()
-                if title and contact.title != title:
-                    contact.title = title
-                    updated_fields.append('title')
+                    # Update title if provided
+                    title = attrs.get('TITLE', '').strip()
+                    if title and contact.title != title:
+                        contact.title = title
+                        updated_fields.append('title')
                 
-                # Update contact_type from list membership
-                list_type = bc.get('_list_type', '')
-                if list_type == 'client':
-                    if contact.contact_type != 'client':
-                        contact.contact_type = 'client'
-                        updated_fields.append('contact_type')
-                elif list_type == 'referral':
-                    if contact.contact_type != 'referral':
-                        contact.contact_type = 'referral'
-                        updated_fields.append('contact_type')
+                    # Update contact_type from list membership
+                    list_type = bc['_list_type']
+                    if list_type == 'client':
+                        if contact.contact_type != 'client':
+                            contact.contact_type = 'client'
+                            updated_fields.append('contact_type')
+                    elif list_type == 'referral':
+                        if contact.contact_type != 'referral':
+                            contact.contact_type = 'referral'
+                            updated_fields.append('contact_type')
                 
-                if updated_fields:
-                    contact.updated_at = datetime.now()
-                    updated += 1
-                    if updated <= 10:
-                        print(f"  Updated: {email} ({', '.join(updated_fields)})")
-            else:
-                # Create new contact from Brevo
-                full_name = f"{first_name} {last_name}".strip() or email
-                contact = Contact(
-                    email=email,
-                    first_name=first_name,
-                    last_name=last_name,
-                    name=full_name,
-                    company=attrs.get('COMPANY', '').strip(),
-                    phone=attrs.get('SMS', '').strip() or attrs.get('PHONE', '').strip(),
-                    title=attrs.get('TITLE', '').strip(),
-                    contact_type=attrs.get('CONTACT_TYPE', 'prospect'),
-                    status=attrs.get('STATUS', 'cold')
-                )
-                
-                # Determine contact_type from list membership
-                list_type = bc.get('_list_type', '')
-                if list_type == 'client':
-                    contact.contact_type = 'client'
-                elif list_type == 'referral':
-                    contact.contact_type = 'referral'
+                    if updated_fields:
+                        contact.updated_at = datetime.now()
+                        updated += 1
+                        if updated <= 10:
+                            print(f"  Updated: {email} ({', '.join(updated_fields)})")
                 else:
-                    contact.contact_type = 'prospect'
+                    # Create new contact from Brevo
+                    full_name = f"{first_name} {last_name}".strip() or email
+                    contact = Contact(
+                        email=email,
+                        first_name=first_name,
+                        last_name=last_name,
+                        name=full_name,
+                        company=attrs.get('COMPANY', '').strip(),
+                        phone=attrs.get('SMS', '').strip() or attrs.get('PHONE', '').strip(),
+                        title=attrs.get('TITLE', '').strip(),
+                        contact_type=attrs.get('CONTACT_TYPE', 'prospect'),
+                        status=attrs.get('STATUS', 'cold')
+                    )
                 
-                db.add(contact)
-                added += 1
-                if added <= 10:
-                    print(f"  Added: {email} ({full_name})")
+                    # Determine contact_type from list membership
+                    list_type = bc['_list_type']
+                    if list_type == 'client':
+                        contact.contact_type = 'client'
+                    elif list_type == 'referral':
+                        contact.contact_type = 'referral'
+                    else:
+                        contact.contact_type = 'prospect'
+                
+                    db.add(contact)
+                    existing[email] = contact
+                    added += 1
+                    if added <= 10:
+                        print(f"  Added: {email} ({full_name})")
             
-        except Exception as e:
-            errors += 1
-            if errors <= 5:
-                print(f"  Error syncing contact {bc.get('email')}: {str(e)}")
+            except Exception as e:
+                errors += 1
+                if errors <= 5:
+                    print(f"  Error syncing contact {bc.get('email')}: {str(e)}")
+        
+        db.commit()
+    
+    sync = BrevoContactSync(brevo, DatabaseSyncStore(db))
+    for list_type, list_id in (('client', client_list_id), ('referral', referral_list_id)):
+        pulled = sync.pull(
+            lambda page, list_type=list_type: apply_contacts(page, list_type),
+            cursor_name=f"list:{list_id}",
+            list_id=list_id,
+        )
+        print(f"Found {pulled} changed contacts in {list_type} list")
     
-    db.commit()
     print(f"\n✓ Contacts: {added} added, {updated} updated, {errors} errors")
     
     return added + updated, errors
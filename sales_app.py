@@ -5,6 +5,7 @@ Runs independently from the portal on its own port.
 Routes:
 - /sales/*  → All Sales CRM routes (deals, contacts, companies, analytics)
 - /health   → Service health check
+- /metrics  → Prometheus metrics
 """
 import os
 import sys
@@ -84,6 +85,11 @@ except Exception as e:
 async def health():
     return {"status": "ok", "service": "sales-dashboard"}
 
+# Prometheus scrape target (WellSky, tool, LLM and DB pool latency histograms)
+from service_metrics import add_metrics_route
+
+add_metrics_route(app)
+
 logger.info("Sales Dashboard standalone service ready")
 
 if __name__ == "__main__":
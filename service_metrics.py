@@ -0,0 +1,393 @@
+"""
+Service Metrics
+
+In-process counters and latency histograms for the hot paths shared by Gigi,
+the portal, sales and recruiting, exposed in Prometheus text format on each
+service's /metrics endpoint. Every service is its own process with its own
+registry, so there is nothing to aggregate here; the scraper does that.
+
+    from service_metrics import TOOL_SECONDS
+
+    with TOOL_SECONDS.time(tool="get_weather"):
+        ...
+
+    @DB_POOL_WAIT_SECONDS.time(pool="gigi")
+    def _get_conn(): ...
+
+A histogram that has an ``outcome`` label gets "ok" or "error" filled in by
+time() depending on whether the block raised.
+
+Covered today:
+- WellSky API requests by method, endpoint and status (WellSkyService._make_request)
+- Gigi tool calls by tool (tool_executor.execute)
+- LLM calls by provider, model and channel (instrument_llm_client)
+- Database pool checkouts by pool (timed_pool_class, tool_executor._get_conn)
+
+This module must stay dependency-free: it is imported by every service,
+including ones that can't import the services package.
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. WellSky/LLM calls run 0.2-10s, tool calls and pool waits mostly <50ms.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return f"{{{body}}}" if body else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(value)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    """Context manager / decorator returned by Histogram.time()."""
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, Any]):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = None
+
+    def _labels_for(self, failed: bool) -> Dict[str, Any]:
+        if "outcome" in self._histogram.labelnames and "outcome" not in self._labels:
+            return {**self._labels, "outcome": "error" if failed else "ok"}
+        return self._labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(
+            time.perf_counter() - self._started, **self._labels_for(exc_type is not None)
+        )
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        histogram, labels = self._histogram, self._labels
+
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _Timer(histogram, labels):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(histogram, labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+
+    def observe(self, seconds: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = _HistogramChild(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    child.counts[i] += 1
+                    break
+            child.sum += seconds
+            child.count += 1
+
+    def time(self, **labels) -> _Timer:
+        """Time a block (``with``) or every call of a function (decorator)."""
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            child = self._children.get(self._key(labels))
+            if child is None:
+                return None
+            return {"count": child.count, "sum": child.sum, "buckets": dict(zip(self.buckets, child.counts))}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, list(c.counts), c.sum, c.count) for key, c in self._children.items()
+            )
+        lines = self._header()
+        for key, counts, total, count in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics for one process, rendered together for /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Modules re-executed by importlib (gigi_main, sales_app_module) re-register
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+
+# Singleton instance
+registry = MetricsRegistry()
+
+WELLSKY_REQUEST_SECONDS = registry.histogram(
+    "wellsky_request_seconds",
+    "WellSky API request latency",
+    ("method", "endpoint", "status"),
+)
+TOOL_SECONDS = registry.histogram(
+    "gigi_tool_seconds",
+    "Gigi tool execution latency, including tool-cache hits",
+    ("tool", "outcome"),
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "llm_request_seconds",
+    "LLM API call latency",
+    ("provider", "model", "channel", "outcome"),
+)
+DB_POOL_WAIT_SECONDS = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time to check a connection out of a database pool",
+    ("pool", "outcome"),
+)
+
+
+# ============================================================
+# Helpers
+# ============================================================
+
+_ID_SEGMENT = re.compile(r"\d")
+
+
+def endpoint_label(endpoint: str) -> str:
+    """'Patient/12345/' -> 'Patient/{id}' so per-record URLs share one series."""
+    parts = [p for p in endpoint.strip("/").split("/") if p]
+    return "/".join("{id}" if _ID_SEGMENT.search(p) else p for p in parts) or "/"
+
+
+# Attribute paths on SDK clients that make a model call
+_LLM_CALLS = {
+    ("messages", "create"),  # anthropic
+    ("chat", "completions", "create"),  # openai and compatibles
+    ("models", "generate_content"),  # google-genai
+    ("aio", "models", "generate_content"),
+}
+_LLM_PREFIXES = {path[:i] for path in _LLM_CALLS for i in range(1, len(path))}
+
+
+def _provider_for(client: Any) -> str:
+    module = type(client).__module__.split(".")[0]
+    if module == "openai":
+        # OpenAI-compatible providers share the SDK: api.deepseek.com -> deepseek
+        host = str(getattr(getattr(client, "base_url", None), "host", "") or "")
+        parts = host.split(".")
+        return parts[-2] if len(parts) >= 2 else module
+    return {"google": "gemini"}.get(module, module)
+
+
+class _InstrumentedClient:
+    """Proxy that times model calls on an SDK client and passes everything else through."""
+
+    def __init__(self, target: Any, labels: Dict[str, str], path: Tuple[str, ...] = ()):
+        self._target = target
+        self._labels = labels
+        self._path = path
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        path = self._path + (name,)
+        if path in _LLM_CALLS:
+            return self._timed(attr)
+        if path in _LLM_PREFIXES:
+            return _InstrumentedClient(attr, self._labels, path)
+        return attr
+
+    def _timed(self, fn: Callable) -> Callable:
+        base_labels = self._labels
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            labels = {**base_labels, "model": kwargs.get("model") or "unknown"}
+            timer = LLM_REQUEST_SECONDS.time(**labels).__enter__()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                timer.__exit__(type(e), e, None)
+                raise
+            if not inspect.isawaitable(result):
+                timer.__exit__(None, None, None)
+                return result
+
+            async def finish():
+                try:
+                    value = await result
+                except BaseException as e:
+                    timer.__exit__(type(e), e, None)
+                    raise
+                timer.__exit__(None, None, None)
+                return value
+
+            return finish()
+
+        return call
+
+
+def instrument_llm_client(client: Any, channel: str, provider: str = None) -> Any:
+    """
+    Wrap an anthropic / openai / google-genai client so every model call is
+    recorded in llm_request_seconds. None passes through, so this can wrap
+    the result of an optional client factory directly.
+    """
+    if client is None or isinstance(client, _InstrumentedClient):
+        return client
+    return _InstrumentedClient(
+        client, {"provider": provider or _provider_for(client), "channel": channel}
+    )
+
+
+def timed_pool_class(pool_name: str):
+    """
+    A SQLAlchemy QueuePool subclass whose checkouts are recorded in
+    db_pool_wait_seconds; pass it to create_engine(poolclass=...).
+    """
+    from sqlalchemy.pool import QueuePool
+
+    class TimedQueuePool(QueuePool):
+        def connect(self):
+            with DB_POOL_WAIT_SECONDS.time(pool=pool_name):
+                return super().connect()
+
+    return TimedQueuePool
+
+
+def add_metrics_route(app, path: str = "/metrics") -> None:
+    """
+    Register GET /metrics on a FastAPI app. If METRICS_TOKEN is set the
+    scraper must send it as a Bearer token.
+    """
+    from fastapi import Header, HTTPException
+    from fastapi.responses import Response
+
+    @app.get(path, include_in_schema=False)
+    async def metrics(authorization: str = Header(None)):
+        token = os.getenv("METRICS_TOKEN")
+        if token and authorization != f"Bearer {token}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,174 @@
+"""
+WellSky Document Upload Pipeline
+
+Uploads documents (fax PDFs, assessment PDFs, text notes) to WellSky's
+DocumentReference API with:
+- Bounded parallelism (a small thread pool — the WellSky client is blocking)
+- Exponential backoff with jitter on transient failures (5xx, 429, timeouts)
+- Streamed base64 encoding, so a large multi-page fax is read from disk in
+  chunks instead of being held as raw bytes + an encoded copy + a JSON body
+
+Usage:
+    from services.document_upload_pipeline import DocumentUpload, upload_document, upload_documents
+
+    result = upload_document(DocumentUpload(
+        patient_id="12345", document_type="Referral",
+        filename="Smith_referral.pdf", path="/path/to/fax.pdf",
+    ))
+
+    results = upload_documents(uploads, on_result=lambda r: ...)
+"""
+from __future__ import annotations
+
+import base64
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CONCURRENCY = int(os.getenv("WELLSKY_UPLOAD_CONCURRENCY", "3"))
+UPLOAD_MAX_ATTEMPTS = int(os.getenv("WELLSKY_UPLOAD_MAX_ATTEMPTS", "4"))
+UPLOAD_BASE_DELAY = 2.0   # seconds; doubles per attempt
+UPLOAD_MAX_DELAY = 30.0
+
+# Must be a multiple of 3 so each chunk encodes without '=' padding
+_B64_READ_SIZE = 3 * 64 * 1024
+
+
+@dataclass
+class DocumentUpload:
+    """One document destined for a WellSky patient profile.
+
+    Exactly one of ``path`` (streamed from disk) or ``data`` (in-memory bytes)
+    should be set. ``key`` is an opaque caller reference (e.g. fax_log id).
+    """
+    patient_id: str
+    document_type: str
+    filename: str
+    content_type: str = "application/pdf"
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    key: Any = None
+
+
+@dataclass
+class UploadResult:
+    upload: DocumentUpload
+    success: bool
+    attempts: int
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+def iter_base64(path: str = None, data: bytes = None, read_size: int = _B64_READ_SIZE) -> Iterator[bytes]:
+    """Yield base64-encoded chunks of a file (or bytes) without materializing
+    the whole encoded document."""
+    if read_size % 3:
+        raise ValueError("read_size must be a multiple of 3")
+    if data is not None:
+        view = memoryview(data)
+        for i in range(0, len(view), read_size):
+            yield base64.b64encode(view[i:i + read_size])
+        return
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(read_size)
+            if not chunk:
+                break
+            yield base64.b64encode(chunk)
+
+
+def _is_transient(response: Any) -> bool:
+    """Whether a failed create_document_reference response is worth retrying."""
+    if not isinstance(response, dict):
+        return True
+    status = response.get("status_code")
+    if status is None:
+        # Timeouts / connection errors surface without a status code
+        return "not configured" not in str(response.get("error", ""))
+    return status == 429 or status >= 500
+
+
+def _backoff_delay(attempt: int) -> float:
+    delay = min(UPLOAD_BASE_DELAY * (2 ** (attempt - 1)), UPLOAD_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def upload_document(
+    upload: DocumentUpload,
+    service=None,
+    max_attempts: int = UPLOAD_MAX_ATTEMPTS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> UploadResult:
+    """Upload one document, retrying transient failures with backoff. Blocking."""
+    if service is None:
+        from services.wellsky_service import wellsky_service as service
+
+    if upload.path and not Path(upload.path).exists():
+        return UploadResult(upload, False, 0, error="PDF not found")
+
+    attempts = 0
+    error = None
+    while attempts < max_attempts:
+        attempts += 1
+        try:
+            success, response = service.create_document_reference(
+                patient_id=str(upload.patient_id),
+                document_type=upload.document_type,
+                content_type=upload.content_type,
+                filename=upload.filename,
+                data_stream=iter_base64(path=upload.path, data=upload.data),
+            )
+        except Exception as e:
+            success, response = False, {"error": str(e)}
+
+        if success:
+            doc_id = response.get("id", "unknown") if isinstance(response, dict) else "unknown"
+            return UploadResult(upload, True, attempts, document_id=doc_id)
+
+        error = str(response.get("error", response) if isinstance(response, dict) else response)[:500]
+        if not _is_transient(response) or attempts >= max_attempts:
+            break
+        delay = _backoff_delay(attempts)
+        logger.info(f"WellSky upload {upload.filename} attempt {attempts} failed, retrying in {delay:.1f}s")
+        sleep(delay)
+
+    logger.warning(f"WellSky upload {upload.filename} failed after {attempts} attempt(s): {error[:200]}")
+    return UploadResult(upload, False, attempts, error=error)
+
+
+def upload_documents(
+    uploads: List[DocumentUpload],
+    concurrency: int = UPLOAD_CONCURRENCY,
+    on_result: Optional[Callable[[UploadResult], None]] = None,
+    service=None,
+    max_attempts: int = UPLOAD_MAX_ATTEMPTS,
+) -> List[UploadResult]:
+    """Upload many documents with at most ``concurrency`` in flight.
+
+    ``on_result`` is called from the calling thread as each upload finishes.
+    """
+    if not uploads:
+        return []
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="ws-upload") as pool:
+        futures = [
+            pool.submit(upload_document, u, service=service, max_attempts=max_attempts)
+            for u in uploads
+        ]
+        for fut in as_completed(futures):
+            result = fut.result()
+            results.append(result)
+            if on_result:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    logger.warning(f"Upload result callback failed: {e}")
+    return results
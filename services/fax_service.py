@@ -5,6 +5,7 @@ Uses 719-428-3999 as fax number (ext 101, admin).
 
 Fax service using RingCentral API (included free with RingEX plan).
 """
+import asyncio
 import logging
 import os
 import uuid
@@ -30,9 +31,20 @@ FAX_DIR.mkdir(parents=True, exist_ok=True)
 (FAX_DIR / "inbound").mkdir(exist_ok=True)
 (FAX_DIR / "outbound").mkdir(exist_ok=True)
 
+# Inbound polling tunables
+FAX_POLL_DAYS = 7
+FAX_POLL_PAGE_SIZE = 100
+FAX_POLL_MAX_PAGES = 20
+FAX_DOWNLOAD_CONCURRENCY = int(os.getenv("FAX_DOWNLOAD_CONCURRENCY", "4"))
+FAX_PARSE_CONCURRENCY = int(os.getenv("FAX_PARSE_CONCURRENCY", "2"))
+FAX_WELLSKY_MAX_TOTAL_ATTEMPTS = 20
+
 # Token cache
 _token_cache = {"token": None, "expires_at": None}
 
+# Strong refs to fire-and-forget tasks (notifications + parsing)
+_background_tasks = set()
+
 
 async def _get_access_token() -> str:
     """Exchange JWT for RC access token (cached)."""
@@ -325,9 +337,60 @@ async def sync_outbound_statuses():
         conn.close()
 
 
+async def _list_inbound_fax_records(client: httpx.AsyncClient, token: str) -> list:
+    """Page through the RC message-store and return every inbound fax record
+    from the polling window (not just the first page)."""
+    records = []
+    params = {
+        "messageType": "Fax",
+        "direction": "Inbound",
+        "dateFrom": (datetime.utcnow() - timedelta(days=FAX_POLL_DAYS)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "perPage": FAX_POLL_PAGE_SIZE,
+        "page": 1,
+    }
+    for _ in range(FAX_POLL_MAX_PAGES):
+        resp = await client.get(
+            f"{RC_SERVER}/restapi/v1.0/account/~/extension/{RC_FAX_EXT_ID}/message-store",
+            headers={"Authorization": f"Bearer {token}"},
+            params=params,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        records.extend(data.get("records", []))
+        if not data.get("navigation", {}).get("nextPage"):
+            break
+        params["page"] += 1
+    return records
+
+
+def _filter_unlogged_records(cur, records: list) -> list:
+    """Drop records already in fax_log using a single ``= ANY(...)`` lookup."""
+    by_id = {}
+    for rec in records:
+        msg_id = str(rec.get("id", ""))
+        if msg_id and msg_id not in by_id:
+            by_id[msg_id] = rec
+    if not by_id:
+        return []
+    cur.execute(
+        "SELECT rc_message_id FROM fax_log WHERE rc_message_id = ANY(%s)",
+        (list(by_id.keys()),),
+    )
+    seen = {row[0] for row in cur.fetchall()}
+    return [rec for msg_id, rec in by_id.items() if msg_id not in seen]
+
+
 async def poll_received_faxes() -> list:
     """Poll RingCentral message-store for received faxes not yet in our DB.
-    Also syncs outbound fax statuses."""
+    Also syncs outbound fax statuses.
+
+    All pages in the polling window are fetched, already-logged ids are
+    filtered in one query, new PDFs are downloaded concurrently (bounded by
+    FAX_DOWNLOAD_CONCURRENCY) and logged with a single batched insert.
+    Notifications and AI parsing run in a background task so the caller
+    doesn't wait on Gemini."""
+    from psycopg2.extras import execute_values
+
     token = await _get_access_token()
     if not token:
         return []
@@ -340,65 +403,93 @@ async def poll_received_faxes() -> list:
 
     new_faxes = []
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.get(
-                f"{RC_SERVER}/restapi/v1.0/account/~/extension/{RC_FAX_EXT_ID}/message-store",
-                headers={"Authorization": f"Bearer {token}"},
-                params={
-                    "messageType": "Fax",
-                    "direction": "Inbound",
-                    "dateFrom": (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "perPage": 50,
-                },
-            )
-            resp.raise_for_status()
-            records = resp.json().get("records", [])
+        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+            records = await _list_inbound_fax_records(client, token)
+            if not records:
+                return []
+
+            conn = _db()
+            try:
+                cur = conn.cursor()
+                pending = _filter_unlogged_records(cur, records)
+            finally:
+                conn.close()
+            if not pending:
+                return []
+
+            # Download the fax PDFs with bounded parallelism
+            sem = asyncio.Semaphore(FAX_DOWNLOAD_CONCURRENCY)
+
+            async def _fetch(rec: dict) -> str:
+                attachments = rec.get("attachments", [])
+                att_uri = attachments[0].get("uri", "") if attachments else ""
+                if not att_uri:
+                    return ""
+                async with sem:
+                    return await _download_rc_attachment(att_uri, token, client=client)
+
+            local_paths = await asyncio.gather(*(_fetch(rec) for rec in pending))
+
+        rows = []
+        for rec, local_path in zip(pending, local_paths):
+            from_num = rec.get("from", {}).get("phoneNumber", "")
+            to_num = (rec.get("to", [{}])[0].get("phoneNumber", "") if rec.get("to") else "")
+            rows.append((
+                str(rec.get("id", "")), from_num, to_num,
+                rec.get("pgCnt"), local_path, rec.get("creationTime", "") or None,
+            ))
 
         conn = _db()
         try:
             cur = conn.cursor()
-            for rec in records:
-                msg_id = str(rec.get("id", ""))
-                # Check if already logged
-                cur.execute("SELECT 1 FROM fax_log WHERE rc_message_id = %s", (msg_id,))
-                if cur.fetchone():
-                    continue
-
-                from_num = rec.get("from", {}).get("phoneNumber", "")
-                to_num = (rec.get("to", [{}])[0].get("phoneNumber", "") if rec.get("to") else "")
-                page_count = rec.get("pgCnt")
-                created = rec.get("creationTime", "")
-
-                # Download the fax PDF
-                local_path = ""
-                attachments = rec.get("attachments", [])
-                if attachments and token:
-                    att_uri = attachments[0].get("uri", "")
-                    if att_uri:
-                        local_path = await _download_rc_attachment(att_uri, token)
-
-                cur.execute("""
-                    INSERT INTO fax_log (direction, rc_message_id, from_number, to_number, status, page_count, local_path, created_at)
-                    VALUES ('inbound', %s, %s, %s, 'received', %s, %s, %s)
-                """, (msg_id, from_num, to_num, page_count, local_path, created))
-                conn.commit()
-                new_faxes.append({"fax_id": msg_id, "from": from_num, "pages": page_count})
-                logger.info(f"New inbound fax from {from_num}, {page_count} pages")
-
-                # Send notifications
-                try:
-                    _notify_fax_received(from_num, page_count)
-                except Exception as ne:
-                    logger.warning(f"Fax notification failed (non-fatal): {ne}")
+            inserted = execute_values(cur, """
+                INSERT INTO fax_log (direction, rc_message_id, from_number, to_number, status, page_count, local_path, created_at)
+                VALUES %s
+                RETURNING id
+            """, rows, template="('inbound', %s, %s, %s, 'received', %s, %s, %s)", fetch=True)
+            conn.commit()
         finally:
             conn.close()
 
+        for (msg_id, from_num, _to, page_count, local_path, _c), (log_id,) in zip(rows, inserted):
+            new_faxes.append({"fax_id": msg_id, "id": log_id, "from": from_num,
+                              "pages": page_count, "has_pdf": bool(local_path)})
+            logger.info(f"New inbound fax from {from_num}, {page_count} pages")
+
     except Exception as e:
         logger.error(f"Failed to poll RC faxes: {e}")
 
+    if new_faxes:
+        task = asyncio.create_task(_process_new_faxes(new_faxes))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
     return new_faxes
 
 
+async def _process_new_faxes(new_faxes: list):
+    """Notify and AI-parse newly received faxes off the polling path."""
+    for fax in new_faxes:
+        try:
+            await asyncio.to_thread(_notify_fax_received, fax["from"], fax["pages"])
+        except Exception as ne:
+            logger.warning(f"Fax notification failed (non-fatal): {ne}")
+
+    if not GEMINI_API_KEY:
+        return
+
+    sem = asyncio.Semaphore(FAX_PARSE_CONCURRENCY)
+
+    async def _parse(fax: dict):
+        async with sem:
+            try:
+                await read_fax(fax["id"])
+            except Exception as e:
+                logger.warning(f"Background parse of fax {fax['id']} failed: {e}")
+
+    await asyncio.gather(*(_parse(f) for f in new_faxes if f.get("has_pdf")))
+
+
 def _notify_fax_received(from_number: str, page_count: int):
     """Send Telegram + email notifications for a received fax."""
     pages_str = f"{page_count} page{'s' if page_count != 1 else ''}" if page_count else "unknown pages"
@@ -434,15 +525,18 @@ def _notify_fax_received(from_number: str, page_count: int):
         logger.warning(f"Email fax notify failed: {e}")
 
 
-async def _download_rc_attachment(uri: str, token: str) -> str:
-    """Download a fax attachment from RingCentral."""
+async def _download_rc_attachment(uri: str, token: str, client: httpx.AsyncClient = None) -> str:
+    """Download a fax attachment from RingCentral (reusing ``client`` if given)."""
     filename = f"{uuid.uuid4().hex}.pdf"
     save_path = FAX_DIR / "inbound" / filename
     try:
-        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+        if client is None:
+            async with httpx.AsyncClient(timeout=60, follow_redirects=True) as own_client:
+                resp = await own_client.get(uri, headers={"Authorization": f"Bearer {token}"})
+        else:
             resp = await client.get(uri, headers={"Authorization": f"Bearer {token}"})
-            resp.raise_for_status()
-            save_path.write_bytes(resp.content)
+        resp.raise_for_status()
+        await asyncio.to_thread(save_path.write_bytes, resp.content)
         return str(save_path)
     except Exception as e:
         logger.error(f"Failed to download fax attachment: {e}")
@@ -651,7 +745,7 @@ async def read_fax(fax_id: int) -> dict:
 
     # Read and parse
     pdf_bytes = Path(local_path).read_bytes()
-    parsed = _call_gemini_for_fax(pdf_bytes)
+    parsed = await asyncio.to_thread(_call_gemini_for_fax, pdf_bytes)
 
     if "error" not in parsed:
         # Cache the parsed result
@@ -781,9 +875,7 @@ async def file_fax_referral(fax_id: int) -> dict:
     # 3) Upload PDF to WellSky DocumentReference (so it appears in client's Files tab)
     if filed_to:
         try:
-            import base64 as _b64
-
-            from services.wellsky_service import wellsky_service
+            from services.document_upload_pipeline import DocumentUpload, upload_document
 
             local_path_ws = None
             conn = _db()
@@ -797,42 +889,27 @@ async def file_fax_referral(fax_id: int) -> dict:
                 conn.close()
 
             if local_path_ws and Path(local_path_ws).exists():
-                pdf_bytes_ws = Path(local_path_ws).read_bytes()
-                pdf_b64 = _b64.b64encode(pdf_bytes_ws).decode("utf-8")
-
-                ws_description = f"Fax {doc_type} from {parsed.get('from_number', 'unknown')} — {parsed.get('summary', '')[:200]}"
                 # Human-readable type name for WellSky
-                ws_type_map = {
-                    "facesheet": "Facesheet",
-                    "referral": "Referral",
-                    "authorization": "Authorization",
-                }
-                ws_doc_type = ws_type_map.get(doc_type, "Fax Document")
                 patient_name = result.get("patient_name", "unknown").replace(" ", "_")
-                ws_filename = f"{patient_name}_{doc_type}.pdf"
-
-                success, ws_resp = wellsky_service.create_document_reference(
+                ws_result = await asyncio.to_thread(upload_document, DocumentUpload(
                     patient_id=str(filed_to),
-                    document_type=ws_doc_type,
-                    content_type="application/pdf",
-                    data_base64=pdf_b64,
-                    filename=ws_filename,
-                )
-                if success:
-                    ws_doc_id = ws_resp.get("id", "unknown") if isinstance(ws_resp, dict) else "unknown"
-                    result["wellsky_document_id"] = ws_doc_id
-                    # Persist WellSky doc ID
-                    _conn = _db()
-                    try:
-                        _cur = _conn.cursor()
-                        _cur.execute("UPDATE fax_log SET wellsky_doc_id = %s WHERE id = %s", (ws_doc_id, fax_id))
-                        _conn.commit()
-                    finally:
-                        _conn.close()
-                    logger.info(f"Uploaded fax {fax_id} to WellSky DocumentReference {ws_doc_id} for patient {filed_to}")
+                    document_type=_WS_DOC_TYPE_MAP.get(doc_type, "Fax Document"),
+                    filename=f"{patient_name}_{doc_type}.pdf",
+                    path=local_path_ws,
+                    key=fax_id,
+                ))
+                _conn = _db()
+                try:
+                    _record_wellsky_upload(_conn.cursor(), fax_id, ws_result)
+                    _conn.commit()
+                finally:
+                    _conn.close()
+                if ws_result.success:
+                    result["wellsky_document_id"] = ws_result.document_id
+                    logger.info(f"Uploaded fax {fax_id} to WellSky DocumentReference {ws_result.document_id} for patient {filed_to}")
                 else:
-                    result["wellsky_upload_error"] = str(ws_resp)
-                    logger.error(f"WellSky DocumentReference upload failed for fax {fax_id}: {ws_resp}")
+                    result["wellsky_upload_error"] = ws_result.error
+                    logger.error(f"WellSky DocumentReference upload failed for fax {fax_id}: {ws_result.error}")
             else:
                 result["wellsky_upload_error"] = "PDF file not found on disk"
         except Exception as e:
@@ -903,14 +980,30 @@ async def file_fax_referral(fax_id: int) -> dict:
     return result
 
 
-def retry_wellsky_uploads() -> dict:
+_WS_DOC_TYPE_MAP = {"facesheet": "Facesheet", "referral": "Referral", "authorization": "Authorization"}
+
+
+def _record_wellsky_upload(cur, fax_id: int, result) -> None:
+    """Persist the outcome of a WellSky upload attempt on fax_log."""
+    cur.execute("""
+        UPDATE fax_log
+        SET wellsky_doc_id = COALESCE(%s, wellsky_doc_id),
+            wellsky_upload_attempts = COALESCE(wellsky_upload_attempts, 0) + %s,
+            wellsky_upload_error = %s,
+            wellsky_upload_last_attempt_at = NOW()
+        WHERE id = %s
+    """, (result.document_id, result.attempts, result.error, fax_id))
+
+
+def retry_wellsky_uploads(max_total_attempts: int = FAX_WELLSKY_MAX_TOTAL_ATTEMPTS) -> dict:
     """Retry WellSky DocumentReference uploads for faxes that were filed but failed to upload.
 
-    Finds faxes with filed_to set but no wellsky_doc_id, and attempts the upload.
+    Finds faxes with filed_to set but no wellsky_doc_id and runs them through the
+    document upload pipeline (bounded concurrency, backoff, streamed base64).
+    Attempt counts and the last error are recorded on fax_log; faxes that have
+    used up max_total_attempts are skipped.
     """
-    import base64 as _b64
-
-    from services.wellsky_service import wellsky_service
+    from services.document_upload_pipeline import DocumentUpload, upload_documents
 
     conn = _db()
     try:
@@ -921,61 +1014,44 @@ def retry_wellsky_uploads() -> dict:
             WHERE filed_to IS NOT NULL
               AND wellsky_doc_id IS NULL
               AND local_path IS NOT NULL
+              AND COALESCE(wellsky_upload_attempts, 0) < %s
             ORDER BY id
-        """)
+        """, (max_total_attempts,))
         rows = cur.fetchall()
-    finally:
-        conn.close()
-
-    results = {"attempted": 0, "succeeded": 0, "failed": 0, "details": []}
-
-    for fax_id, filed_to, local_path, parsed_data in rows:
-        results["attempted"] += 1
-        try:
-            if not Path(local_path).exists():
-                results["failed"] += 1
-                results["details"].append({"fax_id": fax_id, "error": "PDF not found"})
-                continue
-
-            pdf_b64 = _b64.b64encode(Path(local_path).read_bytes()).decode("utf-8")
 
+        uploads = []
+        for fax_id, filed_to, local_path, parsed_data in rows:
             doc_type = "fax"
             patient_name = "unknown"
-            description = ""
             if parsed_data and isinstance(parsed_data, dict):
                 doc_type = parsed_data.get("document_type", "fax")
                 patient_name = parsed_data.get("patient", {}).get("name", "unknown").replace(" ", "_")
-                description = parsed_data.get("summary", "")[:200]
-
-            ws_type_map = {"facesheet": "Facesheet", "referral": "Referral", "authorization": "Authorization"}
-            ws_doc_type = ws_type_map.get(doc_type, "Fax Document")
-            ws_filename = f"{patient_name}_{doc_type}.pdf"
-
-            success, ws_resp = wellsky_service.create_document_reference(
+            uploads.append(DocumentUpload(
                 patient_id=str(filed_to),
-                document_type=ws_doc_type,
-                content_type="application/pdf",
-                data_base64=pdf_b64,
-                filename=ws_filename,
-            )
+                document_type=_WS_DOC_TYPE_MAP.get(doc_type, "Fax Document"),
+                filename=f"{patient_name}_{doc_type}.pdf",
+                path=local_path,
+                key=fax_id,
+            ))
 
-            if success:
-                ws_doc_id = ws_resp.get("id", "unknown") if isinstance(ws_resp, dict) else "unknown"
-                conn2 = _db()
-                try:
-                    cur2 = conn2.cursor()
-                    cur2.execute("UPDATE fax_log SET wellsky_doc_id = %s WHERE id = %s", (ws_doc_id, fax_id))
-                    conn2.commit()
-                finally:
-                    conn2.close()
+        results = {"attempted": len(uploads), "succeeded": 0, "failed": 0, "details": []}
+
+        def _on_result(r):
+            _record_wellsky_upload(cur, r.upload.key, r)
+            conn.commit()
+            if r.success:
                 results["succeeded"] += 1
-                results["details"].append({"fax_id": fax_id, "wellsky_doc_id": ws_doc_id})
-                logger.info(f"Retry: uploaded fax {fax_id} to WellSky DocumentReference {ws_doc_id}")
+                results["details"].append({"fax_id": r.upload.key, "wellsky_doc_id": r.document_id,
+                                           "attempts": r.attempts})
+                logger.info(f"Retry: uploaded fax {r.upload.key} to WellSky DocumentReference {r.document_id}")
             else:
                 results["failed"] += 1
-                results["details"].append({"fax_id": fax_id, "error": str(ws_resp)[:200]})
-        except Exception as e:
-            results["failed"] += 1
-            results["details"].append({"fax_id": fax_id, "error": str(e)[:200]})
+                results["details"].append({"fax_id": r.upload.key, "error": (r.error or "")[:200],
+                                           "attempts": r.attempts})
+
+        upload_documents(uploads, on_result=_on_result)
+    finally:
+        conn.close()
 
+    results["details"].sort(key=lambda d: d["fax_id"])
     return results
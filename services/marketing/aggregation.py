@@ -0,0 +1,120 @@
+"""
+Concurrent fan-out over marketing data sources.
+
+The marketing clients (GA4, Graph API, Google Ads, GBP, Pinterest, LinkedIn)
+are all blocking. Dashboard endpoints that combine several of them run each
+source on a worker thread with its own timeout, so a response takes about as
+long as the slowest source instead of the sum of all of them.
+
+A source that times out or raises doesn't fail the request: the last good
+result for the same source and date range is served instead (marked
+"stale"), or None when there is none (marked "failed"/"timeout").
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE_TIMEOUT = 12.0  # seconds per source
+LAST_GOOD_MAX_AGE = 6 * 3600  # don't serve "stale" data older than this
+
+STATUS_OK = "ok"
+STATUS_STALE = "stale"
+STATUS_TIMEOUT = "timeout"
+STATUS_FAILED = "failed"
+
+_executor = ThreadPoolExecutor(max_workers=12, thread_name_prefix="marketing-source")
+
+# (source name, cache key) -> (fetched_at, value)
+_last_good: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+_last_good_lock = threading.Lock()
+
+
+def _remember(name: str, key: Hashable, value: Any) -> None:
+    with _last_good_lock:
+        _last_good[(name, key)] = (time.time(), value)
+
+
+def _recall(name: str, key: Hashable) -> Optional[Tuple[float, Any]]:
+    with _last_good_lock:
+        entry = _last_good.get((name, key))
+    if entry and time.time() - entry[0] <= LAST_GOOD_MAX_AGE:
+        return entry
+    return None
+
+
+async def _run_source(
+    name: str, fetch: Callable[[], Any], key: Hashable, timeout: float
+) -> Tuple[Any, Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    try:
+        # The worker thread keeps running after a timeout; we just stop waiting
+        value = await asyncio.wait_for(loop.run_in_executor(_executor, fetch), timeout)
+        _remember(name, key, value)
+        return value, {
+            "status": STATUS_OK,
+            "elapsed_ms": round((time.monotonic() - started) * 1000),
+        }
+    except asyncio.TimeoutError:
+        status, error = STATUS_TIMEOUT, f"timed out after {timeout:.0f}s"
+    except Exception as e:
+        status, error = STATUS_FAILED, str(e)
+
+    logger.warning(f"Marketing source {name} {status}: {error}")
+    info = {
+        "status": status,
+        "elapsed_ms": round((time.monotonic() - started) * 1000),
+        "error": error,
+    }
+    cached = _recall(name, key)
+    if cached:
+        fetched_at, value = cached
+        info.update({
+            "status": STATUS_STALE,
+            "reason": status,
+            "as_of": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+        })
+        return value, info
+    return None, info
+
+
+async def fetch_sources(
+    sources: Dict[str, Callable[[], Any]],
+    key: Hashable = None,
+    timeout: float = DEFAULT_SOURCE_TIMEOUT,
+    timeouts: Dict[str, float] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Run every source concurrently off the event loop.
+
+    ``key`` identifies the request parameters (e.g. the date range) for the
+    last-good fallback. Returns (data by source, status by source).
+    """
+    timeouts = timeouts or {}
+    names = list(sources)
+    outcomes = await asyncio.gather(
+        *(_run_source(n, sources[n], key, timeouts.get(n, timeout)) for n in names)
+    )
+    data = {n: value for n, (value, _) in zip(names, outcomes)}
+    status = {n: info for n, (_, info) in zip(names, outcomes)}
+    return data, status
+
+
+def run_parallel(calls: Dict[str, Callable[[], Any]], max_workers: int = 6) -> Dict[str, Any]:
+    """
+    Run blocking calls concurrently from synchronous code; the first error is re-raised.
+
+    For service functions that combine several independent API calls.
+    """
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls) or 1)) as pool:
+        futures = {name: pool.submit(call) for name, call in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -17,6 +17,7 @@ from .google_ads_service import google_ads_service
 from .mailchimp_service import mailchimp_marketing_service
 from .brevo_service import brevo_marketing_service
 from .predis_service import predis_service
+from .aggregation import run_parallel
 
 logger = logging.getLogger(__name__)
 
@@ -42,23 +43,31 @@ def get_social_metrics(start: date, end: date, compare: Optional[str] = None) ->
         return _get_placeholder_social_metrics(start, end)
     
     try:
-        # Fetch real data from Facebook
-        page_metrics = facebook_service.get_page_metrics(FACEBOOK_PAGE_ID, start, end)
-        posts = facebook_service.get_posts_metrics(FACEBOOK_PAGE_ID, start, end, limit=50)
-        click_actions = facebook_service.get_click_actions(FACEBOOK_PAGE_ID, start, end)
-        
-        # Fetch Predis AI earned social metrics
-        predis_analytics = predis_service.get_analytics(start, end)
-        predis_recent = predis_service.get_recent_creations(page=1)
-        
-        # Calculate comparison if requested
-        comparison_data = {}
+        # Facebook + Predis AI calls are independent - fetch them concurrently
+        calls = {
+            "page_metrics": lambda: facebook_service.get_page_metrics(FACEBOOK_PAGE_ID, start, end),
+            "posts": lambda: facebook_service.get_posts_metrics(FACEBOOK_PAGE_ID, start, end, limit=50),
+            "click_actions": lambda: facebook_service.get_click_actions(FACEBOOK_PAGE_ID, start, end),
+            "predis_analytics": lambda: predis_service.get_analytics(start, end),
+            "predis_recent": lambda: predis_service.get_recent_creations(page=1),
+        }
         if compare == "previous_period":
             days_diff = (end - start).days + 1
             prev_start = start - timedelta(days=days_diff)
             prev_end = start - timedelta(days=1)
-            prev_metrics = facebook_service.get_page_metrics(FACEBOOK_PAGE_ID, prev_start, prev_end)
-            comparison_data = _calculate_comparison(page_metrics, prev_metrics)
+            calls["prev_metrics"] = lambda: facebook_service.get_page_metrics(FACEBOOK_PAGE_ID, prev_start, prev_end)
+        results = run_parallel(calls)
+
+        page_metrics = results["page_metrics"]
+        posts = results["posts"]
+        click_actions = results["click_actions"]
+        predis_analytics = results["predis_analytics"]
+        predis_recent = results["predis_recent"]
+
+        # Calculate comparison if requested
+        comparison_data = {}
+        if "prev_metrics" in results:
+            comparison_data = _calculate_comparison(page_metrics, results["prev_metrics"])
         
         # Structure the response
         total_days = (end - start).days + 1
@@ -141,13 +150,21 @@ def get_ads_metrics(start: date, end: date, compare: Optional[str] = None) -> Di
         return _get_placeholder_ads_metrics(start, end)
     
     try:
-        # Try cached script data first, fall back to API
-        google_metrics = google_ads_service.get_cached_script_data(start, end)
-        if not google_metrics:
-            google_metrics = google_ads_service.get_metrics(start, end)
-        
-        facebook_account = facebook_ads_service.get_account_metrics(start, end)
-        facebook_campaigns = facebook_ads_service.get_campaign_metrics(start, end)
+        def _google_metrics():
+            # Try cached script data first, fall back to API
+            return (
+                google_ads_service.get_cached_script_data(start, end)
+                or google_ads_service.get_metrics(start, end)
+            )
+
+        results = run_parallel({
+            "google": _google_metrics,
+            "facebook_account": lambda: facebook_ads_service.get_account_metrics(start, end),
+            "facebook_campaigns": lambda: facebook_ads_service.get_campaign_metrics(start, end),
+        })
+        google_metrics = results["google"]
+        facebook_account = results["facebook_account"]
+        facebook_campaigns = results["facebook_campaigns"]
 
         return {
             "google_ads": google_metrics,
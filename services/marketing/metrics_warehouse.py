@@ -0,0 +1,474 @@
+"""
+Daily-grain marketing metrics warehouse.
+
+A scheduled job copies per-day metrics from each marketing API into the
+marketing_daily_metrics table (migrations/add_marketing_daily_metrics.sql),
+one row per (source, metric, day):
+
+- Incremental: only days not yet stored are fetched (newest first, a bounded
+  number per run, back to BACKFILL_DAYS ago)
+- The last LATE_DATA_DAYS are re-fetched on every run because the APIs keep
+  revising recent numbers (late conversions, delayed insights)
+- Date-range totals, daily series and previous-period comparisons are then
+  plain SQL aggregation over the stored days, so 12-month views cost no API
+  calls at all
+
+Most metrics are additive and a range total is their SUM. Gauges (follower
+counts and the like) are point-in-time, so a range takes the value on its
+last stored day. Daily unique counts (GA4 users, Facebook reach) can't be
+combined across days - the same person shows up on several of them - so they
+are stored for the daily series but have no range total or comparison.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_DAYS = 400          # a bit over 12 months of history
+LATE_DATA_DAYS = 3           # always re-fetch this many recent days
+MAX_DAYS_PER_RUN = 60        # per source, to stay inside API rate limits
+
+DailyRows = Dict[date, Dict[str, float]]
+
+
+@dataclass
+class SourceSpec:
+    """How to pull one source's per-day metrics for a date range."""
+    fetch: Callable[[date, date], DailyRows]
+    gauges: Tuple[str, ...] = ()
+    metrics: Tuple[str, ...] = field(default_factory=tuple)
+    uniques: Tuple[str, ...] = ()  # per-day distinct counts; no range total
+
+
+# =============================================================================
+# Source fetchers
+# =============================================================================
+
+def _dig(data: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = data
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _is_real(data: Any) -> bool:
+    return isinstance(data, dict) and not data.get("is_placeholder") and not data.get("error")
+
+
+def _iter_days(start: date, end: date) -> Iterable[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _per_day(call: Callable[[date, date], Dict[str, Any]], paths: Dict[str, str]) -> Callable[[date, date], DailyRows]:
+    """Fetcher for APIs without a daily breakdown: one single-day range call per day."""
+
+    def _fetch(start: date, end: date) -> DailyRows:
+        rows: DailyRows = {}
+        for day in _iter_days(start, end):
+            data = call(day, day)
+            if not _is_real(data):
+                continue  # leave the gap so a later run retries it
+            values = {metric: _dig(data, path) for metric, path in paths.items()}
+            rows[day] = {m: v for m, v in values.items() if v is not None}
+        return rows
+
+    return _fetch
+
+
+def _from_series(series: List[Dict[str, Any]], fields: Dict[str, str]) -> DailyRows:
+    """Rows from a [{"date": "YYYY-MM-DD", field: n}, ...] breakdown."""
+    rows: DailyRows = {}
+    for entry in series or []:
+        try:
+            day = date.fromisoformat(entry["date"][:10])
+        except (KeyError, TypeError, ValueError):
+            continue
+        rows[day] = {metric: float(entry.get(f, 0) or 0) for metric, f in fields.items()}
+    return rows
+
+
+def _fetch_ga4(start: date, end: date) -> DailyRows:
+    from .ga4_service import ga4_service
+
+    if not ga4_service.client:
+        return {}
+    return _from_series(ga4_service._get_users_over_time(start, end), {"users": "users"})
+
+
+def _fetch_gsc(start: date, end: date) -> DailyRows:
+    from .gsc_service import gsc_service
+
+    if not gsc_service.client:
+        return {}
+    return _from_series(
+        gsc_service._get_daily_trend(start, end),
+        {"clicks": "clicks", "impressions": "impressions"},
+    )
+
+
+def _fetch_gbp(start: date, end: date) -> DailyRows:
+    from .gbp_service import gbp_service
+
+    data = gbp_service.get_gbp_metrics(start, end)
+    return _from_series(
+        data.get("actions_over_time", []),
+        {"calls": "calls", "directions": "directions", "website_clicks": "website"},
+    )
+
+
+def _facebook_page_metrics(start: date, end: date) -> Dict[str, Any]:
+    from .facebook_service import facebook_service
+
+    page_id = os.getenv("FACEBOOK_PAGE_ID")
+    if not page_id:
+        return {"is_placeholder": True}
+    return facebook_service.get_page_metrics(page_id, start, end)
+
+
+def _google_ads_metrics(start: date, end: date) -> Dict[str, Any]:
+    from .google_ads_service import google_ads_service
+
+    return google_ads_service.get_metrics(start, end)
+
+
+def _pinterest_metrics(start: date, end: date) -> Dict[str, Any]:
+    from .pinterest_service import pinterest_service
+
+    return pinterest_service.get_user_metrics(start, end)
+
+
+def _linkedin_metrics(start: date, end: date) -> Dict[str, Any]:
+    from .linkedin_service import linkedin_service
+
+    return linkedin_service.get_metrics(start, end)
+
+
+def _tiktok_metrics(start: date, end: date) -> Dict[str, Any]:
+    from .tiktok_service import tiktok_service
+
+    return tiktok_service.get_ad_metrics(start, end)
+
+
+def _brevo_metrics(start: date, end: date) -> Dict[str, Any]:
+    from .brevo_service import brevo_marketing_service
+
+    return brevo_marketing_service.get_email_metrics(start, end)
+
+
+_FACEBOOK_PATHS = {
+    "impressions": "impressions",
+    "unique_impressions": "unique_impressions",
+    "page_visits": "page_visits",
+    "post_engagements": "post_engagements",
+    "video_views": "video_views",
+    "fan_adds": "fan_adds",
+    "fan_removes": "fan_removes",
+    "current_page_likes": "current_page_likes",
+}
+_GOOGLE_ADS_PATHS = {
+    "spend": "spend.total",
+    "clicks": "performance.clicks",
+    "impressions": "performance.impressions",
+    "conversions": "performance.conversions",
+    "conversion_value": "performance.conversion_value",
+}
+_PINTEREST_PATHS = {
+    "impressions": "impressions",
+    "pin_clicks": "pin_clicks",
+    "outbound_clicks": "outbound_clicks",
+    "saves": "saves",
+    "engagement": "engagement",
+}
+_LINKEDIN_PATHS = {
+    "impressions": "summary.impressions",
+    "clicks": "summary.clicks",
+    "reactions": "summary.reactions",
+    "comments": "summary.comments",
+    "shares": "summary.shares",
+    "engagement": "summary.engagement",
+    "followers": "account.followers",
+}
+_TIKTOK_PATHS = {
+    "spend": "spend",
+    "impressions": "impressions",
+    "clicks": "clicks",
+    "conversions": "conversions",
+}
+_BREVO_PATHS = {
+    "campaigns_sent": "summary.campaigns_sent",
+    "emails_sent": "summary.emails_sent",
+    "unique_clicks": "summary.conversions",
+    "total_contacts": "summary.total_contacts",
+}
+
+SOURCES: Dict[str, SourceSpec] = {
+    "ga4": SourceSpec(_fetch_ga4, metrics=("users",), uniques=("users",)),
+    "gsc": SourceSpec(_fetch_gsc, metrics=("clicks", "impressions")),
+    "gbp": SourceSpec(_fetch_gbp, metrics=("calls", "directions", "website_clicks")),
+    "facebook": SourceSpec(
+        _per_day(_facebook_page_metrics, _FACEBOOK_PATHS),
+        gauges=("current_page_likes",),
+        metrics=tuple(_FACEBOOK_PATHS),
+        uniques=("unique_impressions",),
+    ),
+    "google_ads": SourceSpec(_per_day(_google_ads_metrics, _GOOGLE_ADS_PATHS), metrics=tuple(_GOOGLE_ADS_PATHS)),
+    "pinterest": SourceSpec(_per_day(_pinterest_metrics, _PINTEREST_PATHS), metrics=tuple(_PINTEREST_PATHS)),
+    "linkedin": SourceSpec(
+        _per_day(_linkedin_metrics, _LINKEDIN_PATHS),
+        gauges=("followers",),
+        metrics=tuple(_LINKEDIN_PATHS),
+    ),
+    "tiktok": SourceSpec(_per_day(_tiktok_metrics, _TIKTOK_PATHS), metrics=tuple(_TIKTOK_PATHS)),
+    "brevo": SourceSpec(
+        _per_day(_brevo_metrics, _BREVO_PATHS),
+        gauges=("total_contacts",),
+        metrics=tuple(_BREVO_PATHS),
+    ),
+}
+
+
+# =============================================================================
+# Refresh planning
+# =============================================================================
+
+def previous_period(start: date, end: date) -> Tuple[date, date]:
+    """The equal-length window immediately before [start, end]."""
+    days = (end - start).days + 1
+    return start - timedelta(days=days), start - timedelta(days=1)
+
+
+def plan_refresh(
+    stored: Set[date],
+    today: date,
+    backfill_days: int = BACKFILL_DAYS,
+    late_days: int = LATE_DATA_DAYS,
+    max_days: int = MAX_DAYS_PER_RUN,
+) -> List[Tuple[date, date]]:
+    """
+    Contiguous (start, end) ranges to fetch this run: the late-data window,
+    plus the newest missing days up to max_days.
+    """
+    late = {today - timedelta(days=i) for i in range(late_days)}
+    earliest = today - timedelta(days=backfill_days)
+    missing = [
+        d for d in (today - timedelta(days=i) for i in range(backfill_days + 1))
+        if d >= earliest and d not in stored and d not in late
+    ]
+    days = sorted(late | set(missing[:max_days]))
+
+    ranges: List[Tuple[date, date]] = []
+    for day in days:
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _change_pct(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    if not previous:
+        return None
+    return round(((current or 0) - previous) / previous * 100, 2)
+
+
+# =============================================================================
+# Warehouse
+# =============================================================================
+
+class MetricsWarehouse:
+    """Reads and writes marketing_daily_metrics."""
+
+    def __init__(self, database_url: Optional[str] = None, sources: Dict[str, SourceSpec] = None):
+        self.database_url = database_url or os.getenv("DATABASE_URL")
+        self.sources = sources or SOURCES
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.database_url)
+
+    def _connect(self):
+        import psycopg2
+
+        return psycopg2.connect(self.database_url)
+
+    def _gauges(self, source: str) -> Tuple[str, ...]:
+        spec = self.sources.get(source)
+        return spec.gauges if spec else ()
+
+    def _uniques(self, source: str) -> Tuple[str, ...]:
+        spec = self.sources.get(source)
+        return spec.uniques if spec else ()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, source: str, rows: DailyRows) -> int:
+        from psycopg2.extras import execute_values
+
+        values = [
+            (source, metric, day, value)
+            for day, metrics in rows.items()
+            for metric, value in metrics.items()
+        ]
+        if not values:
+            return 0
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            execute_values(
+                cur,
+                """
+                INSERT INTO marketing_daily_metrics (source, metric, day, value)
+                VALUES %s
+                ON CONFLICT (source, metric, day) DO UPDATE SET
+                    value = EXCLUDED.value, fetched_at = NOW()
+            """,
+                values,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return len(values)
+
+    def stored_days(self, source: str, start: date, end: date) -> Set[date]:
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT DISTINCT day FROM marketing_daily_metrics
+                WHERE source = %s AND day BETWEEN %s AND %s
+            """,
+                (source, start, end),
+            )
+            return {row[0] for row in cur.fetchall()}
+        finally:
+            conn.close()
+
+    def refresh_source(self, source: str, today: date = None) -> int:
+        """Fetch missing + late-arriving days for one source. Returns rows written."""
+        spec = self.sources[source]
+        today = today or date.today()
+        stored = self.stored_days(source, today - timedelta(days=BACKFILL_DAYS), today)
+        written = 0
+        for start, end in plan_refresh(stored, today):
+            rows = spec.fetch(start, end)
+            written += self.upsert(source, rows)
+        return written
+
+    def refresh_all(self, today: date = None) -> Dict[str, Any]:
+        """Refresh every source; one failing API doesn't stop the others."""
+        results: Dict[str, Any] = {}
+        for source in self.sources:
+            try:
+                results[source] = self.refresh_source(source, today)
+            except Exception as e:
+                logger.warning(f"Marketing warehouse refresh failed for {source}: {e}")
+                results[source] = f"error: {e}"
+        logger.info(f"Marketing warehouse refresh: {results}")
+        return results
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def coverage(self, source: str, start: date, end: date) -> float:
+        """Fraction of days in [start, end] with stored data."""
+        days = (end - start).days + 1
+        return len(self.stored_days(source, start, end)) / days if days > 0 else 0.0
+
+    def compare(
+        self, source: str, start: date, end: date, metrics: List[str] = None
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Totals for [start, end] and the previous equal-length period in one
+        query, plus percent change per metric. Unique-count metrics come back
+        as None: summing daily uniques would overcount.
+        """
+        prev_start, prev_end = previous_period(start, end)
+        sql = """
+            SELECT metric,
+                   SUM(value) FILTER (WHERE day >= %(start)s),
+                   SUM(value) FILTER (WHERE day <= %(prev_end)s),
+                   (ARRAY_AGG(value ORDER BY day DESC) FILTER (WHERE day >= %(start)s))[1],
+                   (ARRAY_AGG(value ORDER BY day DESC) FILTER (WHERE day <= %(prev_end)s))[1]
+            FROM marketing_daily_metrics
+            WHERE source = %(source)s AND day BETWEEN %(prev_start)s AND %(end)s
+        """
+        params = {"source": source, "start": start, "end": end,
+                  "prev_start": prev_start, "prev_end": prev_end}
+        if metrics:
+            sql += " AND metric = ANY(%(metrics)s)"
+            params["metrics"] = list(metrics)
+        sql += " GROUP BY metric"
+
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        gauges = self._gauges(source)
+        uniques = self._uniques(source)
+        current, previous, change = {}, {}, {}
+        for metric, cur_sum, prev_sum, cur_last, prev_last in rows:
+            if metric in uniques:
+                current[metric] = previous[metric] = change[metric] = None
+                continue
+            is_gauge = metric in gauges
+            cur_value = cur_last if is_gauge else cur_sum
+            prev_value = prev_last if is_gauge else prev_sum
+            current[metric] = float(cur_value) if cur_value is not None else None
+            previous[metric] = float(prev_value) if prev_value is not None else None
+            change[metric] = _change_pct(current[metric], previous[metric])
+        return {"current": current, "previous": previous, "change_pct": change}
+
+    def totals(self, source: str, start: date, end: date, metrics: List[str] = None) -> Dict[str, Optional[float]]:
+        return self.compare(source, start, end, metrics)["current"]
+
+    def daily(self, source: str, start: date, end: date, metrics: List[str] = None) -> List[Dict[str, Any]]:
+        """[{"date": ..., metric: value, ...}] for charting, oldest first."""
+        sql = """
+            SELECT day, metric, value FROM marketing_daily_metrics
+            WHERE source = %s AND day BETWEEN %s AND %s
+        """
+        params: List[Any] = [source, start, end]
+        if metrics:
+            sql += " AND metric = ANY(%s)"
+            params.append(list(metrics))
+        sql += " ORDER BY day"
+
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        by_day: Dict[date, Dict[str, Any]] = {}
+        for day, metric, value in rows:
+            by_day.setdefault(day, {"date": day.isoformat()})[metric] = float(value)
+        return list(by_day.values())
+
+
+metrics_warehouse = MetricsWarehouse()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(metrics_warehouse.refresh_all())
@@ -250,6 +250,44 @@ class RingCentralMessagingService:
             return messages
         return []
 
+    def get_chat_posts_since(
+        self,
+        chat_id: str,
+        since: datetime,
+        page_size: int = 30,
+        max_pages: int = 5,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get posts in a chat created after ``since`` (cursor-style polling).
+
+        Pages backwards with ``pageToken`` while full pages are still newer than
+        ``since``, so a chat that was quiet for a while catches up in one call
+        chain instead of a fixed lookback window.
+
+        Returns:
+            Posts oldest-first, or None if the API call failed (so callers can
+            tell "no new posts" from "chat unreachable").
+        """
+        since_iso = since.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        params = {"recordCount": min(page_size, 250), "dateFrom": since_iso}
+        posts: List[Dict[str, Any]] = []
+        for page in range(max_pages):
+            result = self._api_request(f"/glip/chats/{chat_id}/posts", params=params)
+            if result is None:
+                if page == 0:
+                    return None
+                break
+            records = result.get("records", [])  # newest first
+            # dateFrom is inclusive; drop the post the cursor already points at
+            fresh = [r for r in records if r.get("creationTime", "") > since_iso]
+            posts.extend(fresh)
+            next_token = result.get("navigation", {}).get("nextPageToken")  # older posts
+            if len(fresh) < len(records) or len(records) < params["recordCount"] or not next_token:
+                break
+            params = {"recordCount": params["recordCount"], "pageToken": next_token}
+        posts.sort(key=lambda r: r.get("creationTime", ""))
+        return posts
+
     def load_client_names(self, db_session) -> List[str]:
         """
         Load client names from the database or WellSky for matching.
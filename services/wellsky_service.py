@@ -16,15 +16,19 @@ API Documentation: https://apidocs.clearcareonline.com/
 """
 from __future__ import annotations
 
+import json
 import logging
 import os
+import time
 from dataclasses import asdict, dataclass, field
 from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+from service_metrics import WELLSKY_REQUEST_SECONDS, endpoint_label
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -52,6 +56,9 @@ API_HOSTS = {
 # OAuth endpoint path (at ROOT level, not under /v1/)
 OAUTH_TOKEN_PATH = "/oauth/accesstoken"  # Working WellSky OAuth path
 
+# Marks where streamed base64 content is spliced into a DocumentReference body
+_STREAM_PLACEHOLDER = "__wellsky_stream_content__"
+
 
 # =============================================================================
 # Data Models
@@ -588,11 +595,15 @@ class WellSkyService:
         method: str,
         endpoint: str,
         params: Dict = None,
-        data: Dict = None
+        data: Dict = None,
+        body: Iterable[bytes] = None,
     ) -> Tuple[bool, Any]:
         """
         Make authenticated API request to WellSky.
 
+        ``body`` is a pre-serialized JSON payload (iterable of byte chunks)
+        sent as a chunked stream instead of ``data``; POST only.
+
         Returns:
             Tuple of (success: bool, data: Any)
         """
@@ -619,9 +630,13 @@ class WellSkyService:
         # if "agencyId" not in params and self.agency_id:
         #     params["agencyId"] = self.agency_id
 
+        started = time.perf_counter()
+        status = "error"
         try:
             if method.upper() == "GET":
                 response = self._session.get(url, headers=headers, params=params, timeout=30)
+            elif method.upper() == "POST" and body is not None:
+                response = self._session.post(url, headers=headers, data=body, params=params, timeout=120)
             elif method.upper() == "POST":
                 response = self._session.post(url, headers=headers, json=data, params=params, timeout=30)
             elif method.upper() == "PUT":
@@ -631,6 +646,7 @@ class WellSkyService:
             else:
                 return False, {"error": f"Unsupported method: {method}"}
 
+            status = str(response.status_code)
             if response.status_code in (200, 201):
                 return True, response.json()
             elif response.status_code == 204:
@@ -640,11 +656,19 @@ class WellSkyService:
                 return False, {"error": response.text, "status_code": response.status_code}
 
         except requests.exceptions.Timeout:
+            status = "timeout"
             logger.error(f"WellSky API timeout: {endpoint}")
             return False, {"error": "Request timeout"}
         except Exception as e:
             logger.error(f"WellSky API error: {e}")
             return False, {"error": str(e)}
+        finally:
+            WELLSKY_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=method.upper(),
+                endpoint=endpoint_label(endpoint_clean),
+                status=status,
+            )
 
     def _get_headers(self) -> Dict[str, str]:
         """Standard auth headers for WellSky requests."""
@@ -3118,8 +3142,9 @@ class WellSkyService:
         patient_id: str,
         document_type: str,
         content_type: str,
-        data_base64: str,
+        data_base64: str = "",
         filename: str = "",
+        data_stream: Optional[Iterable[bytes]] = None,
     ) -> Tuple[bool, Any]:
         """
         Upload/create a document attached to a patient profile.
@@ -3136,6 +3161,9 @@ class WellSkyService:
             content_type: MIME type (e.g. "application/pdf", "image/jpeg", "text/plain")
             data_base64: Base64-encoded document content
             filename: Original filename (e.g. "facesheet.pdf")
+            data_stream: Base64 content as byte chunks (see
+                services.document_upload_pipeline.iter_base64). Used instead of
+                data_base64 so large faxes are never held as one encoded string.
         """
         if self.is_mock_mode:
             logger.info(f"Mock: Created document for patient {patient_id}")
@@ -3155,7 +3183,7 @@ class WellSkyService:
             "content": {
                 "attachment": {
                     "contentType": content_type,
-                    "data": data_base64,
+                    "data": data_base64 if data_stream is None else _STREAM_PLACEHOLDER,
                     "title": title,
                 }
             },
@@ -3171,7 +3199,17 @@ class WellSkyService:
             },
         }
 
-        success, response = self._make_request("POST", "documentReferences/", data=doc_data)
+        if data_stream is None:
+            success, response = self._make_request("POST", "documentReferences/", data=doc_data)
+        else:
+            prefix, suffix = json.dumps(doc_data).split(f'"{_STREAM_PLACEHOLDER}"', 1)
+
+            def _body():
+                yield prefix.encode("utf-8") + b'"'
+                yield from data_stream
+                yield b'"' + suffix.encode("utf-8")
+
+            success, response = self._make_request("POST", "documentReferences/", body=_body())
         if success:
             doc_id = response.get("id", "unknown")
             logger.info(f"Created DocumentReference {doc_id} for patient {patient_id}")
@@ -4158,12 +4196,19 @@ class WellSkyService:
         Get the shift a caregiver is currently working or about to start.
         """
         shifts = self.get_caregiver_shifts_today(phone)
+        if not shifts:
+            return None
+        return self.select_current_shift(shifts)
+
+    def select_current_shift(self, shifts: List[WellSkyShift]) -> Optional[WellSkyShift]:
+        """
+        Pick the shift being worked or about to start from a caregiver's shifts today.
+        """
         if not shifts:
             return None
 
         # If only one shift today, assume it is the target (high flexibility for SMS)
         if len(shifts) == 1:
-            logger.info(f"Only one shift found for {phone} today, using it.")
             return shifts[0]
 
         now = datetime.now()
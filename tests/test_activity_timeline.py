@@ -0,0 +1,104 @@
+"""
+Unit tests for sales/activity_timeline.py
+
+Covers:
+- Keyset cursors round-trip and reject garbage
+- limit + 1 rows split into a page and the next cursor
+- Day grouping reuses the serialized rows
+- Cached totals expire and are invalidated per entity
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from sales.activity_timeline import (
+    MAX_PAGE_SIZE,
+    TotalCache,
+    decode_cursor,
+    encode_cursor,
+    group_by_day,
+    page_size,
+    split_page,
+)
+
+
+class TestCursor:
+    def test_round_trip(self):
+        when = datetime(2026, 3, 4, 5, 6, 7, 891011)
+        cursor = encode_cursor(when, 1234)
+        assert "|" not in cursor and "=" not in cursor
+        assert decode_cursor(cursor) == (when, 1234)
+
+    @pytest.mark.parametrize("cursor", ["", "garbage", encode_cursor(datetime(2026, 1, 1), 1)[:-3] + "!!!"])
+    def test_rejects_malformed(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_page_size_is_bounded(self):
+        assert page_size(None) == 50
+        assert page_size(0) == 50
+        assert page_size(10_000) == MAX_PAGE_SIZE
+        assert page_size(-5) == 1
+
+
+class TestPaging:
+    def _rows(self, n):
+        return [SimpleNamespace(id=100 - i, display_time=datetime(2026, 1, 1, 12, i)) for i in range(n)]
+
+    def test_split_with_more(self):
+        rows = self._rows(4)
+        page, cursor = split_page(rows, 3)
+        assert page == rows[:3]
+        assert decode_cursor(cursor) == (rows[2].display_time, rows[2].id)
+
+    def test_last_page(self):
+        rows = self._rows(3)
+        assert split_page(rows, 3) == (rows, None)
+
+    def test_group_by_day_shares_items(self):
+        items = [
+            {"id": 3, "display_time": "2026-01-02T09:00:00"},
+            {"id": 2, "display_time": "2026-01-02T08:00:00"},
+            {"id": 1, "display_time": None},
+        ]
+        grouped = group_by_day(items)
+        assert list(grouped) == ["2026-01-02", "Unknown"]
+        assert grouped["2026-01-02"][0] is items[0]
+
+
+class TestTotalCache:
+    def _cache(self):
+        now = [0.0]
+        cache = TotalCache(ttl=60, clock=lambda: now[0])
+        return cache, now
+
+    def test_reuses_until_ttl(self):
+        cache, now = self._cache()
+        calls = []
+        key = (frozenset({("company", 1)}), None, None, None)
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get(key, compute) == 1
+        now[0] = 59
+        assert cache.get(key, compute) == 1
+        now[0] = 61
+        assert cache.get(key, compute) == 2
+
+    def test_invalidates_only_affected_entities(self):
+        cache, _ = self._cache()
+        company = (frozenset({("company", 1)}), None, None, None)
+        other = (frozenset({("company", 2)}), None, None, None)
+        everything = (frozenset(), None, None, None)
+        for key in (company, other, everything):
+            cache.get(key, lambda: 5)
+
+        cache.invalidate([("contact", 9), ("company", 1), ("deal", None)])
+
+        assert cache.get(company, lambda: 6) == 6
+        assert cache.get(everything, lambda: 6) == 6
+        assert cache.get(other, lambda: 6) == 5
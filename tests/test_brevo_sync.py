@@ -0,0 +1,173 @@
+"""
+Unit tests for sales/brevo_sync.py
+
+Covers:
+- Content-hash diff: only new or changed contacts are pushed, per list
+- Chunked async imports wait for Brevo's import process and checkpoint per chunk
+- A failed chunk is not checkpointed, so the next run resends only it
+- Incremental pulls use modifiedSince and only advance the cursor on success
+"""
+
+import threading
+
+import pytest
+
+from sales.brevo_sync import BrevoContactSync, content_hash, format_contact
+
+
+class FakeBrevo:
+    base_url = "https://brevo.example/v3"
+
+    def _get_headers(self):
+        return {"api-key": "k"}
+
+
+class MemoryStore:
+    def __init__(self):
+        self.hashes = {}
+        self.cursors = {}
+
+    def load_hashes(self, list_id=None):
+        return dict(self.hashes.get(list_id or 0, {}))
+
+    def save_hashes(self, hashes, list_id=None):
+        self.hashes.setdefault(list_id or 0, {}).update(hashes)
+
+    def get_cursor(self, name):
+        return self.cursors.get(name)
+
+    def set_cursor(self, name, value):
+        self.cursors[name] = value
+
+
+class _Resp:
+    def __init__(self, status, body=None):
+        self.status_code = status
+        self.body = body or {}
+        self.text = "x" if body else ""
+
+    def json(self):
+        return self.body
+
+
+class FakeHttp:
+    def __init__(self, fail_emails=(), pages=None, process_states=("in_process", "completed")):
+        self.fail_emails = set(fail_emails)
+        self.pages = pages or []
+        self.process_states = process_states
+        self.imports = []
+        self.polls = {}
+        self.gets = []
+        self.lock = threading.Lock()
+
+    def post(self, url, headers, json):
+        emails = [row["email"] for row in json["jsonBody"]]
+        with self.lock:
+            self.imports.append((emails, json.get("listIds")))
+            process_id = len(self.imports)
+        if self.fail_emails & set(emails):
+            return _Resp(400, {"message": "invalid"})
+        return _Resp(202, {"processId": process_id})
+
+    def get(self, url, headers, params=None):
+        if "/processes/" in url:
+            process_id = url.rsplit("/", 1)[1]
+            with self.lock:
+                n = self.polls.get(process_id, 0)
+                self.polls[process_id] = n + 1
+            return _Resp(200, {"status": self.process_states[min(n, len(self.process_states) - 1)]})
+        self.gets.append((url, dict(params)))
+        page = self.pages.pop(0) if self.pages else []
+        return _Resp(200, {"contacts": page})
+
+
+def _contacts(n, **extra):
+    return [{"email": f"c{i}@x.com", "first_name": f"First{i} Last", **extra} for i in range(n)]
+
+
+def _sync(http, store, **kwargs):
+    return BrevoContactSync(FakeBrevo(), store, session=http, poll_seconds=0, **kwargs)
+
+
+class TestFormat:
+    def test_format_contact(self):
+        row = format_contact({"email": " Pat@X.com ", "first_name": "Pat Doe", "phone": "303", "company": ""})
+        assert row == {"email": "pat@x.com", "attributes": {"FIRSTNAME": "Pat", "LASTNAME": "Doe", "SMS": "303"}}
+        assert format_contact({"email": ""}) is None
+
+    def test_hash_is_order_independent(self):
+        a = {"email": "a@x.com", "attributes": {"A": 1, "B": 2}}
+        b = {"attributes": {"B": 2, "A": 1}, "email": "a@x.com"}
+        assert content_hash(a) == content_hash(b)
+
+
+class TestPush:
+    def test_only_changed_contacts_are_sent(self):
+        store, http = MemoryStore(), FakeHttp()
+        sync = _sync(http, store, chunk_size=2)
+
+        first = sync.push(_contacts(5), list_id=7)
+        assert (first.changed, first.imported, first.unchanged) == (5, 5, 0)
+        assert sorted(len(emails) for emails, _ in http.imports) == [1, 2, 2]
+        assert all(list_ids == [7] for _, list_ids in http.imports)
+
+        contacts = _contacts(5)
+        contacts[3]["phone"] = "3035550100"
+        http.imports.clear()
+        second = sync.push(contacts, list_id=7)
+        assert (second.changed, second.unchanged) == (1, 4)
+        assert http.imports == [(["c3@x.com"], [7])]
+
+        # A different list has its own sync state
+        assert sync.push(_contacts(5), list_id=8).changed == 5
+
+    def test_failed_chunk_is_retried_next_run(self):
+        store = MemoryStore()
+        result = _sync(FakeHttp(fail_emails={"c2@x.com"}), store, chunk_size=2).push(_contacts(6))
+
+        assert not result.success and result.imported == 4
+        assert set(store.hashes[0]) == {"c0@x.com", "c1@x.com", "c4@x.com", "c5@x.com"}
+
+        http = FakeHttp()
+        retry = _sync(http, store, chunk_size=2).push(_contacts(6))
+        assert retry.success and retry.unchanged == 4
+        assert http.imports == [(["c2@x.com", "c3@x.com"], None)]
+
+    def test_waits_for_import_process(self):
+        http = FakeHttp(process_states=("queued", "in_process", "completed"))
+        _sync(http, MemoryStore()).push(_contacts(1))
+        assert http.polls == {"1": 3}
+
+    def test_unfinished_process_is_not_checkpointed(self):
+        store = MemoryStore()
+        result = _sync(FakeHttp(process_states=("in_process",)), store, timeout_seconds=0).push(_contacts(1))
+        assert not result.success and store.hashes == {}
+
+
+class TestPull:
+    def test_incremental_pull_advances_cursor(self, monkeypatch):
+        monkeypatch.setattr("sales.brevo_sync.PULL_PAGE_SIZE", 2)
+        store = MemoryStore()
+        store.cursors["list:4"] = "2026-01-01T00:00:00.000Z"
+        http = FakeHttp(pages=[[{"email": "a@x.com"}, {"email": "b@x.com"}], [{"email": "c@x.com"}]])
+        applied = []
+
+        pulled = _sync(http, store).pull(applied.append, cursor_name="list:4", list_id=4)
+
+        assert pulled == 3 and [len(p) for p in applied] == [2, 1]
+        assert http.gets[0][0].endswith("/contacts/lists/4/contacts")
+        assert http.gets[0][1]["modifiedSince"] == "2026-01-01T00:00:00.000Z"
+        assert http.gets[1][1]["offset"] == 2
+        assert store.cursors["list:4"] > "2026-01-01T00:00:00.000Z"
+
+    def test_failed_apply_keeps_cursor(self):
+        store = MemoryStore()
+
+        def apply(page):
+            raise RuntimeError("db down")
+
+        http = FakeHttp(pages=[[{"email": "a@x.com"}]])
+        with pytest.raises(RuntimeError):
+            _sync(http, store).pull(apply)
+        assert "modifiedSince" not in http.gets[0][1]  # first pull reads everything
+        assert "contacts" not in store.cursors
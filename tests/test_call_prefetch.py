@@ -0,0 +1,134 @@
+"""
+Unit tests for gigi/call_prefetch.py
+
+Covers:
+- Loaders run in parallel and a failing loader doesn't sink the rest
+- Concurrent prefetches for one phone share a single load
+- Entries expire after the TTL and are released at hang-up
+- Shift reads are only served for the caller's own, prefetched window
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from gigi.call_prefetch import CallContextPrefetcher
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _shift(hours_from_now, caregiver_id="CG1", client_id="CL1"):
+    start = datetime.now() + timedelta(hours=hours_from_now)
+    return {
+        "id": f"S{hours_from_now}",
+        "scheduled_start": start.isoformat(),
+        "scheduled_end": (start + timedelta(hours=4)).isoformat(),
+        "status": "scheduled",
+        "client_id": client_id,
+        "caregiver_id": caregiver_id,
+        "client_name": "Client",
+        "caregiver_name": "Caregiver",
+        "client_address": "",
+    }
+
+
+def _prefetcher(delay=0.0, clock=None, fail=None):
+    calls = []
+
+    def loader(name, value):
+        def _load(phone):
+            calls.append(name)
+            time.sleep(delay)
+            if name == fail:
+                raise RuntimeError("db down")
+            return value
+        return _load
+
+    loaders = {
+        "identity": loader("identity", {"type": "caregiver", "id": "CG1", "first_name": "Ana", "full_name": "Ana Diaz"}),
+        "shifts": loader("shifts", [_shift(2), _shift(30), _shift(5, caregiver_id="CG2")]),
+        "open_call_outs": loader("open_call_outs", []),
+        "recent_conversations": loader("recent_conversations", [{"role": "user", "content": "hi"}]),
+    }
+    return CallContextPrefetcher(loaders, ttl=300, clock=clock or _Clock()), calls
+
+
+class TestPrefetch:
+    @pytest.mark.asyncio
+    async def test_loaders_run_in_parallel(self):
+        prefetcher, _ = _prefetcher(delay=0.2)
+
+        started = time.monotonic()
+        ctx = await prefetcher.prefetch("+1 (303) 555-0100", call_id="call_1")
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.6  # four 0.2s loaders, not 0.8s serially
+        assert ctx.person_id == "CG1"
+        assert prefetcher.get(call_id="call_1") is ctx
+
+    @pytest.mark.asyncio
+    async def test_failed_loader_keeps_other_segments(self):
+        prefetcher, _ = _prefetcher(fail="shifts")
+        ctx = await prefetcher.prefetch("3035550100")
+
+        assert ctx.shifts == []
+        assert ctx.identity["first_name"] == "Ana"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_prefetches_share_one_load(self):
+        prefetcher, calls = _prefetcher(delay=0.1)
+
+        first, second = await asyncio.gather(
+            prefetcher.prefetch("3035550100"), prefetcher.prefetch("13035550100")
+        )
+
+        assert first is second
+        assert calls.count("identity") == 1
+
+
+class TestLifecycle:
+    @pytest.mark.asyncio
+    async def test_expires_after_ttl(self):
+        clock = _Clock()
+        prefetcher, _ = _prefetcher(clock=clock)
+        await prefetcher.prefetch("3035550100")
+
+        clock.now += 299
+        assert prefetcher.find_person("CG1") is not None
+        clock.now += 2
+        assert prefetcher.find_person("CG1") is None
+
+    @pytest.mark.asyncio
+    async def test_release_and_forget(self):
+        prefetcher, _ = _prefetcher()
+        await prefetcher.prefetch("3035550100", call_id="call_1")
+        prefetcher.release("call_1")
+        assert prefetcher.get(phone="3035550100") is None
+
+        await prefetcher.prefetch("3035550100")
+        prefetcher.forget_person("CG1")
+        assert prefetcher.get(phone="3035550100") is None
+
+
+class TestShiftReads:
+    @pytest.mark.asyncio
+    async def test_own_shifts_within_window(self):
+        prefetcher, _ = _prefetcher()
+        ctx = await prefetcher.prefetch("3035550100")
+
+        assert [s["id"] for s in ctx.upcoming_shifts(hours=24)] == ["S2", "S5"]
+        payload = ctx.shifts_payload(7, caregiver_id="CG1")
+        assert payload["count"] == 2
+        assert payload["shifts"][0]["scheduled_hours"] == 4.0
+
+        # Someone else's shifts, or a longer window than prefetched, go to the DB
+        assert ctx.shifts_payload(7, caregiver_id="CG2") is None
+        assert ctx.shifts_payload(30, caregiver_id="CG1") is None
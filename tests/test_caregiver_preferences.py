@@ -0,0 +1,113 @@
+"""
+Unit tests for gigi/caregiver_preference_extractor.py
+
+Covers:
+- Batch lookup returns hard/soft preferences for a candidate list in one query
+- Cached preferences are reused within the TTL and refetched after it
+- Storing a preference invalidates that caregiver's cache entry for every
+  extractor in the process
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from gigi import caregiver_preference_extractor as cpe
+from gigi.caregiver_preference_extractor import CaregiverPreferenceExtractor
+
+
+def _pref(caregiver_id, content, hard=False, confidence=0.6, pref_type="schedule"):
+    return SimpleNamespace(
+        id=f"{caregiver_id}:{content}",
+        content=f"Caregiver: {content}",
+        confidence=confidence,
+        metadata={"caregiver_id": caregiver_id, "hard_constraint": hard, "preference_type": pref_type},
+    )
+
+
+class FakeMemory:
+    def __init__(self, memories):
+        self.memories = memories
+        self.queries = []
+        self.reinforced = []
+
+    def query_memories(self, category, status, min_confidence, limit, metadata_key, metadata_values):
+        self.queries.append(list(metadata_values))
+        return [
+            m for m in self.memories
+            if m.metadata[metadata_key] in metadata_values and m.confidence >= min_confidence
+        ]
+
+    def reinforce_memory(self, memory_id):
+        self.reinforced.append(memory_id)
+
+
+@pytest.fixture
+def memory():
+    return FakeMemory([
+        _pref("CG1", "can never work thursdays", hard=True),
+        _pref("CG1", "prefers mornings"),
+        _pref("CG1", "won't go to Boulder", hard=True, confidence=0.4),
+        _pref("CG2", "loves Mrs. Smith", pref_type="client"),
+    ])
+
+
+def _extractor(memory):
+    return CaregiverPreferenceExtractor(memory, llm_provider="anthropic", api_key="test")
+
+
+@pytest.fixture
+def extractor(memory, monkeypatch):
+    monkeypatch.setattr(cpe, "ANTHROPIC_AVAILABLE", True)
+    monkeypatch.setattr(cpe, "anthropic", SimpleNamespace(Anthropic=lambda api_key: object()))
+    extractor = _extractor(memory)
+    extractor.invalidate_preferences()
+    return extractor
+
+
+class TestBatchLookup:
+    def test_one_query_for_all_candidates(self, extractor, memory):
+        prefs = extractor.get_preferences_for_caregivers(["CG1", "CG2", "CG3", "CG1"])
+
+        assert memory.queries == [["CG1", "CG2", "CG3"]]
+        assert [p.content for p in prefs["CG1"].hard] == ["Caregiver: can never work thursdays"]
+        assert len(prefs["CG1"].soft) == 1
+        assert prefs["CG3"].hard == prefs["CG3"].soft == []
+
+        # Per-candidate checks in the matcher are now cache hits
+        assert len(extractor.get_hard_constraints("CG1")) == 1
+        assert len(extractor.get_soft_preferences("CG2")) == 1
+        assert len(memory.queries) == 1
+
+    def test_cache_expires(self, extractor, memory, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(cpe.time, "monotonic", lambda: clock[0])
+
+        extractor.get_caregiver_preferences("CG1")
+        clock[0] += cpe.PREFERENCE_CACHE_TTL + 1
+        extractor.get_caregiver_preferences("CG1")
+
+        assert memory.queries == [["CG1"], ["CG1"]]
+
+
+class TestInvalidation:
+    def test_store_drops_cached_entry(self, extractor, memory):
+        assert len(extractor.get_caregiver_preferences("CG1")) == 3
+
+        memory_id = extractor._store_preference(
+            "CG1", "Maria", {"type": "schedule", "content": "can never work thursdays"}
+        )
+
+        assert memory.reinforced == [memory_id] == ["CG1:can never work thursdays"]
+        extractor.get_caregiver_preferences("CG1")
+        # Initial load, similarity lookup on store, reload after invalidation
+        assert memory.queries == [["CG1"], ["CG1"], ["CG1"]]
+
+    def test_store_invalidates_other_extractors(self, extractor, memory):
+        matcher_extractor = _extractor(memory)
+        assert len(matcher_extractor.get_caregiver_preferences("CG2")) == 1
+
+        memory.memories.append(_pref("CG2", "won't work weekends", hard=True))
+        extractor._store_preference("CG2", "Ana", {"type": "schedule", "content": "won't work weekends"})
+
+        assert len(matcher_extractor.get_hard_constraints("CG2")) == 1
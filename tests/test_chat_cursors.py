@@ -0,0 +1,72 @@
+"""
+Unit tests for gigi/chat_cursors.py
+
+Covers:
+- Cursor advances to the newest post seen
+- Idle chats back off exponentially up to the cap
+- lastModifiedTime wakes a backed-off chat immediately
+"""
+
+from datetime import datetime, timedelta
+
+from gigi.chat_cursors import ChatCursorTracker, parse_rc_timestamp
+
+START = datetime(2026, 3, 2, 12, 0, 0)
+
+
+def _post(post_id, when):
+    return {"id": post_id, "creationTime": when.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"}
+
+
+class TestParse:
+    def test_with_and_without_millis(self):
+        assert parse_rc_timestamp("2026-03-02T12:00:01.250Z") == datetime(2026, 3, 2, 12, 0, 1, 250000)
+        assert parse_rc_timestamp("2026-03-02T12:00:01Z") == datetime(2026, 3, 2, 12, 0, 1)
+        assert parse_rc_timestamp("garbage") is None
+        assert parse_rc_timestamp("") is None
+
+
+class TestCursor:
+    def test_new_chat_starts_at_startup_and_is_due(self):
+        tracker = ChatCursorTracker(start_at=START)
+        assert tracker.get("c1").last_seen_at == START
+        assert tracker.is_due("c1", START)
+
+    def test_advance_moves_to_newest_post(self):
+        tracker = ChatCursorTracker(start_at=START)
+        t1, t2 = START + timedelta(seconds=5), START + timedelta(seconds=9)
+        tracker.advance("c1", [_post("a", t1), _post("b", t2)], now=START)
+
+        cursor = tracker.get("c1")
+        assert cursor.last_seen_at == t2
+        assert cursor.idle_polls == 0
+        assert cursor.next_poll_at == START + timedelta(seconds=30)
+
+    def test_idle_backoff_caps(self):
+        tracker = ChatCursorTracker(start_at=START, base_interval=30, max_interval=300)
+        intervals = []
+        for _ in range(6):
+            tracker.advance("c1", [], now=START)
+            intervals.append((tracker.get("c1").next_poll_at - START).total_seconds())
+        assert intervals == [60, 120, 240, 300, 300, 300]
+
+        tracker.advance("c1", [_post("x", START + timedelta(seconds=1))], now=START)
+        assert tracker.get("c1").idle_polls == 0
+
+    def test_per_chat_cap(self):
+        tracker = ChatCursorTracker(start_at=START, base_interval=30, max_interval=300)
+        tracker.set_max_interval("team", 60)
+        for _ in range(4):
+            tracker.advance("team", [], now=START)
+            tracker.advance("dm", [], now=START)
+        assert tracker.get("team").next_poll_at == START + timedelta(seconds=60)
+        assert tracker.get("dm").next_poll_at == START + timedelta(seconds=300)
+
+    def test_last_modified_wakes_backed_off_chat(self):
+        tracker = ChatCursorTracker(start_at=START)
+        for _ in range(4):
+            tracker.advance("c1", [], now=START)
+        soon = START + timedelta(seconds=31)
+        assert not tracker.is_due("c1", soon)
+        assert not tracker.is_due("c1", soon, "2026-03-02T11:59:00.000Z")
+        assert tracker.is_due("c1", soon, "2026-03-02T12:00:30.000Z")
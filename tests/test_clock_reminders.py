@@ -0,0 +1,123 @@
+"""
+Unit tests for gigi/clock_reminder_service.py
+
+Covers:
+- Caregiver phones are resolved in one cached_practitioners lookup, not per shift
+- Each check only visits shifts whose reminder window is open
+"""
+
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from gigi import clock_reminder_service as crs
+from gigi.clock_reminder_service import ClockReminderService, TodayShiftIndex
+
+
+def _shift(shift_id, caregiver_id, start, end, phone=None, clock_in=None, status="scheduled"):
+    return SimpleNamespace(
+        id=shift_id, caregiver_id=caregiver_id, caregiver_phone=phone,
+        caregiver_first_name=None, client_first_name="Ann",
+        date=date.today(), start_time=start, end_time=end,
+        clock_in_time=clock_in, clock_out_time=None, status=status,
+    )
+
+
+class FakeWellSky:
+    def __init__(self, shifts):
+        self.shifts = shifts
+        self.get_caregiver_calls = 0
+
+    def get_shifts(self, date_from, date_to, limit):
+        return self.shifts
+
+    def get_caregiver(self, caregiver_id):
+        self.get_caregiver_calls += 1
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+
+    def lookup(ids):
+        ids = sorted(ids)
+        calls.append(ids)
+        return {i: (f"+1303555{i[-4:]}", f"Care{i[-1]}") for i in ids}
+
+    monkeypatch.setattr(crs, "_lookup_practitioners", lookup)
+    return calls
+
+
+class TestIndexBuild:
+    def test_phones_resolved_in_one_batch(self, lookups):
+        wellsky = FakeWellSky([
+            _shift("S1", "CG0001", "08:00", "12:00"),
+            _shift("S2", "CG0002", "09:00", "13:00", phone="+17205550000"),
+            _shift("S3", "CG0003", "10:00", "14:00"),
+            _shift("S4", "CG0004", "11:00", "15:00", status="cancelled"),
+        ])
+
+        index = crs.build_today_shift_index(wellsky)
+
+        assert lookups == [["CG0001", "CG0003"]]
+        assert wellsky.get_caregiver_calls == 0
+        assert [s["shift_id"] for s in index.shifts] == ["S1", "S2", "S3"]
+        assert index.shifts[2]["caregiver_phone"] == "+13035550003"
+        assert index.shifts[1]["caregiver_phone"] == "+17205550000"
+
+
+class TestWindows:
+    def test_range_queries(self):
+        day = date(2026, 3, 2)
+        shifts = [
+            {"shift_id": "late", "start_time": "14:00", "end_time": "18:00"},
+            {"shift_id": "early", "start_time": "07:00", "end_time": "11:00"},
+            {"shift_id": "mid", "start_time": "09:30", "end_time": "13:30"},
+            {"shift_id": "no_time", "start_time": None, "end_time": None},
+        ]
+        index = TodayShiftIndex(shifts, day, datetime(2026, 3, 2, 6, 0))
+
+        at = lambda h, m=0: datetime(2026, 3, 2, h, m)  # noqa: E731
+        assert [s["shift_id"] for s in index.starting_between(at(7), at(10))] == ["early", "mid"]
+        assert [s["shift_id"] for s in index.ending_between(at(12), at(18))] == ["mid", "late"]
+        assert index.starting_between(at(15), at(16)) == []
+
+    def test_check_only_sends_inside_window(self, lookups, monkeypatch):
+        now = datetime(2026, 3, 2, 12, 0)
+
+        class FixedDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now
+
+        class FixedDate(date):
+            @classmethod
+            def today(cls):
+                return now.date()
+
+        monkeypatch.setattr(crs, "datetime", FixedDatetime)
+        monkeypatch.setattr(crs, "date", FixedDate)
+        monkeypatch.setattr(crs, "CLOCK_REMINDER_ENABLED", True)
+        monkeypatch.setattr(crs, "psycopg2", None)
+
+        shifts = [
+            _shift("late_in", "CG0001", "11:30", "15:00"),
+            _shift("future", "CG0002", "13:00", "17:00"),
+            _shift("long_ago", "CG0003", "09:00", "15:00"),
+            _shift("late_out", "CG0004", "07:00", "11:40", clock_in=now),
+        ]
+        for s in shifts:
+            s.date = now.date()
+        sent = []
+        service = ClockReminderService(
+            FakeWellSky(shifts), lambda phone, msg: (sent.append(phone) or True, None)
+        )
+
+        actions = service.check_and_remind()
+
+        assert sorted(a.split(":")[0] for a in actions) == ["clock_in_reminder", "clock_out_reminder"]
+        assert sorted(sent) == ["+13035550001", "+13035550004"]
+        # Second run inside the cooldown sends nothing
+        assert service.check_and_remind() == []
+
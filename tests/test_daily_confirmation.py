@@ -0,0 +1,145 @@
+"""
+Unit tests for gigi/daily_confirmation_service.py
+
+Covers:
+- WellSky fallback pages past 200 caregivers and groups shifts per caregiver
+- One text per caregiver, sent through the async batch sender
+- A resumed run skips caregivers already texted and claims held elsewhere
+- Failed sends release their claim
+- Rate limiter spacing
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from gigi import daily_confirmation_service as dcs
+from gigi.daily_confirmation_service import (
+    CaregiverSchedule,
+    ConfirmationShift,
+    DailyConfirmationService,
+    RateLimiter,
+)
+
+TOMORROW = date.today() + timedelta(days=1)
+
+
+class _Sender:
+    def __init__(self, fail=()):
+        self.sent = []
+        self.fail = set(fail)
+
+    def __call__(self, phone, message):
+        if phone in self.fail:
+            return False, "carrier rejected"
+        self.sent.append((phone, message))
+        return True, None
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(dcs, "psycopg2", None)
+    monkeypatch.setattr(dcs, "SMS_RATE_PER_SECOND", 0)
+    sender = _Sender()
+    svc = DailyConfirmationService(wellsky_service=None, sms_send_fn=sender)
+    svc.sender = sender
+    return svc
+
+
+def _schedule(i, n_shifts=1):
+    shifts = [ConfirmationShift(f"Client{j}", f"{8 + j:02d}:00", f"{12 + j:02d}:00") for j in range(n_shifts)]
+    return CaregiverSchedule(f"CG{i}", f"Care{i}", f"+1303555{i:04d}", shifts)
+
+
+class TestWellSkyFallback:
+    def test_pages_caregivers_and_clients_and_groups(self, service):
+        wellsky_service = pytest.importorskip("services.wellsky_service")
+
+        caregivers = [
+            SimpleNamespace(id=f"CG{i}", first_name=f"Care{i}", phone=f"+1303555{i:04d}")
+            for i in range(450)
+        ]
+
+        def shift(cg_id, client, start, status="scheduled"):
+            return SimpleNamespace(
+                caregiver_id=cg_id, client_first_name=client, start_time=start,
+                end_time="17:00", date=TOMORROW, status=wellsky_service.ShiftStatus(status),
+            )
+
+        shifts_by_client = {
+            "C1": [shift("CG420", "Ann", "13:00"), shift("CG1", "Ann", "09:00")],
+            "C2": [shift("CG420", "Bob", "08:00"), shift("CG2", "Bob", "10:00", "cancelled")],
+        }
+        # More active clients than one page; only the first two have shifts
+        clients = [SimpleNamespace(id=c) for c in shifts_by_client]
+        clients += [SimpleNamespace(id=f"C{i}") for i in range(3, 260)]
+        calls = []
+
+        class FakeWellSky:
+            def get_caregivers(self, status, limit, offset=0):
+                return caregivers[offset:offset + limit]
+
+            def get_clients(self, status, limit, offset=0):
+                return clients[offset:offset + limit]
+
+            def get_shifts(self, client_id, date_from, date_to):
+                calls.append(client_id)
+                return shifts_by_client.get(client_id, [])
+
+        service.wellsky = FakeWellSky()
+        schedules = {s.caregiver_id: s for s in service._load_schedule_from_wellsky(TOMORROW)}
+
+        assert sorted(calls) == sorted(c.id for c in clients)
+        assert set(schedules) == {"CG1", "CG420"}
+        assert [s.client_first_name for s in schedules["CG420"].shifts] == ["Bob", "Ann"]
+
+
+class TestSend:
+    def test_one_text_per_caregiver(self, service, monkeypatch):
+        schedules = [_schedule(1, n_shifts=2), _schedule(2)]
+        monkeypatch.setattr(service, "_load_schedule_from_cache", lambda d: schedules)
+
+        notified = service._send_all_confirmations(TOMORROW)
+
+        assert sorted(notified) == ["Care1", "Care2"]
+        assert len(service.sender.sent) == 2
+        message = dict(service.sender.sent)["+13035550001"]
+        assert "2 shifts tomorrow" in message
+        assert "- Client1 09:00-13:00" in message
+
+    def test_resume_skips_already_sent(self, service, monkeypatch):
+        schedules = [_schedule(i) for i in range(5)]
+        monkeypatch.setattr(service, "_load_schedule_from_cache", lambda d: schedules)
+        monkeypatch.setattr(service, "_load_sent_caregivers", lambda d: {"CG0", "CG1"})
+        # CG2 was claimed by a concurrent run between load and send
+        monkeypatch.setattr(service, "_claim_sent_marker", lambda key: not key.endswith(":CG2"))
+
+        notified = service._send_all_confirmations(TOMORROW)
+
+        assert sorted(notified) == ["Care3", "Care4"]
+        assert [phone for phone, _ in service.sender.sent] == ["+13035550003", "+13035550004"]
+
+    def test_failed_send_releases_claim(self, service, monkeypatch):
+        service.sender.fail.add("+13035550001")
+        released, recorded = [], []
+        monkeypatch.setattr(service, "_release_sent_marker", released.append)
+        monkeypatch.setattr(service, "_set_sent_marker", lambda key, value: recorded.append(key))
+
+        notified = asyncio.run(service._send_batch([_schedule(1), _schedule(2)], TOMORROW))
+
+        assert notified == ["Care2"]
+        assert released == [f"daily_confirmation:{TOMORROW.isoformat()}:CG1"]
+        assert recorded == [f"daily_confirmation:{TOMORROW.isoformat()}:CG2"]
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_spacing(self):
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait() for _ in range(6)))
+        # First call is immediate, the remaining five are 20ms apart
+        assert time.monotonic() - start >= 0.09
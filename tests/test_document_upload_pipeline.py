@@ -0,0 +1,99 @@
+"""
+Unit tests for services/document_upload_pipeline.py
+
+Covers:
+- Streamed base64 encoding matches one-shot encoding
+- Retry/backoff on transient WellSky failures only
+- Bounded-concurrency batch uploads
+"""
+
+import base64
+from unittest.mock import MagicMock
+
+from services.document_upload_pipeline import (
+    DocumentUpload,
+    iter_base64,
+    upload_document,
+    upload_documents,
+)
+
+
+def _service(*responses):
+    svc = MagicMock()
+
+    def _create(**kwargs):
+        b"".join(kwargs["data_stream"])  # consume like a real HTTP body
+        return responses[min(svc.create_document_reference.call_count - 1, len(responses) - 1)]
+
+    svc.create_document_reference.side_effect = _create
+    return svc
+
+
+class TestIterBase64:
+    def test_file_stream_matches_one_shot(self, tmp_path):
+        payload = bytes(range(256)) * 1000 + b"tail"
+        path = tmp_path / "fax.pdf"
+        path.write_bytes(payload)
+
+        streamed = b"".join(iter_base64(path=str(path), read_size=3 * 100))
+
+        assert streamed == base64.b64encode(payload)
+
+    def test_bytes_stream_matches_one_shot(self):
+        payload = b"x" * 1001
+        assert b"".join(iter_base64(data=payload, read_size=9)) == base64.b64encode(payload)
+
+
+class TestUploadDocument:
+    def test_retries_transient_then_succeeds(self):
+        svc = _service(
+            (False, {"error": "boom", "status_code": 500}),
+            (True, {"id": "doc-1"}),
+        )
+        sleep = MagicMock()
+
+        result = upload_document(DocumentUpload("p1", "Referral", "a.pdf", data=b"pdf"),
+                                 service=svc, sleep=sleep)
+
+        assert result.success is True
+        assert result.attempts == 2
+        assert result.document_id == "doc-1"
+        sleep.assert_called_once()
+
+    def test_client_error_not_retried(self):
+        svc = _service((False, {"error": "bad request", "status_code": 400}))
+
+        result = upload_document(DocumentUpload("p1", "Referral", "a.pdf", data=b"pdf"),
+                                 service=svc, sleep=MagicMock())
+
+        assert result.success is False
+        assert result.attempts == 1
+        assert "bad request" in result.error
+
+    def test_gives_up_after_max_attempts(self):
+        svc = _service((False, {"error": "Request timeout"}))
+
+        result = upload_document(DocumentUpload("p1", "Referral", "a.pdf", data=b"pdf"),
+                                 service=svc, max_attempts=3, sleep=MagicMock())
+
+        assert result.success is False
+        assert result.attempts == 3
+
+    def test_missing_file(self, tmp_path):
+        result = upload_document(DocumentUpload("p1", "Referral", "a.pdf", path=str(tmp_path / "nope.pdf")),
+                                 service=MagicMock())
+        assert result.success is False
+        assert result.attempts == 0
+
+
+class TestUploadDocuments:
+    def test_reports_every_result(self):
+        svc = _service((True, {"id": "doc"}))
+        seen = []
+        uploads = [DocumentUpload("p", "Referral", f"{i}.pdf", data=b"x", key=i) for i in range(5)]
+
+        results = upload_documents(uploads, concurrency=2, on_result=seen.append, service=svc)
+
+        assert len(results) == 5
+        assert sorted(r.upload.key for r in seen) == [0, 1, 2, 3, 4]
+        assert all(r.success for r in results)
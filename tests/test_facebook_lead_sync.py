@@ -0,0 +1,160 @@
+"""
+Unit tests for recruiting/facebook_lead_sync.py
+
+Covers:
+- Lead forms and leads are fetched with Graph API batch requests (50 per call)
+- Per-form `since` cursors filter requests and advance to the newest lead
+- Paging links are followed; failed batch items are skipped without moving cursors
+- Set-based dedupe against existing rows by facebook id, email, phone or name
+"""
+
+import json
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from recruiting.facebook_lead_sync import (
+    GraphClient,
+    fetch_new_leads,
+    list_lead_forms,
+    normalize_phone,
+    parse_lead,
+    plan_ingest,
+)
+
+
+class _Resp:
+    def __init__(self, body, status=200):
+        self.body = body
+        self.status_code = status
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Serves relative Graph URLs from a dict, batched or via paging links."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.batches = []
+        self.gets = []
+
+    def post(self, url, data, timeout):
+        batch = json.loads(data["batch"])
+        self.batches.append([b["relative_url"] for b in batch])
+        items = []
+        for b in batch:
+            body = self.routes.get(b["relative_url"].split("?")[0])
+            if body is None:
+                items.append({"code": 400, "body": json.dumps({"error": {"message": "nope"}})})
+            else:
+                items.append({"code": 200, "body": json.dumps(body(b["relative_url"]) if callable(body) else body)})
+        return _Resp(items)
+
+    def get(self, url, params, timeout):
+        self.gets.append(url)
+        return _Resp(self.routes[url])
+
+
+def _lead(lead_id, created, email="", phone="", name="Pat Doe"):
+    return {
+        "id": lead_id,
+        "created_time": created,
+        "field_data": [
+            {"name": "full_name", "values": [name]},
+            {"name": "email", "values": [email]},
+            {"name": "phone_number", "values": [phone]},
+        ],
+    }
+
+
+class TestGraphFetch:
+    def test_forms_and_leads_batched_with_cursors(self):
+        seen_filters = {}
+
+        def leads_for(form_id, leads):
+            def respond(url):
+                query = parse_qs(urlparse(url).query)
+                seen_filters[form_id] = json.loads(unquote(query["filtering"][0])) if "filtering" in query else None
+                return {"data": leads}
+            return respond
+
+        routes = {
+            "P1/leadgen_forms": {
+                "data": [{"id": "F1", "name": "Denver", "status": "ACTIVE"}],
+                "paging": {"next": "https://graph.example/P1/forms?after=x"},
+            },
+            "https://graph.example/P1/forms?after=x": {"data": [{"id": "F2", "name": "Old", "status": "ARCHIVED"}]},
+            "P2/leadgen_forms": {"data": [{"id": "F3", "name": "Pueblo", "status": "ACTIVE"}]},
+            "F1/leads": leads_for("F1", [
+                _lead("L1", "2026-01-05T10:00:00+0000"),
+                _lead("L2", "2026-01-06T10:00:00+0000"),
+            ]),
+            "F2/leads": leads_for("F2", []),
+            # F3 fails (e.g. missing permission) and keeps its cursor
+        }
+        session = FakeSession(routes)
+        client = GraphClient("token", session=session)
+
+        forms = list_lead_forms(client, ["P1", "P2"])
+        assert [(f["id"], f["page_id"]) for f in forms] == [("F1", "P1"), ("F2", "P1"), ("F3", "P2")]
+
+        leads, cursors = fetch_new_leads(client, forms, {"F1": 1767000000, "F3": 1700000000})
+
+        assert [lead["id"] for lead in leads] == ["L1", "L2"]
+        assert all(lead["form_id"] == "F1" for lead in leads)
+        assert cursors == {"F1": 1767693600, "F3": 1700000000}
+        assert seen_filters == {
+            "F1": [{"field": "time_created", "operator": "GREATER_THAN", "value": 1767000000}],
+            "F2": None,
+        }
+        # One batch for the forms of both pages, one for all three forms' leads
+        assert len(session.batches) == 2
+        assert len(session.batches[1]) == 3
+
+    def test_batches_capped_at_50(self):
+        session = FakeSession({f"F{i}/leads": {"data": []} for i in range(120)})
+        client = GraphClient("token", session=session)
+
+        fetch_new_leads(client, [{"id": f"F{i}"} for i in range(120)], {})
+
+        assert [len(b) for b in session.batches] == [50, 50, 20]
+
+
+class TestParse:
+    def test_fields(self):
+        lead = parse_lead(_lead("L1", "2026-01-05T10:00:00+0000", "Pat@Example.com ", "+1 (303) 555-0100"))
+        assert lead["facebook_lead_id"] == "L1"
+        assert lead["name"] == "Pat Doe"
+        assert lead["created_time"].year == 2026
+        assert normalize_phone(lead["phone"]) == "3035550100"
+
+
+class TestPlanIngest:
+    def test_set_based_dedupe(self):
+        existing = [
+            {"id": 1, "facebook_lead_id": "L1", "email": "a@x.com", "phone": "", "name": "A"},
+            {"id": 2, "facebook_lead_id": None, "email": "B@X.com", "phone": "", "name": "B"},
+            {"id": 3, "facebook_lead_id": None, "email": "", "phone": "303-555-0100", "name": "C"},
+        ]
+        incoming = [
+            {"facebook_lead_id": "L1", "email": "other@x.com"},            # known facebook id
+            {"facebook_lead_id": "L2", "email": " b@x.com"},               # email match -> backfill
+            {"facebook_lead_id": "L3", "phone": "+1 3035550100"},          # phone match -> backfill
+            {"facebook_lead_id": "L4", "email": "new@x.com", "name": "N"},  # new
+            {"facebook_lead_id": "L5", "email": "NEW@x.com"},              # same person later in the run
+            {"facebook_lead_id": "L4", "email": "new@x.com"},              # repeated lead
+            {"facebook_lead_id": "L6", "name": "Walk In"},                 # name-only, new
+        ]
+
+        new, backfills = plan_ingest(incoming, existing)
+
+        assert [lead["facebook_lead_id"] for lead in new] == ["L4", "L6"]
+        assert backfills == [(2, "L2"), (3, "L3")]
+
+    @pytest.mark.parametrize("phone", ["", None])
+    def test_empty_keys_never_match(self, phone):
+        existing = [{"id": 1, "facebook_lead_id": None, "email": "", "phone": phone, "name": ""}]
+        new, backfills = plan_ingest([{"facebook_lead_id": "L1", "email": "", "phone": ""}], existing)
+        assert len(new) == 1 and backfills == []
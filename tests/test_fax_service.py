@@ -0,0 +1,66 @@
+"""
+Unit tests for services/fax_service.py
+
+Covers:
+- Message-store paging for inbound faxes
+- Batched dedupe against fax_log
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services import fax_service
+
+
+def _page(records, has_next):
+    resp = MagicMock()
+    resp.raise_for_status = MagicMock()
+    nav = {"nextPage": {"uri": "next"}} if has_next else {}
+    resp.json.return_value = {"records": records, "navigation": nav}
+    return resp
+
+
+class TestInboundPaging:
+    @pytest.mark.asyncio
+    async def test_follows_next_page_until_exhausted(self):
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=[
+            _page([{"id": 1}, {"id": 2}], True),
+            _page([{"id": 3}], False),
+        ])
+
+        records = await fax_service._list_inbound_fax_records(client, "tok")
+
+        assert [r["id"] for r in records] == [1, 2, 3]
+        assert client.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stops_at_max_pages(self, monkeypatch):
+        monkeypatch.setattr(fax_service, "FAX_POLL_MAX_PAGES", 2)
+        client = MagicMock()
+        client.get = AsyncMock(return_value=_page([{"id": 1}], True))
+
+        await fax_service._list_inbound_fax_records(client, "tok")
+
+        assert client.get.await_count == 2
+
+
+class TestBatchedDedupe:
+    def test_single_any_query(self, mock_db_connection):
+        _conn, cursor = mock_db_connection
+        cursor.fetchall.return_value = [("2",)]
+        records = [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 1}]
+
+        pending = fax_service._filter_unlogged_records(cursor, records)
+
+        assert [r["id"] for r in pending] == [1, 3]
+        cursor.execute.assert_called_once()
+        sql, params = cursor.execute.call_args[0]
+        assert "= ANY(%s)" in sql
+        assert sorted(params[0]) == ["1", "2", "3"]
+
+    def test_no_records_skips_query(self, mock_db_connection):
+        _conn, cursor = mock_db_connection
+        assert fax_service._filter_unlogged_records(cursor, []) == []
+        cursor.execute.assert_not_called()
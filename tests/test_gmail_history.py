@@ -0,0 +1,196 @@
+"""
+Unit tests for sales/gmail_history.py
+
+Covers:
+- history.list paging returns only newly added mail and the next historyId
+- Expired history (HTTP 404) is reported as HistoryExpired
+- Metadata is fetched in batches of 50 and deleted (404) messages are skipped
+- Transient (429/5xx) failures are retried, then reported with the partial result
+- Header parsing for sender/recipients
+"""
+
+import pytest
+
+from sales import gmail_history
+from sales.gmail_history import (
+    HistoryExpired,
+    MetadataFetchFailed,
+    fetch_metadata,
+    list_history,
+    list_message_ids,
+    parse_message,
+)
+
+
+class _Call:
+    def __init__(self, fn, params):
+        self.fn = fn
+        self.params = params
+
+    def execute(self):
+        return self.fn(**self.params)
+
+
+class _HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.calls = []
+
+    def add(self, call, request_id):
+        self.calls.append((request_id, call))
+
+    def execute(self):
+        self.service.batches.append(len(self.calls))
+        for request_id, call in self.calls:
+            try:
+                self.callback(request_id, call.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class FakeGmail:
+    """Just enough of the googleapiclient Gmail resource for these helpers."""
+
+    def __init__(self, history_pages=None, messages=None, history_error=None, listing=None, flaky=None):
+        self.history_pages = history_pages or {}
+        self.messages_by_id = messages or {}
+        self.flaky = dict(flaky or {})  # message id -> failures (HTTP 429) before it succeeds
+        self.history_error = history_error
+        self.listing = listing or []
+        self.batches = []
+
+    def users(self):
+        return self
+
+    def history(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+    def list(self, **params):
+        if "startHistoryId" in params:
+            return _Call(self._history, params)
+        return _Call(self._list, params)
+
+    def get(self, **params):
+        return _Call(self._get, params)
+
+    def _history(self, startHistoryId, pageToken=None, **_):
+        if self.history_error:
+            raise _HttpError(self.history_error)
+        return self.history_pages[pageToken]
+
+    def _list(self, q, maxResults, pageToken=None, **_):
+        start = int(pageToken or 0)
+        chunk = self.listing[start:start + min(maxResults, 2)]
+        body = {"messages": [{"id": m} for m in chunk]}
+        if start + len(chunk) < len(self.listing):
+            body["nextPageToken"] = str(start + len(chunk))
+        return body
+
+    def _get(self, id, **_):
+        if self.flaky.get(id):
+            self.flaky[id] -= 1
+            raise _HttpError(429)
+        if id not in self.messages_by_id:
+            raise _HttpError(404)
+        return self.messages_by_id[id]
+
+
+def _message(message_id, sender="Pat <Pat@Clinic.org>", to="me@cca.com"):
+    return {
+        "id": message_id,
+        "threadId": "t" + message_id,
+        "internalDate": "1767693600000",
+        "snippet": "Following up",
+        "payload": {"headers": [
+            {"name": "From", "value": sender},
+            {"name": "To", "value": to},
+            {"name": "Cc", "value": "Sam <sam@x.com>"},
+            {"name": "Subject", "value": "Referral"},
+        ]},
+    }
+
+
+def _added(message_id, labels=("INBOX",)):
+    return {"messagesAdded": [{"message": {"id": message_id, "labelIds": list(labels)}}]}
+
+
+class TestHistory:
+    def test_pages_and_next_history_id(self):
+        service = FakeGmail(history_pages={
+            None: {"history": [_added("m1"), _added("m2", ["DRAFT"])], "nextPageToken": "p2", "historyId": "900"},
+            "p2": {"history": [_added("m3"), _added("m1")], "historyId": "905"},
+        })
+
+        ids, history_id = list_history(service, "850")
+
+        assert ids == ["m1", "m3"]
+        assert history_id == "905"
+
+    def test_no_changes_keeps_cursor(self):
+        ids, history_id = list_history(FakeGmail(history_pages={None: {}}), "850")
+        assert ids == [] and history_id == "850"
+
+    def test_expired_history(self):
+        with pytest.raises(HistoryExpired):
+            list_history(FakeGmail(history_error=404), "1")
+
+    def test_other_errors_propagate(self):
+        with pytest.raises(_HttpError):
+            list_history(FakeGmail(history_error=500), "1")
+
+
+class TestMessages:
+    def test_list_message_ids_capped(self):
+        service = FakeGmail(listing=["a", "b", "c", "d", "e"])
+        assert list_message_ids(service, "after:0", 3) == ["a", "b", "c"]
+
+    def test_fetch_metadata_batches_and_skips_failures(self):
+        ids = [f"m{i}" for i in range(120)]
+        service = FakeGmail(messages={m: _message(m) for m in ids if m != "m7"})
+
+        parsed = fetch_metadata(service, ids)
+
+        assert service.batches == [50, 50, 20]
+        assert len(parsed) == 119
+        assert [p["message_id"] for p in parsed[:8]] == ["m0", "m1", "m2", "m3", "m4", "m5", "m6", "m8"]
+
+    def test_fetch_metadata_retries_transient_failures(self, monkeypatch):
+        monkeypatch.setattr(gmail_history, "RETRY_DELAYS", (0, 0))
+        ids = ["m1", "m2", "m3"]
+        service = FakeGmail(messages={m: _message(m) for m in ids}, flaky={"m2": 2})
+
+        parsed = fetch_metadata(service, ids)
+
+        assert [p["message_id"] for p in parsed] == ids
+        assert service.batches == [3, 1, 1]
+
+    def test_fetch_metadata_reports_persistent_failures(self, monkeypatch):
+        monkeypatch.setattr(gmail_history, "RETRY_DELAYS", (0,))
+        ids = ["m1", "m2", "m3"]
+        service = FakeGmail(messages={m: _message(m) for m in ids}, flaky={"m3": 5})
+
+        with pytest.raises(MetadataFetchFailed) as failure:
+            fetch_metadata(service, ids)
+
+        assert [p["message_id"] for p in failure.value.messages] == ["m1", "m2"]
+        assert list(failure.value.errors) == ["m3"]
+
+    def test_parse_message(self):
+        parsed = parse_message(_message("m1", to="A <a@x.com>, b@y.com"))
+        assert parsed["from"] == "pat@clinic.org"
+        assert parsed["to"] == ["a@x.com", "b@y.com", "sam@x.com"]
+        assert parsed["subject"] == "Referral"
+        assert parsed["date"].year == 2026
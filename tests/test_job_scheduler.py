@@ -0,0 +1,138 @@
+"""
+Unit tests for gigi/job_scheduler.py
+
+Covers:
+- Timeouts and failures are isolated per job and counted
+- Sync jobs run off the event loop, and a timed-out one isn't restarted
+  while its thread is still running
+- Conditions skip runs
+- Persisted last-run state shortens the first delay after restart
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from gigi.job_scheduler import JobScheduler, ScheduledJob
+
+
+def _scheduler():
+    return JobScheduler("test", persist=False)
+
+
+class TestRunOnce:
+    @pytest.mark.asyncio
+    async def test_timeout_is_recorded(self):
+        async def slow():
+            await asyncio.sleep(1)
+
+        sched = _scheduler().add(ScheduledJob("slow", slow, interval=0.01, timeout=0.01))
+        ok = await sched.run_once("slow")
+
+        stats = sched.snapshot()["slow"]
+        assert ok is False
+        assert stats["timeouts"] == 1
+        assert stats["overruns"] == 1
+        assert "timed out" in stats["last_error"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded(self):
+        async def boom():
+            raise RuntimeError("wellsky down")
+
+        sched = _scheduler().add(ScheduledJob("boom", boom, interval=60))
+        assert await sched.run_once("boom") is False
+        assert sched.snapshot()["boom"]["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_job_runs_in_thread(self):
+        seen = {}
+
+        def blocking():
+            seen["thread"] = threading.current_thread()
+            time.sleep(0.01)
+
+        sched = _scheduler().add(ScheduledJob("sync", blocking, interval=60))
+        assert await sched.run_once("sync") is True
+        assert seen["thread"] is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_thread_blocks_next_run(self):
+        release = threading.Event()
+        calls = []
+
+        def blocking():
+            calls.append(1)
+            release.wait(5)
+
+        sched = _scheduler().add(ScheduledJob("sync", blocking, interval=60, timeout=0.01))
+        assert await sched.run_once("sync") is False
+        assert await sched.run_once("sync") is False
+        assert calls == [1]
+        assert sched.snapshot()["sync"]["skipped"] == 1
+
+        release.set()
+        for _ in range(100):
+            if "sync" not in sched._threads:
+                break
+            await asyncio.sleep(0.01)
+        assert await sched.run_once("sync") is True
+        assert calls == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_condition_skips(self):
+        calls = []
+
+        async def job():
+            calls.append(1)
+
+        sched = _scheduler().add(ScheduledJob("c", job, interval=60, condition=lambda: False))
+        await sched.run_once("c")
+
+        assert calls == []
+        assert sched.snapshot()["c"]["skipped"] == 1
+        assert sched.snapshot()["c"]["runs"] == 0
+
+
+class TestIsolation:
+    @pytest.mark.asyncio
+    async def test_slow_job_does_not_block_fast_job(self):
+        fast_runs = []
+
+        def slow():
+            time.sleep(0.3)
+
+        async def fast():
+            fast_runs.append(1)
+
+        sched = _scheduler()
+        sched.add(ScheduledJob("slow", slow, interval=60))
+        sched.add(ScheduledJob("fast", fast, interval=0.05))
+        task = asyncio.create_task(sched.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert len(fast_runs) >= 1
+        assert sched.snapshot()["slow"]["runs"] == 0  # still running
+
+
+class TestInitialDelay:
+    def test_uses_persisted_last_run(self):
+        sched = _scheduler()
+        job = ScheduledJob("j", lambda: None, interval=300)
+        sched.add(job)
+        sched._last_run["j"] = datetime.utcnow() - timedelta(seconds=100)
+
+        assert 190 <= sched._initial_delay(job) <= 200
+
+    def test_no_state_runs_immediately(self):
+        sched = _scheduler()
+        job = ScheduledJob("j", lambda: None, interval=300)
+        assert sched._initial_delay(job) == 0.0
+        job.run_on_start = False
+        assert sched._initial_delay(job) == 300
@@ -0,0 +1,119 @@
+"""
+Unit tests for recruiting/lead_csv_import.py
+
+Covers:
+- Facebook tab-delimited (UTF-16) and generic comma exports are parsed
+- Dedupe against existing leads and earlier rows via normalized keys
+- Existing-lead lookups and inserts happen once per chunk
+- Per-row error report for oversize values and failed chunks
+"""
+
+import io
+
+from recruiting.facebook_lead_sync import normalize_phone
+from recruiting.lead_csv_import import import_leads_csv, import_leads_files
+
+
+class FakeLeads:
+    def __init__(self, existing=(), fail_on=None):
+        self.emails = {e for e, _, _ in existing if e}
+        self.phones = {normalize_phone(p) for _, p, _ in existing if p}
+        self.names = {n.strip().lower() for _, _, n in existing if n}
+        self.lookups = []
+        self.inserted = []
+        self.fail_on = fail_on
+
+    def find_existing(self, emails, phones, names):
+        self.lookups.append(len(emails) + len(phones) + len(names))
+        return emails & self.emails, phones & self.phones, names & self.names
+
+    def insert(self, rows):
+        if self.fail_on and any(r["name"] == self.fail_on for r in rows):
+            raise RuntimeError("value too long for type character varying(20)")
+        self.inserted.append(rows)
+
+
+def _csv(text, encoding="utf-8"):
+    return io.BytesIO(text.encode(encoding))
+
+
+class TestParsing:
+    def test_facebook_utf16_tab_export(self):
+        text = (
+            "id\tcreated_time\tfull name\temail\tphone\n"
+            "l:1\t2025-10-02T04:26:32-07:00\tAna Ruiz\tana@x.com\tp:+13035550101\n"
+            "l:2\t2025-10-02T05:00:00-07:00\t\t\t\n"
+        )
+        leads = FakeLeads()
+
+        result = import_leads_csv(_csv(text, "utf-16"), leads.find_existing, leads.insert)
+
+        assert (result.rows_processed, result.leads_added, result.empty_rows_skipped) == (2, 1, 1)
+        assert leads.inserted == [[{"name": "Ana Ruiz", "email": "ana@x.com", "phone": "+13035550101"}]]
+
+    def test_generic_cp1252_export(self):
+        text = "Name,Email,Phone\nJos\xe9 Pe\xf1a,jose@x.com,303-555-0102\n"
+        leads = FakeLeads()
+
+        result = import_leads_csv(_csv(text, "cp1252"), leads.find_existing, leads.insert)
+
+        assert result.leads_added == 1
+        assert leads.inserted[0][0]["name"] == "Jos\xe9 Pe\xf1a"
+
+
+class TestDedupe:
+    def test_existing_and_in_file_duplicates(self):
+        text = (
+            "Name,Email,Phone\n"
+            "Old Email,ANA@x.com ,\n"            # existing email (normalized)
+            "Old Phone,,(303) 555-0199\n"        # existing phone (normalized)
+            "bob smith,,\n"                      # existing name (case-insensitive)
+            "New One,new@x.com,3035550001\n"
+            "New Again,NEW@x.com,\n"             # same email earlier in file
+            "Other,,+1 303 555 0001\n"           # same phone earlier in file
+            "Fresh,fresh@x.com,\n"
+        )
+        leads = FakeLeads(existing=[("ana@x.com", "", ""), ("", "3035550199", ""), ("", "", "Bob Smith")])
+
+        result = import_leads_csv(_csv(text), leads.find_existing, leads.insert, chunk_size=3)
+
+        assert result.duplicates_skipped == 5
+        assert [r["name"] for chunk in leads.inserted for r in chunk] == ["New One", "Fresh"]
+        # One existing-lead lookup per chunk of 3 rows
+        assert len(leads.lookups) == 3
+
+    def test_large_file_is_chunked(self):
+        rows = "\n".join(f"Lead {i},lead{i}@x.com,303555{i:04d}" for i in range(2500))
+        leads = FakeLeads()
+
+        result = import_leads_csv(_csv("Name,Email,Phone\n" + rows + "\n"), leads.find_existing, leads.insert)
+
+        assert result.leads_added == 2500
+        assert [len(chunk) for chunk in leads.inserted] == [1000, 1000, 500]
+
+
+class TestErrors:
+    def test_row_errors_are_reported(self):
+        text = (
+            "Name,Email,Phone\n"
+            "Ok,ok@x.com,3035550001\n"
+            f"{'x' * 101},long@x.com,\n"
+            "Bad,bad@x.com,3035550002\n"
+        )
+        leads = FakeLeads(fail_on="Bad")
+
+        result = import_leads_csv(_csv(text), leads.find_existing, leads.insert, chunk_size=1)
+
+        assert result.leads_added == 1
+        assert result.error_count == 2
+        assert result.errors[0] == {"row": 3, "error": "name longer than 100 characters"}
+        assert result.errors[1]["row"] == 4
+        assert "Insert failed" in result.errors[1]["error"]
+
+    def test_files_merge(self):
+        leads = FakeLeads()
+        result = import_leads_files(
+            [_csv("Name,Email\nA,a@x.com\n"), _csv("Name,Email\nB,b@x.com\n")],
+            leads.find_existing, leads.insert,
+        )
+        assert result.to_dict()["leads_added"] == 2
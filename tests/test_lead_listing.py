@@ -0,0 +1,74 @@
+"""
+Unit tests for recruiting/lead_listing.py
+
+Covers:
+- Sparse field selection (id always kept, unknown fields ignored)
+- Only the columns behind the requested fields are loaded
+- Keyset cursor parsing and next-cursor calculation
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from recruiting.lead_listing import (
+    APPLICANT_FIELDS,
+    LEAD_FIELDS,
+    columns_for,
+    keyset_page,
+    page_size,
+    parse_cursor,
+    parse_fields,
+    serialize_lead,
+)
+
+
+def _lead(lead_id, assignee=None):
+    return SimpleNamespace(
+        id=lead_id, name=f"Lead {lead_id}", email="", phone="3035550100", notes="long notes",
+        status="new", priority="medium", assigned_to=7 if assignee else None,
+        assigned_user=SimpleNamespace(name=assignee) if assignee else None,
+        created_at=datetime(2026, 3, 2, 9, 30), updated_at=None,
+    )
+
+
+class TestFields:
+    def test_default_is_every_field(self):
+        assert parse_fields(None) == LEAD_FIELDS
+        assert "assigned_to_id" not in parse_fields("", APPLICANT_FIELDS)
+
+    def test_sparse_selection_skips_notes(self):
+        fields = parse_fields("status, name,bogus,assigned_to")
+        assert fields == ("id", "name", "status", "assigned_to")
+        assert columns_for(fields) == ["id", "name", "status", "assigned_to"]
+
+    def test_serialize(self):
+        fields = parse_fields("name,assigned_to,assigned_to_id,created_at,updated_at")
+        assert serialize_lead(_lead(3, "Israt"), fields) == {
+            "id": 3, "name": "Lead 3", "assigned_to": "Israt", "assigned_to_id": 7,
+            "created_at": "2026-03-02T09:30:00", "updated_at": None,
+        }
+        assert serialize_lead(_lead(4), ("id", "assigned_to"))["assigned_to"] is None
+
+
+class TestKeyset:
+    @pytest.mark.parametrize("value,expected", [(None, None), ("", None), ("120", 120)])
+    def test_parse_cursor(self, value, expected):
+        assert parse_cursor(value) == expected
+
+    @pytest.mark.parametrize("value", ["abc", "0", "-5"])
+    def test_bad_cursor(self, value):
+        with pytest.raises(ValueError):
+            parse_cursor(value)
+
+    def test_next_cursor_only_when_more_rows(self):
+        rows = [_lead(i) for i in (10, 9, 8)]
+        page, cursor = keyset_page(rows, 2)
+        assert [r.id for r in page] == [10, 9] and cursor == 9
+        assert keyset_page(rows[:2], 2)[1] is None
+
+    def test_page_size_bounds(self):
+        assert page_size(None) == 50
+        assert page_size(0) == 50
+        assert page_size(10_000) == 500
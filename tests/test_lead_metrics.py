@@ -0,0 +1,74 @@
+"""
+Unit tests for recruiting/lead_metrics.py
+
+Covers:
+- "Wants work" classification matches the dashboard's note markers
+- Stats and pipeline payloads built from one set of grouped rows
+- Metrics cache TTL, day rollover and invalidation
+"""
+
+from datetime import datetime
+
+from recruiting.lead_metrics import MetricsCache, summarize, wants_work, wants_work_sql
+
+
+class TestWantsWork:
+    def test_markers(self):
+        assert wants_work("Called, wants FT nights")
+        assert wants_work("sent application 3/2")
+        assert not wants_work("left voicemail")
+        assert not wants_work("")
+        assert not wants_work(None)
+
+    def test_case_sensitive_like_the_old_query(self):
+        assert not wants_work("ft")
+        assert "notes LIKE '%QMAP%'" in wants_work_sql()
+
+
+class TestSummarize:
+    def test_stats_and_pipeline_from_grouped_rows(self):
+        rows = [("new", 5, 2, 1), ("contacted", 3, 0, 2), ("hired", 4, 0, 0), (None, 1, 1, 0)]
+
+        result = summarize(rows)
+
+        assert result["stats"] == {
+            "total_leads": 13,
+            "new_leads": 3,
+            "contacted_leads": 3,
+            "wants_work_leads": 3,
+            "current_caregivers": 4,
+        }
+        counts = {s["stage"]: s["count"] for s in result["pipeline"]["pipeline"]}
+        assert counts == {"new": 5, "contacted": 3, "interested": 0, "sent_to_ep": 0, "hired": 4, "not_interested": 0}
+        assert result["pipeline"]["total"] == 13
+
+
+class TestMetricsCache:
+    def test_ttl_day_and_invalidate(self):
+        now = [0.0]
+        cache = MetricsCache(ttl=60, clock=lambda: now[0])
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"n": len(calls)}
+
+        today, tomorrow = datetime(2026, 3, 2), datetime(2026, 3, 3)
+        assert cache.get(today, compute) == {"n": 1}
+        assert cache.get(today, compute) == {"n": 1}
+        assert cache.get(tomorrow, compute) == {"n": 2}
+        now[0] = 61
+        assert cache.get(tomorrow, compute) == {"n": 3}
+        cache.invalidate()
+        assert cache.get(tomorrow, compute) == {"n": 4}
+
+    def test_result_computed_across_invalidation_is_not_cached(self):
+        cache = MetricsCache()
+        day = datetime(2026, 3, 2)
+
+        def compute():
+            cache.invalidate()  # a lead changed mid-query
+            return {"stale": True}
+
+        cache.get(day, compute)
+        assert cache.get(day, lambda: {"stale": False}) == {"stale": False}
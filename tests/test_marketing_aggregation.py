@@ -0,0 +1,82 @@
+"""
+Unit tests for services/marketing/aggregation.py
+
+Covers:
+- Sources run concurrently (total ~ slowest source)
+- A timed-out or failing source yields partial results, annotated
+- Last good data for the same key is served as stale
+"""
+
+import time
+
+import pytest
+
+from services.marketing import aggregation
+from services.marketing.aggregation import fetch_sources, run_parallel
+
+
+def _slow(value, seconds):
+    def _fetch():
+        time.sleep(seconds)
+        return value
+    return _fetch
+
+
+def _boom():
+    raise RuntimeError("API down")
+
+
+@pytest.fixture(autouse=True)
+def _clear_last_good():
+    aggregation._last_good.clear()
+    yield
+    aggregation._last_good.clear()
+
+
+class TestFetchSources:
+    @pytest.mark.asyncio
+    async def test_runs_sources_concurrently(self):
+        started = time.monotonic()
+        data, status = await fetch_sources(
+            {"a": _slow(1, 0.2), "b": _slow(2, 0.2), "c": _slow(3, 0.2)}, key="k"
+        )
+
+        assert time.monotonic() - started < 0.5
+        assert data == {"a": 1, "b": 2, "c": 3}
+        assert {info["status"] for info in status.values()} == {"ok"}
+
+    @pytest.mark.asyncio
+    async def test_partial_results_on_timeout_and_error(self):
+        data, status = await fetch_sources(
+            {"fast": _slow("ok", 0), "slow": _slow("late", 1), "broken": _boom},
+            key="k",
+            timeouts={"slow": 0.1},
+        )
+
+        assert data == {"fast": "ok", "slow": None, "broken": None}
+        assert status["slow"]["status"] == "timeout"
+        assert status["broken"]["status"] == "failed"
+        assert "API down" in status["broken"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_serves_last_good_as_stale(self):
+        await fetch_sources({"ga4": _slow({"users": 5}, 0)}, key=("2026-01-01", "2026-01-31"))
+
+        data, status = await fetch_sources({"ga4": _boom}, key=("2026-01-01", "2026-01-31"))
+        assert data["ga4"] == {"users": 5}
+        assert status["ga4"]["status"] == "stale"
+        assert status["ga4"]["reason"] == "failed"
+
+        # Different date range: nothing to fall back to
+        data, _ = await fetch_sources({"ga4": _boom}, key=("2026-02-01", "2026-02-28"))
+        assert data["ga4"] is None
+
+
+class TestRunParallel:
+    def test_collects_results_and_reraises(self):
+        started = time.monotonic()
+        assert run_parallel({"x": _slow(1, 0.2), "y": _slow(2, 0.2)}) == {"x": 1, "y": 2}
+        assert time.monotonic() - started < 0.35
+
+        with pytest.raises(RuntimeError):
+            run_parallel({"x": _slow(1, 0), "y": _boom})
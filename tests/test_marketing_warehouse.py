@@ -0,0 +1,122 @@
+"""
+Unit tests for services/marketing/metrics_warehouse.py
+
+Covers:
+- Refresh planning: late-data window always, newest missing days first, capped
+- Per-day fetchers skip placeholder/error payloads (gap is retried later)
+- refresh_source only fetches planned ranges
+- compare() sums additive metrics, takes the last value for gauges and gives
+  no total for daily unique counts
+"""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+from services.marketing.metrics_warehouse import (
+    MetricsWarehouse,
+    SourceSpec,
+    _per_day,
+    plan_refresh,
+    previous_period,
+)
+
+TODAY = date(2026, 3, 15)
+
+
+def _days(ranges):
+    out = []
+    for start, end in ranges:
+        d = start
+        while d <= end:
+            out.append(d)
+            d += timedelta(days=1)
+    return out
+
+
+class TestPlanRefresh:
+    def test_empty_store_backfills_newest_first_with_cap(self):
+        ranges = plan_refresh(set(), TODAY, backfill_days=400, late_days=3, max_days=10)
+        days = _days(ranges)
+
+        assert len(days) == 13
+        assert max(days) == TODAY
+        assert min(days) == TODAY - timedelta(days=12)
+        assert ranges == [(TODAY - timedelta(days=12), TODAY)]
+
+    def test_refetches_late_window_and_fills_gaps(self):
+        stored = {TODAY - timedelta(days=i) for i in range(30)} - {TODAY - timedelta(days=10)}
+        ranges = plan_refresh(stored, TODAY, backfill_days=30, late_days=2, max_days=5)
+
+        assert ranges == [
+            (TODAY - timedelta(days=30), TODAY - timedelta(days=30)),
+            (TODAY - timedelta(days=10), TODAY - timedelta(days=10)),
+            (TODAY - timedelta(days=1), TODAY),
+        ]
+
+    def test_previous_period(self):
+        assert previous_period(date(2026, 3, 1), date(2026, 3, 31)) == (
+            date(2026, 1, 29),
+            date(2026, 2, 28),
+        )
+
+
+class TestFetchers:
+    def test_per_day_skips_placeholders(self):
+        def call(start, end):
+            if start.day == 2:
+                return {"is_placeholder": True, "clicks": 0}
+            return {"performance": {"clicks": start.day * 10}, "name": "x"}
+
+        fetch = _per_day(call, {"clicks": "performance.clicks", "missing": "nope.here"})
+        rows = fetch(date(2026, 3, 1), date(2026, 3, 3))
+
+        assert rows == {date(2026, 3, 1): {"clicks": 10.0}, date(2026, 3, 3): {"clicks": 30.0}}
+
+    def test_refresh_source_fetches_planned_ranges(self):
+        fetch = MagicMock(return_value={TODAY: {"users": 5.0}})
+        wh = MetricsWarehouse("postgresql://test", sources={"ga4": SourceSpec(fetch)})
+        wh.stored_days = MagicMock(return_value={TODAY - timedelta(days=i) for i in range(3, 401)})
+        wh.upsert = MagicMock(return_value=1)
+
+        assert wh.refresh_source("ga4", TODAY) == 1
+        fetch.assert_called_once_with(TODAY - timedelta(days=2), TODAY)
+
+
+class TestCompare:
+    def test_gauges_use_last_value(self):
+        wh = MetricsWarehouse(
+            "postgresql://test",
+            sources={"facebook": SourceSpec(MagicMock(), gauges=("current_page_likes",))},
+        )
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            # metric, cur_sum, prev_sum, cur_last, prev_last
+            ("impressions", 1500.0, 1000.0, 40.0, 30.0),
+            ("current_page_likes", 30200.0, 29000.0, 1010.0, 1000.0),
+        ]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        wh._connect = MagicMock(return_value=conn)
+
+        result = wh.compare("facebook", date(2026, 3, 1), date(2026, 3, 30))
+
+        assert result["current"] == {"impressions": 1500.0, "current_page_likes": 1010.0}
+        assert result["change_pct"] == {"impressions": 50.0, "current_page_likes": 1.0}
+        params = cursor.execute.call_args[0][1]
+        assert params["prev_start"] == date(2026, 1, 30)
+        assert params["prev_end"] == date(2026, 2, 28)
+
+    def test_uniques_are_not_summed(self):
+        wh = MetricsWarehouse(
+            "postgresql://test",
+            sources={"ga4": SourceSpec(MagicMock(), uniques=("users",))},
+        )
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("users", 900.0, 800.0, 35.0, 30.0)]
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        wh._connect = MagicMock(return_value=conn)
+
+        result = wh.compare("ga4", date(2026, 3, 1), date(2026, 3, 30))
+
+        assert result == {"current": {"users": None}, "previous": {"users": None}, "change_pct": {"users": None}}
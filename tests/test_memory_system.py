@@ -235,3 +235,31 @@ class TestConflictDetection:
             "ALWAYS use formal greetings",
             "NEVER use formal greetings"
         ) is True
+
+
+# ============================================================
+# Metadata filter tests
+# ============================================================
+
+class TestMetadataFilter:
+    """query_memories can filter on a metadata key (indexed for caregiver_id)."""
+
+    def test_caregiver_id_filter_without_limit(self, mock_psycopg2):
+        mock_connect, conn, cursor = mock_psycopg2
+        MemorySystem._schema_initialized = True
+        system = MemorySystem.__new__(MemorySystem)
+        system.database_url = "postgresql://test@localhost/test"
+        cursor.fetchall.return_value = []
+
+        system.query_memories(
+            category="caregiver_preference",
+            status=MemoryStatus.ACTIVE,
+            limit=None,
+            metadata_key="caregiver_id",
+            metadata_values=["CG1", "CG2"],
+        )
+
+        query, params = cursor.execute.call_args[0]
+        assert "metadata->>%s = ANY(%s)" in query
+        assert "LIMIT" not in query
+        assert params == ["caregiver_preference", "active", "caregiver_id", ["CG1", "CG2"]]
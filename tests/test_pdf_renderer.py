@@ -0,0 +1,136 @@
+"""
+Unit tests for portal/pdf_renderer.py
+
+Covers:
+- Repeat payloads are served from the cache; identical concurrent renders share one job
+- The queue is bounded: callers past capacity get PdfRenderBusy after the timeout
+- Per-form timings and error counts
+- A broken worker pool is replaced and the render retried
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from portal.pdf_renderer import PdfRenderBusy, PdfRenderService
+
+
+def _threads(max_workers):
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+class _Renderer:
+    def __init__(self, delay=0.0, gate=None):
+        self.calls = []
+        self.delay = delay
+        self.gate = gate
+
+    def __call__(self, form, data, meta):
+        self.calls.append(form)
+        if self.gate is not None:
+            self.gate.wait(2)
+        time.sleep(self.delay)
+        return f"%PDF {form} {data.get('n')}".encode()
+
+
+class TestCache:
+    @pytest.mark.asyncio
+    async def test_repeat_payload_is_cached(self):
+        renderer = _Renderer()
+        service = PdfRenderService(executor_factory=_threads, render_fn=renderer)
+
+        first = await service.render("monitoring_visit", {"n": 1}, {"client_name": "A"})
+        again = await service.render("monitoring_visit", {"n": 1}, {"client_name": "A"})
+        other = await service.render("monitoring_visit", {"n": 2}, {"client_name": "A"})
+
+        assert first == again == b"%PDF monitoring_visit 1"
+        assert other == b"%PDF monitoring_visit 2"
+        assert len(renderer.calls) == 2
+        stats = service.stats()["forms"]["monitoring_visit"]
+        assert (stats["renders"], stats["cache_hits"]) == (2, 1)
+        service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_renders_coalesce(self):
+        renderer = _Renderer(delay=0.1)
+        service = PdfRenderService(executor_factory=_threads, render_fn=renderer)
+
+        results = await asyncio.gather(
+            *(service.render("incident_report", {"n": 1}, {}) for _ in range(5))
+        )
+
+        assert len(set(results)) == 1
+        assert renderer.calls == ["incident_report"]
+        service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_by_entries(self):
+        service = PdfRenderService(
+            executor_factory=_threads, render_fn=_Renderer(), cache_max_entries=2
+        )
+        for n in range(3):
+            await service.render("incident_report", {"n": n}, {})
+
+        assert service.stats()["cache_entries"] == 2
+        service.shutdown()
+
+
+class TestQueue:
+    @pytest.mark.asyncio
+    async def test_busy_when_queue_full(self):
+        gate = threading.Event()
+        service = PdfRenderService(
+            max_workers=1,
+            max_queue=1,
+            queue_timeout=0.1,
+            executor_factory=_threads,
+            render_fn=_Renderer(gate=gate),
+        )
+
+        running = [
+            asyncio.ensure_future(service.render("client_assessment", {"n": n}, {}))
+            for n in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        assert service.stats()["in_flight"] == 2
+
+        with pytest.raises(PdfRenderBusy):
+            await service.render("client_assessment", {"n": 99}, {})
+
+        gate.set()
+        assert len(await asyncio.gather(*running)) == 2
+        service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_counted_and_broken_pool_restarted(self):
+        pools = []
+
+        class _BrokenOnce(ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                if len(pools) == 1:
+                    raise BrokenProcessPool("worker died")
+                return super().submit(fn, *args, **kwargs)
+
+        def factory(max_workers):
+            pools.append(_BrokenOnce(max_workers=max_workers))
+            return pools[-1]
+
+        service = PdfRenderService(executor_factory=factory, render_fn=_Renderer())
+        assert await service.render("incident_report", {"n": 1}, {}) == b"%PDF incident_report 1"
+        assert len(pools) == 2
+
+        def boom(form, data, meta):
+            raise ValueError("bad form data")
+
+        service._render_fn = boom
+        with pytest.raises(ValueError):
+            await service.render("incident_report", {"n": 2}, {})
+        assert service.stats()["forms"]["incident_report"]["errors"] == 1
+
+        with pytest.raises(ValueError):
+            await service.render("timesheet", {}, {})
+        service.shutdown()
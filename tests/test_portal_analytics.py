@@ -0,0 +1,157 @@
+"""
+Unit tests for portal/portal_analytics.py
+
+Covers:
+- Recording never touches the database; flush writes the batch in one go
+- Hourly and daily rollups per user/tool, incremented across flushes
+- Logout in the same batch as its login closes that session
+- A flush with the database down keeps the events queued for the next attempt
+- An invalid event is dropped without blocking the rest of its batch
+- Backfill from existing event tables, totals and trends from rollups
+"""
+
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "portal"))
+
+from portal_analytics import (  # noqa: E402
+    AnalyticsBuffer,
+    backfill_rollups,
+    usage_totals,
+    usage_trends,
+)
+from portal_models import Base, ToolClick, UsageRollup, UserSession  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+T0 = datetime(2026, 3, 10, 9, 15)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _rollup(db, granularity, user_email, tool_id):
+    return (
+        db.query(UsageRollup)
+        .filter_by(granularity=granularity, user_email=user_email, tool_id=tool_id)
+        .one()
+    )
+
+
+class TestFlush:
+    def test_batches_events_and_maintains_rollups(self, session_factory):
+        factory = MagicMock(side_effect=session_factory)
+        buffer = AnalyticsBuffer(factory)
+
+        buffer.record_login("a@x.com", "A", at=T0)
+        buffer.record_click("a@x.com", 7, "WellSky", "https://w", at=T0)
+        buffer.record_click("a@x.com", 7, "WellSky", "https://w", at=T0.replace(hour=11))
+        buffer.record_logout("a@x.com", at=T0.replace(minute=45))
+        factory.assert_not_called()
+
+        assert buffer.flush() == 4
+        assert factory.call_count == 1
+        assert buffer.pending == 0
+
+        db = session_factory()
+        assert db.query(ToolClick).count() == 2
+        session = db.query(UserSession).one()
+        assert session.duration_seconds == 30 * 60
+
+        assert _rollup(db, "day", "a@x.com", 7).clicks == 2
+        hourly = db.query(UsageRollup).filter_by(granularity="hour", tool_id=7).all()
+        assert sorted(r.period_start.hour for r in hourly) == [9, 11]
+        sessions = _rollup(db, "day", "a@x.com", 0)
+        assert (sessions.sessions, sessions.session_seconds) == (1, 1800)
+
+        # A second flush increments the same rows rather than adding new ones
+        buffer.record_click("a@x.com", 7, "WellSky", "https://w", at=T0)
+        buffer.flush()
+        db.expire_all()
+        assert _rollup(db, "day", "a@x.com", 7).clicks == 3
+        assert db.query(UsageRollup).filter_by(granularity="day").count() == 2
+        db.close()
+
+    def test_failed_flush_keeps_events(self, session_factory):
+        broken = MagicMock()
+        broken.commit.side_effect = OperationalError("COMMIT", {}, Exception("db down"))
+        factory = MagicMock(return_value=broken)
+        buffer = AnalyticsBuffer(factory)
+        buffer.record_click("a@x.com", 7, "WellSky", "https://w", at=T0)
+
+        assert buffer.flush() == 0
+        assert buffer.pending == 1
+        broken.rollback.assert_called_once()
+
+        buffer._session_factory = session_factory
+        assert buffer.flush() == 1
+        assert buffer.pending == 0
+
+    def test_bad_event_is_dropped_not_retried_forever(self, session_factory):
+        buffer = AnalyticsBuffer(session_factory)
+        buffer.record_click("a@x.com", 7, "WellSky", "https://w", at=T0)
+        buffer.record_click("a@x.com", 8, None, None, at=T0)  # NOT NULL violation
+        buffer.record_login("a@x.com", "A", at=T0)
+
+        assert buffer.flush() == 2
+        assert buffer.pending == 0
+
+        db = session_factory()
+        assert [c.tool_id for c in db.query(ToolClick).all()] == [7]
+        assert db.query(UserSession).count() == 1
+        db.close()
+
+        buffer.record_click("a@x.com", 7, "WellSky", "https://w", at=T0)
+        assert buffer.flush() == 1
+
+    def test_drops_oldest_when_full(self):
+        buffer = AnalyticsBuffer(MagicMock(), max_pending=2)
+        for tool_id in (1, 2, 3):
+            buffer.record_click("a@x.com", tool_id, "t", "u", at=T0)
+
+        assert [data["tool_id"] for _, data in buffer._events] == [2, 3]
+
+
+class TestReads:
+    def test_backfill_then_totals_and_trends(self, session_factory):
+        db = session_factory()
+        db.add_all([
+            UserSession(user_email="a@x.com", login_time=T0, duration_seconds=60),
+            UserSession(user_email="b@x.com", login_time=T0.replace(day=11)),
+            ToolClick(user_email="a@x.com", tool_id=3, tool_name="Maps", tool_url="u", clicked_at=T0),
+            ToolClick(user_email="b@x.com", tool_id=3, tool_name="Maps", tool_url="u", clicked_at=T0),
+            ToolClick(user_email="b@x.com", tool_id=4, tool_name="Docs", tool_url="u", clicked_at=T0),
+        ])
+        db.commit()
+
+        assert backfill_rollups(db) > 0
+        assert backfill_rollups(db) == 0  # only runs against an empty rollup table
+
+        assert usage_totals(db) == {"total_sessions": 2, "total_clicks": 3, "active_users": 2}
+
+        trends = usage_trends(db, "day", since=datetime(2026, 3, 1))
+        assert [(p["period_start"][:10], p["clicks"], p["sessions"]) for p in trends["series"]] == [
+            ("2026-03-10", 3, 1),
+            ("2026-03-11", 0, 1),
+        ]
+        assert trends["top_tools"][0] == {"tool_id": 3, "tool_name": "Maps", "clicks": 2}
+
+        only_b = usage_trends(db, "hour", since=datetime(2026, 3, 1), user_email="b@x.com", tool_id=4)
+        assert [p["clicks"] for p in only_b["series"]] == [1]
+        db.close()
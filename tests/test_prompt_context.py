@@ -0,0 +1,112 @@
+"""
+Unit tests for gigi/prompt_context.py
+
+Covers:
+- Segments are cached per TTL and re-fetched after expiry
+- bump_version invalidates a cached segment immediately
+- Segments are fetched concurrently
+- Stable sections render before volatile ones (cacheable prefix)
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from gigi.prompt_context import (
+    SEGMENT_CROSS_CHANNEL,
+    SEGMENT_MEMORIES,
+    PromptContext,
+    PromptContextAssembler,
+    bump_version,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _memory(content):
+    return SimpleNamespace(content=content, confidence=0.9, category="ops")
+
+
+def _assembler(clock=None, delay=0.0):
+    memory_system = MagicMock()
+    memory_system.query_memories.side_effect = lambda **kw: (time.sleep(delay), [_memory("prefers text")])[1]
+    mode_detector = MagicMock()
+    mode_detector.get_current_mode.side_effect = lambda: (time.sleep(delay), "focus")[1]
+    store = MagicMock()
+    store.get_cross_channel_summary.side_effect = lambda *a, **kw: (time.sleep(delay), "xc")[1]
+    store.get_long_term_context.side_effect = lambda *a, **kw: (time.sleep(delay), "ltc")[1]
+    return PromptContextAssembler(mode_detector, memory_system, store, clock=clock or _Clock())
+
+
+class TestCache:
+    def test_hit_until_ttl_expires(self):
+        clock = _Clock()
+        asm = _assembler(clock)
+
+        asm.get_memories()
+        asm.get_memories()
+        assert asm.memory_system.query_memories.call_count == 1
+
+        clock.now += asm.ttls[SEGMENT_MEMORIES] + 1
+        asm.get_memories()
+        assert asm.memory_system.query_memories.call_count == 2
+
+    def test_version_bump_invalidates(self):
+        asm = _assembler()
+        asm.get_cross_channel("jason", "voice")
+        asm.get_cross_channel("someone_else", "voice")
+
+        bump_version(SEGMENT_CROSS_CHANNEL, "jason")
+        asm.get_cross_channel("jason", "voice")
+        asm.get_cross_channel("someone_else", "voice")
+
+        # Only jason's entry was re-fetched
+        assert asm.conversation_store.get_cross_channel_summary.call_count == 3
+
+    def test_loader_error_serves_stale_copy(self):
+        clock = _Clock()
+        asm = _assembler(clock)
+        assert asm.get_mode() == "focus"
+
+        clock.now += 3600
+        asm.mode_detector.get_current_mode.side_effect = RuntimeError("db down")
+        assert asm.get_mode() == "focus"
+
+
+class TestFetch:
+    def test_segments_fetched_concurrently(self):
+        asm = _assembler(delay=0.2)
+
+        started = time.monotonic()
+        ctx = asm.fetch(user_id="jason", channel="voice", long_term_days=14)
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.6  # four 0.2s segments, not 0.8s serially
+        assert (ctx.mode, ctx.cross_channel, ctx.long_term) == ("focus", "xc", "ltc")
+        assert [m.content for m in ctx.memories] == ["prefers text"]
+
+    def test_no_user_skips_per_user_segments(self):
+        asm = _assembler()
+        ctx = asm.fetch(channel="sms", long_term_days=None)
+
+        assert ctx.cross_channel is None and ctx.long_term is None
+        asm.conversation_store.get_cross_channel_summary.assert_not_called()
+
+
+class TestRender:
+    def test_stable_prefix_and_anthropic_blocks(self):
+        prompt = PromptContext.render("BASE", ["memories", None, "ltc"], ["date", "xc"])
+        prefix = PromptContext.render("BASE", ["memories", None, "ltc"], [])
+
+        assert prompt == "BASE\nmemories\nltc\ndate\nxc"
+        blocks = PromptContext.anthropic_system(prompt, prefix)
+        assert blocks[0]["text"] == prefix
+        assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+        assert blocks[1]["text"] == "\ndate\nxc"
+        assert PromptContext.anthropic_system(prompt, "other") == prompt
@@ -0,0 +1,169 @@
+"""
+Unit tests for service_metrics.py
+
+Covers:
+- Histogram buckets and Prometheus text rendering
+- time() as a context manager and as a sync/async decorator, with outcome labels
+- LLM client proxy times model calls (sync and async SDKs) and passes the rest through
+- WellSky endpoint labels collapse record ids
+- SQLAlchemy pool checkouts are timed, also after the pool is recreated
+- /metrics route with and without METRICS_TOKEN
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from service_metrics import (
+    LLM_REQUEST_SECONDS,
+    MetricsRegistry,
+    endpoint_label,
+    instrument_llm_client,
+)
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestHistogram:
+    def test_render(self, registry):
+        hist = registry.histogram("x_seconds", "X latency", ("tool",), buckets=(0.1, 1.0))
+        hist.observe(0.05, tool="a")
+        hist.observe(0.5, tool="a")
+        hist.observe(5.0, tool="a")
+
+        text = registry.render()
+        assert "# TYPE x_seconds histogram" in text
+        assert 'x_seconds_bucket{tool="a",le="0.1"} 1' in text
+        assert 'x_seconds_bucket{tool="a",le="1.0"} 2' in text
+        assert 'x_seconds_bucket{tool="a",le="+Inf"} 3' in text
+        assert 'x_seconds_count{tool="a"} 3' in text
+
+    def test_labels_must_match(self, registry):
+        hist = registry.histogram("y_seconds", "Y", ("tool",))
+        with pytest.raises(ValueError):
+            hist.observe(1.0, endpoint="a")
+
+    def test_reregistering_returns_same_metric(self, registry):
+        assert registry.counter("c_total", "C", ("a",)) is registry.counter("c_total", "C", ("a",))
+        with pytest.raises(ValueError):
+            registry.histogram("c_total", "C", ("a",))
+
+    def test_timer_outcome(self, registry):
+        hist = registry.histogram("z_seconds", "Z", ("pool", "outcome"))
+        with hist.time(pool="p"):
+            pass
+        with pytest.raises(RuntimeError):
+            with hist.time(pool="p"):
+                raise RuntimeError("pool exhausted")
+
+        assert hist.snapshot(pool="p", outcome="ok")["count"] == 1
+        assert hist.snapshot(pool="p", outcome="error")["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_decorators(self, registry):
+        hist = registry.histogram("d_seconds", "D", ("fn",))
+
+        @hist.time(fn="sync")
+        def work():
+            return 1
+
+        @hist.time(fn="async")
+        async def awork():
+            await asyncio.sleep(0.01)
+            return 2
+
+        assert work() + work() == 2
+        assert await awork() == 2
+        assert hist.snapshot(fn="sync")["count"] == 2
+        assert hist.snapshot(fn="async")["sum"] >= 0.01
+
+
+class _AsyncMessages:
+    async def create(self, **kwargs):
+        await asyncio.sleep(0.01)
+        return "anthropic-response"
+
+
+class _SyncCompletions:
+    def create(self, **kwargs):
+        if kwargs.get("fail"):
+            raise ConnectionError("provider down")
+        return "openai-response"
+
+
+class TestLLMClient:
+    @pytest.mark.asyncio
+    async def test_async_and_sync_calls_are_timed(self):
+        anthropic_like = SimpleNamespace(messages=_AsyncMessages(), api_key="k")
+        client = instrument_llm_client(anthropic_like, channel="test", provider="anthropic")
+
+        assert client.api_key == "k"
+        assert await client.messages.create(model="haiku") == "anthropic-response"
+        snap = LLM_REQUEST_SECONDS.snapshot(
+            provider="anthropic", model="haiku", channel="test", outcome="ok"
+        )
+        assert snap["count"] >= 1 and snap["sum"] >= 0.01
+
+        openai_like = SimpleNamespace(chat=SimpleNamespace(completions=_SyncCompletions()))
+        client = instrument_llm_client(openai_like, channel="test", provider="deepseek")
+        assert client.chat.completions.create(model="v3") == "openai-response"
+        with pytest.raises(ConnectionError):
+            client.chat.completions.create(model="v3", fail=True)
+        assert LLM_REQUEST_SECONDS.snapshot(
+            provider="deepseek", model="v3", channel="test", outcome="error"
+        )["count"] >= 1
+
+    def test_none_and_double_wrap(self):
+        assert instrument_llm_client(None, channel="voice") is None
+        client = instrument_llm_client(SimpleNamespace(), channel="voice", provider="x")
+        assert instrument_llm_client(client, channel="voice") is client
+
+
+class TestEndpointLabel:
+    def test_ids_collapse(self):
+        assert endpoint_label("Patient/12345/") == "Patient/{id}"
+        assert endpoint_label("/appointment/_search") == "appointment/_search"
+        assert endpoint_label("practitioners/abc-42/availability") == "practitioners/{id}/availability"
+
+
+class TestPool:
+    def test_checkouts_timed(self, tmp_path):
+        sqlalchemy = pytest.importorskip("sqlalchemy")
+        from service_metrics import DB_POOL_WAIT_SECONDS, timed_pool_class
+
+        engine = sqlalchemy.create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=timed_pool_class("test_pool")
+        )
+        with engine.connect():
+            pass
+        engine.dispose()
+        with engine.connect():
+            pass
+
+        assert DB_POOL_WAIT_SECONDS.snapshot(pool="test_pool", outcome="ok")["count"] == 2
+
+
+class TestRoute:
+    def test_metrics_route(self, monkeypatch):
+        fastapi = pytest.importorskip("fastapi")
+        from fastapi.testclient import TestClient
+
+        from service_metrics import CONTENT_TYPE, add_metrics_route
+
+        app = fastapi.FastAPI()
+        add_metrics_route(app)
+        client = TestClient(app)
+
+        monkeypatch.delenv("METRICS_TOKEN", raising=False)
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == CONTENT_TYPE
+        assert "# TYPE wellsky_request_seconds histogram" in resp.text
+
+        monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
@@ -0,0 +1,192 @@
+"""
+Unit tests for sales/shift_filling/campaign_timers.py and the engine's
+deadline-driven campaign lifecycle.
+
+Covers:
+- DeadlineQueue ordering, rescheduling and cancellation
+- Allowed / rejected campaign status transitions
+- SMS timeout escalates at its deadline, not before
+- Voice follow-ups only for caregivers who haven't replied
+- Replies route through the phone index
+- Campaign state round-trips through the store
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from sales.shift_filling.campaign_timers import (
+    DEADLINE_TIMEOUT,
+    DEADLINE_VOICE,
+    DeadlineQueue,
+    InvalidCampaignTransition,
+    campaign_state,
+    restore_campaign,
+)
+from sales.shift_filling.engine import ShiftFillingEngine
+from sales.shift_filling.matcher import MatchResult
+from sales.shift_filling.models import OutreachStatus
+from sales.shift_filling.sms_service import MockSMSService
+from sales.shift_filling.wellsky_mock import WellSkyMockService
+
+T0 = datetime(2026, 3, 2, 9, 0, 0)
+
+
+class _MemoryStore:
+    def __init__(self):
+        self.saved = {}
+
+    def save(self, campaign):
+        self.saved[campaign.id] = campaign_state(campaign)
+
+    def load_open(self):
+        return [s for s in self.saved.values() if s["status"] in ("pending", "in_progress")]
+
+
+def _engine(voice=False, store=None, wellsky=None):
+    wellsky = wellsky or WellSkyMockService()
+    engine = ShiftFillingEngine(wellsky, MockSMSService(), campaign_store=store or _MemoryStore())
+    engine.shift_lock = None
+    # Deterministic candidates regardless of today's date
+    engine.matcher = MagicMock()
+    engine.matcher.find_replacements.side_effect = lambda shift: [
+        MatchResult(cg, 90.0 - i, 1, []) for i, cg in enumerate(wellsky.get_caregivers()[:5])
+    ]
+    if voice:
+        engine.voice_service = MagicMock(enabled=True)
+        engine.voice_service.create_shift_offer_call.return_value = (True, "call-1")
+    return engine
+
+
+def _campaign(engine, include_voice=False):
+    if include_voice:
+        # Voice calls are opt-in per campaign
+        initiate = engine._initiate_outreach
+
+        def _with_voice(campaign, matches):
+            campaign.include_voice_calls = True
+            initiate(campaign, matches)
+
+        engine._initiate_outreach = _with_voice
+    shift = engine.wellsky.get_shift("S001")
+    shift.date = datetime.now().date() + timedelta(days=1)  # keep expiry out of the way
+    campaign = engine.process_calloff(shift.id, shift.assigned_caregiver_id or "CG001")
+    assert campaign.total_contacted == 5
+    return campaign
+
+
+class TestDeadlineQueue:
+    def test_pops_in_order_and_respects_cancel(self):
+        q = DeadlineQueue()
+        q.schedule("a", T0 + timedelta(minutes=2), "c1")
+        q.schedule("b", T0 + timedelta(minutes=1), "c1")
+        q.schedule("a", T0 + timedelta(minutes=3), "c2")
+        q.cancel("a", "c2")
+
+        assert q.next_fire_at() == T0 + timedelta(minutes=1)
+        assert [d.kind for d in q.pop_due(T0 + timedelta(minutes=5))] == ["b", "a"]
+        assert len(q) == 0
+
+    def test_reschedule_replaces_old_entry(self):
+        q = DeadlineQueue()
+        q.schedule("a", T0, "c1")
+        q.schedule("a", T0 + timedelta(minutes=10), "c1")
+
+        assert q.pop_due(T0 + timedelta(minutes=1)) == []
+        assert len(q.pop_due(T0 + timedelta(minutes=10))) == 1
+
+
+class TestLifecycle:
+    def test_timeout_escalates_only_when_due(self):
+        engine = _engine()
+        campaign = _campaign(engine)
+        deadline = campaign.started_at + timedelta(minutes=campaign.timeout_minutes)
+
+        assert engine.run_due_deadlines(deadline - timedelta(seconds=1)) == []
+        fired = engine.run_due_deadlines(deadline)
+
+        assert [e["kind"] for e in fired] == [DEADLINE_TIMEOUT]
+        assert campaign.status == OutreachStatus.ESCALATED
+        assert engine.deadlines.pending(campaign.id) != []
+
+    def test_late_yes_fills_escalated_campaign(self):
+        engine = _engine()
+        campaign = _campaign(engine)
+        outreach = campaign.caregivers_contacted[0]
+        engine._escalate_campaign(campaign, "Timeout - no acceptances")
+
+        found, _ = engine.find_outreach_by_phone(outreach.phone)
+        result = engine.process_response(found.id, outreach.phone, "yes")
+
+        assert result["action"] == "shift_filled"
+        assert campaign.status == OutreachStatus.FILLED
+        assert engine.find_outreach_by_phone(outreach.phone) is None
+
+    def test_escalated_campaign_unindexed_when_shift_ends(self):
+        engine = _engine()
+        campaign = _campaign(engine)
+        engine._escalate_campaign(campaign, "Timeout - no acceptances")
+        (expiry,) = engine.deadlines.pending(campaign.id)
+
+        engine.run_due_deadlines(expiry.fire_at)
+
+        assert campaign.status == OutreachStatus.EXPIRED
+        assert engine.find_outreach_by_phone(campaign.caregivers_contacted[0].phone) is None
+
+    def test_closed_campaign_rejects_transition(self):
+        engine = _engine()
+        campaign = _campaign(engine)
+        assert engine.cancel_campaign(campaign.id)
+
+        with pytest.raises(InvalidCampaignTransition):
+            engine._transition(campaign, OutreachStatus.IN_PROGRESS)
+        assert len(engine.deadlines.pending(campaign.id)) == 0
+
+    def test_acceptance_fills_and_clears_deadlines(self):
+        engine = _engine()
+        campaign = _campaign(engine)
+        outreach = campaign.caregivers_contacted[0]
+
+        found, _ = engine.find_outreach_by_phone("+1 " + outreach.phone)
+        result = engine.process_response(found.id, outreach.phone, "yes")
+
+        assert result["action"] == "shift_filled"
+        assert campaign.status == OutreachStatus.FILLED
+        assert engine.deadlines.pending(campaign.id) == []
+        assert engine.store.saved[campaign.id]["status"] == "filled"
+
+    def test_voice_followup_skips_responders(self):
+        engine = _engine(voice=True)
+        campaign = _campaign(engine, include_voice=True)
+        replied, silent = campaign.caregivers_contacted[:2]
+        engine.process_response(campaign.id, replied.phone, "no sorry")
+
+        due = max(o.sent_at for o in campaign.caregivers_contacted) + timedelta(minutes=campaign.voice_delay_minutes)
+        fired = [e for e in engine.run_due_deadlines(due) if e["kind"] == DEADLINE_VOICE]
+
+        called = {e["outreach_id"] for e in fired}
+        assert silent.id in called
+        assert replied.id not in called
+        assert len(called) == campaign.total_contacted - 1
+
+
+class TestPersistence:
+    def test_restore_rebuilds_indexes_and_deadlines(self):
+        store, wellsky = _MemoryStore(), WellSkyMockService()
+        original = _campaign(_engine(store=store, wellsky=wellsky))
+        engine = _engine(store=store, wellsky=wellsky)
+
+        assert engine.restore_campaigns() == 1
+        restored = engine.active_campaigns[original.id]
+        assert restored.total_contacted == original.total_contacted
+        assert engine.find_outreach_by_phone(original.caregivers_contacted[0].phone)[0] is restored
+        assert DEADLINE_TIMEOUT in {d.kind for d in engine.deadlines.pending(original.id)}
+
+    def test_state_roundtrip(self):
+        engine = _engine()
+        campaign = _campaign(engine)
+        rebuilt = restore_campaign(campaign_state(campaign), engine.wellsky)
+
+        assert rebuilt.id == campaign.id
+        assert [o.phone for o in rebuilt.caregivers_contacted] == [o.phone for o in campaign.caregivers_contacted]
@@ -0,0 +1,99 @@
+"""
+Unit tests for gigi/simulation_bench.py
+
+Covers:
+- Percentile math and summaries
+- Expected tools are spread over the scenario's turns
+- An in-process run drives the voice brain with the stub LLM/tools, times
+  every turn and tool, and restores the voice brain's globals afterwards
+- Report comparison
+"""
+
+import pytest
+
+from gigi.simulation_bench import (
+    benchmark,
+    compare_reports,
+    percentile,
+    plan_tools,
+    render_html,
+    summarize,
+)
+
+SCENARIOS = [
+    {
+        "id": "callout",
+        "name": "Caregiver call-out",
+        "messages": ["I can't make my shift today.", "It's Maria.", "Thanks."],
+        "expected_tools": ["verify_caller", "get_active_shifts", "report_call_out", "log_call_out"],
+    },
+    {
+        "id": "prospect",
+        "name": "Prospect",
+        "messages": ["Do you do home care in Pueblo?", "Great, thanks."],
+        "expected_tools": ["verify_caller"],
+    },
+]
+
+
+class TestStats:
+    def test_percentile(self):
+        values = [10, 20, 30, 40, 50]
+        assert percentile(values, 50) == 30
+        assert percentile(values, 90) == pytest.approx(46)
+        assert percentile([7], 99) == 7
+        assert percentile([], 50) is None
+
+    def test_summarize(self):
+        summary = summarize([1.0, 2.0, 3.0, 4.0])
+        assert summary["count"] == 4
+        assert summary["p50"] == 2.5
+        assert (summary["max"], summary["mean"]) == (4.0, 2.5)
+        assert summarize([])["p95"] is None
+
+
+class TestPlan:
+    def test_one_tool_per_turn_rest_on_last(self):
+        assert plan_tools(SCENARIOS[0]) == [
+            ["verify_caller"],
+            ["get_active_shifts"],
+            ["report_call_out", "log_call_out"],
+        ]
+        assert plan_tools(SCENARIOS[1]) == [["verify_caller"], []]
+
+
+class TestInProcess:
+    @pytest.mark.asyncio
+    async def test_run_reports_latencies(self):
+        voice_brain = pytest.importorskip("gigi.voice_brain")
+        llm_client, execute_tool = voice_brain.llm_client, voice_brain.execute_tool
+
+        report = await benchmark(SCENARIOS, concurrency=4, repeat=2, llm_ms=(5, 10), tool_ms=(1, 5))
+
+        assert report["summary"]["calls"] == 4
+        assert report["summary"]["errors"] == 0
+        assert report["summary"]["turns"] == 10
+        latency = report["latency_ms"]
+        assert latency["turn"]["count"] == 10
+        assert latency["greeting"]["count"] == 4
+        # Every turn waits for at least one stub LLM round
+        assert latency["turn"]["p50"] >= 5
+        assert latency["ttft"]["max"] <= latency["turn"]["max"]
+        assert report["tools"]["verify_caller"]["count"] == 4
+        assert report["scenarios"]["callout"]["tools"] == [
+            "get_active_shifts", "log_call_out", "report_call_out", "verify_caller",
+        ]
+        assert "<table>" in render_html(report)
+
+        assert voice_brain.llm_client is llm_client
+        assert voice_brain.execute_tool is execute_tool
+
+
+class TestCompare:
+    def test_change_pct(self):
+        baseline = {"latency_ms": {"turn": {"p95": 200.0}}, "tools": {"verify_caller": {"p95": 40.0}}}
+        current = {"latency_ms": {"turn": {"p95": 250.0}}, "tools": {"verify_caller": {"p95": None}}}
+
+        assert compare_reports(baseline, current) == [
+            {"metric": "turn", "baseline": 200.0, "current": 250.0, "change_pct": 25.0}
+        ]
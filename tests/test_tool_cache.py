@@ -0,0 +1,131 @@
+"""
+Unit tests for gigi/tool_cache.py
+
+Covers:
+- Keys come from normalized policy fields (case/whitespace/empty values ignored)
+- Results are reused within the TTL and refetched after it
+- Concurrent identical calls share one upstream request
+- Error results and side-effect tools are never cached
+- Per-tool hit rates
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from gigi.tool_cache import CachePolicy, ToolResultCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Upstream:
+    def __init__(self, result=None, delay=0.0):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.result is not None:
+            return self.result
+        return json.dumps({"price": 100 + self.calls})
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    return ToolResultCache(
+        {
+            "get_stock_price": CachePolicy(60, ("symbol",)),
+            "search_events": CachePolicy(1800),
+            "send_sms": CachePolicy(60),
+        },
+        clock=clock,
+    )
+
+
+class TestKeys:
+    def test_normalized_input(self, cache):
+        assert cache.key("get_stock_price", {"symbol": " aapl "}) == cache.key(
+            "get_stock_price", {"symbol": "AAPL", "note": "ignored"}
+        )
+        assert cache.key("search_events", {"query": "Phish", "city": None}) == cache.key(
+            "search_events", {"city": "", "query": "phish"}
+        )
+        assert cache.key("search_events", {"query": "phish"}) != cache.key(
+            "search_events", {"query": "phish"}, namespace="retell"
+        )
+
+    def test_unlisted_and_side_effect_tools_not_cacheable(self, cache):
+        assert cache.key("get_wellsky_shifts", {}) is None
+        assert cache.key("send_sms", {"to": "x"}) is None
+        assert "send_sms" not in cache.policies
+
+
+class TestCall:
+    @pytest.mark.asyncio
+    async def test_ttl(self, cache, clock):
+        upstream = _Upstream()
+
+        first = await cache.call("get_stock_price", {"symbol": "AAPL"}, upstream)
+        again = await cache.call("get_stock_price", {"symbol": "aapl"}, upstream)
+        assert first == again
+        assert upstream.calls == 1
+
+        clock.now += 61
+        assert await cache.call("get_stock_price", {"symbol": "AAPL"}, upstream) != first
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_calls(self, cache):
+        upstream = _Upstream(delay=0.05)
+
+        results = await asyncio.gather(
+            *(cache.call("search_events", {"query": "Nuggets"}, upstream) for _ in range(4))
+        )
+
+        assert len(set(results)) == 1
+        assert upstream.calls == 1
+        stats = cache.stats()["tools"]["search_events"]
+        assert (stats["misses"], stats["coalesced"], stats["hit_rate"]) == (1, 3, 0.75)
+
+    @pytest.mark.asyncio
+    async def test_errors_and_side_effects_always_run(self, cache):
+        failing = _Upstream(result=json.dumps({"error": "rate limited"}))
+        for _ in range(2):
+            await cache.call("get_stock_price", {"symbol": "TSLA"}, failing)
+        assert failing.calls == 2
+        assert cache.stats()["tools"]["get_stock_price"]["errors"] == 2
+
+        sms = _Upstream(result="sent")
+        for _ in range(2):
+            await cache.call("send_sms", {"to": "+13035551234", "message": "hi"}, sms)
+        assert sms.calls == 2
+        assert "send_sms" not in cache.stats()["tools"]
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_coalesced_callers(self, cache):
+        async def boom():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            cache.call("search_events", {"query": "x"}, boom),
+            cache.call("search_events", {"query": "x"}, boom),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,228 @@
+"""
+Unit tests for voucher_sync_service.py (Drive changes-feed sync)
+
+Covers:
+- Changes feed: folder/mime filtering, removals, pagination, next token
+- A run inserts all vouchers in one transaction and appends once to Sheets
+- Re-running with the same file content is a no-op (file id + hash key)
+- The page token only advances after the vouchers are committed
+- Files that fail are retried on the next run until they succeed
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+for _module in ("sqlalchemy", "gspread", "googleapiclient", "google.cloud.vision"):
+    pytest.importorskip(_module)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "portal"))
+
+import voucher_sync_service  # noqa: E402
+from portal_models import Base, DriveSyncRetry, DriveSyncState, Voucher  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+FOLDER = "folder-1"
+
+
+def _file(file_id, md5="abc", parents=(FOLDER,), mime="application/pdf", **extra):
+    return {
+        "id": file_id,
+        "name": f"{file_id}.pdf",
+        "mimeType": mime,
+        "parents": list(parents),
+        "md5Checksum": md5,
+        "webViewLink": f"https://drive/{file_id}",
+        **extra,
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db_manager = MagicMock()
+    db_manager.get_session.side_effect = sessionmaker(bind=engine)
+    monkeypatch.setattr(voucher_sync_service, "db_manager", db_manager)
+    monkeypatch.setattr(voucher_sync_service, "GOOGLE_DRIVE_FOLDER_ID", FOLDER)
+
+    svc = voucher_sync_service.VoucherSyncService.__new__(voucher_sync_service.VoucherSyncService)
+    svc.credentials = None
+    svc.drive_service = MagicMock()
+    svc.sheets_client = MagicMock()
+    svc.vision_client = None
+    svc._local = MagicMock()
+    svc.download_file = MagicMock(side_effect=lambda file_id: file_id.encode())
+    svc.extract_text_from_image = MagicMock(side_effect=lambda data, is_pdf=False: data.decode())
+    svc.parse_voucher_data = MagicMock(
+        side_effect=lambda text, name, url: {
+            "voucher_number": f"12345-ROS {text}",
+            "client_name": "Shirley Rosell",
+            "amount": 180.0,
+            "status": "Pending",
+            "voucher_image_url": url,
+        }
+    )
+    svc.engine = engine
+    return svc
+
+
+def _changes(svc, pages):
+    svc.drive_service.changes.return_value.list.return_value.execute.side_effect = pages
+
+
+class TestChangesFeed:
+    def test_filters_and_paginates(self, service):
+        _changes(service, [
+            {
+                "nextPageToken": "p2",
+                "changes": [
+                    {"fileId": "a", "file": _file("a")},
+                    {"fileId": "elsewhere", "file": _file("elsewhere", parents=("other",))},
+                    {"fileId": "doc", "file": _file("doc", mime="application/vnd.google-apps.document")},
+                ],
+            },
+            {
+                "newStartPageToken": "t2",
+                "changes": [
+                    {"fileId": "b", "file": _file("b", trashed=True)},
+                    {"fileId": "a", "removed": True},
+                    {"fileId": "c", "file": _file("c", mime="image/png")},
+                ],
+            },
+        ])
+
+        files, token = service.get_changed_vouchers_from_drive("t1")
+
+        assert [f["id"] for f in files] == ["c"]
+        assert token == "t2"
+
+
+class TestSync:
+    def test_batches_writes_and_is_idempotent(self, service):
+        db = sessionmaker(bind=service.engine)()
+        db.add(DriveSyncState(sync_key=f"vouchers:{FOLDER}", page_token="t1"))
+        db.commit()
+
+        _changes(service, [{
+            "newStartPageToken": "t2",
+            "changes": [{"fileId": f, "file": _file(f)} for f in ("a", "b", "c")],
+        }])
+        summary = service.sync_new_vouchers()
+
+        assert summary["files_processed"] == 3
+        assert db.query(Voucher).count() == 3
+        worksheet = service.sheets_client.open_by_key.return_value.get_worksheet.return_value
+        worksheet.append_rows.assert_called_once()
+        assert len(worksheet.append_rows.call_args[0][0]) == 3
+        worksheet.append_row.assert_not_called()
+        db.expire_all()
+        assert db.query(DriveSyncState).one().page_token == "t2"
+
+        # Same files with unchanged content show up again: nothing downloaded
+        service.download_file.reset_mock()
+        _changes(service, [{
+            "newStartPageToken": "t3",
+            "changes": [{"fileId": "a", "file": _file("a")}],
+        }])
+        summary = service.sync_new_vouchers()
+
+        assert summary["files_skipped"] == 1
+        service.download_file.assert_not_called()
+        assert db.query(Voucher).count() == 3
+        db.close()
+
+    def test_token_not_advanced_when_db_write_fails(self, service, monkeypatch):
+        db = sessionmaker(bind=service.engine)()
+        db.add(DriveSyncState(sync_key=f"vouchers:{FOLDER}", page_token="t1"))
+        db.commit()
+        monkeypatch.setattr(
+            service, "save_vouchers_to_database", MagicMock(side_effect=RuntimeError("db down"))
+        )
+        _changes(service, [{"newStartPageToken": "t2", "changes": [{"fileId": "a", "file": _file("a")}]}])
+
+        summary = service.sync_new_vouchers()
+
+        assert "db down" in summary["errors"][0]
+        db.expire_all()
+        assert db.query(DriveSyncState).one().page_token == "t1"
+        db.close()
+
+    def test_failed_file_is_retried_next_run(self, service):
+        db = sessionmaker(bind=service.engine)()
+        db.add(DriveSyncState(sync_key=f"vouchers:{FOLDER}", page_token="t1"))
+        db.commit()
+
+        service.download_file.side_effect = lambda file_id: None if file_id == "b" else file_id.encode()
+        _changes(service, [{
+            "newStartPageToken": "t2",
+            "changes": [{"fileId": f, "file": _file(f)} for f in ("a", "b")],
+        }])
+        summary = service.sync_new_vouchers()
+
+        assert (summary["files_processed"], summary["files_failed"]) == (1, 1)
+        assert [(r.file_id, r.attempts) for r in db.query(DriveSyncRetry).all()] == [("b", 1)]
+        db.expire_all()
+        assert db.query(DriveSyncState).one().page_token == "t2"
+
+        # "b" isn't in the next feed, but comes back from the retry list
+        service.download_file.side_effect = lambda file_id: file_id.encode()
+        service.drive_service.files.return_value.get.return_value.execute.return_value = _file("b")
+        _changes(service, [{"newStartPageToken": "t3", "changes": []}])
+        summary = service.sync_new_vouchers()
+
+        assert summary["files_processed"] == 1
+        service.drive_service.files.return_value.get.assert_called_with(
+            fileId="b", fields=voucher_sync_service.VOUCHER_FILE_FIELDS, supportsAllDrives=True
+        )
+        db.expire_all()
+        assert db.query(DriveSyncRetry).count() == 0
+        assert db.query(Voucher).count() == 2
+        db.close()
+
+    def test_file_is_dead_lettered_after_max_attempts(self, service, monkeypatch):
+        monkeypatch.setattr(voucher_sync_service, "VOUCHER_SYNC_MAX_ATTEMPTS", 2)
+        db = sessionmaker(bind=service.engine)()
+        db.add(DriveSyncState(sync_key=f"vouchers:{FOLDER}", page_token="t1"))
+        db.commit()
+
+        service.download_file.side_effect = lambda file_id: None
+        service.drive_service.files.return_value.get.return_value.execute.return_value = _file("b")
+        _changes(service, [
+            {"newStartPageToken": "t2", "changes": [{"fileId": "b", "file": _file("b")}]},
+            {"newStartPageToken": "t3", "changes": []},
+            {"newStartPageToken": "t4", "changes": []},
+        ])
+        service.sync_new_vouchers()
+        service.sync_new_vouchers()
+
+        retry = db.query(DriveSyncRetry).one()
+        assert retry.attempts == 2
+        assert retry.dead_at is not None
+
+        # Dead files are no longer fetched or retried
+        service.drive_service.files.return_value.get.reset_mock()
+        summary = service.sync_new_vouchers()
+
+        assert summary["files_found"] == 0
+        service.drive_service.files.return_value.get.assert_not_called()
+        db.close()
+
+    def test_first_run_listing_failure_keeps_no_token(self, service):
+        db = sessionmaker(bind=service.engine)()
+        service.drive_service.changes.return_value.getStartPageToken.return_value.execute.return_value = {
+            "startPageToken": "t1"
+        }
+        service.drive_service.files.return_value.list.return_value.execute.side_effect = RuntimeError("drive down")
+
+        summary = service.sync_new_vouchers()
+
+        assert "drive down" in summary["errors"][0]
+        assert db.query(DriveSyncState).count() == 0
+        db.close()
@@ -2,13 +2,26 @@
 Voucher Sync Service
 Monitors Google Drive folder for new vouchers, extracts data using OCR,
 and syncs to both the portal database and Google Sheets
+
+Each run reads the Drive changes feed from a persisted page token, so only
+files added or changed since the last run are downloaded. Download + OCR run
+on a small thread pool; the results are written with one DB transaction and
+one Sheets append. Vouchers are keyed by Drive file id + content hash so a
+re-run (or a file that shows up in the feed again unchanged) is a no-op.
+Files that fail to download or OCR are recorded in drive_sync_retries and
+retried on every run until they succeed or leave the folder, since the
+changes feed won't return them again unless they are edited. After
+VOUCHER_SYNC_MAX_ATTEMPTS failures a file is marked dead and left for a human.
 """
 import os
 import io
 import re
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dotenv import load_dotenv
 
 # Google APIs
@@ -20,7 +33,7 @@ import gspread
 
 # Portal imports
 from portal_database import db_manager
-from portal_models import Voucher
+from portal_models import DriveSyncRetry, DriveSyncState, Voucher
 
 load_dotenv()
 
@@ -32,6 +45,10 @@ GOOGLE_DRIVE_FOLDER_ID = os.getenv("GOOGLE_DRIVE_VOUCHER_FOLDER_ID")
 GOOGLE_SHEETS_ID = os.getenv("GOOGLE_SHEETS_VOUCHER_ID", "1f0lk54-zyAnZd2Ok9KNezHgTjYeuH4zCwaLASGjMZAM")
 GOOGLE_SERVICE_ACCOUNT_JSON = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
 GOOGLE_CLOUD_PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT_ID")
+VOUCHER_SYNC_WORKERS = int(os.getenv("VOUCHER_SYNC_WORKERS", "4"))
+VOUCHER_SYNC_MAX_ATTEMPTS = int(os.getenv("VOUCHER_SYNC_MAX_ATTEMPTS", "5"))
+
+VOUCHER_FILE_FIELDS = "id, name, mimeType, parents, trashed, createdTime, md5Checksum, webViewLink"
 
 # Scopes needed
 SCOPES = [
@@ -47,6 +64,7 @@ class VoucherSyncService:
         self.drive_service = None
         self.vision_client = None
         self.sheets_client = None
+        self._local = threading.local()
         self._initialize_clients()
     
     def _initialize_clients(self):
@@ -98,40 +116,188 @@ class VoucherSyncService:
             return []
         
         try:
-            # Calculate cutoff time
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours_back)
-            cutoff_str = cutoff_time.isoformat() + 'Z'
-            
-            # Query for new PDF and image files in the folder
-            query = (
-                f"'{GOOGLE_DRIVE_FOLDER_ID}' in parents "
-                f"and (mimeType contains 'image/' or mimeType = 'application/pdf') "
-                f"and createdTime > '{cutoff_str}' "
-                f"and trashed = false"
-            )
-            
-            results = self.drive_service.files().list(
-                q=query,
-                fields="files(id, name, mimeType, createdTime, webViewLink)",
-                orderBy="createdTime desc",
-                corpora='allDrives',
-                includeItemsFromAllDrives=True,
-                supportsAllDrives=True
-            ).execute()
-            
-            files = results.get('files', [])
-            logger.info(f"Found {len(files)} new voucher files in Drive")
-            
-            return files
-            
+            return self._list_recent_vouchers(hours_back)
         except Exception as e:
             logger.error(f"Error getting files from Drive: {str(e)}")
             return []
+
+    def _list_recent_vouchers(self, hours_back: int) -> List[Dict[str, Any]]:
+        """Voucher files created in the last hours_back hours; raises on API errors"""
+        # Calculate cutoff time
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours_back)
+        cutoff_str = cutoff_time.isoformat() + 'Z'
+
+        # Query for new PDF and image files in the folder
+        query = (
+            f"'{GOOGLE_DRIVE_FOLDER_ID}' in parents "
+            f"and (mimeType contains 'image/' or mimeType = 'application/pdf') "
+            f"and createdTime > '{cutoff_str}' "
+            f"and trashed = false"
+        )
+
+        results = self.drive_service.files().list(
+            q=query,
+            fields=f"files({VOUCHER_FILE_FIELDS})",
+            orderBy="createdTime desc",
+            corpora='allDrives',
+            includeItemsFromAllDrives=True,
+            supportsAllDrives=True
+        ).execute()
+
+        files = results.get('files', [])
+        logger.info(f"Found {len(files)} new voucher files in Drive")
+        return files
     
+    # ------------------------------------------------------------------
+    # Drive changes feed
+    # ------------------------------------------------------------------
+
+    def _sync_key(self) -> str:
+        return f"vouchers:{GOOGLE_DRIVE_FOLDER_ID}"
+
+    def _load_page_token(self) -> Optional[str]:
+        db = db_manager.get_session()
+        try:
+            state = db.query(DriveSyncState).filter(
+                DriveSyncState.sync_key == self._sync_key()
+            ).first()
+            return state.page_token if state else None
+        finally:
+            db.close()
+
+    def _load_retry_files(self) -> List[Dict[str, Any]]:
+        """Current metadata for files that failed on earlier runs (dead ones excluded)"""
+        db = db_manager.get_session()
+        try:
+            file_ids = [r.file_id for r in db.query(DriveSyncRetry.file_id).filter(
+                DriveSyncRetry.sync_key == self._sync_key(),
+                DriveSyncRetry.dead_at.is_(None),
+            ).all()]
+        finally:
+            db.close()
+
+        files, gone = [], []
+        for file_id in file_ids:
+            try:
+                file_info = self.drive_service.files().get(
+                    fileId=file_id, fields=VOUCHER_FILE_FIELDS, supportsAllDrives=True
+                ).execute()
+            except Exception as e:
+                if getattr(getattr(e, "resp", None), "status", None) == 404:
+                    gone.append(file_id)
+                    continue
+                # Drive hiccup: keep it queued (no attempt counted) for the next run
+                logger.warning(f"Could not load retry file {file_id}: {str(e)}")
+                continue
+            if self._is_voucher_file(file_info):
+                files.append(file_info)
+            else:
+                gone.append(file_id)
+        if gone:
+            self._save_progress(None, {}, gone)
+        return files
+
+    def _save_progress(self, page_token: Optional[str], failed: Dict[str, str], resolved: List[str]):
+        """Advance the page token and update the retry list in one transaction"""
+        db = db_manager.get_session()
+        try:
+            if page_token:
+                db.merge(DriveSyncState(sync_key=self._sync_key(), page_token=page_token))
+            if resolved:
+                db.query(DriveSyncRetry).filter(
+                    DriveSyncRetry.sync_key == self._sync_key(),
+                    DriveSyncRetry.file_id.in_(resolved),
+                ).delete(synchronize_session=False)
+            existing = {
+                r.file_id: r for r in db.query(DriveSyncRetry).filter(
+                    DriveSyncRetry.sync_key == self._sync_key(),
+                    DriveSyncRetry.file_id.in_(list(failed)),
+                ).all()
+            } if failed else {}
+            for file_id, error in failed.items():
+                retry = existing.get(file_id)
+                if retry is None:
+                    db.add(DriveSyncRetry(sync_key=self._sync_key(), file_id=file_id, attempts=1, last_error=error))
+                else:
+                    retry.attempts += 1
+                    retry.last_error = error
+                    if retry.dead_at is None and retry.attempts >= VOUCHER_SYNC_MAX_ATTEMPTS:
+                        # Logged once, when the file is given up on
+                        retry.dead_at = datetime.utcnow()
+                        logger.error(
+                            f"Giving up on voucher file {file_id} after {retry.attempts} attempts: {error}"
+                        )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _get_start_page_token(self) -> str:
+        response = self.drive_service.changes().getStartPageToken(
+            supportsAllDrives=True
+        ).execute()
+        return response["startPageToken"]
+
+    @staticmethod
+    def _is_voucher_file(file_info: Dict[str, Any]) -> bool:
+        """A non-trashed image/PDF directly inside the voucher folder"""
+        mime_type = file_info.get("mimeType", "")
+        return (
+            not file_info.get("trashed")
+            and GOOGLE_DRIVE_FOLDER_ID in (file_info.get("parents") or [])
+            and (mime_type.startswith("image/") or mime_type == "application/pdf")
+        )
+
+    def get_changed_vouchers_from_drive(self, page_token: str) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Read the Drive changes feed from page_token
+
+        Returns:
+            (voucher files added or changed since the token, token for the next run)
+        """
+        files_by_id: Dict[str, Dict[str, Any]] = {}
+        new_start_token = None
+        while page_token:
+            response = self.drive_service.changes().list(
+                pageToken=page_token,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({VOUCHER_FILE_FIELDS}))",
+                pageSize=1000,
+                spaces="drive",
+                includeItemsFromAllDrives=True,
+                supportsAllDrives=True,
+            ).execute()
+
+            for change in response.get("changes", []):
+                file_info = change.get("file")
+                if change.get("removed") or not file_info or not self._is_voucher_file(file_info):
+                    # Later changes to the same file win
+                    files_by_id.pop(change.get("fileId"), None)
+                    continue
+                files_by_id[file_info["id"]] = file_info
+
+            page_token = response.get("nextPageToken")
+            new_start_token = response.get("newStartPageToken", new_start_token)
+
+        files = list(files_by_id.values())
+        logger.info(f"Drive changes feed: {len(files)} new/changed voucher files")
+        return files, new_start_token
+
+    def _drive_for_thread(self):
+        """googleapiclient services aren't thread-safe; build one per worker thread"""
+        if not self.credentials:
+            return self.drive_service
+        service = getattr(self._local, "drive_service", None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+            self._local.drive_service = service
+        return service
+
     def download_file(self, file_id: str) -> Optional[bytes]:
         """Download a file from Google Drive"""
         try:
-            request = self.drive_service.files().get_media(fileId=file_id, supportsAllDrives=True)
+            request = self._drive_for_thread().files().get_media(fileId=file_id, supportsAllDrives=True)
             file_buffer = io.BytesIO()
             downloader = MediaIoBaseDownload(file_buffer, request)
             
@@ -466,6 +632,23 @@ class VoucherSyncService:
             logger.error(f"Error parsing voucher data: {str(e)}")
             return None
     
+    @staticmethod
+    def _voucher_from_data(voucher_data: Dict[str, Any]) -> Voucher:
+        return Voucher(
+            client_name=voucher_data.get("client_name"),
+            voucher_number=voucher_data.get("voucher_number"),
+            voucher_start_date=datetime.fromisoformat(voucher_data["voucher_start_date"]).date() if voucher_data.get("voucher_start_date") else None,
+            voucher_end_date=datetime.fromisoformat(voucher_data["voucher_end_date"]).date() if voucher_data.get("voucher_end_date") else None,
+            invoice_date=datetime.fromisoformat(voucher_data["invoice_date"]).date() if voucher_data.get("invoice_date") else None,
+            amount=voucher_data.get("amount"),
+            status=voucher_data.get("status", "Pending"),
+            notes=voucher_data.get("notes"),
+            voucher_image_url=voucher_data.get("voucher_image_url"),
+            drive_file_id=voucher_data.get("drive_file_id"),
+            content_hash=voucher_data.get("content_hash"),
+            created_by="auto-sync"
+        )
+
     def save_to_database(self, voucher_data: Dict[str, Any]) -> Optional[int]:
         """Save voucher to database"""
         db = db_manager.get_session()
@@ -481,18 +664,7 @@ class VoucherSyncService:
                 return existing.id
             
             # Create new voucher
-            voucher = Voucher(
-                client_name=voucher_data.get("client_name"),
-                voucher_number=voucher_data.get("voucher_number"),
-                voucher_start_date=datetime.fromisoformat(voucher_data["voucher_start_date"]).date() if voucher_data.get("voucher_start_date") else None,
-                voucher_end_date=datetime.fromisoformat(voucher_data["voucher_end_date"]).date() if voucher_data.get("voucher_end_date") else None,
-                invoice_date=datetime.fromisoformat(voucher_data["invoice_date"]).date() if voucher_data.get("invoice_date") else None,
-                amount=voucher_data.get("amount"),
-                status=voucher_data.get("status", "Pending"),
-                notes=voucher_data.get("notes"),
-                voucher_image_url=voucher_data.get("voucher_image_url"),
-                created_by="auto-sync"
-            )
+            voucher = self._voucher_from_data(voucher_data)
             
             db.add(voucher)
             db.commit()
@@ -507,6 +679,101 @@ class VoucherSyncService:
             return None
         finally:
             db.close()
+
+    def _imported_keys(self, file_ids: List[str]) -> set:
+        """(drive_file_id, content_hash) pairs already in the database"""
+        if not file_ids:
+            return set()
+        db = db_manager.get_session()
+        try:
+            rows = db.query(Voucher.drive_file_id, Voucher.content_hash).filter(
+                Voucher.drive_file_id.in_(file_ids)
+            ).all()
+            return {(file_id, content_hash) for file_id, content_hash in rows}
+        finally:
+            db.close()
+
+    def save_vouchers_to_database(self, vouchers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert a run's vouchers in a single transaction
+
+        Vouchers whose number or (file id, content hash) is already stored are
+        skipped. Raises on failure so the caller doesn't advance the page token.
+
+        Returns:
+            The voucher dicts that were inserted
+        """
+        if not vouchers:
+            return []
+
+        db = db_manager.get_session()
+        try:
+            numbers = [v.get("voucher_number") for v in vouchers]
+            file_ids = [v.get("drive_file_id") for v in vouchers if v.get("drive_file_id")]
+            existing_numbers = {
+                number for (number,) in
+                db.query(Voucher.voucher_number).filter(Voucher.voucher_number.in_(numbers)).all()
+            }
+            existing_keys = set()
+            if file_ids:
+                existing_keys = {
+                    (file_id, content_hash) for file_id, content_hash in
+                    db.query(Voucher.drive_file_id, Voucher.content_hash).filter(
+                        Voucher.drive_file_id.in_(file_ids)
+                    ).all()
+                }
+
+            new_vouchers = []
+            for voucher_data in vouchers:
+                number = voucher_data.get("voucher_number")
+                key = (voucher_data.get("drive_file_id"), voucher_data.get("content_hash"))
+                if number in existing_numbers or key in existing_keys:
+                    logger.info(f"Voucher {number} already exists in database")
+                    continue
+                existing_numbers.add(number)
+                existing_keys.add(key)
+                new_vouchers.append(voucher_data)
+
+            db.add_all([self._voucher_from_data(v) for v in new_vouchers])
+            db.commit()
+            logger.info(f"Saved {len(new_vouchers)} vouchers to database")
+            return new_vouchers
+
+        except Exception as e:
+            logger.error(f"Error saving vouchers to database: {str(e)}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _sheet_row(voucher_data: Dict[str, Any]) -> List[Any]:
+        # Columns: Client, Voucher No, Voucher Dates, Invoice Date, Amount, Invoiced Correctly?, Notes, Voucher Image
+        voucher_dates = ""
+        if voucher_data.get("voucher_start_date") and voucher_data.get("voucher_end_date"):
+            start = datetime.fromisoformat(voucher_data["voucher_start_date"])
+            end = datetime.fromisoformat(voucher_data["voucher_end_date"])
+            voucher_dates = f"{start.strftime('%b %d')} - {end.strftime('%b %d')}"
+        
+        invoice_date = ""
+        if voucher_data.get("invoice_date"):
+            inv_date = datetime.fromisoformat(voucher_data["invoice_date"])
+            invoice_date = inv_date.strftime("%m/%d/%Y")
+        
+        return [
+            voucher_data.get("client_name", ""),
+            voucher_data.get("voucher_number", ""),
+            voucher_dates,
+            invoice_date,
+            voucher_data.get("amount", ""),
+            voucher_data.get("status", "Pending"),
+            voucher_data.get("notes", "Auto-imported via OCR"),
+            voucher_data.get("voucher_image_url", "")
+        ]
+
+    def _worksheet(self):
+        sheet = self.sheets_client.open_by_key(GOOGLE_SHEETS_ID)
+        return sheet.get_worksheet(0)  # First sheet
     
     def save_to_google_sheet(self, voucher_data: Dict[str, Any]):
         """Append voucher to Google Sheet"""
@@ -515,48 +782,72 @@ class VoucherSyncService:
                 logger.warning("Sheets client not initialized")
                 return
             
-            # Open the spreadsheet
-            sheet = self.sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-            worksheet = sheet.get_worksheet(0)  # First sheet
-            
-            # Format the row data to match the sheet structure
-            # Columns: Client, Voucher No, Voucher Dates, Invoice Date, Amount, Invoiced Correctly?, Notes, Voucher Image
-            
-            voucher_dates = ""
-            if voucher_data.get("voucher_start_date") and voucher_data.get("voucher_end_date"):
-                start = datetime.fromisoformat(voucher_data["voucher_start_date"])
-                end = datetime.fromisoformat(voucher_data["voucher_end_date"])
-                voucher_dates = f"{start.strftime('%b %d')} - {end.strftime('%b %d')}"
-            
-            invoice_date = ""
-            if voucher_data.get("invoice_date"):
-                inv_date = datetime.fromisoformat(voucher_data["invoice_date"])
-                invoice_date = inv_date.strftime("%m/%d/%Y")
-            
-            row = [
-                voucher_data.get("client_name", ""),
-                voucher_data.get("voucher_number", ""),
-                voucher_dates,
-                invoice_date,
-                voucher_data.get("amount", ""),
-                voucher_data.get("status", "Pending"),
-                voucher_data.get("notes", "Auto-imported via OCR"),
-                voucher_data.get("voucher_image_url", "")
-            ]
-            
             # Append the row
-            worksheet.append_row(row, value_input_option='USER_ENTERED')
+            self._worksheet().append_row(self._sheet_row(voucher_data), value_input_option='USER_ENTERED')
             logger.info(f"Added voucher {voucher_data.get('voucher_number')} to Google Sheet")
             
         except Exception as e:
             logger.error(f"Error saving to Google Sheet: {str(e)}")
+
+    def append_to_google_sheet(self, vouchers: List[Dict[str, Any]]):
+        """Append all of a run's vouchers to the Google Sheet in one request"""
+        if not vouchers:
+            return
+        if not self.sheets_client:
+            logger.warning("Sheets client not initialized")
+            return
+        self._worksheet().append_rows(
+            [self._sheet_row(v) for v in vouchers], value_input_option='USER_ENTERED'
+        )
+        logger.info(f"Added {len(vouchers)} vouchers to Google Sheet")
+
+    def _process_file(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Download, OCR and parse one file (runs on a worker thread)"""
+        file_id = file_info['id']
+        file_name = file_info['name']
+        file_url = file_info.get('webViewLink', '')
+        mime_type = file_info.get('mimeType', '')
+
+        logger.info(f"Processing file: {file_name} (type: {mime_type})")
+
+        # Download the file
+        image_bytes = self.download_file(file_id)
+        if not image_bytes:
+            return {"error": f"Failed to download {file_name}"}
+
+        # Check if it's a PDF
+        is_pdf = mime_type == 'application/pdf' or file_name.lower().endswith('.pdf')
+
+        # Extract text using OCR
+        text = self.extract_text_from_image(image_bytes, is_pdf=is_pdf)
+        if not text:
+            return {"error": f"No text extracted from {file_name}"}
+
+        logger.info(f"Extracted text from {file_name}:\n{text[:200]}...")
+
+        # Parse voucher data
+        voucher_data = self.parse_voucher_data(text, file_name, file_url)
+        if not voucher_data:
+            return {"error": f"Failed to parse data from {file_name}"}
+
+        voucher_data["drive_file_id"] = file_id
+        voucher_data["content_hash"] = file_info.get("md5Checksum") or hashlib.md5(image_bytes).hexdigest()
+        return {"voucher": voucher_data}
+
+    def _safe_process_file(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self._process_file(file_info)
+        except Exception as e:
+            logger.error(f"Error processing file {file_info.get('name')}: {str(e)}")
+            return {"error": f"Error processing {file_info.get('name')}: {str(e)}"}
     
     def sync_new_vouchers(self, hours_back: int = 24) -> Dict[str, Any]:
         """
         Main sync function - process new vouchers from Drive
         
         Args:
-            hours_back: How many hours back to check for new files
+            hours_back: On the first run (no saved page token), how many hours
+                back to list the folder before switching to the changes feed
         
         Returns:
             Summary of sync operation
@@ -565,70 +856,78 @@ class VoucherSyncService:
             "files_found": 0,
             "files_processed": 0,
             "files_failed": 0,
+            "files_skipped": 0,
             "vouchers_created": [],
             "errors": []
         }
+
+        if not self.drive_service or not GOOGLE_DRIVE_FOLDER_ID:
+            logger.warning("Drive service not initialized or folder ID not set")
+            return summary
         
         try:
-            # Get new files from Drive
-            files = self.get_new_vouchers_from_drive(hours_back)
+            page_token = self._load_page_token()
+            if page_token:
+                files, next_token = self.get_changed_vouchers_from_drive(page_token)
+            else:
+                # Take the token before listing so nothing lands in between.
+                # A failed listing raises, so the token isn't saved and the
+                # next run lists again instead of skipping those files.
+                next_token = self._get_start_page_token()
+                files = self._list_recent_vouchers(hours_back)
+            # Earlier failures first; the feed's copy of a file wins if both have it
+            files_by_id = {f['id']: f for f in self._load_retry_files()}
+            files_by_id.update((f['id'], f) for f in files)
+            files = list(files_by_id.values())
             summary["files_found"] = len(files)
-            
-            for file_info in files:
-                try:
-                    file_id = file_info['id']
-                    file_name = file_info['name']
-                    file_url = file_info.get('webViewLink', '')
-                    mime_type = file_info.get('mimeType', '')
-                    
-                    logger.info(f"Processing file: {file_name} (type: {mime_type})")
-                    
-                    # Download the file
-                    image_bytes = self.download_file(file_id)
-                    if not image_bytes:
-                        summary["files_failed"] += 1
-                        summary["errors"].append(f"Failed to download {file_name}")
-                        continue
-                    
-                    # Check if it's a PDF
-                    is_pdf = mime_type == 'application/pdf' or file_name.lower().endswith('.pdf')
-                    
-                    # Extract text using OCR
-                    text = self.extract_text_from_image(image_bytes, is_pdf=is_pdf)
-                    if not text:
-                        summary["files_failed"] += 1
-                        summary["errors"].append(f"No text extracted from {file_name}")
-                        continue
-                    
-                    logger.info(f"Extracted text from {file_name}:\n{text[:200]}...")
-                    
-                    # Parse voucher data
-                    voucher_data = self.parse_voucher_data(text, file_name, file_url)
-                    if not voucher_data:
-                        summary["files_failed"] += 1
-                        summary["errors"].append(f"Failed to parse data from {file_name}")
-                        continue
-                    
-                    # Save to database
-                    voucher_id = self.save_to_database(voucher_data)
-                    if voucher_id:
-                        # Save to Google Sheet
-                        self.save_to_google_sheet(voucher_data)
-                        
-                        summary["files_processed"] += 1
-                        summary["vouchers_created"].append({
-                            "voucher_number": voucher_data.get("voucher_number"),
-                            "client_name": voucher_data.get("client_name"),
-                            "amount": voucher_data.get("amount")
-                        })
-                    else:
-                        summary["files_failed"] += 1
-                        summary["errors"].append(f"Failed to save {file_name} to database")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing file {file_info.get('name')}: {str(e)}")
-                    summary["files_failed"] += 1
-                    summary["errors"].append(f"Error processing {file_info.get('name')}: {str(e)}")
+
+            # Files whose current content was already imported need no download
+            imported = self._imported_keys([f['id'] for f in files])
+            pending = [
+                f for f in files
+                if not f.get("md5Checksum") or (f['id'], f["md5Checksum"]) not in imported
+            ]
+            summary["files_skipped"] = len(files) - len(pending)
+
+            vouchers = []
+            failed: Dict[str, str] = {}
+            if pending:
+                with ThreadPoolExecutor(
+                    max_workers=min(VOUCHER_SYNC_WORKERS, len(pending)),
+                    thread_name_prefix="voucher-ocr",
+                ) as pool:
+                    for file_info, result in zip(pending, pool.map(self._safe_process_file, pending)):
+                        if "error" in result:
+                            summary["files_failed"] += 1
+                            summary["errors"].append(result["error"])
+                            failed[file_info['id']] = result["error"]
+                        else:
+                            vouchers.append(result["voucher"])
+
+            # One transaction, then one Sheets append for the whole run
+            created = self.save_vouchers_to_database(vouchers)
+            summary["files_skipped"] += len(vouchers) - len(created)
+            try:
+                self.append_to_google_sheet(created)
+            except Exception as e:
+                logger.error(f"Error saving to Google Sheet: {str(e)}")
+                summary["errors"].append(f"Google Sheet append failed: {str(e)}")
+
+            summary["files_processed"] = len(created)
+            summary["vouchers_created"] = [
+                {
+                    "voucher_number": v.get("voucher_number"),
+                    "client_name": v.get("client_name"),
+                    "amount": v.get("amount")
+                }
+                for v in created
+            ]
+
+            # Only advance once the vouchers are committed; failed files are
+            # kept in the retry list so the next run tries them again
+            self._save_progress(
+                next_token, failed, [f['id'] for f in files if f['id'] not in failed]
+            )
             
         except Exception as e:
             logger.error(f"Error in sync_new_vouchers: {str(e)}")